@@ -0,0 +1,166 @@
+"""assignment_student_counters
+
+Revision ID: a1d4e7f2b9c3
+Revises: f9c3d6e1a7b8
+Create Date: 2026-03-02 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "a1d4e7f2b9c3"
+down_revision = "f9c3d6e1a7b8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "assignment_student_counters",
+        sa.Column("assignment_id", sa.Integer(), nullable=False),
+        sa.Column("students_total", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("students_submitted", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["assignment_id"], ["assignments.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("assignment_id"),
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION assignment_student_counters_init() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO assignment_student_counters (assignment_id, students_total, students_submitted)
+            SELECT NEW.id, count(*), 0
+            FROM course_memberships
+            WHERE course_id = NEW.course_id AND role = 'student'
+            ON CONFLICT (assignment_id) DO NOTHING;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION assignment_student_counters_enrollment() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE'
+                AND OLD.role = NEW.role
+                AND OLD.course_id = NEW.course_id
+                AND OLD.user_id = NEW.user_id THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.role = 'student' THEN
+                UPDATE assignment_student_counters AS c
+                SET students_total = GREATEST(c.students_total - 1, 0),
+                    students_submitted = GREATEST(
+                        c.students_submitted - (
+                            EXISTS (
+                                SELECT 1 FROM latest_submissions AS l
+                                WHERE l.assignment_id = c.assignment_id AND l.user_id = OLD.user_id
+                            )
+                        )::int,
+                        0
+                    )
+                FROM assignments AS a
+                WHERE a.id = c.assignment_id AND a.course_id = OLD.course_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.role = 'student' THEN
+                UPDATE assignment_student_counters AS c
+                SET students_total = c.students_total + 1,
+                    students_submitted = c.students_submitted + (
+                        EXISTS (
+                            SELECT 1 FROM latest_submissions AS l
+                            WHERE l.assignment_id = c.assignment_id AND l.user_id = NEW.user_id
+                        )
+                    )::int
+                FROM assignments AS a
+                WHERE a.id = c.assignment_id AND a.course_id = NEW.course_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION assignment_student_counters_submitted() RETURNS trigger AS $$
+        DECLARE
+            changed_assignment_id integer;
+            changed_user_id integer;
+            delta integer;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                changed_assignment_id := NEW.assignment_id;
+                changed_user_id := NEW.user_id;
+                delta := 1;
+            ELSE
+                changed_assignment_id := OLD.assignment_id;
+                changed_user_id := OLD.user_id;
+                delta := -1;
+            END IF;
+            UPDATE assignment_student_counters AS c
+            SET students_submitted = GREATEST(c.students_submitted + delta, 0)
+            FROM assignments AS a
+            WHERE c.assignment_id = changed_assignment_id
+                AND a.id = changed_assignment_id
+                AND EXISTS (
+                    SELECT 1 FROM course_memberships AS m
+                    WHERE m.course_id = a.course_id AND m.user_id = changed_user_id AND m.role = 'student'
+                );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    # Block writers while the triggers are installed and the counters backfilled.
+    op.execute(
+        "LOCK TABLE assignments, course_memberships, latest_submissions IN SHARE ROW EXCLUSIVE MODE"
+    )
+    op.execute(
+        """
+        CREATE TRIGGER assignments_student_counters
+        AFTER INSERT ON assignments
+        FOR EACH ROW EXECUTE FUNCTION assignment_student_counters_init()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER course_memberships_student_counters
+        AFTER INSERT OR DELETE OR UPDATE OF role, course_id, user_id ON course_memberships
+        FOR EACH ROW EXECUTE FUNCTION assignment_student_counters_enrollment()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER latest_submissions_student_counters
+        AFTER INSERT OR DELETE ON latest_submissions
+        FOR EACH ROW EXECUTE FUNCTION assignment_student_counters_submitted()
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO assignment_student_counters (assignment_id, students_total, students_submitted)
+        SELECT
+            a.id,
+            (
+                SELECT count(*) FROM course_memberships AS m
+                WHERE m.course_id = a.course_id AND m.role = 'student'
+            ),
+            (
+                SELECT count(*) FROM latest_submissions AS l
+                JOIN course_memberships AS m
+                    ON m.user_id = l.user_id AND m.course_id = a.course_id AND m.role = 'student'
+                WHERE l.assignment_id = a.id
+            )
+        FROM assignments AS a
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS latest_submissions_student_counters ON latest_submissions")
+    op.execute("DROP TRIGGER IF EXISTS course_memberships_student_counters ON course_memberships")
+    op.execute("DROP TRIGGER IF EXISTS assignments_student_counters ON assignments")
+    op.execute("DROP FUNCTION IF EXISTS assignment_student_counters_submitted()")
+    op.execute("DROP FUNCTION IF EXISTS assignment_student_counters_enrollment()")
+    op.execute("DROP FUNCTION IF EXISTS assignment_student_counters_init()")
+    op.drop_table("assignment_student_counters")
@@ -0,0 +1,76 @@
+"""submission_archive_jobs
+
+Revision ID: a7c3e9d1f2b4
+Revises: f1a2d3c4b5e6
+Create Date: 2026-02-24 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "a7c3e9d1f2b4"
+down_revision = "f1a2d3c4b5e6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    scope_enum = postgresql.ENUM("latest", "all", name="submission_archive_scope")
+    status_enum = postgresql.ENUM("queued", "running", "completed", "failed", name="submission_archive_job_status")
+    scope_enum.create(op.get_bind(), checkfirst=True)
+    status_enum.create(op.get_bind(), checkfirst=True)
+
+    op.create_table(
+        "submission_archive_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("course_id", sa.Integer(), nullable=False),
+        sa.Column("assignment_id", sa.Integer(), nullable=False),
+        sa.Column("requested_by_user_id", sa.Integer(), nullable=True),
+        sa.Column(
+            "scope",
+            postgresql.ENUM("latest", "all", name="submission_archive_scope", create_type=False),
+            nullable=False,
+        ),
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "queued",
+                "running",
+                "completed",
+                "failed",
+                name="submission_archive_job_status",
+                create_type=False,
+            ),
+            nullable=False,
+            server_default="queued",
+        ),
+        sa.Column("total_entries", sa.Integer(), nullable=False),
+        sa.Column("processed_entries", sa.Integer(), nullable=False),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("storage_path", sa.String(length=500), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["course_id"], ["courses.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["assignment_id"], ["assignments.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["requested_by_user_id"], ["users.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_submission_archive_jobs_course_id"), "submission_archive_jobs", ["course_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_submission_archive_jobs_assignment_id"), "submission_archive_jobs", ["assignment_id"], unique=False
+    )
+    op.create_index(op.f("ix_submission_archive_jobs_status"), "submission_archive_jobs", ["status"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_submission_archive_jobs_status"), table_name="submission_archive_jobs")
+    op.drop_index(op.f("ix_submission_archive_jobs_assignment_id"), table_name="submission_archive_jobs")
+    op.drop_index(op.f("ix_submission_archive_jobs_course_id"), table_name="submission_archive_jobs")
+    op.drop_table("submission_archive_jobs")
+    sa.Enum(name="submission_archive_job_status").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="submission_archive_scope").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,112 @@
+"""course_gradebook_versions
+
+Revision ID: b2e5a8d1c4f7
+Revises: a1d4e7f2b9c3
+Create Date: 2026-03-03 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "b2e5a8d1c4f7"
+down_revision = "a1d4e7f2b9c3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "course_gradebook_versions",
+        sa.Column("course_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.BigInteger(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["course_id"], ["courses.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("course_id"),
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION course_gradebook_versions_init() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO course_gradebook_versions (course_id, version)
+            VALUES (NEW.id, 0)
+            ON CONFLICT (course_id) DO NOTHING;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION course_gradebook_versions_bump_course_row() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE course_gradebook_versions SET version = version + 1 WHERE course_id = OLD.course_id;
+            END IF;
+            IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.course_id IS DISTINCT FROM OLD.course_id) THEN
+                UPDATE course_gradebook_versions SET version = version + 1 WHERE course_id = NEW.course_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION course_gradebook_versions_bump_cell() RETURNS trigger AS $$
+        DECLARE
+            changed_assignment_id integer;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                changed_assignment_id := OLD.assignment_id;
+            ELSE
+                changed_assignment_id := NEW.assignment_id;
+            END IF;
+            UPDATE course_gradebook_versions AS v
+            SET version = v.version + 1
+            FROM assignments AS a
+            WHERE a.id = changed_assignment_id AND v.course_id = a.course_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER courses_gradebook_version
+        AFTER INSERT ON courses
+        FOR EACH ROW EXECUTE FUNCTION course_gradebook_versions_init()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER assignments_gradebook_version
+        AFTER INSERT OR DELETE OR UPDATE OF course_id, title, max_points, due_date ON assignments
+        FOR EACH ROW EXECUTE FUNCTION course_gradebook_versions_bump_course_row()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER course_memberships_gradebook_version
+        AFTER INSERT OR DELETE OR UPDATE OF course_id, user_id, role, student_number ON course_memberships
+        FOR EACH ROW EXECUTE FUNCTION course_gradebook_versions_bump_course_row()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER latest_submissions_gradebook_version
+        AFTER INSERT OR DELETE OR UPDATE ON latest_submissions
+        FOR EACH ROW EXECUTE FUNCTION course_gradebook_versions_bump_cell()
+        """
+    )
+    op.execute("INSERT INTO course_gradebook_versions (course_id, version) SELECT id, 0 FROM courses")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS latest_submissions_gradebook_version ON latest_submissions")
+    op.execute("DROP TRIGGER IF EXISTS course_memberships_gradebook_version ON course_memberships")
+    op.execute("DROP TRIGGER IF EXISTS assignments_gradebook_version ON assignments")
+    op.execute("DROP TRIGGER IF EXISTS courses_gradebook_version ON courses")
+    op.execute("DROP FUNCTION IF EXISTS course_gradebook_versions_bump_cell()")
+    op.execute("DROP FUNCTION IF EXISTS course_gradebook_versions_bump_course_row()")
+    op.execute("DROP FUNCTION IF EXISTS course_gradebook_versions_init()")
+    op.drop_table("course_gradebook_versions")
@@ -0,0 +1,38 @@
+"""submission_archive_expiry
+
+Revision ID: b3e7f2a9c5d1
+Revises: f1c8d3a6b2e4
+Create Date: 2026-03-07 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "b3e7f2a9c5d1"
+down_revision = "f1c8d3a6b2e4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("submission_archive_jobs", sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True))
+    # Archives built before this revision expire one default retention window after completion.
+    op.execute(
+        """
+        UPDATE submission_archive_jobs
+        SET expires_at = completed_at + interval '24 hours'
+        WHERE status = 'completed' AND storage_path IS NOT NULL
+        """
+    )
+    op.create_index(
+        op.f("ix_submission_archive_jobs_expires_at"),
+        "submission_archive_jobs",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_submission_archive_jobs_expires_at"), table_name="submission_archive_jobs")
+    op.drop_column("submission_archive_jobs", "expires_at")
@@ -0,0 +1,36 @@
+"""notification_unread_counters
+
+Revision ID: b4d8e2f6a1c3
+Revises: a7c3e9d1f2b4
+Create Date: 2026-02-25 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "b4d8e2f6a1c3"
+down_revision = "a7c3e9d1f2b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "notification_unread_counters",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("unread_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.execute(
+        """
+        INSERT INTO notification_unread_counters (user_id, unread_count)
+        SELECT user_id, count(*) FROM notifications WHERE read_at IS NULL GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("notification_unread_counters")
@@ -0,0 +1,75 @@
+"""submission_updated_at
+
+Revision ID: c3f6b9e2d5a8
+Revises: b2e5a8d1c4f7
+Create Date: 2026-03-04 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "c3f6b9e2d5a8"
+down_revision = "b2e5a8d1c4f7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "submissions",
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    op.add_column("submissions", sa.Column("graded_at", sa.DateTime(timezone=True), nullable=True))
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION submissions_touch() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+                RETURN NEW;
+            END IF;
+            NEW.updated_at := clock_timestamp();
+            IF NEW.status <> 'graded' THEN
+                NEW.graded_at := NULL;
+            ELSIF TG_OP = 'INSERT'
+                OR OLD.status IS DISTINCT FROM NEW.status
+                OR OLD.score IS DISTINCT FROM NEW.score THEN
+                NEW.graded_at := NEW.updated_at;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    # Block writers between installing the trigger and backfilling, so no write is overwritten.
+    op.execute("LOCK TABLE submissions IN SHARE ROW EXCLUSIVE MODE")
+    # Existing rows have no write history: treat their creation as their last change and,
+    # for graded rows, as when they were graded.
+    op.execute(
+        """
+        UPDATE submissions
+        SET updated_at = created_at,
+            graded_at = CASE WHEN status = 'graded' THEN created_at END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER submissions_touch
+        BEFORE INSERT OR UPDATE ON submissions
+        FOR EACH ROW EXECUTE FUNCTION submissions_touch()
+        """
+    )
+    op.create_index(
+        "ix_submissions_course_updated",
+        "submissions",
+        ["course_id", "updated_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_submissions_course_updated", table_name="submissions")
+    op.execute("DROP TRIGGER IF EXISTS submissions_touch ON submissions")
+    op.execute("DROP FUNCTION IF EXISTS submissions_touch()")
+    op.drop_column("submissions", "graded_at")
+    op.drop_column("submissions", "updated_at")
@@ -0,0 +1,77 @@
+"""assignment_submission_counters
+
+Revision ID: c5e9f3a7b2d4
+Revises: b4d8e2f6a1c3
+Create Date: 2026-02-26 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "c5e9f3a7b2d4"
+down_revision = "b4d8e2f6a1c3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    status_enum = postgresql.ENUM(
+        "pending", "grading", "graded", "error", name="submission_status", create_type=False
+    )
+    op.create_table(
+        "assignment_submission_counters",
+        sa.Column("assignment_id", sa.Integer(), nullable=False),
+        sa.Column("status", status_enum, nullable=False),
+        sa.Column("submission_count", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["assignment_id"], ["assignments.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("assignment_id", "status"),
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION assignment_submission_counters_apply() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE'
+                AND OLD.status IS NOT DISTINCT FROM NEW.status
+                AND OLD.assignment_id = NEW.assignment_id THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE assignment_submission_counters
+                SET submission_count = GREATEST(submission_count - 1, 0)
+                WHERE assignment_id = OLD.assignment_id AND status = OLD.status;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO assignment_submission_counters (assignment_id, status, submission_count)
+                VALUES (NEW.assignment_id, NEW.status, 1)
+                ON CONFLICT (assignment_id, status)
+                DO UPDATE SET submission_count = assignment_submission_counters.submission_count + 1;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    # Block writers while the trigger is installed and the counters backfilled, so no
+    # submission is counted twice or missed.
+    op.execute("LOCK TABLE submissions IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(
+        """
+        CREATE TRIGGER submissions_status_counters
+        AFTER INSERT OR DELETE OR UPDATE OF status, assignment_id ON submissions
+        FOR EACH ROW EXECUTE FUNCTION assignment_submission_counters_apply()
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO assignment_submission_counters (assignment_id, status, submission_count)
+        SELECT assignment_id, status, count(*) FROM submissions GROUP BY assignment_id, status
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS submissions_status_counters ON submissions")
+    op.execute("DROP FUNCTION IF EXISTS assignment_submission_counters_apply()")
+    op.drop_table("assignment_submission_counters")
@@ -0,0 +1,59 @@
+"""grading_event_rollups
+
+Revision ID: d4a7c0f3e6b9
+Revises: c3f6b9e2d5a8
+Create Date: 2026-03-05 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "d4a7c0f3e6b9"
+down_revision = "c3f6b9e2d5a8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "grading_event_rollups",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("phase", sa.String(length=16), nullable=False),
+        sa.Column("event_type", sa.String(length=32), nullable=False),
+        sa.Column("reason", sa.String(length=64), nullable=True),
+        sa.Column("context", sa.String(length=64), nullable=True),
+        sa.Column("events", sa.Integer(), nullable=False),
+        sa.Column("duration_count", sa.Integer(), nullable=False),
+        sa.Column("duration_sum_ms", sa.BigInteger(), nullable=False),
+        sa.Column("duration_max_ms", sa.Integer(), nullable=True),
+        sa.Column("duration_p50_ms", sa.Integer(), nullable=True),
+        sa.Column("duration_p95_ms", sa.Integer(), nullable=True),
+        sa.Column("duration_p99_ms", sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_grading_event_rollups_bucket_start"),
+        "grading_event_rollups",
+        ["bucket_start"],
+        unique=False,
+    )
+    op.create_index(
+        "ux_grading_event_rollups_bucket_group",
+        "grading_event_rollups",
+        [
+            "bucket_start",
+            "phase",
+            "event_type",
+            sa.text("coalesce(reason, '')"),
+            sa.text("coalesce(context, '')"),
+        ],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_grading_event_rollups_bucket_group", table_name="grading_event_rollups")
+    op.drop_index(op.f("ix_grading_event_rollups_bucket_start"), table_name="grading_event_rollups")
+    op.drop_table("grading_event_rollups")
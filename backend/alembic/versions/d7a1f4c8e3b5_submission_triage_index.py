@@ -0,0 +1,84 @@
+"""submission_triage_index
+
+Revision ID: d7a1f4c8e3b5
+Revises: c5e9f3a7b2d4
+Create Date: 2026-02-27 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "d7a1f4c8e3b5"
+down_revision = "c5e9f3a7b2d4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("submissions", sa.Column("course_id", sa.Integer(), nullable=True))
+    op.add_column("submissions", sa.Column("triage_priority", sa.SmallInteger(), nullable=True))
+    op.create_foreign_key(
+        "submissions_course_id_fkey",
+        "submissions",
+        "courses",
+        ["course_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION submissions_set_triage() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' OR NEW.assignment_id IS DISTINCT FROM OLD.assignment_id THEN
+                SELECT course_id INTO NEW.course_id FROM assignments WHERE id = NEW.assignment_id;
+            END IF;
+            NEW.triage_priority := CASE NEW.status
+                WHEN 'pending' THEN 0
+                WHEN 'grading' THEN 1
+                WHEN 'error' THEN 2
+                ELSE 3
+            END;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    # Block writers between installing the trigger and backfilling, so no row is left unset.
+    op.execute("LOCK TABLE submissions IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(
+        """
+        CREATE TRIGGER submissions_triage
+        BEFORE INSERT OR UPDATE OF status, assignment_id ON submissions
+        FOR EACH ROW EXECUTE FUNCTION submissions_set_triage()
+        """
+    )
+    op.execute(
+        """
+        UPDATE submissions AS s
+        SET course_id = a.course_id,
+            triage_priority = CASE s.status
+                WHEN 'pending' THEN 0
+                WHEN 'grading' THEN 1
+                WHEN 'error' THEN 2
+                ELSE 3
+            END
+        FROM assignments AS a
+        WHERE a.id = s.assignment_id
+        """
+    )
+    op.create_index(
+        "ix_submissions_course_triage",
+        "submissions",
+        ["course_id", "triage_priority", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_submissions_course_triage", table_name="submissions")
+    op.execute("DROP TRIGGER IF EXISTS submissions_triage ON submissions")
+    op.execute("DROP FUNCTION IF EXISTS submissions_set_triage()")
+    op.drop_constraint("submissions_course_id_fkey", "submissions", type_="foreignkey")
+    op.drop_column("submissions", "triage_priority")
+    op.drop_column("submissions", "course_id")
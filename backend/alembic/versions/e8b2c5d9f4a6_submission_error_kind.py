@@ -0,0 +1,69 @@
+"""submission_error_kind
+
+Revision ID: e8b2c5d9f4a6
+Revises: d7a1f4c8e3b5
+Create Date: 2026-02-28 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "e8b2c5d9f4a6"
+down_revision = "d7a1f4c8e3b5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("submissions", sa.Column("error_kind", sa.String(length=20), nullable=True))
+    op.add_column("submissions", sa.Column("tests_passed", sa.Integer(), nullable=True))
+    op.add_column("submissions", sa.Column("tests_total", sa.Integer(), nullable=True))
+
+    # Same classification the student list endpoints used to derive per request:
+    # compile output beats a non-OK JOBE outcome (15), and infrastructure feedback
+    # beats both for errored submissions. Like the worker, only the latest phase
+    # counts: final results when there are any, practice results otherwise.
+    op.execute(
+        """
+        UPDATE submissions AS s
+        SET tests_passed = r.passed,
+            tests_total = r.total,
+            error_kind = CASE
+                WHEN r.compile_error THEN 'compile_error'
+                WHEN r.runtime_error THEN 'runtime_error'
+            END
+        FROM (
+            SELECT DISTINCT ON (submission_id)
+                submission_id,
+                count(*) FILTER (WHERE passed) AS passed,
+                count(*) AS total,
+                bool_or(btrim(coalesce(compile_output, '')) <> '') AS compile_error,
+                bool_or(outcome <> 15) AS runtime_error
+            FROM submission_test_results
+            GROUP BY submission_id, phase
+            ORDER BY submission_id, phase::text = 'final' DESC
+        ) AS r
+        WHERE r.submission_id = s.id
+        """
+    )
+    op.execute(
+        """
+        UPDATE submissions
+        SET error_kind = CASE
+            WHEN lower(coalesce(feedback, '')) LIKE '%grading infrastructure%'
+                OR lower(coalesce(feedback, '')) LIKE '%jobe request timed out%'
+                OR lower(coalesce(feedback, '')) LIKE '%jobe connection error%'
+                OR lower(coalesce(feedback, '')) LIKE '%jobe base url is not configured%'
+                THEN 'infra_error'
+            ELSE coalesce(error_kind, 'internal_error')
+        END
+        WHERE status = 'error'
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("submissions", "tests_total")
+    op.drop_column("submissions", "tests_passed")
+    op.drop_column("submissions", "error_kind")
@@ -0,0 +1,51 @@
+"""gradebook_cells_stamp
+
+Revision ID: f1c8d3a6b2e4
+Revises: d4a7c0f3e6b9
+Create Date: 2026-03-06 00:00:00.000000
+"""
+
+from alembic import op
+
+
+revision = "f1c8d3a6b2e4"
+down_revision = "d4a7c0f3e6b9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Cell changes are read from submissions.updated_at; bumping the per-course row on every
+    # latest_submissions write serialised a course's uploads and grading on one row lock.
+    op.execute("DROP TRIGGER IF EXISTS latest_submissions_gradebook_version ON latest_submissions")
+    op.execute("DROP FUNCTION IF EXISTS course_gradebook_versions_bump_cell()")
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION course_gradebook_versions_bump_cell() RETURNS trigger AS $$
+        DECLARE
+            changed_assignment_id integer;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                changed_assignment_id := OLD.assignment_id;
+            ELSE
+                changed_assignment_id := NEW.assignment_id;
+            END IF;
+            UPDATE course_gradebook_versions AS v
+            SET version = v.version + 1
+            FROM assignments AS a
+            WHERE a.id = changed_assignment_id AND v.course_id = a.course_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER latest_submissions_gradebook_version
+        AFTER INSERT OR DELETE OR UPDATE ON latest_submissions
+        FOR EACH ROW EXECUTE FUNCTION course_gradebook_versions_bump_cell()
+        """
+    )
@@ -0,0 +1,96 @@
+"""latest_submissions
+
+Revision ID: f9c3d6e1a7b8
+Revises: e8b2c5d9f4a6
+Create Date: 2026-03-01 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "f9c3d6e1a7b8"
+down_revision = "e8b2c5d9f4a6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    status_enum = postgresql.ENUM(
+        "pending", "grading", "graded", "error", name="submission_status", create_type=False
+    )
+    op.create_table(
+        "latest_submissions",
+        sa.Column("assignment_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("submission_id", sa.Integer(), nullable=False),
+        sa.Column("status", status_enum, nullable=False),
+        sa.Column("score", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["assignment_id"], ["assignments.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("assignment_id", "user_id"),
+        sa.UniqueConstraint("submission_id"),
+    )
+    op.create_index(op.f("ix_latest_submissions_user_id"), "latest_submissions", ["user_id"], unique=False)
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION latest_submissions_apply() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO latest_submissions (assignment_id, user_id, submission_id, status, score)
+                VALUES (NEW.assignment_id, NEW.user_id, NEW.id, NEW.status, NEW.score)
+                ON CONFLICT (assignment_id, user_id) DO UPDATE
+                SET submission_id = EXCLUDED.submission_id, status = EXCLUDED.status, score = EXCLUDED.score
+                WHERE latest_submissions.submission_id < EXCLUDED.submission_id;
+            ELSIF TG_OP = 'UPDATE' THEN
+                IF OLD.status IS DISTINCT FROM NEW.status OR OLD.score IS DISTINCT FROM NEW.score THEN
+                    UPDATE latest_submissions
+                    SET status = NEW.status, score = NEW.score
+                    WHERE submission_id = NEW.id;
+                END IF;
+            ELSE
+                DELETE FROM latest_submissions WHERE submission_id = OLD.id;
+                -- Fall back to the previous attempt, unless the whole assignment or user is going
+                -- away (cascades), in which case there is nothing left to point at.
+                IF FOUND
+                    AND EXISTS (SELECT 1 FROM assignments WHERE id = OLD.assignment_id)
+                    AND EXISTS (SELECT 1 FROM users WHERE id = OLD.user_id) THEN
+                    INSERT INTO latest_submissions (assignment_id, user_id, submission_id, status, score)
+                    SELECT assignment_id, user_id, id, status, score
+                    FROM submissions
+                    WHERE assignment_id = OLD.assignment_id AND user_id = OLD.user_id
+                    ORDER BY id DESC
+                    LIMIT 1
+                    ON CONFLICT (assignment_id, user_id) DO NOTHING;
+                END IF;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    # Block writers while the trigger is installed and the table backfilled.
+    op.execute("LOCK TABLE submissions IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(
+        """
+        CREATE TRIGGER submissions_latest
+        AFTER INSERT OR DELETE OR UPDATE OF status, score ON submissions
+        FOR EACH ROW EXECUTE FUNCTION latest_submissions_apply()
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO latest_submissions (assignment_id, user_id, submission_id, status, score)
+        SELECT DISTINCT ON (assignment_id, user_id) assignment_id, user_id, id, status, score
+        FROM submissions
+        ORDER BY assignment_id, user_id, id DESC
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS submissions_latest ON submissions")
+    op.execute("DROP FUNCTION IF EXISTS latest_submissions_apply()")
+    op.drop_index(op.f("ix_latest_submissions_user_id"), table_name="latest_submissions")
+    op.drop_table("latest_submissions")
@@ -4,9 +4,10 @@ from datetime import datetime, timezone
 from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps.principal import reset_request_principal
 from app.core.config import settings
-from app.crud.sessions import delete_session, get_session_by_token
-from app.crud.users import get_user
+from app.core.session_cache import attach_cached_user, cache_session, get_cached_session
+from app.crud.sessions import delete_session, get_session_with_user, hash_session_token
 from app.db.deps import get_db
 from app.models.user import User
 
@@ -15,20 +16,24 @@ async def get_current_user(
     request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> User:
+    reset_request_principal()
     token = request.cookies.get(settings.session_cookie_name)
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
-    session = await get_session_by_token(db, token=token)
-    if session is None:
+    token_hash = hash_session_token(token)
+    cached = await get_cached_session(token_hash)
+    if cached is not None:
+        return await attach_cached_user(db, cached)
+
+    row = await get_session_with_user(db, token_hash=token_hash)
+    if row is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    session, user = row
 
     if session.expires_at <= datetime.now(timezone.utc):
         await delete_session(db, session=session)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
-    user = await get_user(db, user_id=session.user_id)
-    if user is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-
+    await cache_session(token_hash, user=user, expires_at=session.expires_at)
     return user
@@ -1,13 +1,13 @@
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps.auth import get_current_user
+from app.api.deps.principal import INSTRUCTOR_ROLES, STAFF_ROLES, get_request_principal
 from app.api.deps.superadmin import is_superadmin
 from app.db.deps import get_db
-from app.models.course_membership import CourseMembership, CourseRole
+from app.models.course_membership import CourseRole
 from app.models.user import User
 
 
@@ -18,15 +18,8 @@ async def require_course_staff(
 ) -> None:
     if is_superadmin(current_user):
         return
-    result = await db.execute(
-        select(CourseMembership).where(
-            CourseMembership.course_id == course_id,
-            CourseMembership.user_id == current_user.id,
-            CourseMembership.role.in_([CourseRole.owner, CourseRole.co_lecturer, CourseRole.ta]),
-        )
-    )
-    membership = result.scalars().first()
-    if membership is None:
+    principal = await get_request_principal(db, user=current_user)
+    if principal.course_role(course_id) not in STAFF_ROLES:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Course staff role required")
 
 
@@ -37,15 +30,8 @@ async def require_course_instructor(
 ) -> None:
     if is_superadmin(current_user):
         return
-    result = await db.execute(
-        select(CourseMembership).where(
-            CourseMembership.course_id == course_id,
-            CourseMembership.user_id == current_user.id,
-            CourseMembership.role.in_([CourseRole.owner, CourseRole.co_lecturer]),
-        )
-    )
-    membership = result.scalars().first()
-    if membership is None:
+    principal = await get_request_principal(db, user=current_user)
+    if principal.course_role(course_id) not in INSTRUCTOR_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Course instructor role required",
@@ -59,13 +45,8 @@ async def require_course_student_or_staff(
 ) -> CourseRole:
     if is_superadmin(current_user):
         return CourseRole.owner
-    result = await db.execute(
-        select(CourseMembership).where(
-            CourseMembership.course_id == course_id,
-            CourseMembership.user_id == current_user.id,
-        )
-    )
-    membership = result.scalars().first()
-    if membership is None:
+    principal = await get_request_principal(db, user=current_user)
+    role = principal.course_role(course_id)
+    if role is None:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Course enrollment required")
-    return membership.role
+    return role
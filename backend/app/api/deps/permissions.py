@@ -1,13 +1,13 @@
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps.auth import get_current_user
+from app.api.deps.principal import get_request_principal
 from app.api.deps.superadmin import is_superadmin
 from app.db.deps import get_db
-from app.models.organization_membership import OrgRole, OrganizationMembership
+from app.models.organization_membership import OrgRole
 from app.models.user import User
 
 
@@ -18,15 +18,8 @@ async def require_org_admin(
 ) -> None:
     if is_superadmin(current_user):
         return
-    result = await db.execute(
-        select(OrganizationMembership).where(
-            OrganizationMembership.organization_id == org_id,
-            OrganizationMembership.user_id == current_user.id,
-            OrganizationMembership.role == OrgRole.admin,
-        )
-    )
-    membership = result.scalars().first()
-    if membership is None:
+    principal = await get_request_principal(db, user=current_user)
+    if principal.org_role(org_id) != OrgRole.admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin role required")
 
 
@@ -37,14 +30,8 @@ async def require_org_member(
 ) -> None:
     if is_superadmin(current_user):
         return
-    result = await db.execute(
-        select(OrganizationMembership).where(
-            OrganizationMembership.organization_id == org_id,
-            OrganizationMembership.user_id == current_user.id,
-        )
-    )
-    membership = result.scalars().first()
-    if membership is None:
+    principal = await get_request_principal(db, user=current_user)
+    if principal.org_role(org_id) is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Organization membership required",
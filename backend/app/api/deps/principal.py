@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import time
+from typing import Any
+
+from sqlalchemy import String, cast, event, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session as OrmSession
+
+from app.core.config import settings
+from app.models.course_membership import CourseMembership, CourseRole
+from app.models.organization_membership import OrganizationMembership, OrgRole
+from app.models.user import User
+
+# Authorization principal: every course and org role of the current user, loaded
+# with one query on first use and memoized for the rest of the request.
+#
+# Membership writes bump a per-user version (ORM flush/commit hooks below), which
+# invalidates both the request memo and the optional cross-request cache
+# (`authz_cache_ttl_seconds`, off by default). The version map is per process, so
+# with several replicas the TTL is what bounds staleness.
+
+STAFF_ROLES = frozenset({CourseRole.owner, CourseRole.co_lecturer, CourseRole.ta})
+INSTRUCTOR_ROLES = frozenset({CourseRole.owner, CourseRole.co_lecturer})
+
+
+@dataclass(frozen=True)
+class Principal:
+    user_id: int
+    version: int
+    course_roles: dict[int, CourseRole] = field(default_factory=dict)
+    org_roles: dict[int, OrgRole] = field(default_factory=dict)
+
+    def course_role(self, course_id: int) -> CourseRole | None:
+        return self.course_roles.get(int(course_id))
+
+    def org_role(self, org_id: int) -> OrgRole | None:
+        return self.org_roles.get(int(org_id))
+
+
+_request_principal: ContextVar[Principal | None] = ContextVar("marconi_request_principal", default=None)
+_principal_versions: dict[int, int] = {}
+_principal_cache: OrderedDict[int, tuple[float, Principal]] = OrderedDict()
+
+
+def principal_version(user_id: int) -> int:
+    return _principal_versions.get(int(user_id), 0)
+
+
+def invalidate_principal(user_id: int) -> None:
+    user_id = int(user_id)
+    _principal_versions[user_id] = principal_version(user_id) + 1
+    _principal_cache.pop(user_id, None)
+
+
+def reset_request_principal() -> None:
+    """Forget the memoized principal; called once per request by get_current_user."""
+    _request_principal.set(None)
+
+
+def _reset_principal_cache_for_tests() -> None:
+    _principal_versions.clear()
+    _principal_cache.clear()
+    _request_principal.set(None)
+
+
+async def load_principal(db: AsyncSession, *, user_id: int) -> Principal:
+    version = principal_version(user_id)
+    roles = union_all(
+        select(
+            literal("course").label("scope"),
+            CourseMembership.course_id.label("target_id"),
+            cast(CourseMembership.role, String).label("role"),
+        ).where(CourseMembership.user_id == user_id),
+        select(
+            literal("org").label("scope"),
+            OrganizationMembership.organization_id.label("target_id"),
+            cast(OrganizationMembership.role, String).label("role"),
+        ).where(OrganizationMembership.user_id == user_id),
+    )
+    result = await db.execute(roles)
+    course_roles: dict[int, CourseRole] = {}
+    org_roles: dict[int, OrgRole] = {}
+    for scope, target_id, role in result.all():
+        if scope == "course":
+            course_roles[int(target_id)] = CourseRole(role)
+        else:
+            org_roles[int(target_id)] = OrgRole(role)
+    return Principal(user_id=user_id, version=version, course_roles=course_roles, org_roles=org_roles)
+
+
+def _cached_principal(user_id: int) -> Principal | None:
+    ttl = settings.authz_cache_ttl_seconds
+    if ttl <= 0:
+        return None
+    item = _principal_cache.get(user_id)
+    if item is None:
+        return None
+    deadline, principal = item
+    if deadline <= time.monotonic() or principal.version != principal_version(user_id):
+        _principal_cache.pop(user_id, None)
+        return None
+    _principal_cache.move_to_end(user_id)
+    return principal
+
+
+def _store_principal(principal: Principal) -> None:
+    ttl = settings.authz_cache_ttl_seconds
+    if ttl <= 0:
+        return
+    _principal_cache[principal.user_id] = (time.monotonic() + ttl, principal)
+    _principal_cache.move_to_end(principal.user_id)
+    while len(_principal_cache) > settings.authz_cache_max_entries:
+        _principal_cache.popitem(last=False)
+
+
+async def get_request_principal(db: AsyncSession, *, user: User) -> Principal:
+    user_id = int(user.id)
+    principal = _request_principal.get()
+    if principal is not None and principal.user_id == user_id and principal.version == principal_version(user_id):
+        return principal
+
+    principal = _cached_principal(user_id)
+    if principal is None:
+        principal = await load_principal(db, user_id=user_id)
+        _store_principal(principal)
+    _request_principal.set(principal)
+    return principal
+
+
+_DIRTY_KEY = "marconi_authz_dirty_user_ids"
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _collect_membership_changes(session: OrmSession, _flush_context: Any) -> None:
+    dirty: set[int] | None = None
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (CourseMembership, OrganizationMembership)) and obj.user_id is not None:
+            if dirty is None:
+                dirty = session.info.setdefault(_DIRTY_KEY, set())
+            dirty.add(int(obj.user_id))
+    if dirty:
+        # Bump now so this session's own request stops trusting its memo immediately.
+        for user_id in dirty:
+            invalidate_principal(user_id)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _publish_membership_changes(session: OrmSession) -> None:
+    # Bump again after commit so principals loaded between flush and commit are discarded.
+    for user_id in session.info.pop(_DIRTY_KEY, ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_membership_changes(session: OrmSession) -> None:
+    session.info.pop(_DIRTY_KEY, None)
@@ -1,48 +1,154 @@
 from __future__ import annotations
 
+import logging
+import math
 import time
-from collections import defaultdict, deque
+from collections import OrderedDict
 from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 from threading import Lock
+from typing import Annotated, Literal, Protocol
 
-from fastapi import HTTPException, Request, status
+from fastapi import Depends, HTTPException, Request, status
 
+from app.api.deps.auth import get_current_user
+from app.core.config import settings
+from app.models.user import User
+from app.observability.metrics import counter
 
-class _InMemorySlidingWindowLimiter:
-    def __init__(self) -> None:
-        self._events: dict[str, deque[float]] = defaultdict(deque)
-        self._last_gc_monotonic = 0.0
+logger = logging.getLogger(__name__)
+
+RateLimitKey = Literal["ip", "user"]
+
+_rejections_total = counter(
+    "marconi_rate_limit_rejections_total",
+    "Requests rejected by the rate limiter, by bucket.",
+    ("bucket",),
+)
+_backend_errors_total = counter(
+    "marconi_rate_limit_backend_errors_total",
+    "Shared rate limiter backend failures (requests fell back to the in-process limiter).",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitDecision:
+    allowed: bool
+    retry_after_seconds: float = 0.0
+
+
+class RateLimiterBackend(Protocol):
+    async def hit(self, *, key: str, limit: int, window_seconds: int) -> RateLimitDecision: ...
+
+
+class _InMemoryGcraLimiter:
+    """Generic cell rate algorithm: one float (theoretical arrival time) per key.
+
+    `limit` requests may arrive back-to-back, after which they are admitted at one per
+    `window_seconds / limit`. Keys are kept in last-touched order and expired ones are
+    trimmed from the front, so cleanup is amortized O(1) instead of a full scan.
+    """
+
+    def __init__(self, *, max_keys: int = 100_000) -> None:
+        self._tats: OrderedDict[str, float] = OrderedDict()
+        self._max_keys = max(1, int(max_keys))
         self._lock = Lock()
 
-    def allow(self, *, key: str, limit: int, window_seconds: int) -> bool:
+    def allow(self, *, key: str, limit: int, window_seconds: int) -> RateLimitDecision:
         now = time.monotonic()
-        cutoff = now - window_seconds
+        interval = window_seconds / limit
         with self._lock:
-            if now - self._last_gc_monotonic > 60:
-                self._gc(now=now, stale_seconds=max(window_seconds * 2, 300))
-                self._last_gc_monotonic = now
+            tat = max(self._tats.get(key, now), now)
+            new_tat = tat + interval
+            if new_tat - now > window_seconds:
+                return RateLimitDecision(False, new_tat - now - window_seconds)
+            self._tats[key] = new_tat
+            self._tats.move_to_end(key)
+            self._trim(now)
+            return RateLimitDecision(True)
+
+    async def hit(self, *, key: str, limit: int, window_seconds: int) -> RateLimitDecision:
+        return self.allow(key=key, limit=limit, window_seconds=window_seconds)
+
+    def _trim(self, now: float) -> None:
+        while self._tats:
+            _, oldest_tat = next(iter(self._tats.items()))
+            if oldest_tat > now and len(self._tats) <= self._max_keys:
+                break
+            self._tats.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+
+# Same GCRA as the in-process limiter, evaluated atomically in Redis using the server
+# clock so every replica shares one budget per key. Times are in microseconds.
+_GCRA_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000000 + tonumber(now_parts[2])
+local interval = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+  tat = now
+end
+local new_tat = tat + interval
+if new_tat - now > window then
+  return {0, new_tat - now - window}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil((new_tat - now) / 1000))
+return {1, 0}
+"""
+
+
+class _RedisGcraLimiter:
+    def __init__(self, *, url: str, prefix: str) -> None:
+        from redis.asyncio import Redis
+
+        self._redis = Redis.from_url(url)
+        self._script = self._redis.register_script(_GCRA_LUA)
+        self._prefix = prefix
+
+    async def hit(self, *, key: str, limit: int, window_seconds: int) -> RateLimitDecision:
+        window_us = int(window_seconds * 1_000_000)
+        interval_us = max(1, window_us // limit)
+        allowed, retry_after_us = await self._script(
+            keys=[f"{self._prefix}:{key}"],
+            args=[interval_us, window_us],
+        )
+        return RateLimitDecision(bool(int(allowed)), int(retry_after_us) / 1_000_000)
 
-            queue = self._events[key]
-            while queue and queue[0] <= cutoff:
-                queue.popleft()
-            if len(queue) >= limit:
-                return False
-            queue.append(now)
-            return True
 
-    def _gc(self, *, now: float, stale_seconds: int) -> None:
-        stale_keys: list[str] = []
-        for key, queue in self._events.items():
-            if not queue:
-                stale_keys.append(key)
-                continue
-            if now - queue[-1] > stale_seconds:
-                stale_keys.append(key)
-        for key in stale_keys:
-            self._events.pop(key, None)
+_limiter = _InMemoryGcraLimiter()
+_shared_limiter: RateLimiterBackend | None = None
+_shared_limiter_configured = False
 
 
-_limiter = _InMemorySlidingWindowLimiter()
+def _shared_backend() -> RateLimiterBackend | None:
+    global _shared_limiter, _shared_limiter_configured
+    if not _shared_limiter_configured:
+        _shared_limiter_configured = True
+        use_redis = settings.rate_limit_backend == "redis" or (
+            settings.rate_limit_backend == "auto" and settings.redis_url.strip()
+        )
+        if use_redis and settings.redis_url.strip():
+            _shared_limiter = _RedisGcraLimiter(
+                url=settings.redis_url,
+                prefix=f"{settings.taskiq_queue_name}:ratelimit",
+            )
+    return _shared_limiter
+
+
+async def _hit(*, key: str, limit: int, window_seconds: int) -> RateLimitDecision:
+    shared = _shared_backend()
+    if shared is not None:
+        try:
+            return await shared.hit(key=key, limit=limit, window_seconds=window_seconds)
+        except Exception:
+            # Fail open to per-process limits rather than rejecting or crashing requests.
+            _backend_errors_total.inc()
+            logger.warning("Shared rate limiter unavailable; using in-process limiter", exc_info=True)
+    return _limiter.allow(key=key, limit=limit, window_seconds=window_seconds)
 
 
 def _client_ip(request: Request) -> str:
@@ -59,20 +165,41 @@ def make_rate_limit_dependency(
     bucket: str,
     limit: int,
     window_seconds: int = 60,
-) -> Callable[[Request], Awaitable[None]]:
+    key_by: RateLimitKey = "ip",
+) -> Callable[..., Awaitable[None]]:
+    """Build a dependency allowing `limit` requests per `window_seconds` per client IP or user.
+
+    `key_by="user"` keys on the authenticated user (so a shared campus NAT does not pool
+    everyone's budget) and therefore requires an authenticated route.
+    """
     if limit <= 0:
         async def _disabled(_request: Request) -> None:
             return None
 
         return _disabled
 
-    async def _dependency(request: Request) -> None:
-        key = f"{bucket}:{_client_ip(request)}"
-        if _limiter.allow(key=key, limit=limit, window_seconds=window_seconds):
+    rejections = _rejections_total.labels(bucket)
+
+    async def _check(key: str) -> None:
+        decision = await _hit(key=key, limit=limit, window_seconds=window_seconds)
+        if decision.allowed:
             return None
+        rejections.inc()
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Too many requests",
+            headers={"Retry-After": str(max(1, math.ceil(decision.retry_after_seconds)))},
         )
 
+    if key_by == "user":
+        async def _user_dependency(
+            current_user: Annotated[User, Depends(get_current_user)],
+        ) -> None:
+            await _check(f"{bucket}:user:{current_user.id}")
+
+        return _user_dependency
+
+    async def _dependency(request: Request) -> None:
+        await _check(f"{bucket}:{_client_ip(request)}")
+
     return _dependency
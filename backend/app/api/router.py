@@ -23,6 +23,7 @@ from app.api.routes.staff_course_invites import router as staff_course_invites_r
 from app.api.routes.staff_course_memberships import router as staff_course_memberships_router
 from app.api.routes.staff_course_modules import router as staff_course_modules_router
 from app.api.routes.staff_course_github_sync import router as staff_course_github_sync_router
+from app.api.routes.staff_course_gradebook import router as staff_course_gradebook_router
 from app.api.routes.staff_course_org_members import router as staff_course_org_members_router
 from app.api.routes.staff_course_resources import router as staff_course_resources_router
 from app.api.routes.staff_course_submissions import router as staff_course_submissions_router
@@ -51,6 +52,7 @@ api_router.include_router(staff_course_modules_router, tags=["staff"])
 api_router.include_router(staff_course_assignments_router, tags=["staff"])
 api_router.include_router(staff_course_assignment_extensions_router, tags=["staff"])
 api_router.include_router(staff_course_submissions_router, tags=["staff"])
+api_router.include_router(staff_course_gradebook_router, tags=["staff"])
 api_router.include_router(staff_course_memberships_router, tags=["staff"])
 api_router.include_router(staff_course_invites_router, tags=["staff"])
 api_router.include_router(staff_course_org_members_router, tags=["staff"])
@@ -4,14 +4,16 @@ from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps.auth import get_current_user
+from app.api.deps.principal import get_request_principal
 from app.api.deps.rate_limit import make_rate_limit_dependency
 from app.core.config import settings
-from app.core.security import hash_password, verify_password
+from app.core.security import hash_password_async, password_needs_rehash, verify_password_async
 from sqlalchemy.exc import IntegrityError
 
 from app.crud.course_memberships import CourseMembershipExistsError, add_course_membership
 from app.crud.invites import get_invite_by_token, mark_invite_used
-from app.crud.sessions import create_session, delete_session, get_session_by_token
+from app.core.session_cache import invalidate_session, invalidate_user_sessions
+from app.crud.sessions import create_session, delete_session, get_session_by_token, hash_session_token
 from app.crud.audit import enqueue_audit_event
 from app.crud.users import create_user, get_user_by_email
 from app.db.deps import get_db
@@ -19,7 +21,7 @@ from app.models.user import User
 from sqlalchemy import select
 
 from app.models.course_membership import CourseMembership, CourseRole
-from app.models.organization_membership import OrgRole, OrganizationMembership
+from app.models.organization_membership import OrgRole
 from app.models.student_profile import StudentProfile
 from app.api.deps.superadmin import is_superadmin
 from app.schemas.auth import (
@@ -39,23 +41,12 @@ login_rate_limit = make_rate_limit_dependency(
 
 async def _build_me_response(db: AsyncSession, *, user: User) -> MeResponse:
     is_sa = is_superadmin(user)
+    principal = await get_request_principal(db, user=user)
 
-    org_result = await db.execute(
-        select(OrganizationMembership.organization_id, OrganizationMembership.role).where(
-            OrganizationMembership.user_id == user.id
-        )
-    )
-    org_rows = list(org_result.all())
-    org_admin_of = [org_id for org_id, role in org_rows if role == OrgRole.admin]
-    org_roles = [OrgRoleItem(org_id=org_id, role=role) for org_id, role in org_rows]
-
-    course_result = await db.execute(
-        select(CourseMembership.course_id, CourseMembership.role).where(
-            CourseMembership.user_id == user.id
-        )
-    )
+    org_admin_of = [org_id for org_id, role in principal.org_roles.items() if role == OrgRole.admin]
+    org_roles = [OrgRoleItem(org_id=org_id, role=role) for org_id, role in principal.org_roles.items()]
     course_roles = [
-        CourseRoleItem(course_id=course_id, role=role) for course_id, role in course_result.all()
+        CourseRoleItem(course_id=course_id, role=role) for course_id, role in principal.course_roles.items()
     ]
 
     return MeResponse(
@@ -87,10 +78,16 @@ async def login(
     if (
         user is None
         or user.password_hash is None
-        or not verify_password(payload.password, user.password_hash)
+        or not await verify_password_async(payload.password, user.password_hash)
     ):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
+    if password_needs_rehash(user.password_hash):
+        # Transparent upgrade to the configured scheme/parameters while we hold the plaintext.
+        user.password_hash = await hash_password_async(payload.password)
+        await db.commit()
+        await invalidate_user_sessions(user.id)
+
     token, _ = await create_session(db, user_id=user.id)
     response.set_cookie(
         key=settings.session_cookie_name,
@@ -122,6 +119,8 @@ async def logout(
         existing = await get_session_by_token(db, token=token)
         if existing is not None:
             await delete_session(db, session=existing)
+        else:
+            await invalidate_session(hash_session_token(token))
     response.delete_cookie(key=settings.session_cookie_name, path="/")
     return None
 
@@ -144,8 +143,9 @@ async def accept_invite(
     if user is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invite user missing")
 
-    user.password_hash = hash_password(payload.password)
+    user.password_hash = await hash_password_async(payload.password)
     await db.commit()
+    await invalidate_user_sessions(user.id)
 
     if invite.full_name and invite.programme:
         profile = await db.get(StudentProfile, user.id)
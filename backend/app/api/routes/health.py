@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.deps import get_db
 from app.observability.grading_metrics import metrics_content_type, render_grading_metrics
+from app.observability.metrics import render_process_metrics
 
 router = APIRouter()
 
@@ -18,6 +19,6 @@ async def metrics(
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     return Response(
-        content=await render_grading_metrics(db),
+        content=await render_grading_metrics(db) + render_process_metrics(),
         media_type=metrics_content_type(),
     )
@@ -2,12 +2,13 @@ from __future__ import annotations
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps.auth import get_current_user
 from app.api.deps.permissions import require_org_admin
 from app.crud.audit import list_audit_events
+from app.crud.pagination import next_page_cursor
 from app.db.deps import get_db
 from app.models.user import User
 from app.schemas.audit import AuditEventOut
@@ -20,10 +21,15 @@ async def list_org_audit_events(
     org_id: int,
     db: Annotated[AsyncSession, Depends(get_db)],
     _current_user: Annotated[User, Depends(get_current_user)],
+    response: Response,
     offset: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ) -> list[AuditEventOut]:
-    rows = await list_audit_events(db, organization_id=org_id, offset=offset, limit=limit)
+    rows = await list_audit_events(db, organization_id=org_id, offset=offset, limit=limit, cursor=cursor)
+    next_cursor = next_page_cursor(rows, limit=min(max(1, limit), 200), key=lambda row: (row[0].id,))
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [
         AuditEventOut(
             id=e.id,
@@ -27,6 +27,7 @@ router = APIRouter(prefix="/orgs/{org_id}/courses/{course_id}/assignments/{assig
 submission_upload_rate_limit = make_rate_limit_dependency(
     bucket="org.submission.upload",
     limit=settings.rate_limit_uploads_per_minute,
+    key_by="user",
 )
 
 _ALLOWED_EXTENSIONS = {".c", ".cpp", ".zip"}
@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps.auth import get_current_user
 from app.api.deps.permissions import require_org_admin
 from app.core.crypto import TokenCryptoNotConfiguredError
+from app.core.session_cache import invalidate_user_sessions, load_uncached_user_columns
 from app.crud.github_oauth_states import create_github_oauth_state, consume_github_oauth_state
 from app.crud.org_github_admin_tokens import (
     get_best_org_github_admin_token,
@@ -107,8 +108,10 @@ async def github_user_connect_start(
 
 @callback_router.get("/user/status")
 async def github_user_status(
+    db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_user)],
 ) -> dict:
+    await load_uncached_user_columns(db, current_user)
     return {
         "connected": bool(current_user.github_user_id and current_user.github_login),
         "github_user_id": current_user.github_user_id,
@@ -138,6 +141,7 @@ async def github_oauth_callback(
             current_user.github_login = str(viewer["login"])
             current_user.github_connected_at = datetime.now(timezone.utc)
             await db.commit()
+            await invalidate_user_sessions(current_user.id)
         else:
             await upsert_org_github_admin_token(
                 db,
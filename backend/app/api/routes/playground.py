@@ -18,6 +18,7 @@ router = APIRouter(prefix="/playground", dependencies=[Depends(get_current_user)
 execution_rate_limit = make_rate_limit_dependency(
     bucket="playground.run",
     limit=settings.rate_limit_execution_per_minute,
+    key_by="user",
 )
 _playground_run_semaphore = asyncio.Semaphore(max(1, int(settings.playground_max_concurrent_runs)))
 
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps.auth import get_current_user
+from app.api.deps.course_permissions import require_course_staff
+from app.crud.courses import get_course
+from app.crud.gradebook import (
+    GradebookColumn,
+    GradebookRow,
+    GradebookScore,
+    get_gradebook_matrix_json,
+    list_gradebook_columns,
+    stream_gradebook_rows,
+)
+from app.db.deps import get_db
+from app.models.user import User
+
+router = APIRouter(
+    prefix="/staff/courses/{course_id}",
+    dependencies=[Depends(get_current_user)],
+)
+
+# Rows are buffered into chunks of roughly this size before being sent.
+GRADEBOOK_CHUNK_SIZE = 64 * 1024
+
+
+async def _iter_gradebook_csv(columns: list[GradebookColumn], rows: AsyncIterator[GradebookRow]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["student_number", "email", "full_name", *(f"{c.title} ({c.max_points})" for c in columns)])
+    async for row in rows:
+        writer.writerow(
+            [
+                row.student_number or "",
+                row.email,
+                row.full_name or "",
+                *("" if score is None else score for score in row.scores),
+            ]
+        )
+        if buffer.tell() >= GRADEBOOK_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+async def _iter_gradebook_jsonl(columns: list[GradebookColumn], rows: AsyncIterator[GradebookRow]) -> AsyncIterator[str]:
+    keys = [str(c.assignment_id) for c in columns]
+    chunk: list[str] = []
+    size = 0
+    async for row in rows:
+        line = json.dumps(
+            {
+                "user_id": row.user_id,
+                "email": row.email,
+                "full_name": row.full_name,
+                "student_number": row.student_number,
+                "scores": dict(zip(keys, row.scores)),
+            },
+            separators=(",", ":"),
+        )
+        chunk.append(line)
+        size += len(line) + 1
+        if size >= GRADEBOOK_CHUNK_SIZE:
+            yield "\n".join(chunk) + "\n"
+            chunk, size = [], 0
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+async def _gradebook_stream(
+    course_id: int,
+    db: AsyncSession,
+    current_user: User,
+    score: GradebookScore,
+) -> tuple[list[GradebookColumn], AsyncIterator[GradebookRow]]:
+    await require_course_staff(course_id, current_user, db)
+    course = await get_course(db, course_id=course_id)
+    if course is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    columns = await list_gradebook_columns(db, course=course)
+    return columns, stream_gradebook_rows(db, course_id=course_id, columns=columns, score=score)
+
+
+@router.get("/gradebook")
+async def get_gradebook_matrix(
+    course_id: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> Response:
+    await require_course_staff(course_id, current_user, db)
+    course = await get_course(db, course_id=course_id)
+    if course is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    _, body = await get_gradebook_matrix_json(db, course=course)
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/gradebook.csv")
+async def download_gradebook_csv(
+    course_id: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+    score: GradebookScore = GradebookScore.latest,
+) -> StreamingResponse:
+    columns, rows = await _gradebook_stream(course_id, db, current_user, score)
+    return StreamingResponse(
+        _iter_gradebook_csv(columns, rows),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="gradebook-course-{course_id}.csv"'},
+    )
+
+
+@router.get("/gradebook.jsonl")
+async def download_gradebook_jsonl(
+    course_id: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+    score: GradebookScore = GradebookScore.latest,
+) -> StreamingResponse:
+    columns, rows = await _gradebook_stream(course_id, db, current_user, score)
+    return StreamingResponse(
+        _iter_gradebook_jsonl(columns, rows),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="gradebook-course-{course_id}.jsonl"'},
+    )
@@ -31,6 +31,7 @@ router = APIRouter(prefix="/staff/courses/{course_id}/modules/{module_id}/resour
 resource_upload_rate_limit = make_rate_limit_dependency(
     bucket="staff.resource.upload",
     limit=settings.rate_limit_uploads_per_minute,
+    key_by="user",
 )
 
 _MAX_UPLOAD_BYTES = 15 * 1024 * 1024
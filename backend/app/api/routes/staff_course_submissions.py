@@ -1,18 +1,34 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
+from pathlib import Path
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps.auth import get_current_user
 from app.api.deps.course_permissions import require_course_staff
 from app.crud.assignments import get_assignment
 from app.crud.courses import get_course
+from app.crud.submission_archives import (
+    create_submission_archive_job,
+    get_submission_archive_job,
+    stream_submission_archive_rows,
+)
 from app.crud.submissions import list_submissions
 from app.db.deps import get_db
+from app.models.submission_archive_job import SubmissionArchiveJobStatus, SubmissionArchiveScope
 from app.models.user import User
 from app.schemas.submission import SubmissionOut
+from app.schemas.submission_archive import SubmissionArchiveJobCreate, SubmissionArchiveJobOut
+from app.worker.enqueue import enqueue_submission_archive
+from app.worker.submission_archive import (
+    archive_download_filename,
+    build_submission_archive_job,
+    iter_submission_archive,
+)
 
 router = APIRouter(
     prefix="/staff/courses/{course_id}/assignments/{assignment_id}/submissions",
@@ -42,3 +58,89 @@ async def list_assignment_submissions(
     await _require_course_and_assignment(db, course_id=course_id, assignment_id=assignment_id)
     return await list_submissions(db, assignment_id=assignment_id, offset=offset, limit=limit)
 
+
+
+@router.get("/download")
+async def download_assignment_submissions(
+    course_id: int,
+    assignment_id: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+    scope: SubmissionArchiveScope = SubmissionArchiveScope.latest,
+) -> StreamingResponse:
+    await require_course_staff(course_id, current_user, db)
+    await _require_course_and_assignment(db, course_id=course_id, assignment_id=assignment_id)
+
+    rows = stream_submission_archive_rows(db, course_id=course_id, assignment_id=assignment_id, scope=scope)
+    filename = archive_download_filename(assignment_id=assignment_id, scope=scope)
+    return StreamingResponse(
+        iter_submission_archive(rows, scope=scope),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/archives", response_model=SubmissionArchiveJobOut, status_code=status.HTTP_202_ACCEPTED)
+async def create_assignment_submissions_archive(
+    course_id: int,
+    assignment_id: int,
+    payload: SubmissionArchiveJobCreate,
+    background_tasks: BackgroundTasks,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> SubmissionArchiveJobOut:
+    await require_course_staff(course_id, current_user, db)
+    await _require_course_and_assignment(db, course_id=course_id, assignment_id=assignment_id)
+    job = await create_submission_archive_job(
+        db,
+        course_id=course_id,
+        assignment_id=assignment_id,
+        requested_by_user_id=current_user.id,
+        scope=payload.scope,
+    )
+    if not await enqueue_submission_archive(job_id=job.id):
+        # No queue configured (local dev): build in-process after the response is sent.
+        background_tasks.add_task(build_submission_archive_job, job.id)
+    return job
+
+
+@router.get("/archives/{job_id}", response_model=SubmissionArchiveJobOut)
+async def get_assignment_submissions_archive(
+    course_id: int,
+    assignment_id: int,
+    job_id: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> SubmissionArchiveJobOut:
+    await require_course_staff(course_id, current_user, db)
+    job = await get_submission_archive_job(db, course_id=course_id, assignment_id=assignment_id, job_id=job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Archive job not found")
+    return job
+
+
+@router.get("/archives/{job_id}/download")
+async def download_assignment_submissions_archive(
+    course_id: int,
+    assignment_id: int,
+    job_id: int,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> FileResponse:
+    await require_course_staff(course_id, current_user, db)
+    job = await get_submission_archive_job(db, course_id=course_id, assignment_id=assignment_id, job_id=job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Archive job not found")
+    if job.status != SubmissionArchiveJobStatus.completed:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Archive is not ready")
+    # The cleanup job clears storage_path once it deletes an expired ZIP.
+    if not job.storage_path or (job.expires_at is not None and job.expires_at <= datetime.now(timezone.utc)):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Archive has expired")
+    storage_path = Path(job.storage_path)
+    if not storage_path.exists():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    return FileResponse(
+        path=storage_path,
+        filename=archive_download_filename(assignment_id=assignment_id, scope=job.scope),
+        media_type="application/zip",
+    )
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+from datetime import datetime
 from pathlib import Path
 from typing import Annotated
 
@@ -10,11 +11,21 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps.auth import get_current_user
 from app.crud.audit import enqueue_audit_event
-from app.crud.notifications import create_notification
+from app.crud.notifications import (
+    NotificationDraft,
+    create_notification,
+    insert_notifications,
+    publish_notification_batch,
+)
+from app.core.config import settings
+from app.crud.pagination import decode_cursor, encode_cursor, next_page_cursor
 from app.crud.staff_submissions import (
     count_staff_submission_rows,
+    count_staff_submission_rows_from_counters,
     get_next_ungraded_staff_submission_row,
     get_staff_submission_row,
+    get_submission_changes_horizon,
+    list_staff_submission_changes,
     list_staff_submission_rows,
     list_staff_submission_rows_by_ids,
 )
@@ -24,10 +35,12 @@ from app.models.submission import SubmissionStatus
 from app.models.submission_test_result import SubmissionTestResult
 from app.models.user import User
 from app.models.notification import NotificationKind
+from app.realtime.events import publish_events, publish_submission_status, submission_status_event
 from app.schemas.submission_test_result import SubmissionTestResultOut
 from app.schemas.staff_submissions import (
     StaffNextSubmissionOut,
     StaffSubmissionBulkAction,
+    StaffSubmissionChanges,
     StaffSubmissionDetail,
     StaffSubmissionQueueItem,
     StaffSubmissionUpdate,
@@ -66,6 +79,8 @@ def _to_queue_item(row) -> StaffSubmissionQueueItem:
         status=row.submission.status,
         score=row.submission.score,
         feedback=row.submission.feedback,
+        updated_at=row.submission.updated_at,
+        graded_at=row.submission.graded_at,
     )
 
 
@@ -73,10 +88,12 @@ def _to_queue_item(row) -> StaffSubmissionQueueItem:
 async def list_submissions_queue(
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_user)],
+    response: Response,
     course_id: int | None = None,
     status_filter: SubmissionStatus | None = None,
     offset: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ) -> list[StaffSubmissionQueueItem]:
     rows = await list_staff_submission_rows(
         db,
@@ -85,7 +102,11 @@ async def list_submissions_queue(
         status=status_filter,
         offset=offset,
         limit=limit,
+        cursor=cursor,
     )
+    next_cursor = next_page_cursor(rows, limit=min(max(1, limit), 200), key=lambda r: (r.submission.id,))
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [_to_queue_item(r) for r in rows]
 
 
@@ -93,14 +114,20 @@ async def list_submissions_queue(
 async def list_submissions_page(
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_user)],
+    response: Response,
     course_id: int | None = None,
     status_filter: SubmissionStatus | None = None,
     offset: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    exact_total: bool = False,
 ) -> StaffSubmissionsPage:
-    effective_offset = max(0, offset)
+    # A cursor supersedes offset; keyset pages stay cheap however deep the client goes.
+    effective_offset = 0 if cursor is not None else max(0, offset)
     effective_limit = min(max(1, limit), 200)
-    total = await count_staff_submission_rows(
+    # Totals come from the maintained counters unless the caller asks for a recount.
+    count_rows = count_staff_submission_rows if exact_total else count_staff_submission_rows_from_counters
+    total = await count_rows(
         db,
         staff_user_id=current_user.id,
         course_id=course_id,
@@ -113,12 +140,18 @@ async def list_submissions_page(
         status=status_filter,
         offset=effective_offset,
         limit=effective_limit,
+        cursor=cursor,
     )
+    next_cursor = next_page_cursor(rows, limit=effective_limit, key=lambda r: (r.submission.id,))
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
     return StaffSubmissionsPage(
         items=[_to_queue_item(r) for r in rows],
         total=total,
         offset=effective_offset,
         limit=effective_limit,
+        next_cursor=next_cursor,
+        total_source="exact" if exact_total else "counter",
     )
 
 
@@ -148,8 +181,39 @@ async def bulk_update_submissions(
     for r in rows:
         r.submission.status = target_status
 
+    drafts: list[NotificationDraft] = []
+    if target_status == SubmissionStatus.graded:
+        for r in rows:
+            if prior_status_by_id.get(r.submission.id) == SubmissionStatus.graded:
+                continue
+            drafts.append(
+                NotificationDraft(
+                    user_id=r.submission.user_id,
+                    kind=NotificationKind.submission_graded,
+                    title=f"Graded: {r.assignment.title}",
+                    body=None,
+                    link_url=f"/dashboard/courses/{r.course.id}/assignments/{r.assignment.id}",
+                )
+            )
+    # Status changes and their notifications commit together; push events go out afterwards.
+    notification_batch = await insert_notifications(db, drafts=drafts)
+
     await db.commit()
 
+    await publish_events(
+        [
+            submission_status_event(
+                submission_id=r.submission.id,
+                user_id=r.submission.user_id,
+                assignment_id=r.assignment.id,
+                status=target_status,
+                score=r.submission.score,
+            )
+            for r in rows
+        ]
+    )
+    await publish_notification_batch(notification_batch)
+
     enqueue_audit_event(
         organization_id=rows[0].course.organization_id if rows else None,
         actor_user_id=current_user.id,
@@ -160,20 +224,6 @@ async def bulk_update_submissions(
         context={"actor_user_id": current_user.id, "submission_ids": payload.submission_ids},
     )
 
-    if target_status == SubmissionStatus.graded:
-        for r in rows:
-            if prior_status_by_id.get(r.submission.id) == SubmissionStatus.graded:
-                continue
-            link = f"/dashboard/courses/{r.course.id}/assignments/{r.assignment.id}"
-            await create_notification(
-                db,
-                user_id=r.submission.user_id,
-                kind=NotificationKind.submission_graded,
-                title=f"Graded: {r.assignment.title}",
-                body=None,
-                link_url=link,
-            )
-
     return StaffSubmissionsBulkResult(
         updated_ids=sorted(found_ids),
         skipped_ids=skipped_ids,
@@ -198,6 +248,39 @@ async def next_ungraded_submission(
     return StaffNextSubmissionOut(submission_id=None if row is None else row.submission.id)
 
 
+@router.get("/changes", response_model=StaffSubmissionChanges)
+async def list_submission_changes(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+    course_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = 100,
+) -> StaffSubmissionChanges:
+    settle_seconds = settings.submission_changes_settle_seconds
+    if cursor is None:
+        horizon = await get_submission_changes_horizon(db, settle_seconds=settle_seconds)
+        return StaffSubmissionChanges(items=[], next_cursor=encode_cursor(horizon, 0), has_more=False)
+
+    after = decode_cursor(cursor, (datetime, int))
+    effective_limit = min(max(1, limit), 500)
+    rows = await list_staff_submission_changes(
+        db,
+        staff_user_id=current_user.id,
+        after=after,
+        course_id=course_id,
+        limit=effective_limit,
+        settle_seconds=settle_seconds,
+    )
+    if rows:
+        last = rows[-1].submission
+        cursor = encode_cursor(last.updated_at, last.id)
+    return StaffSubmissionChanges(
+        items=[_to_queue_item(r) for r in rows],
+        next_cursor=cursor,
+        has_more=len(rows) == effective_limit,
+    )
+
+
 @router.get("/{submission_id}", response_model=StaffSubmissionDetail)
 async def get_submission_detail(
     submission_id: int,
@@ -267,6 +350,15 @@ async def update_submission(
     await db.commit()
     await db.refresh(submission)
 
+    if submission.status != prior_status or payload.score is not None:
+        await publish_submission_status(
+            submission_id=submission.id,
+            user_id=submission.user_id,
+            assignment_id=assignment.id,
+            status=submission.status,
+            score=submission.score,
+        )
+
     enqueue_audit_event(
         organization_id=row.course.organization_id,
         actor_user_id=current_user.id,
@@ -353,6 +445,12 @@ async def regrade_submission(
     submission.feedback = None
     await db.commit()
     await delete_submission_test_results(db, submission_id=submission_id, phase=phase)
+    await publish_submission_status(
+        submission_id=submission_id,
+        user_id=submission.user_id,
+        assignment_id=row.assignment.id,
+        status=SubmissionStatus.pending,
+    )
 
     try:
         await enqueue_grading(submission_id=submission_id, phase=phase)
@@ -5,8 +5,8 @@ from typing import Annotated, Any
 from uuid import uuid4
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from fastapi.responses import FileResponse
-from sqlalchemy import select
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps.auth import get_current_user
@@ -23,7 +23,7 @@ from app.crud.late_policy import (
     compute_late_penalty_percent,
     resolve_late_policy,
 )
-from app.crud.notifications import notify_staff_new_submission_digest
+from app.crud.notifications import SubmissionDigestEntry
 from app.crud.submissions import create_submission, list_submissions
 from app.crud.self_enroll import (
     SelfEnrollAlreadyEnrolledError,
@@ -35,12 +35,13 @@ from app.crud.self_enroll import (
 from app.crud.student_submissions import get_student_submission_row, list_student_submission_rows
 from app.crud.student_views import list_course_assignments, list_course_modules, list_my_courses
 from app.db.deps import get_db
-from app.integrations.jobe import JOBE_OUTCOME_OK
 from app.models.course import Course
 from app.models.assignment_autograde_test_case_snapshot import AssignmentAutogradeTestCaseSnapshot
+from app.models.submission import Submission, SubmissionStatus
 from app.models.submission_test_result import SubmissionTestResult
 from app.models.test_case import TestCase
 from app.models.user import User
+from app.observability.tracing import start_span
 from app.schemas.assignment import AssignmentOut
 from app.schemas.course import CourseOut
 from app.schemas.module import ModuleOut
@@ -48,7 +49,10 @@ from app.schemas.self_enroll import CourseSelfEnrollRequest
 from app.schemas.student_submission_tests import StudentSubmissionTestsOut, StudentVisibleTestResultOut
 from app.schemas.student_submissions import StudentSubmissionItem
 from app.schemas.submission import SubmissionOut, SubmissionStudentOut
+from app.realtime.events import publish_submission_status, submission_channel
+from app.realtime.sse import iter_channel_events, sse_response
 from app.worker.enqueue import enqueue_grading
+from app.worker.submission_digests import record_submission_digest
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +60,7 @@ router = APIRouter(prefix="/student", dependencies=[Depends(get_current_user)])
 submission_upload_rate_limit = make_rate_limit_dependency(
     bucket="student.submission.upload",
     limit=settings.rate_limit_uploads_per_minute,
+    key_by="user",
 )
 
 _ALLOWED_EXTENSIONS = {".c", ".cpp", ".zip"}
@@ -84,46 +89,11 @@ async def _read_upload_limited(file: UploadFile, *, max_bytes: int) -> bytes:
     return bytes(buf)
 
 
-async def _error_kind_by_submission_id(
-    db: AsyncSession, *, submission_ids: list[int]
-) -> dict[int, str]:
-    if not submission_ids:
-        return {}
-
-    compile_error: set[int] = set()
-    runtime_error: set[int] = set()
-    result = await db.execute(
-        select(
-            SubmissionTestResult.submission_id,
-            SubmissionTestResult.outcome,
-            SubmissionTestResult.compile_output,
-        ).where(SubmissionTestResult.submission_id.in_(submission_ids))
-    )
-    for submission_id, outcome, compile_output in result.all():
-        if isinstance(compile_output, str) and compile_output.strip():
-            compile_error.add(int(submission_id))
-        if isinstance(outcome, int) and outcome != JOBE_OUTCOME_OK:
-            runtime_error.add(int(submission_id))
-
-    out: dict[int, str] = {}
-    for submission_id in submission_ids:
-        if submission_id in compile_error:
-            out[submission_id] = "compile_error"
-        elif submission_id in runtime_error:
-            out[submission_id] = "runtime_error"
-    return out
-
-
-def _is_infra_feedback(feedback: str | None) -> bool:
-    if not feedback:
-        return False
-    text = feedback.lower()
-    return (
-        "grading infrastructure" in text
-        or "jobe request timed out" in text
-        or "jobe connection error" in text
-        or "jobe base url is not configured" in text
-    )
+def _submission_error_kind(submission: Submission) -> str | None:
+    # Errors recorded before the worker classified them (or set by staff) count as internal.
+    if submission.status == SubmissionStatus.error:
+        return submission.error_kind or "internal_error"
+    return submission.error_kind
 
 
 @router.get("/courses", response_model=list[CourseOut])
@@ -257,10 +227,6 @@ async def my_assignment_submissions(
         limit=limit,
     )
 
-    error_kind_by_id = await _error_kind_by_submission_id(
-        db, submission_ids=[s.id for s in submissions]
-    )
-
     out: list[SubmissionStudentOut] = []
     for submission in submissions:
         late_seconds, late_penalty_percent = compute_late_penalty_percent(
@@ -268,15 +234,6 @@ async def my_assignment_submissions(
             effective_due_date=effective_due_date,
             policy=policy,
         )
-        error_kind: str | None = None
-        if submission.status.value == "error":
-            error_kind = (
-                "infra_error"
-                if _is_infra_feedback(submission.feedback)
-                else error_kind_by_id.get(submission.id) or "internal_error"
-            )
-        else:
-            error_kind = error_kind_by_id.get(submission.id)
         out.append(
             SubmissionStudentOut(
                 id=submission.id,
@@ -291,7 +248,9 @@ async def my_assignment_submissions(
                 status=submission.status,
                 score=submission.score,
                 feedback=submission.feedback,
-                error_kind=error_kind,
+                error_kind=_submission_error_kind(submission),
+                tests_passed=submission.tests_passed,
+                tests_total=submission.tests_total,
                 effective_due_date=effective_due_date,
                 late_seconds=late_seconds,
                 late_penalty_percent=late_penalty_percent,
@@ -329,10 +288,11 @@ async def submit_assignment(
             detail="This assignment does not accept ZIP submissions",
         )
 
-    data = await _read_upload_limited(file, max_bytes=_MAX_UPLOAD_BYTES)
-
-    dest = _uploads_root() / f"{uuid4().hex}{ext}"
-    dest.write_bytes(data)
+    with start_span("submission.store") as span:
+        data = await _read_upload_limited(file, max_bytes=_MAX_UPLOAD_BYTES)
+        dest = _uploads_root() / f"{uuid4().hex}{ext}"
+        dest.write_bytes(data)
+        span.set_attribute("submission.size_bytes", len(data))
 
     submission = await create_submission(
         db,
@@ -344,15 +304,23 @@ async def submit_assignment(
         storage_path=str(dest),
         practice_autograde_version_id=assignment.active_autograde_version_id,
     )
+    await publish_submission_status(
+        submission_id=submission.id,
+        user_id=current_user.id,
+        assignment_id=assignment_id,
+        status=submission.status,
+    )
     try:
         course = await db.get(Course, course_id)
-        await notify_staff_new_submission_digest(
+        await record_submission_digest(
             db,
-            course_id=course_id,
-            course_code=course.code if course is not None else str(course_id),
-            assignment_title=assignment.title,
-            student_email=current_user.email,
-            submitter_user_id=current_user.id,
+            entry=SubmissionDigestEntry(
+                course_id=course_id,
+                course_code=course.code if course is not None else str(course_id),
+                assignment_title=assignment.title,
+                student_email=current_user.email,
+                submitter_user_id=current_user.id,
+            ),
         )
     except Exception:
         # Best-effort only: never block submission creation on notifications.
@@ -387,6 +355,23 @@ async def submit_assignment(
     return submission
 
 
+@router.get("/submissions/events")
+async def my_submission_events(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+    assignment_id: int | None = None,
+) -> StreamingResponse:
+    """Server-sent stream of this user's submission status transitions (replaces polling)."""
+    user_id = current_user.id
+    # The stream stays open for minutes; end the transaction so no pooled connection is held.
+    await db.commit()
+
+    def _accept(event: dict) -> bool:
+        return assignment_id is None or event.get("assignment_id") == assignment_id
+
+    return sse_response(iter_channel_events(submission_channel(user_id), accept=_accept))
+
+
 @router.get("/submissions", response_model=list[StudentSubmissionItem])
 async def my_submissions(
     db: Annotated[AsyncSession, Depends(get_db)],
@@ -412,10 +397,6 @@ async def my_submissions(
         e.assignment_id: e.extended_due_date for e in extensions
     }
 
-    error_kind_by_id = await _error_kind_by_submission_id(
-        db, submission_ids=[r.submission.id for r in rows]
-    )
-
     out: list[StudentSubmissionItem] = []
     for row in rows:
         effective_due_date = compute_effective_due_date(
@@ -431,15 +412,6 @@ async def my_submissions(
             effective_due_date=effective_due_date,
             policy=policy,
         )
-        error_kind: str | None = None
-        if row.submission.status.value == "error":
-            error_kind = (
-                "infra_error"
-                if _is_infra_feedback(row.submission.feedback)
-                else error_kind_by_id.get(row.submission.id) or "internal_error"
-            )
-        else:
-            error_kind = error_kind_by_id.get(row.submission.id)
         out.append(
             StudentSubmissionItem(
                 id=row.submission.id,
@@ -454,7 +426,9 @@ async def my_submissions(
                 status=row.submission.status,
                 score=row.submission.score,
                 feedback=row.submission.feedback,
-                error_kind=error_kind,
+                error_kind=_submission_error_kind(row.submission),
+                tests_passed=row.submission.tests_passed,
+                tests_total=row.submission.tests_total,
                 due_date=row.assignment.due_date,
                 effective_due_date=effective_due_date,
                 late_seconds=late_seconds,
@@ -501,15 +475,24 @@ async def my_submission_tests(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Submission not found")
 
     # Prefer final-phase visible tests when available; otherwise show practice-phase visible tests.
-    has_final_result = await db.execute(
-        select(SubmissionTestResult.id)
-        .where(
-            SubmissionTestResult.submission_id == submission_id,
-            SubmissionTestResult.phase == "final",
+    # One grouped query answers both "is there a final run?" and "what did the compiler say?".
+    phase_result = await db.execute(
+        select(
+            SubmissionTestResult.phase,
+            func.max(
+                case(
+                    (SubmissionTestResult.compile_output != "", SubmissionTestResult.compile_output),
+                    else_=None,
+                )
+            ),
         )
-        .limit(1)
+        .where(SubmissionTestResult.submission_id == submission_id)
+        .group_by(SubmissionTestResult.phase)
     )
-    phase = "final" if has_final_result.scalar_one_or_none() is not None else "practice"
+    compile_output_by_phase = {
+        str(getattr(row_phase, "value", row_phase)): output for row_phase, output in phase_result.all()
+    }
+    phase = "final" if "final" in compile_output_by_phase else "practice"
 
     version_id = (
         row.submission.final_autograde_version_id
@@ -526,16 +509,7 @@ async def my_submission_tests(
             tests=[],
         )
 
-    compile_output_result = await db.execute(
-        select(SubmissionTestResult.compile_output)
-        .where(
-            SubmissionTestResult.submission_id == submission_id,
-            SubmissionTestResult.phase == phase,
-            SubmissionTestResult.compile_output != "",
-        )
-        .limit(1)
-    )
-    compile_output = compile_output_result.scalar_one_or_none() or ""
+    compile_output = compile_output_by_phase.get(phase) or ""
 
     result = await db.execute(
         select(SubmissionTestResult, AssignmentAutogradeTestCaseSnapshot)
@@ -8,6 +8,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps.auth import get_current_user
+from app.core.session_cache import load_uncached_user_columns
 from app.db.deps import get_db
 from app.models.course import Course
 from app.models.course_github_claim import CourseGitHubClaim, GitHubClaimStatus
@@ -48,6 +49,7 @@ async def create_or_update_my_github_claim(
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_user)],
 ) -> CourseGitHubClaim:
+    await load_uncached_user_columns(db, current_user)
     if not current_user.github_user_id or not current_user.github_login:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
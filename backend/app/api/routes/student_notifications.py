@@ -2,15 +2,23 @@ from __future__ import annotations
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps.auth import get_current_user
-from app.crud.notifications import list_notifications, mark_notification_read
+from app.crud.notifications import (
+    get_unread_notification_count,
+    list_notifications,
+    mark_notification_read,
+)
+from app.crud.pagination import next_page_cursor
 from app.db.deps import get_db
 from app.models.notification import Notification
 from app.models.user import User
-from app.schemas.notification import NotificationOut
+from app.realtime.events import notification_channel
+from app.realtime.sse import iter_channel_events, sse_response
+from app.schemas.notification import NotificationOut, NotificationUnreadCountOut
 
 router = APIRouter(prefix="/student", dependencies=[Depends(get_current_user)])
 
@@ -19,11 +27,52 @@ router = APIRouter(prefix="/student", dependencies=[Depends(get_current_user)])
 async def my_notifications(
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_user)],
+    response: Response,
     unread_only: bool = False,
     offset: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ) -> list[NotificationOut]:
-    return await list_notifications(db, user_id=current_user.id, unread_only=unread_only, offset=offset, limit=limit)
+    notifications = await list_notifications(
+        db,
+        user_id=current_user.id,
+        unread_only=unread_only,
+        offset=offset,
+        limit=limit,
+        cursor=cursor,
+    )
+    next_cursor = next_page_cursor(notifications, limit=min(max(1, limit), 200), key=lambda n: (n.id,))
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return notifications
+
+
+@router.get("/notifications/unread-count", response_model=NotificationUnreadCountOut)
+async def my_unread_notification_count(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> NotificationUnreadCountOut:
+    return NotificationUnreadCountOut(
+        unread_count=await get_unread_notification_count(db, user_id=current_user.id)
+    )
+
+
+@router.get("/notifications/stream")
+async def my_notification_stream(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> StreamingResponse:
+    """Server-sent notification events, opened with the current unread count."""
+    user_id = current_user.id
+
+    async def _unread_snapshot() -> list[dict]:
+        # Read once subscribed, so a notification created meanwhile is not missed.
+        unread_count = await get_unread_notification_count(db, user_id=user_id)
+        # The stream stays open for minutes; end the transaction so no pooled connection is held.
+        await db.commit()
+        return [{"type": "notification.unread", "unread_count": unread_count}]
+
+    return sse_response(iter_channel_events(notification_channel(user_id), initial=_unread_snapshot))
 
 
 @router.post("/notifications/{notification_id}/read", response_model=NotificationOut)
@@ -1,9 +1,10 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps.superadmin import require_superadmin
+from app.crud.pagination import next_page_cursor
 from app.crud.users import UserEmailTakenError, create_user, get_user, list_users
 from app.db.deps import get_db
 from app.schemas.user import UserCreate, UserOut
@@ -27,10 +28,16 @@ async def create_user_endpoint(
 @router.get("", response_model=list[UserOut])
 async def list_users_endpoint(
     db: Annotated[AsyncSession, Depends(get_db)],
+    response: Response,
     offset: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ) -> list[UserOut]:
-    return await list_users(db, offset=offset, limit=limit)
+    users = await list_users(db, offset=offset, limit=limit, cursor=cursor)
+    next_cursor = next_page_cursor(users, limit=min(max(1, limit), 500), key=lambda u: (u.id,))
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return users
 
 
 @router.get("/{user_id}", response_model=UserOut)
@@ -6,6 +6,9 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 from sqlalchemy.engine import URL
 
 SameSitePolicy = Literal["lax", "strict", "none"]
+SessionCacheBackend = Literal["memory", "redis", "off"]
+PasswordHashScheme = Literal["pbkdf2_sha256", "scrypt", "argon2"]
+RateLimitBackend = Literal["auto", "memory", "redis"]
 
 
 class Settings(BaseSettings):
@@ -24,6 +27,32 @@ class Settings(BaseSettings):
     # Server-side session TTL (days). Cookie is session-only, but server sessions
     # must still expire for safety/cleanup.
     session_ttl_days: int = 30
+    # Auth session lookup cache. The TTL bounds how stale a cached user snapshot can be
+    # (e.g. across replicas with the memory backend); 0 disables caching.
+    session_cache_backend: SessionCacheBackend = "memory"
+    session_cache_ttl_seconds: int = 30
+    session_cache_max_entries: int = 10000
+    # Cross-request cache of course/org roles (see app/api/deps/principal.py); 0 keeps
+    # role lookups per request only.
+    authz_cache_ttl_seconds: int = 0
+    authz_cache_max_entries: int = 10000
+    # Staff gradebook matrix cache (see app/crud/gradebook.py). Entries are revalidated
+    # against a per-course change stamp on every read; the TTL only bounds staleness of
+    # student names and emails, which do not bump the stamp. 0 disables caching.
+    gradebook_cache_ttl_seconds: int = 300
+    gradebook_cache_max_entries: int = 256
+    # The staff changes-since feed only returns submission writes at least this old, so a
+    # write whose transaction had not committed yet is not skipped by a client's cursor.
+    submission_changes_settle_seconds: float = 2.0
+    # Password hashing. Hashes made with other schemes/parameters are upgraded on the next
+    # successful login. argon2 requires the optional argon2-cffi package (falls back to scrypt).
+    password_hash_scheme: PasswordHashScheme = "pbkdf2_sha256"
+    password_pbkdf2_iterations: int = 200_000
+    password_scrypt_n: int = 2**14
+    password_scrypt_r: int = 8
+    password_scrypt_p: int = 1
+    # Hashing runs in a dedicated thread pool; this caps concurrent hashes per process.
+    password_hash_max_concurrency: int = 4
     # Comma-separated list. Kept as string to avoid Pydantic JSON parsing for list types in .env.
     superadmin_emails: str = ""
     # Optional: enables first-login bootstrap for configured superadmins.
@@ -53,9 +82,23 @@ class Settings(BaseSettings):
     # Queue/worker
     redis_url: str = ""
     taskiq_queue_name: str = "marconi"
+    # Grading workers serve their in-process metrics on their own port (0 disables). With
+    # several worker processes per host each takes the next free port in the span.
+    worker_metrics_host: str = "0.0.0.0"
+    worker_metrics_port: int = 0
+    worker_metrics_port_span: int = 16
+    # Span export: "none" or "file" (OTLP/JSON lines, one file per process under tracing_dir).
+    tracing_exporter: str = "none"
+    tracing_dir: str = ""
+    # Requests and worker jobs issuing at least this many statements are logged, as are
+    # statements repeated this many times within one (likely N+1); 0 disables either.
+    query_log_threshold: int = 50
+    query_repeat_threshold: int = 10
     # File uploads
     uploads_dir: str = ""
-    # Request rate limits (per minute, per client IP)
+    # Request rate limits (per minute; login is keyed per client IP, uploads/execution per user).
+    # "auto" shares limits across replicas through Redis when REDIS_URL is set.
+    rate_limit_backend: RateLimitBackend = "auto"
     rate_limit_login_per_minute: int = 10
     rate_limit_execution_per_minute: int = 30
     rate_limit_uploads_per_minute: int = 20
@@ -64,6 +107,28 @@ class Settings(BaseSettings):
     playground_queue_wait_seconds: float = 0.25
     grading_priority_enabled: bool = True
     grading_priority_max_defer_attempts: int = 5
+    # Staff "new submissions" digests are coalesced in-process and written every N seconds
+    # (one batch per course); 0 writes them on the upload request instead.
+    notification_digest_flush_seconds: float = 5.0
+    notification_digest_max_pending_courses: int = 10000
+    # Audit events are queued in memory and written in batches by one background writer.
+    # When the queue is full, events spill to JSONL files (replayed later) or, with
+    # spilling disabled, are dropped and counted.
+    audit_queue_max_events: int = 10000
+    audit_batch_size: int = 200
+    audit_flush_interval_seconds: float = 0.25
+    audit_spill_enabled: bool = True
+    audit_spill_dir: str = ""
+    # Maintenance jobs run from the deadline poller loop; 0 disables a job.
+    missing_counters_repair_interval_seconds: int = 3600
+    grading_events_rollup_interval_seconds: int = 900
+    # Raw grading events older than this are deleted once their hour is rolled up;
+    # 0 keeps them forever.
+    grading_events_retention_days: int = 30
+    grading_events_prune_batch_size: int = 5000
+    # Built submission archive ZIPs are deleted this long after completion; 0 keeps them.
+    submission_archive_retention_hours: int = 24
+    submission_archive_cleanup_interval_seconds: int = 900
 
     # Third-party integrations
     # Symmetric encryption key (Fernet). Generate with: python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"
@@ -101,6 +166,21 @@ class Settings(BaseSettings):
         if not self.uploads_dir.strip():
             self.uploads_dir = str((Path(__file__).resolve().parents[3] / "var" / "uploads"))
 
+        self.session_cache_ttl_seconds = max(0, int(self.session_cache_ttl_seconds))
+        self.session_cache_max_entries = max(1, int(self.session_cache_max_entries))
+        self.authz_cache_ttl_seconds = max(0, int(self.authz_cache_ttl_seconds))
+        self.authz_cache_max_entries = max(1, int(self.authz_cache_max_entries))
+        self.gradebook_cache_ttl_seconds = max(0, int(self.gradebook_cache_ttl_seconds))
+        self.gradebook_cache_max_entries = max(1, int(self.gradebook_cache_max_entries))
+        self.submission_changes_settle_seconds = max(0.0, float(self.submission_changes_settle_seconds))
+        self.worker_metrics_port = max(0, min(int(self.worker_metrics_port), 65535))
+        self.worker_metrics_port_span = max(1, int(self.worker_metrics_port_span))
+        self.password_pbkdf2_iterations = max(1, int(self.password_pbkdf2_iterations))
+        # scrypt requires N to be a power of two greater than 1.
+        self.password_scrypt_n = 1 << max(1, (max(2, int(self.password_scrypt_n)) - 1).bit_length())
+        self.password_scrypt_r = max(1, int(self.password_scrypt_r))
+        self.password_scrypt_p = max(1, int(self.password_scrypt_p))
+        self.password_hash_max_concurrency = max(1, int(self.password_hash_max_concurrency))
         self.jobe_grading_cputime_seconds = max(1, int(self.jobe_grading_cputime_seconds))
         self.jobe_grading_memorylimit_mb = max(1, int(self.jobe_grading_memorylimit_mb))
         self.jobe_grading_streamsize_mb = max(0.001, float(self.jobe_grading_streamsize_mb))
@@ -132,6 +212,30 @@ class Settings(BaseSettings):
             0,
             int(self.grading_priority_max_defer_attempts),
         )
+        self.tracing_exporter = self.tracing_exporter.strip().lower() or "none"
+        self.query_log_threshold = max(0, int(self.query_log_threshold))
+        self.query_repeat_threshold = max(0, int(self.query_repeat_threshold))
+        if not self.tracing_dir.strip():
+            self.tracing_dir = str(Path(self.uploads_dir).parent / "traces")
+        if not self.audit_spill_dir.strip():
+            self.audit_spill_dir = str(Path(self.uploads_dir).parent / "audit-spill")
+        self.audit_queue_max_events = max(1, int(self.audit_queue_max_events))
+        self.audit_batch_size = max(1, int(self.audit_batch_size))
+        self.audit_flush_interval_seconds = max(0.0, float(self.audit_flush_interval_seconds))
+        self.notification_digest_flush_seconds = max(0.0, float(self.notification_digest_flush_seconds))
+        self.missing_counters_repair_interval_seconds = max(0, int(self.missing_counters_repair_interval_seconds))
+        self.grading_events_rollup_interval_seconds = max(0, int(self.grading_events_rollup_interval_seconds))
+        self.grading_events_retention_days = max(0, int(self.grading_events_retention_days))
+        self.grading_events_prune_batch_size = max(1, int(self.grading_events_prune_batch_size))
+        self.submission_archive_retention_hours = max(0, int(self.submission_archive_retention_hours))
+        self.submission_archive_cleanup_interval_seconds = max(
+            0,
+            int(self.submission_archive_cleanup_interval_seconds),
+        )
+        self.notification_digest_max_pending_courses = max(
+            1,
+            int(self.notification_digest_max_pending_courses),
+        )
 
         return self
 
@@ -1,27 +1,190 @@
+import asyncio
 import base64
+from concurrent.futures import ThreadPoolExecutor
 import hashlib
 import hmac
+import logging
 import os
+import time
+from typing import Callable, TypeVar
+
+from app.core.config import settings
+from app.observability.metrics import gauge, histogram
+
+try:  # Optional dependency: enables PASSWORD_HASH_SCHEME=argon2.
+    from argon2 import PasswordHasher as _Argon2Hasher
+    from argon2.exceptions import InvalidHashError as _Argon2InvalidHash
+    from argon2.exceptions import VerificationError as _Argon2VerificationError
+except ImportError:  # pragma: no cover - exercised only when argon2-cffi is missing
+    _Argon2Hasher = None
+
+logger = logging.getLogger(__name__)
+T = TypeVar("T")
+
+_PBKDF2_PREFIX = "pbkdf2_sha256"
+_SCRYPT_PREFIX = "scrypt"
+_ARGON2_PREFIX = "$argon2"
+
+if settings.password_hash_scheme == "argon2" and _Argon2Hasher is None:
+    logger.warning("PASSWORD_HASH_SCHEME=argon2 but argon2-cffi is not installed; using scrypt")
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _argon2_hasher():
+    if _Argon2Hasher is None:
+        return None
+    return _Argon2Hasher()
+
+
+def _effective_scheme() -> str:
+    scheme = settings.password_hash_scheme
+    if scheme == "argon2" and _Argon2Hasher is None:
+        return "scrypt"
+    return scheme
+
+
+def _scrypt(password: str, salt: bytes, *, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode("utf-8"),
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        maxmem=256 * n * r + 1024 * 1024,
+        dklen=32,
+    )
 
 
 def hash_password(password: str) -> str:
+    scheme = _effective_scheme()
+    if scheme == "argon2":
+        return _argon2_hasher().hash(password)
     salt = os.urandom(16)
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 200_000)
-    return "pbkdf2_sha256$200000$" + base64.b64encode(salt).decode("ascii") + "$" + base64.b64encode(dk).decode(
-        "ascii"
-    )
+    if scheme == "scrypt":
+        n, r, p = settings.password_scrypt_n, settings.password_scrypt_r, settings.password_scrypt_p
+        dk = _scrypt(password, salt, n=n, r=r, p=p)
+        return f"{_SCRYPT_PREFIX}${n}${r}${p}${_b64(salt)}${_b64(dk)}"
+    iterations = settings.password_pbkdf2_iterations
+    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"{_PBKDF2_PREFIX}${iterations}${_b64(salt)}${_b64(dk)}"
 
 
 def verify_password(password: str, stored: str) -> bool:
+    if stored.startswith(_ARGON2_PREFIX):
+        hasher = _argon2_hasher()
+        if hasher is None:
+            return False
+        try:
+            return bool(hasher.verify(stored, password))
+        except (_Argon2VerificationError, _Argon2InvalidHash):
+            return False
+
     try:
-        algo, iterations_s, salt_b64, dk_b64 = stored.split("$", 3)
-        if algo != "pbkdf2_sha256":
+        algo, rest = stored.split("$", 1)
+        if algo == _PBKDF2_PREFIX:
+            iterations_s, salt_b64, dk_b64 = rest.split("$", 2)
+            iterations = int(iterations_s)
+            salt = base64.b64decode(salt_b64)
+            expected = base64.b64decode(dk_b64)
+            candidate = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+        elif algo == _SCRYPT_PREFIX:
+            n_s, r_s, p_s, salt_b64, dk_b64 = rest.split("$", 4)
+            salt = base64.b64decode(salt_b64)
+            expected = base64.b64decode(dk_b64)
+            candidate = _scrypt(password, salt, n=int(n_s), r=int(r_s), p=int(p_s))
+        else:
             return False
-        iterations = int(iterations_s)
-        salt = base64.b64decode(salt_b64)
-        expected = base64.b64decode(dk_b64)
     except Exception:
         return False
 
-    candidate = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
     return hmac.compare_digest(candidate, expected)
+
+
+def password_needs_rehash(stored: str) -> bool:
+    """True when `stored` was produced with a different scheme or parameters than configured."""
+    scheme = _effective_scheme()
+    if stored.startswith(_ARGON2_PREFIX):
+        if scheme != "argon2":
+            return True
+        hasher = _argon2_hasher()
+        return hasher is not None and hasher.check_needs_rehash(stored)
+    parts = stored.split("$")
+    if scheme == "scrypt":
+        expected = [
+            _SCRYPT_PREFIX,
+            str(settings.password_scrypt_n),
+            str(settings.password_scrypt_r),
+            str(settings.password_scrypt_p),
+        ]
+        return parts[:4] != expected
+    if scheme == "pbkdf2_sha256":
+        return parts[:2] != [_PBKDF2_PREFIX, str(settings.password_pbkdf2_iterations)]
+    return True
+
+
+# Hashing is CPU-bound (hashlib releases the GIL), so it runs on a small dedicated pool.
+# The semaphore is the admission queue: waiting on it is what `queue_seconds` measures,
+# and it keeps a login burst from piling unbounded work onto the executor.
+_hash_queue_seconds = histogram(
+    "marconi_password_hash_queue_seconds",
+    "Time password hashing work waited for a hashing slot.",
+    ("op",),
+)
+_hash_duration_seconds = histogram(
+    "marconi_password_hash_duration_seconds",
+    "Time spent computing password hashes.",
+    ("op",),
+)
+_hash_in_flight = gauge(
+    "marconi_password_hash_in_flight",
+    "Password hashing operations currently running or waiting.",
+)
+
+_executor: ThreadPoolExecutor | None = None
+_semaphore: asyncio.Semaphore | None = None
+_semaphore_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _hash_slots() -> asyncio.Semaphore:
+    global _semaphore, _semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _semaphore is None or _semaphore_loop is not loop:
+        _semaphore = asyncio.Semaphore(settings.password_hash_max_concurrency)
+        _semaphore_loop = loop
+    return _semaphore
+
+
+def _hash_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.password_hash_max_concurrency,
+            thread_name_prefix="password-hash",
+        )
+    return _executor
+
+
+async def _run_in_hash_pool(op: str, fn: Callable[..., T], *args) -> T:
+    queued_at = time.perf_counter()
+    _hash_in_flight.inc()
+    try:
+        async with _hash_slots():
+            started_at = time.perf_counter()
+            _hash_queue_seconds.labels(op).observe(started_at - queued_at)
+            try:
+                return await asyncio.get_running_loop().run_in_executor(_hash_executor(), fn, *args)
+            finally:
+                _hash_duration_seconds.labels(op).observe(time.perf_counter() - started_at)
+    finally:
+        _hash_in_flight.dec()
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_hash_pool("hash", hash_password, password)
+
+
+async def verify_password_async(password: str, stored: str) -> bool:
+    return await _run_in_hash_pool("verify", verify_password, password, stored)
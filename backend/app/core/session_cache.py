@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+import json
+import logging
+import time
+from typing import Any
+
+from sqlalchemy import DateTime, inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.models.user import User
+from app.observability.metrics import counter, gauge
+
+logger = logging.getLogger(__name__)
+
+# Cache of session token hash -> (user snapshot, session expiry) for get_current_user.
+#
+# Entries live for at most `session_cache_ttl_seconds`, which bounds how stale a
+# snapshot can be when an invalidation is missed (e.g. another replica using the
+# memory backend). Logout, delete_session and user updates invalidate explicitly.
+
+_lookups_total = counter(
+    "marconi_session_cache_lookups_total",
+    "Session cache lookups by result (hit, miss, expired).",
+    ("result",),
+)
+_invalidations_total = counter(
+    "marconi_session_cache_invalidations_total",
+    "Session cache invalidations by kind (token, user).",
+    ("kind",),
+)
+_entries_gauge = gauge(
+    "marconi_session_cache_entries",
+    "Entries held by the in-process session cache.",
+)
+_hit = _lookups_total.labels("hit")
+_miss = _lookups_total.labels("miss")
+_expired = _lookups_total.labels("expired")
+
+# Credentials and linked identities never leave the database: the redis backend stores
+# snapshots as plain JSON. A user rebuilt from the cache has these attributes expired;
+# routes that read them call `load_uncached_user_columns` first.
+UNCACHED_USER_COLUMNS = frozenset({"password_hash", "github_user_id", "github_login", "github_connected_at"})
+_USER_COLUMNS = tuple(
+    attr.key for attr in sa_inspect(User).column_attrs if attr.key not in UNCACHED_USER_COLUMNS
+)
+_USER_DATETIME_COLUMNS = frozenset(
+    attr.key for attr in sa_inspect(User).column_attrs if isinstance(attr.columns[0].type, DateTime)
+)
+
+
+@dataclass(frozen=True)
+class CachedSession:
+    user_id: int
+    expires_at: datetime
+    user: dict[str, Any]
+
+    def to_json(self) -> str:
+        user = {
+            key: (value.isoformat() if isinstance(value, datetime) else value)
+            for key, value in self.user.items()
+        }
+        return json.dumps({"user_id": self.user_id, "expires_at": self.expires_at.isoformat(), "user": user})
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "CachedSession":
+        data = json.loads(raw)
+        user = dict(data["user"])
+        for key in _USER_DATETIME_COLUMNS:
+            if user.get(key) is not None:
+                user[key] = datetime.fromisoformat(user[key])
+        return cls(
+            user_id=int(data["user_id"]),
+            expires_at=datetime.fromisoformat(data["expires_at"]),
+            user=user,
+        )
+
+
+def snapshot_user(user: User) -> dict[str, Any]:
+    return {key: getattr(user, key) for key in _USER_COLUMNS}
+
+
+async def attach_cached_user(db: AsyncSession, cached: CachedSession) -> User:
+    """Rebuild the user from its snapshot and attach it to `db` without a query.
+
+    The instance behaves like one loaded by `get_user`: route code can mutate it and
+    commit through the request session.
+    """
+    user = User(**cached.user)
+    make_transient_to_detached(user)
+    merged = await db.merge(user, load=False)
+    # Without this, reading an omitted column would silently return None.
+    db.expire(merged, UNCACHED_USER_COLUMNS)
+    return merged
+
+
+async def load_uncached_user_columns(db: AsyncSession, user: User) -> None:
+    """Load the columns a cached user was rebuilt without; no query for a loaded user."""
+    unloaded = sa_inspect(user).unloaded & UNCACHED_USER_COLUMNS
+    if unloaded:
+        await db.refresh(user, attribute_names=sorted(unloaded))
+
+
+class _MemorySessionCache:
+    def __init__(self, *, max_entries: int) -> None:
+        self._max_entries = max(1, int(max_entries))
+        self._entries: OrderedDict[str, tuple[float, CachedSession]] = OrderedDict()
+        self._by_user: dict[int, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, token_hash: str) -> CachedSession | None:
+        item = self._entries.get(token_hash)
+        if item is None:
+            return None
+        deadline, cached = item
+        if deadline <= time.monotonic():
+            self._drop(token_hash)
+            return None
+        self._entries.move_to_end(token_hash)
+        return cached
+
+    async def set(self, token_hash: str, cached: CachedSession, *, ttl_seconds: float) -> None:
+        self._drop(token_hash)
+        self._entries[token_hash] = (time.monotonic() + ttl_seconds, cached)
+        self._by_user.setdefault(cached.user_id, set()).add(token_hash)
+        while len(self._entries) > self._max_entries:
+            oldest, _ = next(iter(self._entries.items()))
+            self._drop(oldest)
+
+    async def delete(self, token_hash: str) -> None:
+        self._drop(token_hash)
+
+    async def delete_user(self, user_id: int) -> None:
+        for token_hash in list(self._by_user.get(user_id, ())):
+            self._drop(token_hash)
+
+    def _drop(self, token_hash: str) -> None:
+        item = self._entries.pop(token_hash, None)
+        if item is None:
+            return
+        user_id = item[1].user_id
+        hashes = self._by_user.get(user_id)
+        if hashes is not None:
+            hashes.discard(token_hash)
+            if not hashes:
+                del self._by_user[user_id]
+
+
+class _RedisSessionCache:
+    """Shared cache for multi-replica deployments; errors degrade to cache misses."""
+
+    def __init__(self, *, url: str, prefix: str) -> None:
+        from redis.asyncio import Redis
+
+        self._redis = Redis.from_url(url)
+        self._prefix = prefix
+
+    def __len__(self) -> int:
+        return 0
+
+    def _session_key(self, token_hash: str) -> str:
+        return f"{self._prefix}:s:{token_hash}"
+
+    def _user_key(self, user_id: int) -> str:
+        return f"{self._prefix}:u:{user_id}"
+
+    async def get(self, token_hash: str) -> CachedSession | None:
+        try:
+            raw = await self._redis.get(self._session_key(token_hash))
+        except Exception:
+            logger.warning("Session cache read failed; falling back to database", exc_info=True)
+            return None
+        if raw is None:
+            return None
+        try:
+            return CachedSession.from_json(raw)
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    async def set(self, token_hash: str, cached: CachedSession, *, ttl_seconds: float) -> None:
+        ttl_ms = max(1, int(ttl_seconds * 1000))
+        user_key = self._user_key(cached.user_id)
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.set(self._session_key(token_hash), cached.to_json(), px=ttl_ms)
+                pipe.sadd(user_key, token_hash)
+                pipe.pexpire(user_key, ttl_ms)
+                await pipe.execute()
+        except Exception:
+            logger.warning("Session cache write failed", exc_info=True)
+
+    async def delete(self, token_hash: str) -> None:
+        try:
+            await self._redis.delete(self._session_key(token_hash))
+        except Exception:
+            logger.warning("Session cache invalidation failed. token_hash=%s", token_hash[:8], exc_info=True)
+
+    async def delete_user(self, user_id: int) -> None:
+        user_key = self._user_key(user_id)
+        try:
+            hashes = await self._redis.smembers(user_key)
+            keys = [self._session_key(h.decode() if isinstance(h, bytes) else h) for h in hashes]
+            await self._redis.delete(user_key, *keys)
+        except Exception:
+            logger.warning("Session cache invalidation failed. user_id=%s", user_id, exc_info=True)
+
+
+_backend: _MemorySessionCache | _RedisSessionCache | None = None
+_backend_configured = False
+
+
+def _get_backend() -> _MemorySessionCache | _RedisSessionCache | None:
+    global _backend, _backend_configured
+    if _backend_configured:
+        return _backend
+    _backend_configured = True
+    if settings.session_cache_ttl_seconds <= 0 or settings.session_cache_backend == "off":
+        _backend = None
+    elif settings.session_cache_backend == "redis" and settings.redis_url.strip():
+        _backend = _RedisSessionCache(url=settings.redis_url, prefix=f"{settings.taskiq_queue_name}:session")
+    else:
+        _backend = _MemorySessionCache(max_entries=settings.session_cache_max_entries)
+    return _backend
+
+
+def _reset_session_cache_for_tests() -> None:
+    global _backend, _backend_configured
+    _backend = None
+    _backend_configured = False
+
+
+async def get_cached_session(token_hash: str) -> CachedSession | None:
+    backend = _get_backend()
+    if backend is None:
+        return None
+    cached = await backend.get(token_hash)
+    if cached is None:
+        _miss.inc()
+    elif cached.expires_at <= datetime.now(cached.expires_at.tzinfo):
+        # The session itself expired; let the database path delete the row.
+        await backend.delete(token_hash)
+        _expired.inc()
+        cached = None
+    else:
+        _hit.inc()
+    _entries_gauge.set(len(backend))
+    return cached
+
+
+async def cache_session(token_hash: str, *, user: User, expires_at: datetime) -> None:
+    backend = _get_backend()
+    if backend is None:
+        return
+    remaining = (expires_at - datetime.now(expires_at.tzinfo)).total_seconds()
+    ttl_seconds = min(float(settings.session_cache_ttl_seconds), remaining)
+    if ttl_seconds <= 0:
+        return
+    await backend.set(
+        token_hash,
+        CachedSession(user_id=user.id, expires_at=expires_at, user=snapshot_user(user)),
+        ttl_seconds=ttl_seconds,
+    )
+    _entries_gauge.set(len(backend))
+
+
+async def invalidate_session(token_hash: str) -> None:
+    backend = _get_backend()
+    if backend is None:
+        return
+    await backend.delete(token_hash)
+    _invalidations_total.labels("token").inc()
+    _entries_gauge.set(len(backend))
+
+
+async def invalidate_user_sessions(user_id: int) -> None:
+    backend = _get_backend()
+    if backend is None:
+        return
+    await backend.delete_user(user_id)
+    _invalidations_total.labels("user").inc()
+    _entries_gauge.set(len(backend))
@@ -1,18 +1,26 @@
 from __future__ import annotations
 
 import asyncio
+import contextvars
+from collections import deque
+import json
 import logging
+import os
+from pathlib import Path
+import re
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import exc as sa_exc, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.crud.pagination import decode_cursor, keyset_after
 from app.db.session import SessionLocal
 from app.models.audit_event import AuditEvent
 from app.models.user import User
+from app.observability.metrics import counter, gauge, histogram
 
 logger = logging.getLogger(__name__)
-_audit_tasks: set[asyncio.Task[None]] = set()
 _audit_dispatch_enabled = True
 
 
@@ -40,37 +48,288 @@ async def create_audit_event(
     return event
 
 
-async def _write_audit_event_async(
-    *,
-    organization_id: int | None,
-    actor_user_id: int | None,
-    action: str,
-    target_type: str | None,
-    target_id: int | None,
-    metadata: dict[str, Any] | None,
-    context: dict[str, Any] | None,
-) -> None:
+async def create_audit_events(db: AsyncSession, *, events: list[dict[str, Any]]) -> None:
+    """Insert many audit events with one multi-row INSERT and a single commit."""
+    if not events:
+        return
+    await db.execute(
+        insert(AuditEvent),
+        [
+            {
+                "organization_id": e["organization_id"],
+                "actor_user_id": e["actor_user_id"],
+                "action": e["action"],
+                "target_type": e["target_type"],
+                "target_id": e["target_id"],
+                "meta": e["metadata"],
+            }
+            for e in events
+        ],
+    )
+    await db.commit()
+
+
+# Events are queued in memory and written by a single background writer per process: it
+# wakes when a full batch is waiting or `audit_flush_interval_seconds` after the first
+# event, and writes everything queued with multi-row inserts. enqueue_audit_event is
+# called synchronously from request handlers, so it cannot wait for space; when the queue
+# is full, events spill to a per-process JSONL file that the writer replays once it has
+# caught up (or are dropped and counted when spilling is disabled).
+#
+# A replay claims a file by renaming it to `audit-<spiller>.<claimer>.replay`. Only the
+# spilling process's own file and files of processes that have exited are claimed, so no
+# live process is appending to a claimed file. Claims left behind by a replay that crashed
+# or was cancelled are picked up again (events written before the interruption are
+# written twice). If the database is unreachable, the replay stops and spills the
+# remaining events again instead of dropping them.
+
+_SPILL_FILE_RE = re.compile(r"^audit-(\d+)\.jsonl$")
+_REPLAY_FILE_RE = re.compile(r"^audit-(\d+)\.(\d+)\.replay$")
+
+_queue_depth = gauge("marconi_audit_queue_depth", "Audit events waiting to be written.")
+_batch_size = histogram(
+    "marconi_audit_batch_size",
+    "Audit events written per batch.",
+    buckets=(1, 5, 10, 25, 50, 100, 200, 500, 1000),
+)
+_written_total = counter("marconi_audit_events_written_total", "Audit events written to the database.")
+_spilled_total = counter("marconi_audit_events_spilled_total", "Audit events spilled to disk because the queue was full.")
+_dropped_total = counter(
+    "marconi_audit_events_dropped_total",
+    "Audit events lost, by reason.",
+    ("reason",),
+)
+
+
+def _database_unavailable(exc: Exception) -> bool:
+    """Connection-level failures, as opposed to a row the database rejected."""
+    if isinstance(exc, (OSError, sa_exc.OperationalError, sa_exc.InterfaceError)):
+        return True
+    return bool(getattr(exc, "connection_invalidated", False))
+
+
+def _process_alive(pid: int) -> bool:
     try:
-        async with SessionLocal() as db:
-            await create_audit_event(
-                db,
-                organization_id=organization_id,
-                actor_user_id=actor_user_id,
-                action=action,
-                target_type=target_type,
-                target_id=target_id,
-                metadata=metadata,
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists but belongs to someone else.
+        return True
+    return True
+
+
+def _log_failed_event(event: dict[str, Any]) -> None:
+    logger.exception(
+        "Failed to write audit event action=%s organization_id=%s actor_user_id=%s target_type=%s target_id=%s context=%s",
+        event["action"],
+        event["organization_id"],
+        event["actor_user_id"],
+        event["target_type"],
+        event["target_id"],
+        event["context"],
+    )
+
+
+class AuditWriter:
+    def __init__(
+        self,
+        *,
+        max_queue: int,
+        batch_size: int,
+        flush_interval_seconds: float,
+        spill_dir: Path | None,
+        session_factory=SessionLocal,
+    ) -> None:
+        self._queue: deque[dict[str, Any]] = deque()
+        self._max_queue = max_queue
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval_seconds
+        self._spill_dir = spill_dir
+        self._spill_path = None if spill_dir is None else spill_dir / f"audit-{os.getpid()}.jsonl"
+        self._session_factory = session_factory
+        self._task: asyncio.Task[None] | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._write_lock: asyncio.Lock | None = None
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def submit(self, event: dict[str, Any], loop: asyncio.AbstractEventLoop) -> None:
+        if len(self._queue) >= self._max_queue:
+            self._spill(event)
+        else:
+            self._queue.append(event)
+            _queue_depth.set(len(self._queue))
+        self._ensure_running(loop)
+        if len(self._queue) >= self._batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _spill(self, event: dict[str, Any]) -> None:
+        if self._spill_path is None:
+            _dropped_total.labels("queue_full").inc()
+            logger.error(
+                "Dropped audit event because the audit queue is full action=%s organization_id=%s",
+                event["action"],
+                event["organization_id"],
             )
-    except Exception:
-        logger.exception(
-            "Failed to write audit event action=%s organization_id=%s actor_user_id=%s target_type=%s target_id=%s context=%s",
-            action,
-            organization_id,
-            actor_user_id,
-            target_type,
-            target_id,
-            context,
+            return
+        try:
+            self._spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._spill_path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(event, default=str) + "\n")
+            _spilled_total.inc()
+        except OSError:
+            _dropped_total.labels("spill_failed").inc()
+            _log_failed_event(event)
+
+    def _ensure_running(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+        self._wakeup = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        # A fresh context: the long-lived writer must not inherit the first caller's trace.
+        self._task = loop.create_task(self._run(), context=contextvars.Context())
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+            await self._replay_spilled()
+            # Exit once idle; the next submit() starts a new writer.
+            if not self._queue:
+                self._task = None
+                return
+
+    async def flush(self) -> None:
+        lock = self._write_lock or asyncio.Lock()
+        async with lock:
+            while self._queue:
+                batch = [self._queue.popleft() for _ in range(min(self._batch_size, len(self._queue)))]
+                _queue_depth.set(len(self._queue))
+                await self._write_batch(batch)
+
+    async def _write_batch(
+        self, batch: list[dict[str, Any]], *, keep_when_unavailable: bool = False
+    ) -> list[dict[str, Any]]:
+        """Write `batch`, dropping rows the database rejects.
+
+        With `keep_when_unavailable`, stops at the first connection failure and returns
+        the events not written yet instead of dropping them; otherwise returns [].
+        """
+        _batch_size.observe(len(batch))
+        try:
+            async with self._session_factory() as db:
+                await create_audit_events(db, events=batch)
+            _written_total.inc(len(batch))
+            return []
+        except Exception as exc:
+            if keep_when_unavailable and _database_unavailable(exc):
+                return batch
+            logger.warning("Batched audit write failed; retrying %s event(s) individually", len(batch), exc_info=True)
+        # One bad row (e.g. an organization deleted meanwhile) must not sink the whole batch.
+        for i, event in enumerate(batch):
+            try:
+                async with self._session_factory() as db:
+                    await create_audit_event(
+                        db,
+                        organization_id=event["organization_id"],
+                        actor_user_id=event["actor_user_id"],
+                        action=event["action"],
+                        target_type=event["target_type"],
+                        target_id=event["target_id"],
+                        metadata=event["metadata"],
+                    )
+                _written_total.inc()
+            except Exception as exc:
+                if keep_when_unavailable and _database_unavailable(exc):
+                    return batch[i:]
+                _dropped_total.labels("write_failed").inc()
+                _log_failed_event(event)
+        return []
+
+    def _claimable_spill_files(self) -> list[tuple[Path, int]]:
+        """(path, spilling pid) for this process's spill file and those of exited processes,
+        including claims an interrupted replay left behind."""
+        assert self._spill_dir is not None
+        claimable = []
+        for path in sorted(self._spill_dir.glob("audit-*")):
+            spill = _SPILL_FILE_RE.match(path.name)
+            if spill is not None:
+                owner = spiller = int(spill.group(1))
+            else:
+                replay = _REPLAY_FILE_RE.match(path.name)
+                if replay is None:
+                    continue
+                spiller, owner = int(replay.group(1)), int(replay.group(2))
+            if owner != os.getpid() and _process_alive(owner):
+                continue
+            claimable.append((path, spiller))
+        return claimable
+
+    def _respill(self, events: list[dict[str, Any]]) -> bool:
+        assert self._spill_path is not None
+        try:
+            with self._spill_path.open("a", encoding="utf-8") as fh:
+                fh.writelines(json.dumps(event, default=str) + "\n" for event in events)
+        except OSError:
+            logger.exception("Failed to re-spill %s audit event(s)", len(events))
+            return False
+        return True
+
+    async def _replay_spilled(self) -> None:
+        if self._spill_dir is None or self._queue or not self._spill_dir.is_dir():
+            return
+        for path, spiller in self._claimable_spill_files():
+            claimed = path.with_name(f"audit-{spiller}.{os.getpid()}.replay")
+            try:
+                if path != claimed:
+                    path.rename(claimed)
+                lines = claimed.read_text(encoding="utf-8").splitlines()
+            except OSError:
+                continue
+            events = []
+            for line in lines:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    _dropped_total.labels("spill_corrupt").inc()
+            for i in range(0, len(events), self._batch_size):
+                unwritten = await self._write_batch(events[i : i + self._batch_size], keep_when_unavailable=True)
+                if unwritten:
+                    remaining = unwritten + events[i + self._batch_size :]
+                    # Keep the claim if the events cannot be spilled again; it is retried later.
+                    if self._respill(remaining):
+                        claimed.unlink(missing_ok=True)
+                    logger.warning("Database unavailable; %s spilled audit event(s) kept for later", len(remaining))
+                    return
+            claimed.unlink(missing_ok=True)
+
+
+_writer: AuditWriter | None = None
+
+
+def get_audit_writer() -> AuditWriter:
+    global _writer
+    if _writer is None:
+        _writer = AuditWriter(
+            max_queue=settings.audit_queue_max_events,
+            batch_size=settings.audit_batch_size,
+            flush_interval_seconds=settings.audit_flush_interval_seconds,
+            spill_dir=Path(settings.audit_spill_dir) if settings.audit_spill_enabled else None,
         )
+    return _writer
+
+
+def _reset_audit_writer_for_tests(writer: AuditWriter | None = None) -> None:
+    global _writer
+    _writer = writer
 
 
 def enqueue_audit_event(
@@ -89,6 +348,7 @@ def enqueue_audit_event(
     try:
         loop = asyncio.get_running_loop()
     except RuntimeError:
+        _dropped_total.labels("no_event_loop").inc()
         logger.error(
             "Dropped audit event because no running event loop action=%s organization_id=%s actor_user_id=%s",
             action,
@@ -97,32 +357,28 @@ def enqueue_audit_event(
         )
         return
 
-    task = loop.create_task(
-        _write_audit_event_async(
-            organization_id=organization_id,
-            actor_user_id=actor_user_id,
-            action=action,
-            target_type=target_type,
-            target_id=target_id,
-            metadata=None if metadata is None else dict(metadata),
-            context=None if context is None else dict(context),
-        )
+    get_audit_writer().submit(
+        {
+            "organization_id": organization_id,
+            "actor_user_id": actor_user_id,
+            "action": action,
+            "target_type": target_type,
+            "target_id": target_id,
+            "metadata": None if metadata is None else dict(metadata),
+            "context": None if context is None else dict(context),
+        },
+        loop,
     )
-    _audit_tasks.add(task)
-    task.add_done_callback(_audit_tasks.discard)
 
 
 async def drain_audit_tasks(*, timeout_seconds: float = 2.0) -> None:
-    if not _audit_tasks:
+    """Write out everything queued (used on shutdown and between tests)."""
+    if _writer is None or not _writer.depth:
         return
-    pending = tuple(_audit_tasks)
     try:
-        await asyncio.wait_for(
-            asyncio.gather(*pending, return_exceptions=True),
-            timeout=timeout_seconds,
-        )
+        await asyncio.wait_for(_writer.flush(), timeout=timeout_seconds)
     except TimeoutError:
-        logger.warning("Timed out waiting for %s audit task(s) to finish", len(_audit_tasks))
+        logger.warning("Timed out writing %s queued audit event(s)", _writer.depth)
 
 
 def set_audit_dispatch_enabled(enabled: bool) -> None:
@@ -136,6 +392,7 @@ async def list_audit_events(
     organization_id: int,
     offset: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ) -> list[tuple[AuditEvent, str | None]]:
     offset = max(0, offset)
     limit = min(max(1, limit), 200)
@@ -144,8 +401,11 @@ async def list_audit_events(
         .outerjoin(User, User.id == AuditEvent.actor_user_id)
         .where(AuditEvent.organization_id == organization_id)
         .order_by(AuditEvent.id.desc())
-        .offset(offset)
-        .limit(limit)
     )
+    if cursor is not None:
+        (after_id,) = decode_cursor(cursor, (int,))
+        stmt = stmt.where(keyset_after([AuditEvent.id], [after_id], descending=True))
+        offset = 0
+    stmt = stmt.offset(offset).limit(limit)
     result = await db.execute(stmt)
     return list(result.all())
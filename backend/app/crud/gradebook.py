@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import enum
+import json
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Select, String, and_, cast, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+from app.crud.late_policy import (
+    apply_late_penalty_sql,
+    effective_due_date_sql,
+    late_penalty_sql,
+    late_policy_sql,
+)
+from app.models.assignment import Assignment
+from app.models.assignment_extension import AssignmentExtension
+from app.models.course import Course
+from app.models.course_gradebook_version import CourseGradebookVersion
+from app.models.course_membership import CourseMembership, CourseRole
+from app.models.latest_submission import LatestSubmission
+from app.models.student_profile import StudentProfile
+from app.models.submission import Submission
+from app.models.user import User
+from app.observability.metrics import counter
+
+# Staff gradebook matrix: students x assignments of the latest submission's status and
+# score, built with one query over `latest_submissions` and returned column-oriented.
+#
+# Serialized matrices are cached per course, keyed by a change stamp read without any
+# writes on the hot path: the course's `course_gradebook_versions` row (bumped by triggers
+# on roster and assignment writes from any process) plus its latest
+# `submissions.updated_at`, which every upload and grading write moves. Each read costs
+# one query to revalidate.
+
+_matrix_lookups_total = counter(
+    "marconi_gradebook_matrix_lookups_total",
+    "Gradebook matrix cache lookups by result (hit, miss, stale).",
+    ("result",),
+)
+_matrix_hit = _matrix_lookups_total.labels("hit")
+_matrix_miss = _matrix_lookups_total.labels("miss")
+_matrix_stale = _matrix_lookups_total.labels("stale")
+
+# course_id -> (expires at, version, serialized matrix)
+_matrix_cache: OrderedDict[int, tuple[float, str, bytes]] = OrderedDict()
+
+
+class GradebookScore(str, enum.Enum):
+    latest = "latest"
+    best = "best"
+
+
+@dataclass(frozen=True)
+class GradebookColumn:
+    assignment_id: int
+    title: str
+    max_points: int
+    due_date: datetime | None
+
+
+@dataclass(frozen=True)
+class GradebookRow:
+    user_id: int
+    email: str
+    full_name: str | None
+    student_number: str | None
+    # One entry per column, in column order; None when there is no scored submission.
+    scores: tuple[int | None, ...]
+
+
+async def list_gradebook_columns(db: AsyncSession, *, course: Course) -> list[GradebookColumn]:
+    result = await db.execute(
+        select(Assignment)
+        .where(Assignment.course_id == course.id)
+        .order_by(Assignment.due_date.asc().nulls_last(), Assignment.id.asc())
+    )
+    return [
+        GradebookColumn(
+            assignment_id=assignment.id,
+            title=assignment.title,
+            max_points=assignment.max_points,
+            due_date=assignment.due_date,
+        )
+        for assignment in result.scalars().all()
+    ]
+
+
+def _gradebook_cells_query(*, course_id: int, score: GradebookScore) -> Select:
+    """One row per (student, assignment with a counted submission), grouped by student.
+
+    Late penalties are applied in SQL, so "best" ranks attempts by their penalised score.
+    Students without any submission still get one row (with NULL cell columns), so every
+    enrolled student appears in the export.
+    """
+    _, penalty_percent = late_penalty_sql(
+        submitted_at=Submission.created_at,
+        effective_due_date=effective_due_date_sql(
+            assignment_due_date=Assignment.due_date,
+            extension_due_date=AssignmentExtension.extended_due_date,
+        ),
+        policy=late_policy_sql(course_policy=Course.late_policy, assignment_policy=Assignment.late_policy),
+    )
+    penalised = apply_late_penalty_sql(Submission.score, penalty_percent)
+    if score == GradebookScore.best:
+        rank_order = (penalised.desc().nulls_last(), Submission.id.desc())
+    else:
+        rank_order = (Submission.id.desc(),)
+    ranked = (
+        select(
+            Submission.user_id,
+            Submission.assignment_id,
+            penalised.label("score"),
+            func.row_number()
+            .over(partition_by=(Submission.user_id, Submission.assignment_id), order_by=rank_order)
+            .label("attempt_rank"),
+        )
+        .join(Assignment, Assignment.id == Submission.assignment_id)
+        .join(Course, Course.id == Assignment.course_id)
+        .outerjoin(
+            AssignmentExtension,
+            and_(
+                AssignmentExtension.assignment_id == Submission.assignment_id,
+                AssignmentExtension.user_id == Submission.user_id,
+            ),
+        )
+        .where(Assignment.course_id == course_id)
+        .subquery()
+    )
+    return (
+        select(
+            CourseMembership.user_id,
+            User.email,
+            StudentProfile.full_name,
+            CourseMembership.student_number,
+            ranked.c.assignment_id,
+            ranked.c.score,
+        )
+        .join(User, User.id == CourseMembership.user_id)
+        .outerjoin(StudentProfile, StudentProfile.user_id == User.id)
+        .outerjoin(
+            ranked,
+            and_(ranked.c.user_id == CourseMembership.user_id, ranked.c.attempt_rank == 1),
+        )
+        .where(CourseMembership.course_id == course_id, CourseMembership.role == CourseRole.student)
+        .order_by(
+            CourseMembership.student_number.asc().nulls_last(),
+            User.email.asc(),
+            User.id.asc(),
+        )
+    )
+
+
+async def stream_gradebook_rows(
+    db: AsyncSession,
+    *,
+    course_id: int,
+    columns: list[GradebookColumn],
+    score: GradebookScore = GradebookScore.latest,
+    batch_size: int = 1000,
+) -> AsyncIterator[GradebookRow]:
+    """Yield one gradebook row per enrolled student, with late penalties applied.
+
+    Cells come from a server-side cursor ordered by student, so only the current student's
+    cells are held in memory regardless of cohort size.
+    """
+    position = {column.assignment_id: i for i, column in enumerate(columns)}
+    stmt = _gradebook_cells_query(course_id=course_id, score=score)
+    result = await db.stream(stmt.execution_options(yield_per=max(1, batch_size)))
+    student: tuple[int, str, str | None, str | None] | None = None
+    scores: list[int | None] = []
+    try:
+        async for user_id, email, full_name, student_number, assignment_id, cell in result:
+            if student is None or student[0] != user_id:
+                if student is not None:
+                    yield GradebookRow(*student, scores=tuple(scores))
+                student = (user_id, email, full_name, student_number)
+                scores = [None] * len(columns)
+            index = position.get(assignment_id)
+            if index is not None and cell is not None:
+                scores[index] = int(cell)
+        if student is not None:
+            yield GradebookRow(*student, scores=tuple(scores))
+    finally:
+        await result.close()
+
+
+def _reset_gradebook_cache_for_tests() -> None:
+    _matrix_cache.clear()
+
+
+@dataclass(frozen=True)
+class GradebookStamp:
+    version: str
+    # False while the latest cell write is younger than the settle window: `updated_at` is
+    # stamped before commit, so an older-stamped write may still become visible and would
+    # not move the stamp. Such matrices are served but not cached.
+    settled: bool
+
+
+async def get_course_gradebook_stamp(
+    db: AsyncSession, *, course_id: int, settle_seconds: float
+) -> GradebookStamp | None:
+    # max() over (course_id, updated_at) is a single backward probe of ix_submissions_course_updated.
+    cells_at = (
+        select(func.max(Submission.updated_at)).where(Submission.course_id == course_id).scalar_subquery()
+    )
+    row = (
+        await db.execute(
+            select(CourseGradebookVersion.version, cells_at, func.clock_timestamp()).where(
+                CourseGradebookVersion.course_id == course_id
+            )
+        )
+    ).one_or_none()
+    if row is None:
+        return None
+    version, cells_at, db_now = row
+    if cells_at is None:
+        return GradebookStamp(version=f"{version}.0", settled=True)
+    cells_us = int(cells_at.timestamp() * 1_000_000)
+    return GradebookStamp(
+        version=f"{version}.{cells_us}",
+        settled=(db_now - cells_at).total_seconds() >= settle_seconds,
+    )
+
+
+async def build_gradebook_matrix(db: AsyncSession, *, course: Course) -> dict[str, Any]:
+    """Column-oriented matrix; `cells.<field>[i][j]` is student i, assignment j (null if unsubmitted)."""
+    columns = await list_gradebook_columns(db, course=course)
+    position = {column.assignment_id: j for j, column in enumerate(columns)}
+    column_order = (Assignment.due_date.asc().nulls_last(), Assignment.id.asc())
+
+    def _per_assignment(expr):
+        return func.array_agg(aggregate_order_by(expr, *column_order))
+
+    result = await db.execute(
+        select(
+            CourseMembership.user_id,
+            User.email,
+            StudentProfile.full_name,
+            CourseMembership.student_number,
+            _per_assignment(Assignment.id),
+            _per_assignment(LatestSubmission.submission_id),
+            _per_assignment(cast(LatestSubmission.status, String)),
+            _per_assignment(LatestSubmission.score),
+        )
+        .join(User, User.id == CourseMembership.user_id)
+        .outerjoin(StudentProfile, StudentProfile.user_id == User.id)
+        .outerjoin(Assignment, Assignment.course_id == CourseMembership.course_id)
+        .outerjoin(
+            LatestSubmission,
+            and_(
+                LatestSubmission.assignment_id == Assignment.id,
+                LatestSubmission.user_id == CourseMembership.user_id,
+            ),
+        )
+        .where(CourseMembership.course_id == course.id, CourseMembership.role == CourseRole.student)
+        .group_by(CourseMembership.user_id, User.email, StudentProfile.full_name, CourseMembership.student_number)
+        .order_by(
+            CourseMembership.student_number.asc().nulls_last(),
+            User.email.asc(),
+            CourseMembership.user_id.asc(),
+        )
+    )
+
+    students: dict[str, list[Any]] = {"user_id": [], "email": [], "full_name": [], "student_number": []}
+    cells: dict[str, list[list[Any]]] = {"submission_id": [], "status": [], "score": []}
+    for user_id, email, full_name, student_number, assignment_ids, submission_ids, statuses, scores in result:
+        students["user_id"].append(user_id)
+        students["email"].append(email)
+        students["full_name"].append(full_name)
+        students["student_number"].append(student_number)
+        row_submission_ids: list[int | None] = [None] * len(columns)
+        row_statuses: list[str | None] = [None] * len(columns)
+        row_scores: list[int | None] = [None] * len(columns)
+        # Place cells by assignment id: a column added after list_gradebook_columns ran is
+        # dropped here and picked up on the next build (its insert bumped the stamp).
+        for assignment_id, submission_id, status, score in zip(assignment_ids, submission_ids, statuses, scores):
+            j = position.get(assignment_id)
+            if j is None:
+                continue
+            row_submission_ids[j] = submission_id
+            row_statuses[j] = status
+            row_scores[j] = score
+        cells["submission_id"].append(row_submission_ids)
+        cells["status"].append(row_statuses)
+        cells["score"].append(row_scores)
+
+    return {
+        "course_id": course.id,
+        "assignments": {
+            "id": [c.assignment_id for c in columns],
+            "title": [c.title for c in columns],
+            "max_points": [c.max_points for c in columns],
+            "due_date": [None if c.due_date is None else c.due_date.isoformat() for c in columns],
+        },
+        "students": students,
+        "cells": cells,
+    }
+
+
+async def get_gradebook_matrix_json(db: AsyncSession, *, course: Course) -> tuple[str | None, bytes]:
+    """Return (version, serialized matrix), from the cache while the course's stamp is unchanged.
+
+    The stamp is read before the matrix is built, so a write racing the build can only
+    make the cached entry look older than its contents, never newer.
+    """
+    stamp = await get_course_gradebook_stamp(
+        db, course_id=course.id, settle_seconds=settings.submission_changes_settle_seconds
+    )
+    version = None if stamp is None else stamp.version
+    ttl = settings.gradebook_cache_ttl_seconds
+    now = time.monotonic()
+    if ttl > 0 and version is not None:
+        item = _matrix_cache.get(course.id)
+        if item is not None:
+            expires_at, cached_version, body = item
+            if cached_version == version and expires_at > now:
+                _matrix_cache.move_to_end(course.id)
+                _matrix_hit.inc()
+                return version, body
+            _matrix_stale.inc()
+        else:
+            _matrix_miss.inc()
+
+    matrix = await build_gradebook_matrix(db, course=course)
+    matrix["version"] = version
+    body = json.dumps(matrix, separators=(",", ":")).encode()
+    if ttl > 0 and stamp is not None and stamp.settled:
+        _matrix_cache[course.id] = (now + ttl, version, body)
+        _matrix_cache.move_to_end(course.id)
+        while len(_matrix_cache) > settings.gradebook_cache_max_entries:
+            _matrix_cache.popitem(last=False)
+    return version, body
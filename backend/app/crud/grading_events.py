@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import BigInteger, Integer, cast, delete, func, literal, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.grading_event import GradingEvent
+from app.models.grading_event_rollup import GradingEventRollup
+
+ROLLUP_BUCKET = timedelta(hours=1)
+# Events are stamped at transaction start (`now()`), and a grading transaction stays open
+# across all of its JOBE runs, so an hour is rolled up only once it ended this long ago
+# and no transaction that started in it is still open (see `_oldest_open_transaction`).
+ROLLUP_SETTLE = timedelta(minutes=5)
+# Transactions open longer than this (e.g. a leaked idle-in-transaction session) stop
+# holding rollups back.
+ROLLUP_MAX_OPEN_TRANSACTION = timedelta(hours=6)
+
+
+def _hour_floor(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _percentile_ms(fraction: float):
+    return cast(func.round(func.percentile_cont(fraction).within_group(GradingEvent.duration_ms)), Integer)
+
+
+async def _oldest_open_transaction(db: AsyncSession) -> datetime | None:
+    """Start of the oldest other open transaction on this database.
+
+    Sessions of other roles report no `xact_start` without pg_read_all_stats; the API
+    and workers share one role.
+    """
+    result = await db.execute(
+        text(
+            """
+            SELECT min(xact_start) FROM pg_stat_activity
+            WHERE datname = current_database()
+              AND pid <> pg_backend_pid()
+              AND xact_start > clock_timestamp() - make_interval(secs => :max_age)
+            """
+        ),
+        {"max_age": ROLLUP_MAX_OPEN_TRANSACTION.total_seconds()},
+    )
+    return result.scalar_one()
+
+
+async def get_grading_events_rolled_through(db: AsyncSession) -> datetime | None:
+    """End of the newest rolled-up hour; raw events before it are safe to prune."""
+    last = (await db.execute(select(func.max(GradingEventRollup.bucket_start)))).scalar_one()
+    return None if last is None else last + ROLLUP_BUCKET
+
+
+async def rollup_grading_events(db: AsyncSession, *, now: datetime | None = None) -> int:
+    """Aggregate every closed hour after the last rolled-up one; returns rows written.
+
+    Hours are written once in a single INSERT .. SELECT; a concurrent or repeated run
+    conflicts on the group index and writes nothing.
+    """
+    now = now or datetime.now(timezone.utc)
+    end = _hour_floor(now - ROLLUP_SETTLE)
+    oldest_open = await _oldest_open_transaction(db)
+    if oldest_open is not None:
+        end = min(end, _hour_floor(oldest_open))
+    start = await get_grading_events_rolled_through(db)
+    if start is None:
+        first = (await db.execute(select(func.min(GradingEvent.created_at)))).scalar_one()
+        if first is None:
+            return 0
+        start = _hour_floor(first)
+    if start >= end:
+        return 0
+
+    # Hours in UTC, like `start`/`end`, whatever the session's TimeZone.
+    bucket = func.date_trunc("hour", GradingEvent.created_at, "UTC").label("bucket_start")
+    aggregates = (
+        select(
+            bucket,
+            GradingEvent.phase,
+            GradingEvent.event_type,
+            GradingEvent.reason,
+            GradingEvent.context,
+            func.count().label("events"),
+            func.count(GradingEvent.duration_ms).label("duration_count"),
+            func.coalesce(func.sum(cast(GradingEvent.duration_ms, BigInteger)), literal(0)).label(
+                "duration_sum_ms"
+            ),
+            func.max(GradingEvent.duration_ms).label("duration_max_ms"),
+            _percentile_ms(0.5).label("duration_p50_ms"),
+            _percentile_ms(0.95).label("duration_p95_ms"),
+            _percentile_ms(0.99).label("duration_p99_ms"),
+        )
+        .where(GradingEvent.created_at >= start, GradingEvent.created_at < end)
+        .group_by(bucket, GradingEvent.phase, GradingEvent.event_type, GradingEvent.reason, GradingEvent.context)
+    )
+    stmt = (
+        insert(GradingEventRollup)
+        .from_select(
+            [
+                "bucket_start",
+                "phase",
+                "event_type",
+                "reason",
+                "context",
+                "events",
+                "duration_count",
+                "duration_sum_ms",
+                "duration_max_ms",
+                "duration_p50_ms",
+                "duration_p95_ms",
+                "duration_p99_ms",
+            ],
+            aggregates,
+        )
+        .on_conflict_do_nothing()
+        .returning(GradingEventRollup.id)
+    )
+    written = len((await db.execute(stmt)).all())
+    await db.commit()
+    return written
+
+
+async def prune_grading_events(
+    db: AsyncSession,
+    *,
+    older_than: datetime,
+    batch_size: int,
+) -> int:
+    """Delete raw events older than `older_than` in short batches; returns rows deleted.
+
+    Only hours that are already rolled up are pruned, whatever `older_than` says.
+    """
+    rolled_through = await get_grading_events_rolled_through(db)
+    if rolled_through is None:
+        return 0
+    cutoff = min(older_than, rolled_through)
+    deleted = 0
+    while True:
+        batch = (
+            select(GradingEvent.id)
+            .where(GradingEvent.created_at < cutoff)
+            .order_by(GradingEvent.created_at)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = await db.execute(delete(GradingEvent).where(GradingEvent.id.in_(batch)))
+        await db.commit()
+        deleted += result.rowcount or 0
+        if (result.rowcount or 0) < batch_size:
+            return deleted
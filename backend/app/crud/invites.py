@@ -48,21 +48,23 @@ async def create_course_student_invites(
     expires_in_days: int = 7,
 ) -> tuple[list[str], int, list[InviteIssue]]:
     invites: list[str] = []
-    issues: list[InviteIssue] = []
+    # (roster position, issue): validation and enrollment issues are reported in row order.
+    issues: list[tuple[int, InviteIssue]] = []
     expires_at = datetime.now(timezone.utc) + timedelta(days=expires_in_days)
     auto_enrolled = 0
 
     seen_student_numbers: set[str] = set()
+    valid_rows: list[tuple[int, RosterRow, str, str, str, str]] = []
 
-    for row in rows:
+    for position, row in enumerate(rows):
         full_name = row.full_name.strip()
         student_number = row.student_number.strip()
         programme = row.programme.strip()
         email = row.email.strip().lower()
         original_email = row.email.strip()
 
-        def make_issue(reason: str, *, issue_email: str | None = None) -> InviteIssue:
-            return InviteIssue(
+        def make_issue(reason: str, *, issue_email: str | None = None) -> tuple[int, InviteIssue]:
+            return position, InviteIssue(
                 email=issue_email if issue_email is not None else email,
                 reason=reason,
                 row_number=row.row_number,
@@ -87,27 +89,60 @@ async def create_course_student_invites(
             issues.append(make_issue("duplicate_student_number_in_csv"))
             continue
         seen_student_numbers.add(student_number)
+        valid_rows.append((position, row, email, full_name, student_number, programme))
 
-        existing_user = await db.execute(select(User).where(User.email == email))
-        user = existing_user.scalars().first()
-        if user is None:
-            user = User(email=email, password_hash=None)
-            db.add(user)
-            await db.flush()
+    # Users and profiles for the whole roster in a constant number of statements.
+    emails = list(dict.fromkeys(email for _, _, email, _, _, _ in valid_rows))
+    users_by_email: dict[str, User] = {}
+    if emails:
+        result = await db.execute(select(User).where(User.email.in_(emails)))
+        users_by_email = {user.email: user for user in result.scalars().all()}
+    new_users = [User(email=email, password_hash=None) for email in emails if email not in users_by_email]
+    if new_users:
+        db.add_all(new_users)
+        await db.flush()
+        users_by_email.update((user.email, user) for user in new_users)
+    # Plain values: the auto-enroll commits below may expire the ORM objects.
+    user_ids = {email: user.id for email, user in users_by_email.items()}
+    activated = {email for email, user in users_by_email.items() if user.password_hash is not None}
 
-        profile = await db.get(StudentProfile, user.id)
+    profiles_by_user_id: dict[int, StudentProfile] = {}
+    if user_ids:
+        result = await db.execute(
+            select(StudentProfile).where(StudentProfile.user_id.in_(list(user_ids.values())))
+        )
+        profiles_by_user_id = {profile.user_id: profile for profile in result.scalars().all()}
+    for _, _, email, full_name, _, programme in valid_rows:
+        user_id = user_ids[email]
+        profile = profiles_by_user_id.get(user_id)
         if profile is None:
-            profile = StudentProfile(user_id=user.id, full_name=full_name, programme=programme)
+            profile = StudentProfile(user_id=user_id, full_name=full_name, programme=programme)
             db.add(profile)
+            profiles_by_user_id[user_id] = profile
         else:
             profile.full_name = full_name
             profile.programme = programme
+    # Committed before enrolling: a failed enrollment rolls back only its own row.
+    await db.commit()
+
+    new_invites: list[InviteToken] = []
+    for position, row, email, full_name, student_number, programme in valid_rows:
+
+        def make_issue(reason: str) -> tuple[int, InviteIssue]:
+            return position, InviteIssue(
+                email=email,
+                reason=reason,
+                row_number=row.row_number,
+                full_name=full_name,
+                student_number=student_number,
+                programme=programme,
+            )
 
         # If the user has already activated (has a password), enroll immediately and skip invite creation.
-        if user.password_hash is not None:
+        if email in activated:
             try:
                 membership = await add_course_membership(
-                    db, course_id=course_id, user_id=user.id, role=CourseRole.student
+                    db, course_id=course_id, user_id=user_ids[email], role=CourseRole.student
                 )
             except CourseMembershipExistsError:
                 membership = None
@@ -135,12 +170,13 @@ async def create_course_student_invites(
             expires_at=expires_at,
             used_at=None,
         )
-        db.add(invite)
+        new_invites.append(invite)
         invites.append(token)
 
+    db.add_all(new_invites)
     await db.commit()
     # Return tokens for non-activated users; activated users are auto-enrolled.
-    return invites, auto_enrolled, issues
+    return invites, auto_enrolled, [issue for _, issue in sorted(issues, key=lambda item: item[0])]
 
 
 def parse_roster_from_csv_bytes(data: bytes) -> list[RosterRow]:
@@ -3,6 +3,10 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 
+from sqlalchemy import BigInteger, Boolean, Integer, Numeric, and_, case, cast, func, literal, null, or_, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql.elements import ColumnElement
+
 
 @dataclass(frozen=True)
 class LatePolicyResolved:
@@ -80,6 +84,109 @@ def compute_late_penalty_percent(
     return late_seconds, int(penalty)
 
 
+def apply_late_penalty(score: int, penalty_percent: int | None) -> int:
+    """Score after deducting `penalty_percent` of it, rounded down."""
+    if not penalty_percent:
+        return score
+    return (score * (100 - penalty_percent)) // 100
+
+
+# Set-based equivalents of the functions above, for queries that compute penalties for many
+# (student, assignment) pairs at once. tests/test_late_policy_sql.py checks parity with the
+# Python implementation over randomly generated policies and timestamps.
+
+
+@dataclass(frozen=True)
+class LatePolicySql:
+    """SQL expressions for a resolved policy; `applies` is false where Python returns None."""
+
+    applies: ColumnElement[bool]
+    grace_minutes: ColumnElement[int]
+    percent_per_day: ColumnElement[int]
+    max_percent: ColumnElement[int]
+
+
+def _jsonb_truthy(policy: ColumnElement, key: str) -> ColumnElement[bool]:
+    # Python truthiness of the decoded JSON value stored under `key`.
+    value = policy.op("->")(key)
+    text_value = policy.op("->>")(key)
+    kind = func.jsonb_typeof(value)
+    return case(
+        (kind == "boolean", cast(text_value, Boolean)),
+        (kind == "number", cast(text_value, Numeric) != 0),
+        (kind == "string", text_value != ""),
+        (kind == "array", func.jsonb_array_length(value) > 0),
+        (kind == "object", value != cast(literal("{}"), JSONB)),
+        else_=False,
+    )
+
+
+def _policy_int(policy: ColumnElement, key: str, *, default: int, upper: int) -> ColumnElement[int]:
+    # int(policy.get(key, default) or 0), clamped to [0, upper].
+    raw = case(
+        (policy.has_key(key), func.coalesce(cast(policy.op("->>")(key), BigInteger), 0)),
+        else_=default,
+    )
+    return cast(func.greatest(0, func.least(raw, upper)), Integer)
+
+
+def late_policy_sql(*, course_policy: ColumnElement, assignment_policy: ColumnElement) -> LatePolicySql:
+    # JSONB columns may hold SQL NULL or a JSON null; both fall through to the course policy,
+    # matching `assignment_policy if assignment_policy is not None else course_policy`.
+    assignment_policy = func.nullif(assignment_policy, cast(literal("null"), JSONB))
+    course_policy = func.nullif(course_policy, cast(literal("null"), JSONB))
+    policy = type_coerce(func.coalesce(assignment_policy, course_policy), JSONB)
+    enabled = case((policy.has_key("enabled"), _jsonb_truthy(policy, "enabled")), else_=True)
+    return LatePolicySql(
+        applies=and_(
+            policy.is_not(None),
+            policy != cast(literal("{}"), JSONB),
+            enabled,
+        ),
+        grace_minutes=_policy_int(policy, "grace_minutes", default=0, upper=7 * 24 * 60),
+        percent_per_day=_policy_int(policy, "percent_per_day", default=0, upper=100),
+        max_percent=_policy_int(policy, "max_percent", default=100, upper=100),
+    )
+
+
+def effective_due_date_sql(
+    *,
+    assignment_due_date: ColumnElement[datetime],
+    extension_due_date: ColumnElement[datetime],
+) -> ColumnElement[datetime]:
+    return func.coalesce(extension_due_date, assignment_due_date)
+
+
+def late_penalty_sql(
+    *,
+    submitted_at: ColumnElement[datetime],
+    effective_due_date: ColumnElement[datetime],
+    policy: LatePolicySql,
+) -> tuple[ColumnElement[int], ColumnElement[int]]:
+    """(late_seconds, penalty_percent) as SQL; both NULL when there is no due date."""
+    grace_minutes = case((policy.applies, policy.grace_minutes), else_=0)
+    deadline = effective_due_date + func.make_interval(0, 0, 0, 0, 0, grace_minutes)
+    overdue_seconds = cast(func.floor(func.extract("epoch", submitted_at - deadline)), BigInteger)
+    late_seconds = case(
+        (effective_due_date.is_(None), null()),
+        (submitted_at <= deadline, 0),
+        else_=overdue_seconds,
+    )
+    days_late = (overdue_seconds + 86400 - 1) // 86400
+    penalty_percent = case(
+        (effective_due_date.is_(None), null()),
+        (submitted_at <= deadline, 0),
+        (or_(~policy.applies, policy.percent_per_day <= 0), 0),
+        else_=cast(func.least(days_late * policy.percent_per_day, policy.max_percent), Integer),
+    )
+    return late_seconds, penalty_percent
+
+
+def apply_late_penalty_sql(score: ColumnElement[int], penalty_percent: ColumnElement[int]) -> ColumnElement[int]:
+    # Integer division rounds down for the non-negative scores stored here.
+    return score * (100 - func.coalesce(penalty_percent, 0)) // 100
+
+
 def _ensure_tz(value: datetime) -> datetime:
     if value.tzinfo is None:
         return value.replace(tzinfo=timezone.utc)
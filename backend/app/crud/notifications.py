@@ -1,14 +1,122 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
+import logging
 import re
 
-from sqlalchemy import select
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.course_notification_preferences import get_course_notification_preference
+from app.crud.pagination import decode_cursor, keyset_after
 from app.models.course_membership import CourseMembership, CourseRole
+from app.models.course_notification_preference import CourseNotificationPreference
 from app.models.notification import Notification, NotificationKind
+from app.models.notification_unread_counter import NotificationUnreadCounter
+from app.realtime.events import notification_event, publish_events, publish_notification_event
+from app.schemas.notification import NotificationOut
+
+logger = logging.getLogger(__name__)
+
+# Unread counts live in notification_unread_counters and are adjusted in the same
+# transaction as the notification write, so the bell reads one primary-key row instead
+# of counting notifications. Events are published only after commit.
+
+
+async def _increment_unread_counts(db: AsyncSession, *, user_ids: list[int]) -> dict[int, int]:
+    if not user_ids:
+        return {}
+    counts: dict[int, int] = {}
+    for user_id in user_ids:
+        counts[user_id] = counts.get(user_id, 0) + 1
+    table = NotificationUnreadCounter.__table__
+    # Sorted rows keep concurrent upserts from deadlocking on each other's counters.
+    stmt = insert(table).values(
+        [{"user_id": user_id, "unread_count": n} for user_id, n in sorted(counts.items())]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={
+            "unread_count": table.c.unread_count + stmt.excluded.unread_count,
+            "updated_at": func.now(),
+        },
+    ).returning(table.c.user_id, table.c.unread_count)
+    result = await db.execute(stmt)
+    return {int(user_id): int(count) for user_id, count in result.all()}
+
+
+async def get_unread_notification_count(db: AsyncSession, *, user_id: int) -> int:
+    result = await db.execute(
+        select(NotificationUnreadCounter.unread_count).where(NotificationUnreadCounter.user_id == user_id)
+    )
+    return int(result.scalar_one_or_none() or 0)
+
+
+def _notification_payload(notification: Notification) -> dict:
+    return NotificationOut.model_validate(notification).model_dump(mode="json")
+
+
+@dataclass(frozen=True)
+class NotificationDraft:
+    user_id: int
+    kind: NotificationKind
+    title: str
+    body: str | None
+    link_url: str | None
+
+
+@dataclass(frozen=True)
+class NotificationBatch:
+    notifications: list[Notification]
+    unread_counts: dict[int, int]
+
+
+async def insert_notifications(db: AsyncSession, *, drafts: list[NotificationDraft]) -> NotificationBatch:
+    """Insert `drafts` with one multi-row INSERT ... RETURNING, without committing.
+
+    Lets callers write notifications in the same transaction as the change they announce;
+    call `publish_notification_batch` once that transaction has committed.
+    """
+    if not drafts:
+        return NotificationBatch(notifications=[], unread_counts={})
+    result = await db.scalars(
+        insert(Notification).returning(Notification, sort_by_parameter_order=True),
+        [
+            {
+                "user_id": d.user_id,
+                "kind": d.kind,
+                "title": d.title,
+                "body": d.body,
+                "link_url": d.link_url,
+            }
+            for d in drafts
+        ],
+    )
+    notifications = list(result.all())
+    unread_counts = await _increment_unread_counts(db, user_ids=[d.user_id for d in drafts])
+    return NotificationBatch(notifications=notifications, unread_counts=unread_counts)
+
+
+async def publish_notification_batch(batch: NotificationBatch) -> None:
+    await publish_events(
+        [
+            notification_event(
+                user_id=n.user_id,
+                kind="created",
+                notification=_notification_payload(n),
+                unread_count=batch.unread_counts.get(n.user_id),
+            )
+            for n in batch.notifications
+        ]
+    )
+
+
+async def create_notifications(db: AsyncSession, *, drafts: list[NotificationDraft]) -> list[Notification]:
+    batch = await insert_notifications(db, drafts=drafts)
+    await db.commit()
+    await publish_notification_batch(batch)
+    return batch.notifications
 
 
 async def create_notification(
@@ -20,10 +128,8 @@ async def create_notification(
     body: str | None,
     link_url: str | None,
 ) -> Notification:
-    n = Notification(user_id=user_id, kind=kind, title=title, body=body, link_url=link_url)
-    db.add(n)
-    await db.commit()
-    await db.refresh(n)
+    draft = NotificationDraft(user_id=user_id, kind=kind, title=title, body=body, link_url=link_url)
+    (n,) = await create_notifications(db, drafts=[draft])
     return n
 
 
@@ -34,20 +140,52 @@ async def list_notifications(
     unread_only: bool,
     offset: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ) -> list[Notification]:
     offset = max(0, offset)
     limit = min(max(1, limit), 200)
     stmt = select(Notification).where(Notification.user_id == user_id).order_by(Notification.id.desc())
     if unread_only:
         stmt = stmt.where(Notification.read_at.is_(None))
+    if cursor is not None:
+        (after_id,) = decode_cursor(cursor, (int,))
+        stmt = stmt.where(keyset_after([Notification.id], [after_id], descending=True))
+        offset = 0
     result = await db.execute(stmt.offset(offset).limit(limit))
     return list(result.scalars().all())
 
 
 async def mark_notification_read(db: AsyncSession, *, notification: Notification) -> Notification:
-    notification.read_at = datetime.now(timezone.utc)
+    if notification.read_at is not None:
+        return notification
+    # Conditional update so two concurrent reads of the same notification decrement once.
+    marked = await db.execute(
+        update(Notification)
+        .where(Notification.id == notification.id, Notification.read_at.is_(None))
+        .values(read_at=datetime.now(timezone.utc))
+        .returning(Notification.id)
+    )
+    unread_count: int | None = None
+    if marked.first() is not None:
+        counter = await db.execute(
+            update(NotificationUnreadCounter)
+            .where(NotificationUnreadCounter.user_id == notification.user_id)
+            .values(
+                unread_count=func.greatest(NotificationUnreadCounter.unread_count - 1, 0),
+                updated_at=func.now(),
+            )
+            .returning(NotificationUnreadCounter.unread_count)
+        )
+        unread_count = int(counter.scalar_one_or_none() or 0)
     await db.commit()
     await db.refresh(notification)
+    if unread_count is not None:
+        await publish_notification_event(
+            user_id=notification.user_id,
+            kind="read",
+            notification_id=notification.id,
+            unread_count=unread_count,
+        )
     return notification
 
 
@@ -64,90 +202,189 @@ def _parse_count_from_title(title: str) -> int:
         return 0
 
 
-async def notify_staff_new_submission_digest(
-    db: AsyncSession,
-    *,
-    course_id: int,
-    course_code: str,
-    assignment_title: str,
-    student_email: str,
-    submitter_user_id: int,
-) -> None:
-    """
-    Create/update a per-course "new submissions" digest notification for each
-    course staff member, grouped within a 10-minute window.
-    """
+@dataclass(frozen=True)
+class SubmissionDigestEntry:
+    course_id: int
+    course_code: str
+    assignment_title: str
+    student_email: str
+    submitter_user_id: int
+
+
+@dataclass
+class CourseSubmissionDigest:
+    """New submissions for one course, coalesced until they are written out."""
+
+    course_id: int
+    course_code: str
+    latest_student_email: str
+    latest_assignment_title: str
+    counts_by_submitter: dict[int, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_entry(cls, entry: SubmissionDigestEntry) -> CourseSubmissionDigest:
+        digest = cls(
+            course_id=entry.course_id,
+            course_code=entry.course_code,
+            latest_student_email=entry.student_email,
+            latest_assignment_title=entry.assignment_title,
+        )
+        digest.counts_by_submitter[entry.submitter_user_id] = 1
+        return digest
+
+    def add(self, entry: SubmissionDigestEntry) -> None:
+        self.course_code = entry.course_code
+        self.latest_student_email = entry.student_email
+        self.latest_assignment_title = entry.assignment_title
+        self.counts_by_submitter[entry.submitter_user_id] = (
+            self.counts_by_submitter.get(entry.submitter_user_id, 0) + 1
+        )
 
+    def count_for(self, staff_user_id: int) -> int:
+        # Staff are never notified about their own submissions.
+        return sum(self.counts_by_submitter.values()) - self.counts_by_submitter.get(staff_user_id, 0)
+
+
+def _digest_link_url(course_id: int) -> str:
+    return f"/staff/submissions?course_id={course_id}"
+
+
+async def _load_digest_recipients(db: AsyncSession, *, course_ids: list[int]) -> dict[int, list[int]]:
+    """Staff per course who have not opted out, in one query (no per-member preference lookups)."""
     staff_roles = [CourseRole.owner, CourseRole.co_lecturer, CourseRole.ta]
     result = await db.execute(
-        select(CourseMembership.user_id).where(
-            CourseMembership.course_id == course_id,
+        select(CourseMembership.course_id, CourseMembership.user_id)
+        .outerjoin(
+            CourseNotificationPreference,
+            and_(
+                CourseNotificationPreference.course_id == CourseMembership.course_id,
+                CourseNotificationPreference.user_id == CourseMembership.user_id,
+            ),
+        )
+        .where(
+            CourseMembership.course_id.in_(course_ids),
             CourseMembership.role.in_(staff_roles),
+            or_(
+                CourseNotificationPreference.id.is_(None),
+                CourseNotificationPreference.notify_new_submissions.is_(True),
+            ),
         )
     )
-    staff_user_ids = sorted({int(uid) for (uid,) in result.all()})
-    if not staff_user_ids:
-        return
+    recipients: dict[int, set[int]] = {}
+    for course_id, user_id in result.all():
+        recipients.setdefault(int(course_id), set()).add(int(user_id))
+    return {course_id: sorted(user_ids) for course_id, user_ids in recipients.items()}
 
-    # Don't notify the submitter if they happen to be staff too.
-    staff_user_ids = [uid for uid in staff_user_ids if uid != submitter_user_id]
-    if not staff_user_ids:
-        return
 
-    enabled_user_ids: list[int] = []
-    for staff_user_id in staff_user_ids:
-        pref = await get_course_notification_preference(
-            db, course_id=course_id, user_id=staff_user_id
-        )
-        if pref is not None and pref.notify_new_submissions is False:
-            continue
-        enabled_user_ids.append(staff_user_id)
-    if not enabled_user_ids:
+async def apply_submission_digests(db: AsyncSession, *, digests: list[CourseSubmissionDigest]) -> None:
+    """
+    Create/update the per-course "new submissions" digest notification for each
+    course staff member, grouped within a 10-minute window. Each course is written
+    as one batch (bulk insert of new digests, updates to open ones) and committed
+    on its own, so one failing course does not drop the others.
+    """
+    if not digests:
         return
+    recipients = await _load_digest_recipients(db, course_ids=[d.course_id for d in digests])
 
-    now = datetime.now(timezone.utc)
-    cutoff = now - timedelta(minutes=10)
-    link_url = f"/staff/submissions?course_id={course_id}"
+    planned: list[tuple[CourseSubmissionDigest, dict[int, int]]] = []
+    for digest in digests:
+        counts = {uid: digest.count_for(uid) for uid in recipients.get(digest.course_id, [])}
+        counts = {uid: n for uid, n in counts.items() if n > 0}
+        if counts:
+            planned.append((digest, counts))
+    if not planned:
+        return
 
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=10)
     existing_result = await db.execute(
         select(Notification).where(
-            Notification.user_id.in_(enabled_user_ids),
+            Notification.user_id.in_({uid for _, counts in planned for uid in counts}),
             Notification.kind == NotificationKind.submissions_received,
             Notification.read_at.is_(None),
-            Notification.link_url == link_url,
+            Notification.link_url.in_([_digest_link_url(d.course_id) for d, _ in planned]),
             Notification.created_at >= cutoff,
         )
     )
-    existing_by_user: dict[int, Notification] = {}
+    # Plain (id, title) values: a failed course rolls the session back, which expires every
+    # loaded Notification, and reading an expired attribute here would lazy-load outside
+    # the event loop's greenlet. `db.get` below is an identity-map hit unless that happened.
+    existing_by_key: dict[tuple[int, str], tuple[int, str]] = {}
     for n in existing_result.scalars().all():
-        if n.user_id not in existing_by_user or n.id > existing_by_user[n.user_id].id:
-            existing_by_user[n.user_id] = n
-
-    for staff_user_id in enabled_user_ids:
-        existing = existing_by_user.get(staff_user_id)
-        if existing is None:
-            title = f"New submissions (1) — {course_code}"
-            body = (
-                "1 new submission in the last 10 minutes.\n"
-                f"Latest: {student_email} — {assignment_title}"
-            )
-            db.add(
-                Notification(
-                    user_id=staff_user_id,
-                    kind=NotificationKind.submissions_received,
-                    title=title,
-                    body=body,
-                    link_url=link_url,
-                )
-            )
+        key = (n.user_id, n.link_url or "")
+        if key not in existing_by_key or n.id > existing_by_key[key][0]:
+            existing_by_key[key] = (n.id, n.title)
+
+    for digest, counts in planned:
+        link_url = _digest_link_url(digest.course_id)
+        latest = f"Latest: {digest.latest_student_email} — {digest.latest_assignment_title}"
+        created: list[Notification] = []
+        updated: list[Notification] = []
+        try:
+            for staff_user_id, added in counts.items():
+                existing_id, existing_title = existing_by_key.get((staff_user_id, link_url), (None, ""))
+                existing = None if existing_id is None else await db.get(Notification, existing_id)
+                new_count = added if existing is None else max(1, _parse_count_from_title(existing_title) + added)
+                title = f"New submissions ({new_count}) — {digest.course_code}"
+                if new_count == 1:
+                    body = f"1 new submission in the last 10 minutes.\n{latest}"
+                else:
+                    body = f"{new_count} new submissions in the last 10 minutes.\n{latest}"
+                if existing is None:
+                    notification = Notification(
+                        user_id=staff_user_id,
+                        kind=NotificationKind.submissions_received,
+                        title=title,
+                        body=body,
+                        link_url=link_url,
+                    )
+                    db.add(notification)
+                    created.append(notification)
+                else:
+                    existing.title = title
+                    existing.body = body
+                    updated.append(existing)
+
+            await db.flush()
+            unread_counts = await _increment_unread_counts(db, user_ids=[n.user_id for n in created])
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            logger.exception("Failed to write submission digest. course_id=%s", digest.course_id)
             continue
 
-        current_count = _parse_count_from_title(existing.title)
-        new_count = max(1, current_count + 1)
-        existing.title = f"New submissions ({new_count}) — {course_code}"
-        existing.body = (
-            f"{new_count} new submissions in the last 10 minutes.\n"
-            f"Latest: {student_email} — {assignment_title}"
+        await publish_events(
+            [
+                notification_event(
+                    user_id=n.user_id,
+                    kind="created",
+                    notification=_notification_payload(n),
+                    unread_count=unread_counts.get(n.user_id),
+                )
+                for n in created
+            ]
+            + [
+                notification_event(user_id=n.user_id, kind="updated", notification=_notification_payload(n))
+                for n in updated
+            ]
         )
 
-    await db.commit()
+
+async def notify_staff_new_submission_digest(
+    db: AsyncSession,
+    *,
+    course_id: int,
+    course_code: str,
+    assignment_title: str,
+    student_email: str,
+    submitter_user_id: int,
+) -> None:
+    """Write the staff digest for one submission immediately (no coalescing)."""
+    entry = SubmissionDigestEntry(
+        course_id=course_id,
+        course_code=course_code,
+        assignment_title=assignment_title,
+        student_email=student_email,
+        submitter_user_id=submitter_user_id,
+    )
+    await apply_submission_digests(db, digests=[CourseSubmissionDigest.from_entry(entry)])
@@ -6,16 +6,18 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.session_cache import invalidate_session
 from app.models.session import Session
+from app.models.user import User
 
 
-def _hash_token(token: str) -> str:
+def hash_session_token(token: str) -> str:
     return hashlib.sha256(token.encode("utf-8")).hexdigest()
 
 
 async def create_session(db: AsyncSession, *, user_id: int) -> tuple[str, Session]:
     token = secrets.token_urlsafe(32)
-    token_hash = _hash_token(token)
+    token_hash = hash_session_token(token)
     expires_at = datetime.now(timezone.utc) + timedelta(days=int(settings.session_ttl_days))
     session = Session(user_id=user_id, token_hash=token_hash, expires_at=expires_at)
     db.add(session)
@@ -25,11 +27,23 @@ async def create_session(db: AsyncSession, *, user_id: int) -> tuple[str, Sessio
 
 
 async def get_session_by_token(db: AsyncSession, *, token: str) -> Session | None:
-    token_hash = _hash_token(token)
+    token_hash = hash_session_token(token)
     result = await db.execute(select(Session).where(Session.token_hash == token_hash))
     return result.scalars().first()
 
 
+async def get_session_with_user(db: AsyncSession, *, token_hash: str) -> tuple[Session, User] | None:
+    result = await db.execute(
+        select(Session, User).join(User, User.id == Session.user_id).where(Session.token_hash == token_hash)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    return row[0], row[1]
+
+
 async def delete_session(db: AsyncSession, *, session: Session) -> None:
+    token_hash = session.token_hash
     await db.delete(session)
     await db.commit()
+    await invalidate_session(token_hash)
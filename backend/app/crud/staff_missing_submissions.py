@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from sqlalchemy import and_, func, select
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.assignment import Assignment
+from app.models.assignment_student_counter import AssignmentStudentCounter
 from app.models.course_membership import CourseMembership, CourseRole
+from app.models.latest_submission import LatestSubmission
 from app.models.student_profile import StudentProfile
-from app.models.submission import Submission
 from app.models.user import User
 
 
@@ -23,45 +25,115 @@ async def list_missing_submissions_summary(
     *,
     course_id: int,
 ) -> list[tuple[int, str, int, int, int]]:
-    student_membership = CourseMembership
-    total_students_subq = (
-        select(func.count(student_membership.id))
-        .where(and_(student_membership.course_id == course_id, student_membership.role == CourseRole.student))
-        .scalar_subquery()
-    )
-
-    submitted_count = func.count(func.distinct(student_membership.user_id))
-
     stmt = (
         select(
             Assignment.id,
             Assignment.title,
-            total_students_subq.label("total_students"),
-            submitted_count.label("submitted_count"),
+            func.coalesce(AssignmentStudentCounter.students_total, 0),
+            func.coalesce(AssignmentStudentCounter.students_submitted, 0),
         )
+        .outerjoin(AssignmentStudentCounter, AssignmentStudentCounter.assignment_id == Assignment.id)
         .where(Assignment.course_id == course_id)
-        .outerjoin(Submission, Submission.assignment_id == Assignment.id)
-        .outerjoin(
-            student_membership,
-            and_(
-                student_membership.course_id == course_id,
-                student_membership.role == CourseRole.student,
-                student_membership.user_id == Submission.user_id,
-            ),
-        )
-        .group_by(Assignment.id, Assignment.title)
         .order_by(Assignment.id.asc())
     )
     result = await db.execute(stmt)
     rows: list[tuple[int, str, int, int, int]] = []
     for assignment_id, title, total_students, submitted in result.all():
         total_students_int = int(total_students)
-        submitted_int = int(submitted)
+        submitted_int = min(int(submitted), total_students_int)
         missing = max(0, total_students_int - submitted_int)
         rows.append((assignment_id, title, total_students_int, submitted_int, missing))
     return rows
 
 
+def _exact_student_counts(*, course_id: int | None) -> Select:
+    """Recount (assignment_id, students_total, students_submitted) from the source tables."""
+    student_membership = CourseMembership
+    total_students = (
+        select(func.count(student_membership.id))
+        .where(
+            student_membership.course_id == Assignment.course_id,
+            student_membership.role == CourseRole.student,
+        )
+        .correlate(Assignment)
+        .scalar_subquery()
+    )
+    submitted_students = (
+        select(func.count(LatestSubmission.user_id))
+        .join(
+            student_membership,
+            and_(
+                student_membership.user_id == LatestSubmission.user_id,
+                student_membership.course_id == Assignment.course_id,
+                student_membership.role == CourseRole.student,
+            ),
+        )
+        .where(LatestSubmission.assignment_id == Assignment.id)
+        .correlate(Assignment)
+        .scalar_subquery()
+    )
+    stmt = select(
+        Assignment.id.label("assignment_id"),
+        total_students.label("students_total"),
+        submitted_students.label("students_submitted"),
+    )
+    if course_id is not None:
+        stmt = stmt.where(Assignment.course_id == course_id)
+    return stmt
+
+
+async def _repair_course_counters(db: AsyncSession, *, course_id: int) -> int:
+    # Lock the course's counter rows first and recount in a separate statement: under
+    # READ COMMITTED the recount's snapshot is taken after the locks are granted, so it
+    # sees every enrollment or submission whose trigger committed before, and later
+    # triggers wait for this commit and apply their delta on top of the repaired value.
+    await db.execute(
+        select(AssignmentStudentCounter.assignment_id)
+        .join(Assignment, Assignment.id == AssignmentStudentCounter.assignment_id)
+        .where(Assignment.course_id == course_id)
+        .order_by(AssignmentStudentCounter.assignment_id.asc())
+        .with_for_update(of=AssignmentStudentCounter)
+    )
+    exact = _exact_student_counts(course_id=course_id).subquery()
+    stmt = insert(AssignmentStudentCounter).from_select(
+        ["assignment_id", "students_total", "students_submitted"],
+        select(exact),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AssignmentStudentCounter.assignment_id],
+        set_={
+            "students_total": stmt.excluded.students_total,
+            "students_submitted": stmt.excluded.students_submitted,
+        },
+        where=or_(
+            AssignmentStudentCounter.students_total != stmt.excluded.students_total,
+            AssignmentStudentCounter.students_submitted != stmt.excluded.students_submitted,
+        ),
+    ).returning(AssignmentStudentCounter.assignment_id)
+    repaired = len((await db.execute(stmt)).all())
+    await db.commit()
+    return repaired
+
+
+async def repair_assignment_student_counters(db: AsyncSession, *, course_id: int | None = None) -> int:
+    """Recompute missing or drifted counters; returns how many rows were changed.
+
+    The triggers can disagree with the source tables when an enrollment and a student's
+    first submission commit concurrently (neither sees the other's row), so this runs
+    periodically from the deadline poller. Each course is repaired in its own transaction.
+    """
+    if course_id is not None:
+        course_ids = [course_id]
+    else:
+        result = await db.execute(select(Assignment.course_id).distinct().order_by(Assignment.course_id.asc()))
+        course_ids = [int(row[0]) for row in result.all()]
+        await db.commit()
+    repaired = 0
+    for cid in course_ids:
+        repaired += await _repair_course_counters(db, course_id=cid)
+    return repaired
+
+
 async def list_missing_students_for_assignment(
     db: AsyncSession,
     *,
@@ -81,10 +153,10 @@ async def list_missing_students_for_assignment(
         )
         .outerjoin(StudentProfile, StudentProfile.user_id == User.id)
         .outerjoin(
-            Submission,
-            and_(Submission.assignment_id == assignment_id, Submission.user_id == User.id),
+            LatestSubmission,
+            and_(LatestSubmission.assignment_id == assignment_id, LatestSubmission.user_id == User.id),
         )
-        .where(Submission.id.is_(None))
+        .where(LatestSubmission.submission_id.is_(None))
         .order_by(StudentProfile.full_name.asc().nullslast(), User.email.asc())
     )
     result = await db.execute(stmt)
@@ -1,16 +1,19 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import datetime
 
-from sqlalchemy import Select, and_, case, func, or_, select
+from sqlalchemy import Select, and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased
 
+from app.crud.pagination import decode_cursor, keyset_after
 from app.models.assignment import Assignment
+from app.models.assignment_submission_counter import AssignmentSubmissionCounter
 from app.models.course import Course
 from app.models.course_membership import CourseMembership, CourseRole
 from app.models.student_profile import StudentProfile
-from app.models.submission import Submission, SubmissionStatus
+from app.models.submission import SUBMISSION_TRIAGE_PRIORITY, Submission, SubmissionStatus
 from app.models.user import User
 
 
@@ -64,7 +67,9 @@ async def list_staff_submission_rows(
     status: SubmissionStatus | None = None,
     offset: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ) -> list[StaffSubmissionRow]:
+    """Newest first. `cursor` (from `encode_cursor(last_row.submission.id)`) replaces `offset`."""
     offset = max(0, offset)
     limit = min(max(1, limit), 200)
     stmt = _base_staff_submission_query(staff_user_id=staff_user_id).order_by(Submission.id.desc())
@@ -72,6 +77,10 @@ async def list_staff_submission_rows(
         stmt = stmt.where(Course.id == course_id)
     if status is not None:
         stmt = stmt.where(Submission.status == status)
+    if cursor is not None:
+        (after_id,) = decode_cursor(cursor, (int,))
+        stmt = stmt.where(keyset_after([Submission.id], [after_id], descending=True))
+        offset = 0
     result = await db.execute(stmt.offset(offset).limit(limit))
     rows: list[StaffSubmissionRow] = []
     for submission, assignment, course, student, profile, student_number in result.all():
@@ -105,6 +114,35 @@ async def count_staff_submission_rows(
     return int(result.scalar_one())
 
 
+async def count_staff_submission_rows_from_counters(
+    db: AsyncSession,
+    *,
+    staff_user_id: int,
+    course_id: int | None = None,
+    status: SubmissionStatus | None = None,
+) -> int:
+    """Same total as `count_staff_submission_rows`, summed from the trigger-maintained
+    per-assignment counters instead of counting (and joining) submissions."""
+    stmt = (
+        select(func.coalesce(func.sum(AssignmentSubmissionCounter.submission_count), 0))
+        .join(Assignment, Assignment.id == AssignmentSubmissionCounter.assignment_id)
+        .join(
+            CourseMembership,
+            and_(
+                CourseMembership.course_id == Assignment.course_id,
+                CourseMembership.user_id == staff_user_id,
+                CourseMembership.role.in_([CourseRole.owner, CourseRole.co_lecturer, CourseRole.ta]),
+            ),
+        )
+    )
+    if course_id is not None:
+        stmt = stmt.where(Assignment.course_id == course_id)
+    if status is not None:
+        stmt = stmt.where(AssignmentSubmissionCounter.status == status)
+    result = await db.execute(stmt)
+    return int(result.scalar_one())
+
+
 async def list_staff_submission_rows_by_ids(
     db: AsyncSession,
     *,
@@ -132,6 +170,58 @@ async def list_staff_submission_rows_by_ids(
     return rows
 
 
+def _changes_horizon(*, settle_seconds: float):
+    return func.clock_timestamp() - func.make_interval(0, 0, 0, 0, 0, 0, settle_seconds)
+
+
+async def get_submission_changes_horizon(db: AsyncSession, *, settle_seconds: float) -> datetime:
+    """Timestamp a new changes-since cursor starts from: later writes are reported."""
+    return (await db.execute(select(_changes_horizon(settle_seconds=settle_seconds)))).scalar_one()
+
+
+async def list_staff_submission_changes(
+    db: AsyncSession,
+    *,
+    staff_user_id: int,
+    after: tuple[datetime, int],
+    course_id: int | None = None,
+    limit: int = 100,
+    settle_seconds: float = 0.0,
+) -> list[StaffSubmissionRow]:
+    """Submissions written after the `(updated_at, id)` keyset position `after`, oldest first.
+
+    Writes newer than `settle_seconds` are held back until the next poll: `updated_at` is
+    stamped inside the writing transaction, so a very recent stamp may belong to a row that
+    is not visible yet, and a cursor past it would skip that row for good.
+    """
+    limit = min(max(1, limit), 500)
+    stmt = _base_staff_submission_query(staff_user_id=staff_user_id)
+    if course_id is not None:
+        # Spelled on the stored column so the scan uses ix_submissions_course_updated.
+        stmt = stmt.where(Submission.course_id == course_id)
+    sort_key = (Submission.updated_at, Submission.id)
+    stmt = (
+        stmt.where(
+            keyset_after(sort_key, after, descending=False),
+            Submission.updated_at < _changes_horizon(settle_seconds=settle_seconds),
+        )
+        .order_by(*sort_key)
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return [
+        StaffSubmissionRow(
+            submission=submission,
+            assignment=assignment,
+            course=course,
+            student=student,
+            student_profile=profile,
+            student_number=student_number,
+        )
+        for submission, assignment, course, student, profile, student_number in result.all()
+    ]
+
+
 async def get_next_ungraded_staff_submission_row(
     db: AsyncSession,
     *,
@@ -140,52 +230,26 @@ async def get_next_ungraded_staff_submission_row(
     status: SubmissionStatus | None = None,
     after_submission_id: int | None = None,
 ) -> StaffSubmissionRow | None:
+    # Filters and ordering use the stored (course_id, triage_priority, created_at, id)
+    # columns so that, within a course, "next after X" is one range seek on
+    # ix_submissions_course_triage.
     stmt = _base_staff_submission_query(staff_user_id=staff_user_id)
     if course_id is not None:
-        stmt = stmt.where(Course.id == course_id)
+        stmt = stmt.where(Submission.course_id == course_id)
     if status is not None:
-        stmt = stmt.where(Submission.status == status)
+        stmt = stmt.where(Submission.triage_priority == SUBMISSION_TRIAGE_PRIORITY[status])
     else:
-        stmt = stmt.where(Submission.status != SubmissionStatus.graded)
-
-    priority = case(
-        (Submission.status == SubmissionStatus.pending, 0),
-        (Submission.status == SubmissionStatus.grading, 1),
-        (Submission.status == SubmissionStatus.error, 2),
-        else_=3,
-    )
+        stmt = stmt.where(Submission.triage_priority < SUBMISSION_TRIAGE_PRIORITY[SubmissionStatus.graded])
 
+    sort_key = (Submission.triage_priority, Submission.created_at, Submission.id)
     if after_submission_id is not None:
-        # Get the sort key values of the 'after' submission
-        after_stmt = select(Submission.status, Submission.created_at, Submission.id).where(
-            Submission.id == after_submission_id
-        )
-        after_res = await db.execute(after_stmt)
-        after_row = after_res.first()
-
-        if after_row:
-            after_status, after_created, after_id = after_row
-            after_priority = 3
-            if after_status == SubmissionStatus.pending:
-                after_priority = 0
-            elif after_status == SubmissionStatus.grading:
-                after_priority = 1
-            elif after_status == SubmissionStatus.error:
-                after_priority = 2
-
-            stmt = stmt.where(
-                or_(
-                    priority > after_priority,
-                    and_(priority == after_priority, Submission.created_at > after_created),
-                    and_(
-                        priority == after_priority,
-                        Submission.created_at == after_created,
-                        Submission.id > after_id,
-                    ),
-                )
-            )
+        after_row = (
+            await db.execute(select(*sort_key).where(Submission.id == after_submission_id))
+        ).first()
+        if after_row is not None:
+            stmt = stmt.where(keyset_after(sort_key, tuple(after_row), descending=False))
 
-    stmt = stmt.order_by(priority, Submission.created_at.asc(), Submission.id.asc())
+    stmt = stmt.order_by(*sort_key)
     result = await db.execute(stmt.limit(1))
     row = result.first()
     if row is None:
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import Select, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.course_membership import CourseMembership
+from app.models.latest_submission import LatestSubmission
+from app.models.submission import Submission
+from app.models.submission_archive_job import (
+    SubmissionArchiveJob,
+    SubmissionArchiveJobStatus,
+    SubmissionArchiveScope,
+)
+
+
+@dataclass(frozen=True)
+class SubmissionArchiveRow:
+    submission_id: int
+    user_id: int
+    student_number: str | None
+    file_name: str
+    storage_path: str
+    created_at: datetime
+
+
+def _archive_submission_ids(*, assignment_id: int, scope: SubmissionArchiveScope):
+    if scope == SubmissionArchiveScope.latest:
+        return select(LatestSubmission.submission_id).where(LatestSubmission.assignment_id == assignment_id)
+    return select(Submission.id).where(Submission.assignment_id == assignment_id)
+
+
+def _archive_rows_query(*, course_id: int, assignment_id: int, scope: SubmissionArchiveScope) -> Select:
+    return (
+        select(
+            Submission.id,
+            Submission.user_id,
+            CourseMembership.student_number,
+            Submission.file_name,
+            Submission.storage_path,
+            Submission.created_at,
+        )
+        .outerjoin(
+            CourseMembership,
+            (CourseMembership.course_id == course_id) & (CourseMembership.user_id == Submission.user_id),
+        )
+        .where(Submission.id.in_(_archive_submission_ids(assignment_id=assignment_id, scope=scope)))
+        .order_by(
+            CourseMembership.student_number.asc().nulls_last(),
+            Submission.user_id.asc(),
+            Submission.id.asc(),
+        )
+    )
+
+
+async def stream_submission_archive_rows(
+    db: AsyncSession,
+    *,
+    course_id: int,
+    assignment_id: int,
+    scope: SubmissionArchiveScope,
+    batch_size: int = 500,
+) -> AsyncIterator[SubmissionArchiveRow]:
+    """Yield archive rows through a server-side cursor so memory stays flat for large cohorts."""
+    stmt = _archive_rows_query(course_id=course_id, assignment_id=assignment_id, scope=scope)
+    result = await db.stream(stmt.execution_options(yield_per=max(1, batch_size)))
+    try:
+        async for row in result:
+            yield SubmissionArchiveRow(
+                submission_id=row[0],
+                user_id=row[1],
+                student_number=row[2],
+                file_name=row[3],
+                storage_path=row[4],
+                created_at=row[5],
+            )
+    finally:
+        await result.close()
+
+
+async def count_submission_archive_rows(
+    db: AsyncSession,
+    *,
+    assignment_id: int,
+    scope: SubmissionArchiveScope,
+) -> int:
+    subq = _archive_submission_ids(assignment_id=assignment_id, scope=scope).subquery()
+    result = await db.execute(select(func.count()).select_from(subq))
+    return int(result.scalar_one())
+
+
+async def create_submission_archive_job(
+    db: AsyncSession,
+    *,
+    course_id: int,
+    assignment_id: int,
+    requested_by_user_id: int | None,
+    scope: SubmissionArchiveScope,
+) -> SubmissionArchiveJob:
+    job = SubmissionArchiveJob(
+        course_id=course_id,
+        assignment_id=assignment_id,
+        requested_by_user_id=requested_by_user_id,
+        scope=scope,
+        status=SubmissionArchiveJobStatus.queued,
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def get_submission_archive_job(
+    db: AsyncSession,
+    *,
+    course_id: int,
+    assignment_id: int,
+    job_id: int,
+) -> SubmissionArchiveJob | None:
+    result = await db.execute(
+        select(SubmissionArchiveJob).where(
+            SubmissionArchiveJob.id == job_id,
+            SubmissionArchiveJob.course_id == course_id,
+            SubmissionArchiveJob.assignment_id == assignment_id,
+        )
+        # Progress is written by the worker's own sessions; never serve a stale identity-map copy.
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+async def claim_submission_archive_job(db: AsyncSession, *, job_id: int) -> SubmissionArchiveJob | None:
+    """Transition queued -> running; returns None if another worker already claimed the job."""
+    result = await db.execute(
+        update(SubmissionArchiveJob)
+        .where(
+            SubmissionArchiveJob.id == job_id,
+            SubmissionArchiveJob.status == SubmissionArchiveJobStatus.queued,
+        )
+        .values(status=SubmissionArchiveJobStatus.running)
+        .returning(SubmissionArchiveJob.id)
+    )
+    if result.scalar_one_or_none() is None:
+        await db.rollback()
+        return None
+    await db.commit()
+    result = await db.execute(select(SubmissionArchiveJob).where(SubmissionArchiveJob.id == job_id))
+    return result.scalars().first()
+
+
+async def update_submission_archive_progress(
+    db: AsyncSession,
+    *,
+    job_id: int,
+    processed_entries: int,
+    total_entries: int | None = None,
+) -> None:
+    values: dict[str, int] = {"processed_entries": max(0, int(processed_entries))}
+    if total_entries is not None:
+        values["total_entries"] = max(0, int(total_entries))
+    await db.execute(update(SubmissionArchiveJob).where(SubmissionArchiveJob.id == job_id).values(**values))
+    await db.commit()
+
+
+async def finish_submission_archive_job(
+    db: AsyncSession,
+    *,
+    job_id: int,
+    status: SubmissionArchiveJobStatus,
+    processed_entries: int,
+    storage_path: str | None = None,
+    size_bytes: int = 0,
+    error: str | None = None,
+    expires_at: datetime | None = None,
+) -> None:
+    await db.execute(
+        update(SubmissionArchiveJob)
+        .where(SubmissionArchiveJob.id == job_id)
+        .values(
+            status=status,
+            processed_entries=max(0, int(processed_entries)),
+            storage_path=storage_path,
+            size_bytes=max(0, int(size_bytes)),
+            error=(error or None) and error[:2000],
+            completed_at=datetime.now(timezone.utc),
+            expires_at=expires_at,
+        )
+    )
+    await db.commit()
+
+
+async def lock_expired_submission_archives(
+    db: AsyncSession,
+    *,
+    now: datetime,
+    limit: int = 100,
+) -> list[tuple[int, str]]:
+    """Lock up to `limit` expired jobs that still have a file; returns (job_id, storage_path).
+
+    Rows stay locked until the caller commits, so concurrent pollers skip them.
+    """
+    result = await db.execute(
+        select(SubmissionArchiveJob.id, SubmissionArchiveJob.storage_path)
+        .where(
+            SubmissionArchiveJob.expires_at <= now,
+            SubmissionArchiveJob.storage_path.is_not(None),
+        )
+        .order_by(SubmissionArchiveJob.expires_at.asc(), SubmissionArchiveJob.id.asc())
+        .limit(max(1, int(limit)))
+        .with_for_update(skip_locked=True)
+    )
+    return [(int(row[0]), str(row[1])) for row in result.all()]
+
+
+async def clear_submission_archive_files(db: AsyncSession, *, job_ids: list[int]) -> None:
+    if job_ids:
+        await db.execute(
+            update(SubmissionArchiveJob).where(SubmissionArchiveJob.id.in_(job_ids)).values(storage_path=None)
+        )
+    await db.commit()
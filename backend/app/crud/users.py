@@ -2,7 +2,8 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import hash_password
+from app.core.security import hash_password_async
+from app.crud.pagination import decode_cursor, keyset_after
 from app.models.user import User
 
 
@@ -16,7 +17,7 @@ async def get_user_by_email(db: AsyncSession, *, email: str) -> User | None:
 
 
 async def create_user(db: AsyncSession, *, email: str, password: str) -> User:
-    user = User(email=email.lower(), password_hash=hash_password(password))
+    user = User(email=email.lower(), password_hash=await hash_password_async(password))
     db.add(user)
     try:
         await db.commit()
@@ -39,10 +40,17 @@ async def create_pending_user(db: AsyncSession, *, email: str) -> User:
     return user
 
 
-async def list_users(db: AsyncSession, *, offset: int = 0, limit: int = 100) -> list[User]:
+async def list_users(
+    db: AsyncSession, *, offset: int = 0, limit: int = 100, cursor: str | None = None
+) -> list[User]:
     offset = max(0, offset)
     limit = min(max(1, limit), 500)
-    result = await db.execute(select(User).order_by(User.id).offset(offset).limit(limit))
+    stmt = select(User).order_by(User.id)
+    if cursor is not None:
+        (after_id,) = decode_cursor(cursor, (int,))
+        stmt = stmt.where(keyset_after([User.id], [after_id], descending=False))
+        offset = 0
+    result = await db.execute(stmt.offset(offset).limit(limit))
     return list(result.scalars().all())
 
 
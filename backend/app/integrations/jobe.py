@@ -8,10 +8,29 @@ from typing import Any, Awaitable, Callable, Iterable, TypeVar
 import httpx
 
 from app.core.config import settings
+from app.observability.metrics import histogram
+from app.observability.tracing import SPAN_KIND_CLIENT, start_span
 
 JOBE_OUTCOME_OK = 15
 T = TypeVar("T")
 
+_request_seconds = histogram(
+    "marconi_jobe_request_seconds",
+    "JOBE HTTP call latency by backend and outcome (ok, error).",
+    ("backend", "outcome"),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0),
+)
+# (backend, outcome) -> histogram child, bound on first use.
+_request_children: dict[tuple[str, str], Any] = {}
+
+
+def _observe_request(base_url: str, outcome: str, seconds: float) -> None:
+    key = (base_url, outcome)
+    child = _request_children.get(key)
+    if child is None:
+        child = _request_children[key] = _request_seconds.labels(base_url, outcome)
+    child.observe(seconds)
+
 
 def _normalize_base_url(base_url: str) -> str:
     return base_url.strip().rstrip("/")
@@ -200,7 +219,7 @@ class JobeClient:
                 state.opened_at_monotonic = now
                 state.half_open_probe_active = False
 
-    async def _execute_with_circuit(self, op: Callable[[str], Awaitable[T]]) -> T:
+    async def _execute_with_circuit(self, op: Callable[[str], Awaitable[T]], *, operation: str) -> T:
         last_error: Exception | None = None
         for base_url in self._candidate_base_urls():
             try:
@@ -209,16 +228,24 @@ class JobeClient:
                 last_error = exc
                 continue
 
+            started = time.perf_counter()
             try:
-                result = await op(base_url)
+                with start_span(
+                    f"JOBE {operation}",
+                    kind=SPAN_KIND_CLIENT,
+                    attributes={"jobe.backend": base_url},
+                ):
+                    result = await op(base_url)
             except JobeCircuitOpenError as exc:
                 last_error = exc
                 continue
             except Exception as exc:
+                _observe_request(base_url, "error", time.perf_counter() - started)
                 self._record_circuit_failure(base_url=base_url)
                 last_error = exc
                 continue
 
+            _observe_request(base_url, "ok", time.perf_counter() - started)
             self._record_circuit_success(base_url=base_url)
             return result
 
@@ -254,7 +281,7 @@ class JobeClient:
                     languages.append(JobeLanguage(id=item[0], version=item[1]))
             return languages
 
-        return await self._execute_with_circuit(_op)
+        return await self._execute_with_circuit(_op, operation="GET /languages")
 
     async def run(
         self,
@@ -327,7 +354,7 @@ class JobeClient:
                 stderr=stderr,
             )
 
-        return await self._execute_with_circuit(_op)
+        return await self._execute_with_circuit(_op, operation="POST /runs")
 
     async def check_file(self, *, file_id: str) -> bool:
         async def _op(base_url: str) -> bool:
@@ -345,7 +372,7 @@ class JobeClient:
                 return False
             raise JobeUpstreamError("JOBE returned an error response")  # pragma: no cover
 
-        return await self._execute_with_circuit(_op)
+        return await self._execute_with_circuit(_op, operation="HEAD /files/{file_id}")
 
     async def put_file(self, *, file_id: str, content: bytes) -> None:
         async def _op(base_url: str) -> None:
@@ -363,7 +390,7 @@ class JobeClient:
                 return
             raise JobeUpstreamError("JOBE returned an error response")  # pragma: no cover
 
-        await self._execute_with_circuit(_op)
+        await self._execute_with_circuit(_op, operation="PUT /files/{file_id}")
 
     async def ensure_file(self, *, file_id: str, content: bytes) -> None:
         if await self.check_file(file_id=file_id):
@@ -1,11 +1,28 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.api.router import api_router
 from app.core.config import settings
+from app.crud.audit import drain_audit_tasks
+from app.crud.pagination import InvalidCursorError
+from app.observability.http_metrics import HttpMetricsMiddleware
+from app.observability.tracing import TracingMiddleware, configure_tracing, flush_spans
+from app.worker.submission_digests import drain_submission_digests
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    yield
+    # Write out coalesced staff digests and queued audit events before the process exits.
+    await drain_submission_digests()
+    await drain_audit_tasks(timeout_seconds=10.0)
+    flush_spans()
 
-app = FastAPI(title="Marconi Elearn API")
+
+app = FastAPI(title="Marconi Elearn API", lifespan=lifespan)
 
 
 @app.get("/")
@@ -20,6 +37,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+configure_tracing(service_name="marconi-api")
+app.add_middleware(TracingMiddleware)
+# Outermost, so latency includes CORS handling and preflights are counted.
+app.add_middleware(HttpMetricsMiddleware)
+
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(_request: Request, exc: InvalidCursorError) -> JSONResponse:
+    return JSONResponse(status_code=400, content={"detail": str(exc) or "Invalid cursor"})
 
 app.include_router(api_router, prefix="/api/v1")
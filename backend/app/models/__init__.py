@@ -1,6 +1,7 @@
 from app.models.course import Course
 from app.models.course_membership import CourseMembership
 from app.models.course_github_claim import CourseGitHubClaim
+from app.models.course_gradebook_version import CourseGradebookVersion
 from app.models.invite_token import InviteToken
 from app.models.organization import Organization
 from app.models.organization_membership import OrganizationMembership
@@ -8,15 +9,21 @@ from app.models.assignment import Assignment
 from app.models.assignment_autograde_test_case_snapshot import AssignmentAutogradeTestCaseSnapshot
 from app.models.assignment_autograde_version import AssignmentAutogradeVersion
 from app.models.assignment_extension import AssignmentExtension
+from app.models.assignment_student_counter import AssignmentStudentCounter
+from app.models.assignment_submission_counter import AssignmentSubmissionCounter
 from app.models.audit_event import AuditEvent
 from app.models.module import Module
 from app.models.module_resource import ModuleResource
 from app.models.course_notification_preference import CourseNotificationPreference
 from app.models.github_oauth_state import GitHubOAuthState
 from app.models.grading_event import GradingEvent
+from app.models.grading_event_rollup import GradingEventRollup
+from app.models.latest_submission import LatestSubmission
 from app.models.notification import Notification
+from app.models.notification_unread_counter import NotificationUnreadCounter
 from app.models.org_github_admin_token import OrgGitHubAdminToken
 from app.models.submission import Submission
+from app.models.submission_archive_job import SubmissionArchiveJob
 from app.models.submission_test_result import SubmissionTestResult
 from app.models.student_profile import StudentProfile
 from app.models.session import Session
@@ -28,23 +35,30 @@ __all__ = [
     "AssignmentAutogradeTestCaseSnapshot",
     "AssignmentAutogradeVersion",
     "AssignmentExtension",
+    "AssignmentStudentCounter",
+    "AssignmentSubmissionCounter",
     "AuditEvent",
     "Course",
     "CourseGitHubClaim",
+    "CourseGradebookVersion",
     "CourseMembership",
     "CourseNotificationPreference",
     "GitHubOAuthState",
     "GradingEvent",
+    "GradingEventRollup",
     "InviteToken",
+    "LatestSubmission",
     "Module",
     "ModuleResource",
     "Notification",
+    "NotificationUnreadCounter",
     "OrgGitHubAdminToken",
     "Organization",
     "OrganizationMembership",
     "Session",
     "StudentProfile",
     "Submission",
+    "SubmissionArchiveJob",
     "SubmissionTestResult",
     "TestCase",
     "User",
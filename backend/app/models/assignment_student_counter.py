@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from sqlalchemy import DDL, ForeignKey, Integer, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.models.assignment import Assignment
+from app.models.course_membership import CourseMembership
+from app.models.latest_submission import LatestSubmission
+
+
+class AssignmentStudentCounter(Base):
+    """Enrolled students per assignment, and how many of them have submitted.
+
+    Maintained by triggers: new assignments start from the course's current roster,
+    student enrollments (insert, delete, role or course changes) adjust every assignment
+    in the course, and a student's first submission (a new `latest_submissions` row)
+    bumps `students_submitted`. `repair_assignment_student_counters` recomputes them.
+    """
+
+    __tablename__ = "assignment_student_counters"
+
+    assignment_id: Mapped[int] = mapped_column(
+        ForeignKey("assignments.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    students_total: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    students_submitted: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+
+
+ASSIGNMENT_COUNTERS_INIT_FUNCTION = """
+CREATE OR REPLACE FUNCTION assignment_student_counters_init() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO assignment_student_counters (assignment_id, students_total, students_submitted)
+    SELECT NEW.id, count(*), 0
+    FROM course_memberships
+    WHERE course_id = NEW.course_id AND role = 'student'
+    ON CONFLICT (assignment_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+ASSIGNMENT_COUNTERS_INIT_TRIGGER = """
+CREATE TRIGGER assignments_student_counters
+AFTER INSERT ON assignments
+FOR EACH ROW EXECUTE FUNCTION assignment_student_counters_init()
+"""
+
+ENROLLMENT_COUNTERS_FUNCTION = """
+CREATE OR REPLACE FUNCTION assignment_student_counters_enrollment() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+        AND OLD.role = NEW.role
+        AND OLD.course_id = NEW.course_id
+        AND OLD.user_id = NEW.user_id THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.role = 'student' THEN
+        UPDATE assignment_student_counters AS c
+        SET students_total = GREATEST(c.students_total - 1, 0),
+            students_submitted = GREATEST(
+                c.students_submitted - (
+                    EXISTS (
+                        SELECT 1 FROM latest_submissions AS l
+                        WHERE l.assignment_id = c.assignment_id AND l.user_id = OLD.user_id
+                    )
+                )::int,
+                0
+            )
+        FROM assignments AS a
+        WHERE a.id = c.assignment_id AND a.course_id = OLD.course_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.role = 'student' THEN
+        UPDATE assignment_student_counters AS c
+        SET students_total = c.students_total + 1,
+            students_submitted = c.students_submitted + (
+                EXISTS (
+                    SELECT 1 FROM latest_submissions AS l
+                    WHERE l.assignment_id = c.assignment_id AND l.user_id = NEW.user_id
+                )
+            )::int
+        FROM assignments AS a
+        WHERE a.id = c.assignment_id AND a.course_id = NEW.course_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+ENROLLMENT_COUNTERS_TRIGGER = """
+CREATE TRIGGER course_memberships_student_counters
+AFTER INSERT OR DELETE OR UPDATE OF role, course_id, user_id ON course_memberships
+FOR EACH ROW EXECUTE FUNCTION assignment_student_counters_enrollment()
+"""
+
+SUBMITTED_COUNTERS_FUNCTION = """
+CREATE OR REPLACE FUNCTION assignment_student_counters_submitted() RETURNS trigger AS $$
+DECLARE
+    changed_assignment_id integer;
+    changed_user_id integer;
+    delta integer;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        changed_assignment_id := NEW.assignment_id;
+        changed_user_id := NEW.user_id;
+        delta := 1;
+    ELSE
+        changed_assignment_id := OLD.assignment_id;
+        changed_user_id := OLD.user_id;
+        delta := -1;
+    END IF;
+    UPDATE assignment_student_counters AS c
+    SET students_submitted = GREATEST(c.students_submitted + delta, 0)
+    FROM assignments AS a
+    WHERE c.assignment_id = changed_assignment_id
+        AND a.id = changed_assignment_id
+        AND EXISTS (
+            SELECT 1 FROM course_memberships AS m
+            WHERE m.course_id = a.course_id AND m.user_id = changed_user_id AND m.role = 'student'
+        );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+SUBMITTED_COUNTERS_TRIGGER = """
+CREATE TRIGGER latest_submissions_student_counters
+AFTER INSERT OR DELETE ON latest_submissions
+FOR EACH ROW EXECUTE FUNCTION assignment_student_counters_submitted()
+"""
+
+# Schemas built with metadata.create_all (tests, fresh dev databases) get the triggers too;
+# the migration installs the same SQL.
+event.listen(Assignment.__table__, "after_create", DDL(ASSIGNMENT_COUNTERS_INIT_FUNCTION))
+event.listen(Assignment.__table__, "after_create", DDL(ASSIGNMENT_COUNTERS_INIT_TRIGGER))
+event.listen(CourseMembership.__table__, "after_create", DDL(ENROLLMENT_COUNTERS_FUNCTION))
+event.listen(CourseMembership.__table__, "after_create", DDL(ENROLLMENT_COUNTERS_TRIGGER))
+event.listen(LatestSubmission.__table__, "after_create", DDL(SUBMITTED_COUNTERS_FUNCTION))
+event.listen(LatestSubmission.__table__, "after_create", DDL(SUBMITTED_COUNTERS_TRIGGER))
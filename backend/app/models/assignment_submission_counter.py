@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from sqlalchemy import DDL, Enum, ForeignKey, Integer, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.models.submission import Submission, SubmissionStatus
+
+
+class AssignmentSubmissionCounter(Base):
+    """Number of submissions per (assignment, status).
+
+    Maintained by a trigger on `submissions` (insert, delete, and status/assignment changes),
+    so every write path, including bulk SQL updates, keeps it in step. Course totals are a
+    sum over the course's assignments, which is cheap next to counting submissions. Keyed
+    by assignment so cascading deletes drop the counters together with the submissions.
+    """
+
+    __tablename__ = "assignment_submission_counters"
+
+    assignment_id: Mapped[int] = mapped_column(
+        ForeignKey("assignments.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    status: Mapped[SubmissionStatus] = mapped_column(
+        Enum(SubmissionStatus, name="submission_status"),
+        primary_key=True,
+    )
+    submission_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+
+
+SUBMISSION_COUNTERS_FUNCTION = """
+CREATE OR REPLACE FUNCTION assignment_submission_counters_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+        AND OLD.status IS NOT DISTINCT FROM NEW.status
+        AND OLD.assignment_id = NEW.assignment_id THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE assignment_submission_counters
+        SET submission_count = GREATEST(submission_count - 1, 0)
+        WHERE assignment_id = OLD.assignment_id AND status = OLD.status;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO assignment_submission_counters (assignment_id, status, submission_count)
+        VALUES (NEW.assignment_id, NEW.status, 1)
+        ON CONFLICT (assignment_id, status)
+        DO UPDATE SET submission_count = assignment_submission_counters.submission_count + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+SUBMISSION_COUNTERS_TRIGGER = """
+CREATE TRIGGER submissions_status_counters
+AFTER INSERT OR DELETE OR UPDATE OF status, assignment_id ON submissions
+FOR EACH ROW EXECUTE FUNCTION assignment_submission_counters_apply()
+"""
+
+# Schemas built with metadata.create_all (tests, fresh dev databases) get the trigger too;
+# the migration installs the same SQL.
+event.listen(Submission.__table__, "after_create", DDL(SUBMISSION_COUNTERS_FUNCTION))
+event.listen(Submission.__table__, "after_create", DDL(SUBMISSION_COUNTERS_TRIGGER))
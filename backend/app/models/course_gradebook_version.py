@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from sqlalchemy import DDL, BigInteger, ForeignKey, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.models.assignment import Assignment
+from app.models.course import Course
+from app.models.course_membership import CourseMembership
+
+
+class CourseGradebookVersion(Base):
+    """Change stamp for a course's gradebook roster and columns.
+
+    Bumped by triggers whenever the student roster or an assignment column changes,
+    whichever process made the write. Cells are not counted here: every upload and grading
+    write would then lock this one row per course until commit. The matrix cache pairs
+    this stamp with the course's latest `submissions.updated_at` instead.
+    """
+
+    __tablename__ = "course_gradebook_versions"
+
+    course_id: Mapped[int] = mapped_column(
+        ForeignKey("courses.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+
+
+GRADEBOOK_VERSION_INIT_FUNCTION = """
+CREATE OR REPLACE FUNCTION course_gradebook_versions_init() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO course_gradebook_versions (course_id, version)
+    VALUES (NEW.id, 0)
+    ON CONFLICT (course_id) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+GRADEBOOK_VERSION_INIT_TRIGGER = """
+CREATE TRIGGER courses_gradebook_version
+AFTER INSERT ON courses
+FOR EACH ROW EXECUTE FUNCTION course_gradebook_versions_init()
+"""
+
+# Assignment and roster rows carry course_id; both OLD and NEW courses are bumped so
+# moves between courses invalidate both matrices.
+GRADEBOOK_VERSION_COURSE_ROW_FUNCTION = """
+CREATE OR REPLACE FUNCTION course_gradebook_versions_bump_course_row() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE course_gradebook_versions SET version = version + 1 WHERE course_id = OLD.course_id;
+    END IF;
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.course_id IS DISTINCT FROM OLD.course_id) THEN
+        UPDATE course_gradebook_versions SET version = version + 1 WHERE course_id = NEW.course_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+GRADEBOOK_VERSION_ASSIGNMENTS_TRIGGER = """
+CREATE TRIGGER assignments_gradebook_version
+AFTER INSERT OR DELETE OR UPDATE OF course_id, title, max_points, due_date ON assignments
+FOR EACH ROW EXECUTE FUNCTION course_gradebook_versions_bump_course_row()
+"""
+
+GRADEBOOK_VERSION_MEMBERSHIPS_TRIGGER = """
+CREATE TRIGGER course_memberships_gradebook_version
+AFTER INSERT OR DELETE OR UPDATE OF course_id, user_id, role, student_number ON course_memberships
+FOR EACH ROW EXECUTE FUNCTION course_gradebook_versions_bump_course_row()
+"""
+
+# Schemas built with metadata.create_all (tests, fresh dev databases) get the triggers too;
+# the migration installs the same SQL.
+event.listen(Course.__table__, "after_create", DDL(GRADEBOOK_VERSION_INIT_FUNCTION))
+event.listen(Course.__table__, "after_create", DDL(GRADEBOOK_VERSION_INIT_TRIGGER))
+event.listen(Assignment.__table__, "after_create", DDL(GRADEBOOK_VERSION_COURSE_ROW_FUNCTION))
+event.listen(Assignment.__table__, "after_create", DDL(GRADEBOOK_VERSION_ASSIGNMENTS_TRIGGER))
+event.listen(CourseMembership.__table__, "after_create", DDL(GRADEBOOK_VERSION_COURSE_ROW_FUNCTION))
+event.listen(CourseMembership.__table__, "after_create", DDL(GRADEBOOK_VERSION_MEMBERSHIPS_TRIGGER))
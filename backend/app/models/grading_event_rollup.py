@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class GradingEventRollup(Base):
+    """Hourly aggregate of `grading_events` per phase, event type, reason and context.
+
+    Written once per closed hour by the rollup job in the deadline poller; raw events are
+    pruned after `grading_events_retention_days`, so history and dashboards read from here.
+    Durations are in milliseconds and only count events that recorded one.
+    """
+
+    __tablename__ = "grading_event_rollups"
+    __table_args__ = (
+        # NULL reason/context are one group each; the expressions make reruns conflict.
+        Index(
+            "ux_grading_event_rollups_bucket_group",
+            "bucket_start",
+            "phase",
+            "event_type",
+            text("coalesce(reason, '')"),
+            text("coalesce(context, '')"),
+            unique=True,
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    phase: Mapped[str] = mapped_column(String(16))
+    event_type: Mapped[str] = mapped_column(String(32))
+    reason: Mapped[str | None] = mapped_column(String(64), default=None)
+    context: Mapped[str | None] = mapped_column(String(64), default=None)
+    events: Mapped[int] = mapped_column(Integer)
+    duration_count: Mapped[int] = mapped_column(Integer)
+    duration_sum_ms: Mapped[int] = mapped_column(BigInteger)
+    duration_max_ms: Mapped[int | None] = mapped_column(Integer, default=None)
+    duration_p50_ms: Mapped[int | None] = mapped_column(Integer, default=None)
+    duration_p95_ms: Mapped[int | None] = mapped_column(Integer, default=None)
+    duration_p99_ms: Mapped[int | None] = mapped_column(Integer, default=None)
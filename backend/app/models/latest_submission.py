@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from sqlalchemy import DDL, Enum, ForeignKey, Integer, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.models.submission import Submission, SubmissionStatus
+
+
+class LatestSubmission(Base):
+    """Each student's most recent submission (highest id) per assignment.
+
+    Maintained by a trigger on `submissions`: inserts advance the pointer, status/score
+    changes are mirrored onto the row that is currently latest, and deleting the latest
+    attempt falls back to the previous one. Deadline, missing-submission and archive
+    queries read this instead of grouping over every historical attempt.
+    """
+
+    __tablename__ = "latest_submissions"
+
+    assignment_id: Mapped[int] = mapped_column(
+        ForeignKey("assignments.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    submission_id: Mapped[int] = mapped_column(Integer, nullable=False, unique=True)
+    status: Mapped[SubmissionStatus] = mapped_column(Enum(SubmissionStatus, name="submission_status"))
+    score: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+
+LATEST_SUBMISSIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION latest_submissions_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO latest_submissions (assignment_id, user_id, submission_id, status, score)
+        VALUES (NEW.assignment_id, NEW.user_id, NEW.id, NEW.status, NEW.score)
+        ON CONFLICT (assignment_id, user_id) DO UPDATE
+        SET submission_id = EXCLUDED.submission_id, status = EXCLUDED.status, score = EXCLUDED.score
+        WHERE latest_submissions.submission_id < EXCLUDED.submission_id;
+    ELSIF TG_OP = 'UPDATE' THEN
+        IF OLD.status IS DISTINCT FROM NEW.status OR OLD.score IS DISTINCT FROM NEW.score THEN
+            UPDATE latest_submissions
+            SET status = NEW.status, score = NEW.score
+            WHERE submission_id = NEW.id;
+        END IF;
+    ELSE
+        DELETE FROM latest_submissions WHERE submission_id = OLD.id;
+        -- Fall back to the previous attempt, unless the whole assignment or user is going
+        -- away (cascades), in which case there is nothing left to point at.
+        IF FOUND
+            AND EXISTS (SELECT 1 FROM assignments WHERE id = OLD.assignment_id)
+            AND EXISTS (SELECT 1 FROM users WHERE id = OLD.user_id) THEN
+            INSERT INTO latest_submissions (assignment_id, user_id, submission_id, status, score)
+            SELECT assignment_id, user_id, id, status, score
+            FROM submissions
+            WHERE assignment_id = OLD.assignment_id AND user_id = OLD.user_id
+            ORDER BY id DESC
+            LIMIT 1
+            ON CONFLICT (assignment_id, user_id) DO NOTHING;
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+LATEST_SUBMISSIONS_TRIGGER = """
+CREATE TRIGGER submissions_latest
+AFTER INSERT OR DELETE OR UPDATE OF status, score ON submissions
+FOR EACH ROW EXECUTE FUNCTION latest_submissions_apply()
+"""
+
+# Schemas built with metadata.create_all (tests, fresh dev databases) get the trigger too;
+# the migration installs the same SQL.
+event.listen(Submission.__table__, "after_create", DDL(LATEST_SUBMISSIONS_FUNCTION))
+event.listen(Submission.__table__, "after_create", DDL(LATEST_SUBMISSIONS_TRIGGER))
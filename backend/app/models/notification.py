@@ -16,6 +16,8 @@ class NotificationKind(str, enum.Enum):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    # Fetch created_at in the INSERT's RETURNING so new rows can be serialized without a refresh.
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
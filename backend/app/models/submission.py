@@ -2,7 +2,7 @@ from datetime import datetime
 
 import enum
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy import DDL, DateTime, Enum, FetchedValue, ForeignKey, Index, Integer, SmallInteger, String, Text, event, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -15,12 +15,29 @@ class SubmissionStatus(str, enum.Enum):
     error = "error"
 
 
+# Order in which staff work through the queue: untouched work first, graded last.
+SUBMISSION_TRIAGE_PRIORITY: dict[SubmissionStatus, int] = {
+    SubmissionStatus.pending: 0,
+    SubmissionStatus.grading: 1,
+    SubmissionStatus.error: 2,
+    SubmissionStatus.graded: 3,
+}
+
+
 class Submission(Base):
     __tablename__ = "submissions"
     __table_args__ = (
         Index("ix_submissions_assignment_id_user_id", "assignment_id", "user_id"),
         Index("ix_submissions_user_id_id", "user_id", "id"),
         Index("ix_submissions_status_created_at", "status", "created_at"),
+        Index(
+            "ix_submissions_course_triage",
+            "course_id",
+            "triage_priority",
+            "created_at",
+            "id",
+        ),
+        Index("ix_submissions_course_updated", "course_id", "updated_at", "id"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -31,6 +48,19 @@ class Submission(Base):
     size_bytes: Mapped[int] = mapped_column(Integer)
     storage_path: Mapped[str] = mapped_column(String(500))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # Maintained by the touch trigger below, for every write path (ORM, bulk UPDATEs, worker).
+    # graded_at is when the current grade was recorded; NULL unless status is graded.
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        server_onupdate=FetchedValue(),
+    )
+    graded_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        server_default=FetchedValue(),
+        server_onupdate=FetchedValue(),
+    )
     practice_autograde_version_id: Mapped[int | None] = mapped_column(
         Integer,
         index=True,
@@ -50,6 +80,23 @@ class Submission(Base):
     )
     score: Mapped[int | None] = mapped_column(Integer, nullable=True)
     feedback: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Set by the grading worker: compile_error, runtime_error, infra_error or internal_error.
+    error_kind: Mapped[str | None] = mapped_column(String(20), nullable=True, default=None)
+    tests_passed: Mapped[int | None] = mapped_column(Integer, nullable=True, default=None)
+    tests_total: Mapped[int | None] = mapped_column(Integer, nullable=True, default=None)
+    # Denormalized for the staff triage index; both are set by the trigger below.
+    course_id: Mapped[int | None] = mapped_column(
+        ForeignKey("courses.id", ondelete="CASCADE"),
+        nullable=True,
+        server_default=FetchedValue(),
+        server_onupdate=FetchedValue(),
+    )
+    triage_priority: Mapped[int | None] = mapped_column(
+        SmallInteger,
+        nullable=True,
+        server_default=FetchedValue(),
+        server_onupdate=FetchedValue(),
+    )
 
     @property
     def file_path(self) -> str:
@@ -58,3 +105,61 @@ class Submission(Base):
     @property
     def submitted_at(self) -> datetime:
         return self.created_at
+
+
+SUBMISSION_TRIAGE_FUNCTION = """
+CREATE OR REPLACE FUNCTION submissions_set_triage() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' OR NEW.assignment_id IS DISTINCT FROM OLD.assignment_id THEN
+        SELECT course_id INTO NEW.course_id FROM assignments WHERE id = NEW.assignment_id;
+    END IF;
+    NEW.triage_priority := CASE NEW.status
+        WHEN 'pending' THEN 0
+        WHEN 'grading' THEN 1
+        WHEN 'error' THEN 2
+        ELSE 3
+    END;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+SUBMISSION_TRIAGE_TRIGGER = """
+CREATE TRIGGER submissions_triage
+BEFORE INSERT OR UPDATE OF status, assignment_id ON submissions
+FOR EACH ROW EXECUTE FUNCTION submissions_set_triage()
+"""
+
+# clock_timestamp() rather than now(): rows become visible in roughly timestamp order even
+# when a transaction runs long, which the changes-since feed relies on.
+SUBMISSION_TOUCH_FUNCTION = """
+CREATE OR REPLACE FUNCTION submissions_touch() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+        RETURN NEW;
+    END IF;
+    NEW.updated_at := clock_timestamp();
+    IF NEW.status <> 'graded' THEN
+        NEW.graded_at := NULL;
+    ELSIF TG_OP = 'INSERT'
+        OR OLD.status IS DISTINCT FROM NEW.status
+        OR OLD.score IS DISTINCT FROM NEW.score THEN
+        NEW.graded_at := NEW.updated_at;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+SUBMISSION_TOUCH_TRIGGER = """
+CREATE TRIGGER submissions_touch
+BEFORE INSERT OR UPDATE ON submissions
+FOR EACH ROW EXECUTE FUNCTION submissions_touch()
+"""
+
+# A trigger rather than a generated column: the priority is derived from an enum (whose
+# casts are not immutable) and course_id needs a lookup. The migration installs the same SQL.
+event.listen(Submission.__table__, "after_create", DDL(SUBMISSION_TRIAGE_FUNCTION))
+event.listen(Submission.__table__, "after_create", DDL(SUBMISSION_TRIAGE_TRIGGER))
+event.listen(Submission.__table__, "after_create", DDL(SUBMISSION_TOUCH_FUNCTION))
+event.listen(Submission.__table__, "after_create", DDL(SUBMISSION_TOUCH_TRIGGER))
@@ -0,0 +1,51 @@
+from datetime import datetime
+import enum
+
+from sqlalchemy import BigInteger, DateTime, Enum, ForeignKey, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class SubmissionArchiveScope(str, enum.Enum):
+    latest = "latest"
+    all = "all"
+
+
+class SubmissionArchiveJobStatus(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+
+class SubmissionArchiveJob(Base):
+    __tablename__ = "submission_archive_jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    course_id: Mapped[int] = mapped_column(ForeignKey("courses.id", ondelete="CASCADE"), index=True)
+    assignment_id: Mapped[int] = mapped_column(
+        ForeignKey("assignments.id", ondelete="CASCADE"),
+        index=True,
+    )
+    requested_by_user_id: Mapped[int | None] = mapped_column(
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    scope: Mapped[SubmissionArchiveScope] = mapped_column(
+        Enum(SubmissionArchiveScope, name="submission_archive_scope"),
+    )
+    status: Mapped[SubmissionArchiveJobStatus] = mapped_column(
+        Enum(SubmissionArchiveJobStatus, name="submission_archive_job_status"),
+        server_default=SubmissionArchiveJobStatus.queued.value,
+        index=True,
+    )
+    total_entries: Mapped[int] = mapped_column(Integer, default=0)
+    processed_entries: Mapped[int] = mapped_column(Integer, default=0)
+    size_bytes: Mapped[int] = mapped_column(BigInteger, default=0)
+    storage_path: Mapped[str | None] = mapped_column(String(500), nullable=True, default=None)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True, default=None)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # The ZIP is deleted (and storage_path cleared) by the deadline poller after this.
+    expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import time
+
+from app.observability.metrics import gauge, histogram
+from app.observability.query_stats import report_query_stats, track_queries
+
+# Per-route request metrics, labelled by the route template (`/api/v1/courses/{course_id}`),
+# never the raw path. Series children are resolved once per (method, route, status class)
+# and cached, so the per-request cost is a dict lookup and a few histogram observations.
+# Server-sent event streams stay open for as long as the client is connected, so once
+# their response starts they move from the in-flight gauge to their own gauge and record
+# no latency or size.
+
+UNMATCHED_ROUTE = "<unmatched>"
+OTHER_METHOD = "OTHER"
+_METHODS = ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+_STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+
+RESPONSE_SIZE_BUCKETS: tuple[float, ...] = (
+    256,
+    1024,
+    4096,
+    16384,
+    65536,
+    262144,
+    1048576,
+    4194304,
+    16777216,
+)
+DB_TIME_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+DB_QUERY_BUCKETS: tuple[float, ...] = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_request_seconds = histogram(
+    "marconi_http_request_duration_seconds",
+    "HTTP request latency until the last response byte, by route template.",
+    ("method", "route", "status_class"),
+)
+_response_bytes = histogram(
+    "marconi_http_response_size_bytes",
+    "HTTP response body size, by route template.",
+    ("method", "route", "status_class"),
+    buckets=RESPONSE_SIZE_BUCKETS,
+)
+_request_db_seconds = histogram(
+    "marconi_http_request_db_seconds",
+    "Time spent executing database statements per HTTP request, by route template.",
+    ("method", "route", "status_class"),
+    buckets=DB_TIME_BUCKETS,
+)
+_request_db_queries = histogram(
+    "marconi_http_request_db_queries",
+    "Database statements executed per HTTP request, by route template.",
+    ("method", "route", "status_class"),
+    buckets=DB_QUERY_BUCKETS,
+)
+_in_flight = gauge(
+    "marconi_http_requests_in_flight",
+    "HTTP requests currently being served.",
+    ("method",),
+)
+
+_event_streams_open = gauge(
+    "marconi_http_event_streams_open",
+    "Server-sent event streams currently open, by route template.",
+    ("route",),
+)
+
+_in_flight_by_method = {method: _in_flight.labels(method) for method in (*_METHODS, OTHER_METHOD)}
+
+
+class _RouteSeries:
+    __slots__ = ("duration", "size", "db", "queries", "unit")
+
+    def __init__(self, method: str, route: str, status_class: str) -> None:
+        self.duration = _request_seconds.labels(method, route, status_class)
+        self.size = _response_bytes.labels(method, route, status_class)
+        self.db = _request_db_seconds.labels(method, route, status_class)
+        self.queries = _request_db_queries.labels(method, route, status_class)
+        self.unit = f"{method} {route}"
+
+
+_series: dict[tuple[str, str, int], _RouteSeries] = {}
+
+
+def _is_event_stream(headers) -> bool:
+    for key, value in headers or ():
+        if key.lower() == b"content-type":
+            return value.split(b";", 1)[0].strip().lower() == b"text/event-stream"
+    return False
+
+
+def _route_template(scope) -> str:
+    # The router stores the matched route in the (shared) scope.
+    return getattr(scope.get("route"), "path_format", None) or UNMATCHED_ROUTE
+
+
+def _route_series(method: str, route: str, status: int) -> _RouteSeries:
+    index = min(max(status // 100, 1), 5) - 1
+    key = (method, route, index)
+    series = _series.get(key)
+    if series is None:
+        series = _RouteSeries(method, route, _STATUS_CLASSES[index])
+        _series[key] = series
+    return series
+
+
+class HttpMetricsMiddleware:
+    """Pure ASGI middleware recording latency, response size, DB usage and in-flight requests.
+
+    Requests over the query budget or repeating a statement are logged
+    (`report_query_stats`).
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_flight = _in_flight_by_method.get(method)
+        if in_flight is None:
+            method = OTHER_METHOD
+            in_flight = _in_flight_by_method[OTHER_METHOD]
+        status = 500
+        size = 0
+        stream = None
+
+        async def send_wrapper(message) -> None:
+            nonlocal status, size, stream
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if _is_event_stream(message.get("headers")):
+                    stream = _event_streams_open.labels(_route_template(scope))
+                    stream.inc()
+                    in_flight.dec()
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            with track_queries() as queries:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            series = _route_series(method, _route_template(scope), status)
+            if stream is None:
+                in_flight.dec()
+                series.duration.observe(elapsed)
+                series.size.observe(size)
+            else:
+                stream.dec()
+            series.db.observe(queries.seconds)
+            series.queries.observe(queries.count)
+            report_query_stats(queries, label=series.unit)
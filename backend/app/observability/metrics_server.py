@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from app.observability.grading_metrics import metrics_content_type
+from app.observability.metrics import render_process_metrics
+
+logger = logging.getLogger(__name__)
+
+# Minimal HTTP endpoint serving this process's registry, for processes without the API
+# (grading workers). Each worker process is scraped on its own port: with several
+# processes per host, each binds the first free port in [port, port + port_span).
+
+_MAX_REQUEST_HEAD_BYTES = 8192
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=5.0)
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+        writer.close()
+        return
+    request_line = head.split(b"\r\n", 1)[0].decode("latin-1")
+    parts = request_line.split(" ")
+    path = parts[1].split("?", 1)[0] if len(parts) >= 2 else ""
+    if len(parts) >= 2 and parts[0] in ("GET", "HEAD") and path in ("/metrics", "/"):
+        status, content_type, body = "200 OK", metrics_content_type(), render_process_metrics().encode()
+    else:
+        status, content_type, body = "404 Not Found", "text/plain; charset=utf-8", b"Not Found\n"
+    writer.write(
+        (
+            f"HTTP/1.1 {status}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode("latin-1")
+    )
+    if parts[0] != "HEAD":
+        writer.write(body)
+    try:
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(*, host: str, port: int, port_span: int = 1) -> asyncio.AbstractServer | None:
+    """Serve `/metrics` on the first free port from `port`; None if every port is taken.
+
+    `port=0` binds an ephemeral port (tests).
+    """
+    span = 1 if port == 0 else max(1, int(port_span))
+    for candidate in range(port, port + span):
+        try:
+            server = await asyncio.start_server(_handle, host, candidate, limit=_MAX_REQUEST_HEAD_BYTES)
+        except OSError:
+            continue
+        bound = server.sockets[0].getsockname()[1] if server.sockets else candidate
+        logger.info("Metrics endpoint listening on %s:%s", host, bound)
+        return server
+    logger.warning("No free metrics port in %s-%s; metrics are not exported", port, port + span - 1)
+    return None
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+import time
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statement counts and DB time for a unit of work (an HTTP request, a worker job, a test
+# block). Trackers nest: a statement counts towards every tracker active in its context,
+# so a test's budget also sees the queries of the requests it makes.
+
+
+class QueryStats:
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: dict[str, int] = {}
+
+    def repeated(self, min_count: int) -> list[tuple[str, int]]:
+        """Statements executed at least `min_count` times, most repeated first."""
+        return sorted(
+            ((statement, n) for statement, n in self.statements.items() if n >= min_count),
+            key=lambda item: -item[1],
+        )
+
+
+_active: ContextVar[tuple[QueryStats, ...]] = ContextVar("marconi_query_stats", default=())
+_QUERY_STARTED_KEY = "marconi_query_started"
+_instrumented = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _active.get():
+        conn.info[_QUERY_STARTED_KEY] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.pop(_QUERY_STARTED_KEY, None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    for stats in _active.get():
+        stats.count += 1
+        stats.seconds += elapsed
+        stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+
+def instrument_queries() -> None:
+    """Listen on every engine; cheap when no tracker is active."""
+    global _instrumented
+    if _instrumented:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _instrumented = True
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    instrument_queries()
+    stats = QueryStats()
+    token = _active.set((*_active.get(), stats))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+def report_query_stats(stats: QueryStats, *, label: str) -> None:
+    """Log units of work over the query budget and statements repeated like an N+1."""
+    if not stats.count:
+        return
+    threshold = settings.query_log_threshold
+    if threshold > 0 and stats.count >= threshold:
+        logger.warning(
+            "High query count. unit=%s queries=%s db_ms=%.1f",
+            label,
+            stats.count,
+            stats.seconds * 1000,
+        )
+    repeat_threshold = settings.query_repeat_threshold
+    if repeat_threshold > 0:
+        for statement, n in stats.repeated(repeat_threshold)[:3]:
+            logger.warning(
+                "Repeated statement (possible N+1). unit=%s executions=%s statement=%s",
+                label,
+                n,
+                " ".join(statement.split())[:300],
+            )
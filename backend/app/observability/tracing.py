@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+import json
+import logging
+import os
+from pathlib import Path
+import queue
+import re
+import secrets
+import threading
+import time
+from typing import Any, Iterator, Protocol
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Minimal in-process tracer.
+#
+# Spans nest through a context variable and cross process boundaries as a W3C
+# `traceparent` string (HTTP header, taskiq message label). Finished spans are buffered
+# per trace; when the trace's process-local root span ends, its spans are queued for a
+# background thread that calls the pluggable exporter, so one process's part of a trace
+# is exported together and the event loop never waits on export I/O. With no exporter
+# configured every entry point is a cheap no-op.
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+SPAN_KIND_PRODUCER = 4
+SPAN_KIND_CONSUMER = 5
+
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+_EXPORT_BATCH_SIZE = 512
+_EXPORT_QUEUE_MAX_BATCHES = 1024
+_MAX_STATEMENT_CHARS = 1024
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+class Span:
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_span_id",
+        "name",
+        "kind",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "status_code",
+        "status_message",
+        "local_root",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        trace_id: str,
+        parent_span_id: str | None,
+        kind: int,
+        attributes: dict[str, Any] | None,
+        local_root: bool,
+    ) -> None:
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: dict[str, Any] = dict(attributes) if attributes else {}
+        self.status_code = _STATUS_OK
+        self.status_message = ""
+        self.local_root = local_root
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.status_code = _STATUS_ERROR
+        self.status_message = message
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+class _NoopSpan:
+    __slots__ = ()
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: list[Span]) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def otlp_json_request(spans: list[Span], *, service_name: str) -> dict[str, Any]:
+    """Spans as an OTLP/JSON `ExportTraceServiceRequest`."""
+    otlp_spans = []
+    for span in spans:
+        item: dict[str, Any] = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": span.kind,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": _otlp_attributes(span.attributes),
+            "status": {"code": span.status_code},
+        }
+        if span.parent_span_id:
+            item["parentSpanId"] = span.parent_span_id
+        if span.status_message:
+            item["status"]["message"] = span.status_message
+        otlp_spans.append(item)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+                "scopeSpans": [{"scope": {"name": "marconi"}, "spans": otlp_spans}],
+            }
+        ]
+    }
+
+
+class FileSpanExporter:
+    """Appends one OTLP/JSON request per line, readable offline or by the collector's
+    `otlpjsonfile` receiver. Each process writes its own file."""
+
+    def __init__(self, path: Path, *, service_name: str) -> None:
+        self.path = path
+        self.service_name = service_name
+
+    def export(self, spans: list[Span]) -> None:
+        line = json.dumps(otlp_json_request(spans, service_name=self.service_name), separators=(",", ":"))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+
+    def shutdown(self) -> None:
+        pass
+
+
+_exporter: SpanExporter | None = None
+# Finished spans by trace id, until that trace's local root ends.
+_pending: dict[str, list[Span]] = {}
+_export_queue: queue.Queue[tuple[SpanExporter, list[Span]]] = queue.Queue(maxsize=_EXPORT_QUEUE_MAX_BATCHES)
+_export_thread: threading.Thread | None = None
+_export_thread_lock = threading.Lock()
+_current_span: ContextVar[Span | None] = ContextVar("marconi_current_span", default=None)
+
+
+def configure_tracing(*, service_name: str) -> None:
+    """Install the exporter selected by `TRACING_EXPORTER` for this process."""
+    exporter: SpanExporter | None = None
+    if settings.tracing_exporter == "file":
+        path = Path(settings.tracing_dir) / f"{service_name}-{os.getpid()}.jsonl"
+        exporter = FileSpanExporter(path, service_name=service_name)
+    set_span_exporter(exporter)
+
+
+def set_span_exporter(exporter: SpanExporter | None) -> SpanExporter | None:
+    """Replace the exporter (None disables tracing); returns the previous one."""
+    global _exporter
+    previous = _exporter
+    flush_spans()
+    _exporter = exporter
+    if exporter is not None:
+        _instrument_db()
+    return previous
+
+
+def tracing_enabled() -> bool:
+    return _exporter is not None
+
+
+def _export_loop() -> None:
+    while True:
+        exporter, batch = _export_queue.get()
+        try:
+            exporter.export(batch)
+        except Exception:
+            logger.warning("Failed to export %s spans", len(batch), exc_info=True)
+        finally:
+            _export_queue.task_done()
+
+
+def _hand_off(batch: list[Span]) -> None:
+    global _export_thread
+    if _exporter is None or not batch:
+        return
+    if _export_thread is None or not _export_thread.is_alive():
+        with _export_thread_lock:
+            if _export_thread is None or not _export_thread.is_alive():
+                _export_thread = threading.Thread(target=_export_loop, name="span-export", daemon=True)
+                _export_thread.start()
+    try:
+        _export_queue.put_nowait((_exporter, batch))
+    except queue.Full:
+        logger.warning("Span export queue is full; dropping %s spans", len(batch))
+
+
+def flush_spans() -> None:
+    """Export every buffered span, including unfinished traces', and wait until written.
+
+    Blocks, so it is meant for shutdown and exporter swaps.
+    """
+    batches = list(_pending.values())
+    _pending.clear()
+    for batch in batches:
+        _hand_off(batch)
+    _export_queue.join()
+
+
+def _finish(span: Span) -> None:
+    span.end_ns = time.time_ns()
+    spans = _pending.setdefault(span.trace_id, [])
+    spans.append(span)
+    if span.local_root or len(spans) >= _EXPORT_BATCH_SIZE:
+        del _pending[span.trace_id]
+        _hand_off(spans)
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str] | None:
+    """(trace_id, parent_span_id) from a W3C `traceparent`, or None if malformed."""
+    if not value:
+        return None
+    match = _TRACEPARENT_RE.match(value.strip().lower())
+    if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2)
+
+
+def current_traceparent() -> str | None:
+    span = _current_span.get()
+    return None if span is None else span.traceparent
+
+
+def _new_span(
+    name: str,
+    *,
+    traceparent: str | None,
+    kind: int,
+    attributes: dict[str, Any] | None,
+) -> Span:
+    remote = parse_traceparent(traceparent) if traceparent is not None else None
+    if remote is not None:
+        return Span(
+            name,
+            trace_id=remote[0],
+            parent_span_id=remote[1],
+            kind=kind,
+            attributes=attributes,
+            local_root=True,
+        )
+    parent = _current_span.get()
+    if parent is not None:
+        return Span(
+            name,
+            trace_id=parent.trace_id,
+            parent_span_id=parent.span_id,
+            kind=kind,
+            attributes=attributes,
+            local_root=False,
+        )
+    return Span(
+        name,
+        trace_id=secrets.token_hex(16),
+        parent_span_id=None,
+        kind=kind,
+        attributes=attributes,
+        local_root=True,
+    )
+
+
+@contextmanager
+def start_span(
+    name: str,
+    *,
+    traceparent: str | None = None,
+    kind: int = SPAN_KIND_INTERNAL,
+    attributes: dict[str, Any] | None = None,
+) -> Iterator[Span | _NoopSpan]:
+    """Run the block in a child of the current span, or of `traceparent` when given.
+
+    Exceptions mark the span as failed and propagate.
+    """
+    if _exporter is None:
+        yield _NOOP_SPAN
+        return
+    span = _new_span(name, traceparent=traceparent, kind=kind, attributes=attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        span.set_error(f"{type(exc).__name__}: {exc}"[:256])
+        raise
+    finally:
+        _current_span.reset(token)
+        _finish(span)
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware: one server span per HTTP request, continuing `traceparent`."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if _exporter is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for key, value in scope.get("headers") or ():
+            if key == b"traceparent":
+                incoming = value.decode("latin-1")
+                break
+        status = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        method = scope["method"]
+        with start_span(method, traceparent=incoming, kind=SPAN_KIND_SERVER) as span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path_format", None)
+                if route:
+                    span.name = f"{method} {route}"
+                    span.set_attribute("http.route", route)
+                span.set_attribute("http.request.method", method)
+                span.set_attribute("http.response.status_code", status)
+                if status >= 500:
+                    span.set_error(f"HTTP {status}")
+
+
+# Statement spans, attached only inside an active trace (pollers and other untraced
+# work create none).
+
+_STATEMENT_SPAN_KEY = "marconi_statement_span"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _exporter is None or _current_span.get() is None:
+        return
+    conn.info[_STATEMENT_SPAN_KEY] = _new_span(
+        "db.query",
+        traceparent=None,
+        kind=SPAN_KIND_CLIENT,
+        attributes={"db.system": "postgresql", "db.statement": statement[:_MAX_STATEMENT_CHARS]},
+    )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    span = conn.info.pop(_STATEMENT_SPAN_KEY, None)
+    if span is not None:
+        _finish(span)
+
+
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+    span = conn.info.pop(_STATEMENT_SPAN_KEY, None) if conn is not None else None
+    if span is not None:
+        span.set_error(type(exception_context.original_exception).__name__)
+        _finish(span)
+
+
+def _instrument_db() -> None:
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+import json
+import logging
+from typing import Any
+
+from app.core.config import settings
+from app.observability.metrics import counter, gauge
+
+logger = logging.getLogger(__name__)
+
+# Fan-out of small JSON events to connected clients (SSE streams).
+#
+# Subscribers always attach to the in-process bus. With REDIS_URL configured,
+# publishers (API replicas and grading workers alike) go through Redis pub/sub and a
+# single listener per process pattern-subscribes to the prefix and fans messages out
+# locally, so N open streams cost one Redis connection, not N. Without Redis, publish
+# dispatches directly (single node, or the in-memory taskiq broker).
+
+_SUBSCRIBER_QUEUE_SIZE = 100
+
+_published_total = counter(
+    "marconi_realtime_events_published_total",
+    "Realtime events published, by kind.",
+    ("kind",),
+)
+_dropped_total = counter(
+    "marconi_realtime_events_dropped_total",
+    "Realtime events dropped because a subscriber fell behind.",
+)
+_subscribers_gauge = gauge(
+    "marconi_realtime_subscribers",
+    "Open realtime subscriptions in this process.",
+)
+
+
+class Subscription:
+    def __init__(self, channel: str) -> None:
+        self.channel = channel
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=_SUBSCRIBER_QUEUE_SIZE)
+
+    def _deliver(self, event: dict[str, Any]) -> None:
+        if self._queue.full():
+            # Slow consumer: keep the newest events; clients resync on reconnect anyway.
+            self._queue.get_nowait()
+            _dropped_total.inc()
+        self._queue.put_nowait(event)
+
+    async def get(self) -> dict[str, Any]:
+        return await self._queue.get()
+
+
+class EventBus:
+    def __init__(self, *, redis_url: str = "", prefix: str = "marconi:events") -> None:
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._redis_url = redis_url.strip()
+        self._prefix = prefix
+        self._redis = None
+        self._listener: asyncio.Task | None = None
+
+    @property
+    def uses_redis(self) -> bool:
+        return bool(self._redis_url)
+
+    def _redis_client(self):
+        if self._redis is None:
+            from redis.asyncio import Redis
+
+            self._redis = Redis.from_url(self._redis_url)
+        return self._redis
+
+    def dispatch_local(self, channel: str, event: dict[str, Any]) -> None:
+        for subscription in tuple(self._subscribers.get(channel, ())):
+            subscription._deliver(event)
+
+    async def publish(self, channel: str, event: dict[str, Any]) -> None:
+        _published_total.labels(str(event.get("type", "unknown"))).inc()
+        if not self.uses_redis:
+            self.dispatch_local(channel, event)
+            return
+        await self._redis_client().publish(f"{self._prefix}:{channel}", json.dumps(event, default=str))
+
+    async def publish_many(self, events: list[tuple[str, dict[str, Any]]]) -> None:
+        """Publish (channel, event) pairs in order, in one Redis round trip."""
+        for _, event in events:
+            _published_total.labels(str(event.get("type", "unknown"))).inc()
+        if not self.uses_redis:
+            for channel, event in events:
+                self.dispatch_local(channel, event)
+            return
+        async with self._redis_client().pipeline(transaction=False) as pipe:
+            for channel, event in events:
+                pipe.publish(f"{self._prefix}:{channel}", json.dumps(event, default=str))
+            await pipe.execute()
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[Subscription]:
+        subscription = Subscription(channel)
+        self._subscribers.setdefault(channel, set()).add(subscription)
+        _subscribers_gauge.inc()
+        if self.uses_redis:
+            self._ensure_listener()
+        try:
+            yield subscription
+        finally:
+            _subscribers_gauge.dec()
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def _ensure_listener(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen_forever())
+
+    async def _listen_forever(self) -> None:
+        prefix = f"{self._prefix}:"
+        while True:
+            pubsub = self._redis_client().pubsub()
+            try:
+                await pubsub.psubscribe(f"{prefix}*")
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    channel = message["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    try:
+                        event = json.loads(message["data"])
+                    except (TypeError, ValueError):
+                        continue
+                    self.dispatch_local(channel[len(prefix):], event)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Realtime event listener disconnected; retrying", exc_info=True)
+                await asyncio.sleep(1.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+_bus: EventBus | None = None
+
+
+def get_event_bus() -> EventBus:
+    global _bus
+    if _bus is None:
+        _bus = EventBus(redis_url=settings.redis_url, prefix=f"{settings.taskiq_queue_name}:events")
+    return _bus
+
+
+def _reset_event_bus_for_tests(bus: EventBus | None = None) -> None:
+    global _bus
+    _bus = bus
+
+
+async def publish_event(channel: str, event: dict[str, Any]) -> None:
+    """Best-effort publish; realtime delivery must never fail the caller's write path."""
+    try:
+        await get_event_bus().publish(channel, event)
+    except Exception:
+        logger.warning("Failed to publish realtime event. channel=%s type=%s", channel, event.get("type"), exc_info=True)
+
+
+async def publish_events(events: list[tuple[str, dict[str, Any]]]) -> None:
+    """Best-effort `publish_event` for many events, so bulk writes cost one round trip."""
+    if not events:
+        return
+    try:
+        await get_event_bus().publish_many(events)
+    except Exception:
+        logger.warning("Failed to publish %s realtime event(s)", len(events), exc_info=True)
+
+
+def submission_channel(user_id: int) -> str:
+    return f"submissions:user:{int(user_id)}"
+
+
+def submission_status_event(
+    *,
+    submission_id: int,
+    user_id: int,
+    assignment_id: int,
+    status: Any,
+    score: int | None = None,
+) -> tuple[str, dict[str, Any]]:
+    return (
+        submission_channel(user_id),
+        {
+            "type": "submission.status",
+            "submission_id": int(submission_id),
+            "assignment_id": int(assignment_id),
+            "status": str(getattr(status, "value", status)),
+            "score": score,
+        },
+    )
+
+
+async def publish_submission_status(
+    *,
+    submission_id: int,
+    user_id: int,
+    assignment_id: int,
+    status: Any,
+    score: int | None = None,
+) -> None:
+    await publish_event(
+        *submission_status_event(
+            submission_id=submission_id,
+            user_id=user_id,
+            assignment_id=assignment_id,
+            status=status,
+            score=score,
+        )
+    )
+
+
+def notification_channel(user_id: int) -> str:
+    return f"notifications:user:{int(user_id)}"
+
+
+def notification_event(
+    *,
+    user_id: int,
+    kind: str,
+    notification: dict[str, Any] | None = None,
+    notification_id: int | None = None,
+    unread_count: int | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """`kind` is created, updated or read; `unread_count` is omitted when it did not change."""
+    event: dict[str, Any] = {"type": f"notification.{kind}"}
+    if notification is not None:
+        event["notification"] = notification
+    if notification_id is not None:
+        event["notification_id"] = int(notification_id)
+    if unread_count is not None:
+        event["unread_count"] = int(unread_count)
+    return notification_channel(user_id), event
+
+
+async def publish_notification_event(
+    *,
+    user_id: int,
+    kind: str,
+    notification: dict[str, Any] | None = None,
+    notification_id: int | None = None,
+    unread_count: int | None = None,
+) -> None:
+    await publish_event(
+        *notification_event(
+            user_id=user_id,
+            kind=kind,
+            notification=notification,
+            notification_id=notification_id,
+            unread_count=unread_count,
+        )
+    )
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+import json
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+
+from app.realtime.events import get_event_bus
+
+SSE_HEARTBEAT_SECONDS = 20.0
+SSE_RETRY_MILLISECONDS = 5000
+
+
+def format_sse(*, event: str, data: dict[str, Any], event_id: str | None = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def iter_channel_events(
+    channel: str,
+    *,
+    accept: Callable[[dict[str, Any]], bool] | None = None,
+    initial: Callable[[], Awaitable[Iterable[dict[str, Any]]]] | None = None,
+    heartbeat_seconds: float = SSE_HEARTBEAT_SECONDS,
+) -> AsyncIterator[str]:
+    """Yield SSE frames for events on `channel`, with comment heartbeats while idle.
+
+    `initial` (e.g. reading a state snapshot) is awaited only once subscribed and its
+    events are sent first, so a change committed while the snapshot is read still arrives
+    as an event; at worst the snapshot already reflects it. StreamingResponse cancels this
+    generator when the client disconnects, which closes the subscription.
+    """
+    async with get_event_bus().subscribe(channel) as subscription:
+        yield f"retry: {SSE_RETRY_MILLISECONDS}\n\n"
+        for event in (await initial()) if initial is not None else ():
+            yield format_sse(event=str(event.get("type", "message")), data=event)
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if accept is not None and not accept(event):
+                continue
+            yield format_sse(event=str(event.get("type", "message")), data=event)
+
+
+def sse_response(stream: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -18,3 +18,7 @@ class NotificationOut(BaseModel):
     read_at: datetime | None
     created_at: datetime
 
+
+
+class NotificationUnreadCountOut(BaseModel):
+    unread_count: int
@@ -3,6 +3,7 @@ from __future__ import annotations
 from enum import Enum
 
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel, EmailStr, Field
 
@@ -29,6 +30,8 @@ class StaffSubmissionQueueItem(BaseModel):
     status: SubmissionStatus
     score: int | None
     feedback: str | None
+    updated_at: datetime | None = None
+    graded_at: datetime | None = None
 
 
 class StaffSubmissionDetail(StaffSubmissionQueueItem):
@@ -47,6 +50,20 @@ class StaffSubmissionsPage(BaseModel):
     total: int
     offset: int
     limit: int
+    # Keyset cursor for the page after this one (pass as `cursor`); null on the last page.
+    next_cursor: str | None = None
+    # "counter": maintained per-assignment counters (default); "exact": counted on request.
+    total_source: Literal["counter", "exact"] = "exact"
+
+
+class StaffSubmissionChanges(BaseModel):
+    # Submissions created or modified since the request's cursor, oldest change first.
+    # Clients upsert these by id. Call without a cursor first to get a starting point,
+    # then load the page, then poll with `next_cursor`.
+    items: list[StaffSubmissionQueueItem]
+    next_cursor: str
+    # True when the batch was cut at `limit`; poll again right away to catch up.
+    has_more: bool
 
 
 class StaffSubmissionBulkAction(str, Enum):
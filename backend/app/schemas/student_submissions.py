@@ -22,6 +22,8 @@ class StudentSubmissionItem(BaseModel):
     score: int | None
     feedback: str | None
     error_kind: str | None = None
+    tests_passed: int | None = None
+    tests_total: int | None = None
     due_date: datetime | None = None
     effective_due_date: datetime | None = None
     late_seconds: int | None = None
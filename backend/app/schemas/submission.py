@@ -20,6 +20,8 @@ class SubmissionOut(BaseModel):
     status: SubmissionStatus
     score: int | None
     feedback: str | None
+    tests_passed: int | None = None
+    tests_total: int | None = None
 
 
 class SubmissionStudentOut(BaseModel):
@@ -36,6 +38,8 @@ class SubmissionStudentOut(BaseModel):
     score: int | None
     feedback: str | None
     error_kind: str | None = None
+    tests_passed: int | None = None
+    tests_total: int | None = None
 
     effective_due_date: datetime | None
     late_seconds: int | None
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+from app.models.submission_archive_job import SubmissionArchiveJobStatus, SubmissionArchiveScope
+
+
+class SubmissionArchiveJobCreate(BaseModel):
+    scope: SubmissionArchiveScope = SubmissionArchiveScope.latest
+
+
+class SubmissionArchiveJobOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    course_id: int
+    assignment_id: int
+    scope: SubmissionArchiveScope
+    status: SubmissionArchiveJobStatus
+    total_entries: int
+    processed_entries: int
+    size_bytes: int
+    error: str | None
+    created_at: datetime
+    completed_at: datetime | None
+    expires_at: datetime | None
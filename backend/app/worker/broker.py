@@ -1,9 +1,20 @@
 from __future__ import annotations
 
-from taskiq import AsyncBroker, InMemoryBroker
+from taskiq import AsyncBroker, InMemoryBroker, TaskiqMessage, TaskiqMiddleware
 from taskiq_redis import ListQueueBroker
 
 from app.core.config import settings
+from app.observability.tracing import current_traceparent
+
+
+class TraceContextMiddleware(TaskiqMiddleware):
+    """Carries the sender's trace into the task as a `traceparent` label."""
+
+    def pre_send(self, message: TaskiqMessage) -> TaskiqMessage:
+        traceparent = current_traceparent()
+        if traceparent is not None:
+            message.labels["traceparent"] = traceparent
+        return message
 
 
 def _build_broker() -> AsyncBroker:
@@ -12,5 +23,5 @@ def _build_broker() -> AsyncBroker:
     return InMemoryBroker()
 
 
-broker: AsyncBroker = _build_broker()
+broker: AsyncBroker = _build_broker().with_middlewares(TraceContextMiddleware())
 
@@ -2,14 +2,23 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from datetime import datetime, timezone
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import func, select, update
+from sqlalchemy import select, update
 
+from app.core.config import settings
+from app.crud.grading_events import prune_grading_events, rollup_grading_events
+from app.crud.staff_missing_submissions import repair_assignment_student_counters
 from app.db.session import SessionLocal
 from app.models.assignment import Assignment
+from app.models.latest_submission import LatestSubmission
 from app.models.submission import Submission, SubmissionStatus
+from app.observability.metrics import counter
+from app.realtime.events import publish_events, submission_status_event
 from app.worker.enqueue import enqueue_grading
+from app.worker.submission_archive import cleanup_expired_submission_archives
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +26,23 @@ logger = logging.getLogger(__name__)
 POLL_INTERVAL_SECONDS = 30
 FINAL_BATCH_SIZE = 25
 
+_counters_repaired_total = counter(
+    "marconi_missing_counters_repaired_total",
+    "Assignment student counters corrected by the periodic repair job.",
+)
+_grading_rollups_written_total = counter(
+    "marconi_grading_event_rollups_written_total",
+    "Hourly grading event rollup rows written.",
+)
+_grading_events_pruned_total = counter(
+    "marconi_grading_events_pruned_total",
+    "Raw grading events deleted by the retention job.",
+)
+_submission_archives_expired_total = counter(
+    "marconi_submission_archives_expired_total",
+    "Submission archive ZIPs deleted after their retention window.",
+)
+
 
 async def enqueue_due_final_grades() -> int:
     now = datetime.now(timezone.utc)
@@ -58,14 +84,10 @@ async def enqueue_due_final_grades() -> int:
             final_version_id = int(row[0])
 
             # Latest submission per user for this assignment.
-            latest_ids_subq = (
-                select(func.max(Submission.id).label("id"))
-                .where(Submission.assignment_id == assignment_id)
-                .group_by(Submission.user_id)
-                .subquery()
-            )
             subs_result = await db.execute(
-                select(Submission).where(Submission.id.in_(select(latest_ids_subq.c.id)))
+                select(Submission)
+                .join(LatestSubmission, LatestSubmission.submission_id == Submission.id)
+                .where(LatestSubmission.assignment_id == assignment_id)
             )
             submissions = list(subs_result.scalars().all())
 
@@ -77,6 +99,17 @@ async def enqueue_due_final_grades() -> int:
 
             await db.commit()
 
+            await publish_events(
+                [
+                    submission_status_event(
+                        submission_id=s.id,
+                        user_id=s.user_id,
+                        assignment_id=assignment_id,
+                        status=SubmissionStatus.pending,
+                    )
+                    for s in submissions
+                ]
+            )
             for s in submissions:
                 try:
                     ok = await enqueue_grading(submission_id=s.id, phase="final")
@@ -92,8 +125,68 @@ async def enqueue_due_final_grades() -> int:
     return enqueued
 
 
+async def repair_missing_submission_counters() -> int:
+    async with SessionLocal() as db:
+        repaired = await repair_assignment_student_counters(db)
+    if repaired:
+        _counters_repaired_total.inc(repaired)
+        logger.warning("Repaired %s drifted missing-submission counters", repaired)
+    return repaired
+
+
+async def rollup_and_prune_grading_events() -> int:
+    async with SessionLocal() as db:
+        written = await rollup_grading_events(db)
+        pruned = 0
+        if settings.grading_events_retention_days > 0:
+            pruned = await prune_grading_events(
+                db,
+                older_than=datetime.now(timezone.utc) - timedelta(days=settings.grading_events_retention_days),
+                batch_size=settings.grading_events_prune_batch_size,
+            )
+    _grading_rollups_written_total.inc(written)
+    _grading_events_pruned_total.inc(pruned)
+    if written or pruned:
+        logger.info("Grading events rolled up. rollup_rows=%s pruned=%s", written, pruned)
+    return written
+
+
+async def expire_submission_archives() -> int:
+    removed = await cleanup_expired_submission_archives()
+    _submission_archives_expired_total.inc(removed)
+    if removed:
+        logger.info("Deleted %s expired submission archives", removed)
+    return removed
+
+
+# (name, interval setting, job). Each job runs on the first poll and then at most once per
+# interval; a failing job is retried on the next interval, not the next poll.
+PERIODIC_JOBS: list[tuple[str, str, Callable[[], Awaitable[int]]]] = [
+    ("missing_counters_repair", "missing_counters_repair_interval_seconds", repair_missing_submission_counters),
+    ("grading_events_rollup", "grading_events_rollup_interval_seconds", rollup_and_prune_grading_events),
+    ("submission_archive_cleanup", "submission_archive_cleanup_interval_seconds", expire_submission_archives),
+]
+
+
+async def run_periodic_jobs(last_run: dict[str, float]) -> None:
+    now = time.monotonic()
+    for name, interval_setting, job in PERIODIC_JOBS:
+        interval = getattr(settings, interval_setting)
+        if interval <= 0:
+            continue
+        previous = last_run.get(name)
+        if previous is not None and now - previous < interval:
+            continue
+        last_run[name] = now
+        try:
+            await job()
+        except Exception:
+            logger.exception("Periodic job failed. job=%s", name)
+
+
 async def run_forever() -> None:
     logger.info("Starting deadline poller. interval=%ss", POLL_INTERVAL_SECONDS)
+    last_run: dict[str, float] = {}
     while True:
         try:
             count = await enqueue_due_final_grades()
@@ -101,6 +194,7 @@ async def run_forever() -> None:
                 logger.info("Enqueued %s final grading jobs", count)
         except Exception:
             logger.exception("Deadline poller iteration failed")
+        await run_periodic_jobs(last_run)
         await asyncio.sleep(POLL_INTERVAL_SECONDS)
 
 
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from app.core.config import settings
-from app.worker.tasks import grade_submission
+from app.observability.tracing import SPAN_KIND_PRODUCER, start_span
+from app.worker.tasks import build_submission_archive, grade_submission
 
 
 async def enqueue_grading(
@@ -12,10 +13,22 @@ async def enqueue_grading(
 ) -> bool:
     if not settings.redis_url.strip():
         return False
-    await grade_submission.kiq(
-        submission_id=submission_id,
-        phase=phase,
-        attempt=0,
-        priority_defer_count=max(0, int(priority_defer_count)),
-    )
+    with start_span(
+        "enqueue grade_submission",
+        kind=SPAN_KIND_PRODUCER,
+        attributes={"submission.id": submission_id, "grading.phase": phase},
+    ):
+        await grade_submission.kiq(
+            submission_id=submission_id,
+            phase=phase,
+            attempt=0,
+            priority_defer_count=max(0, int(priority_defer_count)),
+        )
+    return True
+
+
+async def enqueue_submission_archive(*, job_id: int) -> bool:
+    if not settings.redis_url.strip():
+        return False
+    await build_submission_archive.kiq(job_id=job_id)
     return True
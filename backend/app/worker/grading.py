@@ -10,6 +10,7 @@ from typing import Any
 from app.core.config import settings
 from app.integrations.jobe import JOBE_OUTCOME_OK, JobeClient
 from app.models.assignment import Assignment
+from app.observability.tracing import start_span
 from app.worker.zip_extract import ZipExtractionError, safe_extract_zip
 
 
@@ -251,7 +252,9 @@ async def prepare_jobe_run(
 
     with tempfile.TemporaryDirectory(prefix="marconi_zip_") as tmp:
         tmp_dir = Path(tmp)
-        extracted = safe_extract_zip(submission_path, tmp_dir)
+        with start_span("zip.extract") as span:
+            extracted = safe_extract_zip(submission_path, tmp_dir)
+            span.set_attribute("zip.files", len(extracted))
         by_name: dict[str, Path] = {p.name: p for p in extracted}
         available_files = set(by_name.keys())
 
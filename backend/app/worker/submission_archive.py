@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+import logging
+import os
+from pathlib import Path
+import re
+from typing import Any
+from uuid import uuid4
+import zipfile
+
+from app.core.config import settings
+from app.crud.submission_archives import (
+    SubmissionArchiveRow,
+    claim_submission_archive_job,
+    clear_submission_archive_files,
+    count_submission_archive_rows,
+    finish_submission_archive_job,
+    lock_expired_submission_archives,
+    stream_submission_archive_rows,
+    update_submission_archive_progress,
+)
+from app.db.session import SessionLocal
+from app.models.submission_archive_job import SubmissionArchiveJobStatus, SubmissionArchiveScope
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_CHUNK_SIZE = 256 * 1024
+_PROGRESS_EVERY_ENTRIES = 25
+_CLEANUP_BATCH_SIZE = 100
+_UNSAFE_NAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+class _ChunkSink:
+    """Write-only sink for zipfile.
+
+    It has no `seek`, so zipfile treats it as unseekable and emits data descriptors
+    after each entry instead of rewinding to patch local headers. That is what lets
+    the archive be produced front-to-back without a temp file.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._buffered = 0
+        self._offset = 0
+
+    def write(self, data: Any) -> int:
+        size = len(data)
+        if size:
+            self._chunks.append(bytes(data))
+            self._buffered += size
+            self._offset += size
+        return size
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        return None
+
+    @property
+    def buffered(self) -> int:
+        return self._buffered
+
+    def drain(self) -> bytes:
+        if not self._chunks:
+            return b""
+        data = self._chunks[0] if len(self._chunks) == 1 else b"".join(self._chunks)
+        self._chunks.clear()
+        self._buffered = 0
+        return data
+
+
+def _safe_component(value: str) -> str:
+    return _UNSAFE_NAME_RE.sub("_", value).strip("._")
+
+
+def archive_entry_name(row: SubmissionArchiveRow, *, scope: SubmissionArchiveScope) -> str:
+    folder = _safe_component(row.student_number or "") or f"user-{row.user_id}"
+    file_name = _safe_component(Path(row.file_name.replace("\\", "/")).name) or "submission"
+    if scope == SubmissionArchiveScope.all:
+        file_name = f"{row.submission_id}_{file_name}"
+    return f"{folder}/{file_name}"
+
+
+def archive_download_filename(*, assignment_id: int, scope: SubmissionArchiveScope) -> str:
+    return f"assignment-{assignment_id}-submissions-{scope.value}.zip"
+
+
+async def iter_submission_archive(
+    rows: AsyncIterator[SubmissionArchiveRow],
+    *,
+    scope: SubmissionArchiveScope,
+    chunk_size: int = ARCHIVE_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """Yield a ZIP archive of submission files as byte chunks.
+
+    Entries are stored (not deflated): uploads are small source files or ZIPs already,
+    and stored entries keep the per-byte cost to one CRC pass. File bytes are read with
+    `readinto` into one reusable buffer, so memory is bounded by `chunk_size` regardless
+    of cohort size.
+    """
+    chunk_size = max(16 * 1024, int(chunk_size))
+    sink = _ChunkSink()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        async for row in rows:
+            path = Path(row.storage_path)
+            try:
+                fh = await asyncio.to_thread(path.open, "rb")
+            except OSError:
+                logger.warning(
+                    "Skipping missing submission file in archive. submission_id=%s path=%s",
+                    row.submission_id,
+                    row.storage_path,
+                )
+                continue
+            try:
+                info = zipfile.ZipInfo(
+                    archive_entry_name(row, scope=scope),
+                    date_time=row.created_at.timetuple()[:6],
+                )
+                info.compress_type = zipfile.ZIP_STORED
+                # Declaring the size upfront lets zipfile decide on zip64 headers before writing.
+                info.file_size = os.fstat(fh.fileno()).st_size
+                with archive.open(info, mode="w") as dest:
+                    while True:
+                        read = await asyncio.to_thread(fh.readinto, view)
+                        if not read:
+                            break
+                        dest.write(view[:read])
+                        if sink.buffered >= chunk_size:
+                            yield sink.drain()
+            finally:
+                fh.close()
+            if sink.buffered >= chunk_size:
+                yield sink.drain()
+
+    tail = sink.drain()
+    if tail:
+        yield tail
+
+
+def _archives_root() -> Path:
+    root = Path(settings.uploads_dir).expanduser() / "archives"
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+async def build_submission_archive_job(
+    job_id: int,
+    *,
+    session_factory=SessionLocal,
+) -> dict[str, Any]:
+    """Build the ZIP for a queued archive job; used by the worker task and the no-queue fallback."""
+    async with session_factory() as db:
+        job = await claim_submission_archive_job(db, job_id=job_id)
+        if job is None:
+            return {"status": "skipped", "reason": "not_queued", "job_id": job_id}
+        course_id = job.course_id
+        assignment_id = job.assignment_id
+        scope = SubmissionArchiveScope(job.scope)
+        total = await count_submission_archive_rows(db, assignment_id=assignment_id, scope=scope)
+        await update_submission_archive_progress(db, job_id=job_id, processed_entries=0, total_entries=total)
+
+    dest = _archives_root() / f"assignment-{assignment_id}-{job_id}-{uuid4().hex}.zip"
+    processed = 0
+    size_bytes = 0
+    try:
+        async with session_factory() as stream_db, session_factory() as progress_db:
+
+            async def _counted_rows() -> AsyncIterator[SubmissionArchiveRow]:
+                nonlocal processed
+                async for row in stream_submission_archive_rows(
+                    stream_db,
+                    course_id=course_id,
+                    assignment_id=assignment_id,
+                    scope=scope,
+                ):
+                    yield row
+                    processed += 1
+                    if processed % _PROGRESS_EVERY_ENTRIES == 0:
+                        await update_submission_archive_progress(
+                            progress_db,
+                            job_id=job_id,
+                            processed_entries=processed,
+                        )
+
+            fh = await asyncio.to_thread(dest.open, "wb")
+            try:
+                async for chunk in iter_submission_archive(_counted_rows(), scope=scope):
+                    await asyncio.to_thread(fh.write, chunk)
+                    size_bytes += len(chunk)
+            finally:
+                fh.close()
+    except Exception as exc:
+        logger.exception("Submission archive job failed. job_id=%s", job_id)
+        dest.unlink(missing_ok=True)
+        async with session_factory() as db:
+            await finish_submission_archive_job(
+                db,
+                job_id=job_id,
+                status=SubmissionArchiveJobStatus.failed,
+                processed_entries=processed,
+                error=f"{type(exc).__name__}: {exc}",
+            )
+        return {"status": "failed", "job_id": job_id}
+
+    retention_hours = settings.submission_archive_retention_hours
+    async with session_factory() as db:
+        await finish_submission_archive_job(
+            db,
+            job_id=job_id,
+            status=SubmissionArchiveJobStatus.completed,
+            processed_entries=processed,
+            storage_path=str(dest),
+            size_bytes=size_bytes,
+            expires_at=(
+                datetime.now(timezone.utc) + timedelta(hours=retention_hours) if retention_hours > 0 else None
+            ),
+        )
+    return {"status": "completed", "job_id": job_id, "entries": processed, "size_bytes": size_bytes}
+
+
+async def cleanup_expired_submission_archives(*, session_factory=SessionLocal) -> int:
+    """Delete ZIPs of expired archive jobs; returns how many were removed."""
+    now = datetime.now(timezone.utc)
+    removed = 0
+    while True:
+        async with session_factory() as db:
+            expired = await lock_expired_submission_archives(db, now=now, limit=_CLEANUP_BATCH_SIZE)
+            # Files go first: if the commit fails, the next run retries with missing_ok.
+            for _, storage_path in expired:
+                await asyncio.to_thread(Path(storage_path).unlink, missing_ok=True)
+            await clear_submission_archive_files(db, job_ids=[job_id for job_id, _ in expired])
+        removed += len(expired)
+        if len(expired) < _CLEANUP_BATCH_SIZE:
+            return removed
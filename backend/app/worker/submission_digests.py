@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.notifications import (
+    CourseSubmissionDigest,
+    SubmissionDigestEntry,
+    apply_submission_digests,
+)
+from app.db.session import SessionLocal
+from app.observability.metrics import counter, gauge, histogram
+
+logger = logging.getLogger(__name__)
+
+# Staff "new submissions" digests, taken off the upload request path. Each upload records a
+# small entry here; entries for the same course are merged in memory and a background task
+# writes them every `notification_digest_flush_seconds` (one batch per course). Digests are
+# best-effort, as before: entries still pending when the process dies are lost.
+
+_entries_total = counter(
+    "marconi_notification_digest_entries_total",
+    "Submissions recorded for staff digests, by how they were written.",
+    ("path",),
+)
+_flush_seconds = histogram(
+    "marconi_notification_digest_flush_seconds",
+    "Time spent writing one batch of coalesced staff digests.",
+)
+_pending_courses = gauge(
+    "marconi_notification_digest_pending_courses",
+    "Courses with digest updates waiting for the next flush.",
+)
+
+
+class SubmissionDigestAggregator:
+    def __init__(
+        self,
+        *,
+        flush_seconds: float,
+        max_pending_courses: int,
+        session_factory=SessionLocal,
+    ) -> None:
+        self._flush_interval = flush_seconds
+        self._max_pending_courses = max_pending_courses
+        self._session_factory = session_factory
+        self._pending: dict[int, CourseSubmissionDigest] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def pending_courses(self) -> int:
+        return len(self._pending)
+
+    def record(self, entry: SubmissionDigestEntry) -> bool:
+        """Queue `entry` for the next flush; False means the caller should write it inline."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        digest = self._pending.get(entry.course_id)
+        if digest is None:
+            if len(self._pending) >= self._max_pending_courses:
+                return False
+            self._pending[entry.course_id] = CourseSubmissionDigest.from_entry(entry)
+        else:
+            digest.add(entry)
+        _entries_total.labels("coalesced").inc()
+        _pending_courses.set(len(self._pending))
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            # A fresh context: the long-lived writer must not inherit the first caller's trace.
+            self._task = loop.create_task(self._run(), context=contextvars.Context())
+        return True
+
+    async def _run(self) -> None:
+        # Exits once idle; the next record() starts a new flusher.
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
+            if not self._pending:
+                self._task = None
+                return
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        digests = list(self._pending.values())
+        self._pending = {}
+        _pending_courses.set(0)
+        started_at = time.perf_counter()
+        try:
+            async with self._session_factory() as db:
+                await apply_submission_digests(db, digests=digests)
+        except Exception:
+            logger.exception("Failed to flush staff submission digests. courses=%s", len(digests))
+        finally:
+            _flush_seconds.observe(time.perf_counter() - started_at)
+        return len(digests)
+
+
+_aggregator: SubmissionDigestAggregator | None = None
+
+
+def get_submission_digest_aggregator() -> SubmissionDigestAggregator | None:
+    """The process-wide aggregator, or None when digests are configured to be written inline."""
+    global _aggregator
+    if settings.notification_digest_flush_seconds <= 0:
+        return None
+    if _aggregator is None:
+        _aggregator = SubmissionDigestAggregator(
+            flush_seconds=settings.notification_digest_flush_seconds,
+            max_pending_courses=settings.notification_digest_max_pending_courses,
+        )
+    return _aggregator
+
+
+def _reset_submission_digest_aggregator_for_tests(
+    aggregator: SubmissionDigestAggregator | None = None,
+) -> None:
+    global _aggregator
+    _aggregator = aggregator
+
+
+async def record_submission_digest(db: AsyncSession, *, entry: SubmissionDigestEntry) -> None:
+    aggregator = get_submission_digest_aggregator()
+    if aggregator is not None and aggregator.record(entry):
+        return
+    # Inline fallback: aggregation disabled, no running loop, or too many pending courses.
+    _entries_total.labels("inline").inc()
+    await apply_submission_digests(db, digests=[CourseSubmissionDigest.from_entry(entry)])
+
+
+async def drain_submission_digests() -> None:
+    if _aggregator is not None:
+        await _aggregator.flush()
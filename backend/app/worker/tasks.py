@@ -10,11 +10,12 @@ from types import SimpleNamespace
 from typing import Any, Awaitable, Callable, TypeVar
 
 from sqlalchemy import select, update
-from taskiq import TaskiqEvents
+from taskiq import Context, TaskiqDepends, TaskiqEvents
 
 from app.core.config import settings
 from app.db.session import SessionLocal
 from app.integrations.jobe import (
+    JOBE_OUTCOME_OK,
     JobeCircuitOpenError,
     JobeClient,
     JobeError,
@@ -28,8 +29,14 @@ from app.models.assignment_autograde_version import AssignmentAutogradeVersion
 from app.models.grading_event import GradingEvent
 from app.models.submission import Submission, SubmissionStatus
 from app.models.submission_test_result import GradingPhase, SubmissionTestResult
+from app.observability.metrics import counter, histogram
+from app.observability.metrics_server import start_metrics_server
+from app.observability.query_stats import report_query_stats, track_queries
+from app.observability.tracing import SPAN_KIND_CONSUMER, configure_tracing, flush_spans, start_span
+from app.realtime.events import publish_submission_status
 from app.worker.broker import broker
 from app.worker.grading import prepare_jobe_run, run_test_case
+from app.worker.submission_archive import build_submission_archive_job
 from app.worker.zip_extract import ZipExtractionError
 
 logger = logging.getLogger(__name__)
@@ -42,6 +49,77 @@ _jobe_health_last_error: str | None = None
 _jobe_concurrency_semaphore = asyncio.Semaphore(
     max(1, int(settings.jobe_worker_max_concurrent_requests))
 )
+_metrics_server: asyncio.AbstractServer | None = None
+
+# Grading metrics are recorded in-process as grading events happen (scraped from each
+# worker's metrics port, or from the API's /metrics with the in-memory broker).
+_GRADING_LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+_SLOT_WAIT_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_grading_jobs_total = counter(
+    "marconi_grading_jobs_total",
+    "Grading jobs finished by phase and result.",
+    ("phase", "result"),
+)
+_grading_retries_total = counter(
+    "marconi_grading_retries_total",
+    "Grading retries scheduled by phase.",
+    ("phase",),
+)
+_jobe_errors_total = counter(
+    "marconi_jobe_errors_total",
+    "JOBE-related grading errors by phase and context.",
+    ("phase", "context"),
+)
+_grading_latency_seconds = histogram(
+    "marconi_grading_latency_seconds",
+    "Time from claiming a submission to its final grading outcome, by phase and result.",
+    ("phase", "result"),
+    buckets=_GRADING_LATENCY_BUCKETS,
+)
+_jobe_slot_wait_seconds = histogram(
+    "marconi_jobe_slot_wait_seconds",
+    "Time spent waiting for a JOBE concurrency slot, by grading step.",
+    ("context",),
+    buckets=_SLOT_WAIT_BUCKETS,
+)
+
+# Bound up front so the hot path skips label resolution and every series exports zeros
+# before its first event.
+_PHASES = (GradingPhase.practice.value, GradingPhase.final.value)
+_job_results = {
+    (phase, result): _grading_jobs_total.labels(phase, result)
+    for phase in _PHASES
+    for result in ("graded", "error")
+}
+_job_latencies = {
+    (phase, result): _grading_latency_seconds.labels(phase, result)
+    for phase in _PHASES
+    for result in ("graded", "error")
+}
+_job_retries = {phase: _grading_retries_total.labels(phase) for phase in _PHASES}
+_slot_waits = {context: _jobe_slot_wait_seconds.labels(context) for context in ("prepare", "run_test_case")}
+
+
+def _observe_grading_event(
+    *,
+    phase: str,
+    event_type: str,
+    reason: str | None,
+    context: str | None,
+    duration_ms: int | None,
+) -> None:
+    if event_type == "retry":
+        (_job_retries.get(phase) or _grading_retries_total.labels(phase)).inc()
+        return
+    if event_type not in ("graded", "error"):
+        return
+    key = (phase, event_type)
+    (_job_results.get(key) or _grading_jobs_total.labels(*key)).inc()
+    if duration_ms is not None:
+        (_job_latencies.get(key) or _grading_latency_seconds.labels(*key)).observe(duration_ms / 1000.0)
+    if event_type == "error" and reason is not None and reason.startswith("jobe"):
+        _jobe_errors_total.labels(phase, context or "unknown").inc()
 
 
 def _jobe_client() -> JobeClient:
@@ -122,8 +200,10 @@ def _reset_jobe_concurrency_semaphore_for_tests(limit: int | None = None) -> Non
 @asynccontextmanager
 async def _acquire_jobe_slot(*, context: str):
     wait_started = time.monotonic()
-    await _jobe_concurrency_semaphore.acquire()
+    with start_span("jobe.slot_wait", attributes={"jobe.context": context}):
+        await _jobe_concurrency_semaphore.acquire()
     wait_seconds = time.monotonic() - wait_started
+    (_slot_waits.get(context) or _jobe_slot_wait_seconds.labels(context)).observe(wait_seconds)
     if wait_seconds >= 1.0:
         logger.info(
             "JOBE concurrency slot acquired after waiting %.2fs (context=%s)",
@@ -210,6 +290,45 @@ def _record_grading_event(
         context=context,
         duration_ms=duration_ms,
     )
+    _observe_grading_event(
+        phase=phase,
+        event_type=event_type,
+        reason=reason,
+        context=context,
+        duration_ms=duration_ms,
+    )
+
+
+@broker.on_event(TaskiqEvents.WORKER_STARTUP)
+async def _worker_configure_tracing(_state: Any) -> None:
+    configure_tracing(service_name="marconi-worker")
+
+
+@broker.on_event(TaskiqEvents.WORKER_SHUTDOWN)
+async def _worker_flush_spans(_state: Any) -> None:
+    flush_spans()
+
+
+@broker.on_event(TaskiqEvents.WORKER_STARTUP)
+async def _worker_start_metrics_server(_state: Any) -> None:
+    global _metrics_server
+    if settings.worker_metrics_port <= 0 or _metrics_server is not None:
+        return
+    _metrics_server = await start_metrics_server(
+        host=settings.worker_metrics_host,
+        port=settings.worker_metrics_port,
+        port_span=settings.worker_metrics_port_span,
+    )
+
+
+@broker.on_event(TaskiqEvents.WORKER_SHUTDOWN)
+async def _worker_stop_metrics_server(_state: Any) -> None:
+    global _metrics_server
+    if _metrics_server is None:
+        return
+    _metrics_server.close()
+    await _metrics_server.wait_closed()
+    _metrics_server = None
 
 
 @broker.on_event(TaskiqEvents.WORKER_STARTUP)
@@ -221,6 +340,28 @@ async def _worker_startup_health_check(_state: Any) -> None:
     logger.info("JOBE startup health check passed")
 
 
+async def _publish_submission_outcome(submission_id: int, *, session_factory) -> None:
+    async with session_factory() as db:
+        result = await db.execute(
+            select(
+                Submission.user_id,
+                Submission.assignment_id,
+                Submission.status,
+                Submission.score,
+            ).where(Submission.id == submission_id)
+        )
+        row = result.first()
+    if row is None:
+        return
+    await publish_submission_status(
+        submission_id=submission_id,
+        user_id=row[0],
+        assignment_id=row[1],
+        status=row[2],
+        score=row[3],
+    )
+
+
 async def _grade_submission_impl(
     submission_id: int,
     phase: str = "practice",
@@ -228,6 +369,41 @@ async def _grade_submission_impl(
     priority_defer_count: int = 0,
     *,
     session_factory=SessionLocal,
+    traceparent: str | None = None,
+) -> dict[str, Any]:
+    with start_span(
+        "grade_submission",
+        traceparent=traceparent,
+        kind=SPAN_KIND_CONSUMER,
+        attributes={"submission.id": submission_id, "grading.phase": phase, "grading.attempt": attempt},
+    ) as span, track_queries() as queries:
+        result = await _grade_submission_attempt(
+            submission_id=submission_id,
+            phase=phase,
+            attempt=attempt,
+            priority_defer_count=priority_defer_count,
+            session_factory=session_factory,
+        )
+        span.set_attribute("grading.status", str(result.get("status")))
+        if result.get("status") == "error":
+            span.set_error(str(result.get("reason") or "error"))
+        if result.get("status") in {"graded", "error", "retrying"}:
+            try:
+                await _publish_submission_outcome(submission_id, session_factory=session_factory)
+            except Exception:
+                logger.warning("Failed to publish grading outcome. submission_id=%s", submission_id, exc_info=True)
+        span.set_attribute("db.query_count", queries.count)
+    report_query_stats(queries, label="grade_submission")
+    return result
+
+
+async def _grade_submission_attempt(
+    submission_id: int,
+    phase: str = "practice",
+    attempt: int = 0,
+    priority_defer_count: int = 0,
+    *,
+    session_factory=SessionLocal,
 ) -> dict[str, Any]:
     phase = str(phase or "practice").strip().lower()
     if phase not in {GradingPhase.practice.value, GradingPhase.final.value}:
@@ -245,8 +421,8 @@ async def _grade_submission_impl(
         result = await db.execute(
             update(Submission)
             .where(Submission.id == submission_id, Submission.status == SubmissionStatus.pending)
-            .values(status=SubmissionStatus.grading)
-            .returning(Submission.id)
+            .values(status=SubmissionStatus.grading, error_kind=None, tests_passed=None, tests_total=None)
+            .returning(Submission.id, Submission.user_id, Submission.assignment_id)
         )
         row = result.first()
         if row is None:
@@ -259,6 +435,12 @@ async def _grade_submission_impl(
             )
             return {"status": "skipped"}
         await db.commit()
+    await publish_submission_status(
+        submission_id=submission_id,
+        user_id=row[1],
+        assignment_id=row[2],
+        status=SubmissionStatus.grading,
+    )
 
     try:
         await _ensure_jobe_healthy()
@@ -268,6 +450,7 @@ async def _grade_submission_impl(
             if submission is None:
                 return {"status": "missing"}
             submission.status = SubmissionStatus.error
+            submission.error_kind = "infra_error"
             submission.score = 0
             submission.feedback = "Grading infrastructure unavailable (JOBE health check failed)."
             _record_grading_event(
@@ -292,6 +475,7 @@ async def _grade_submission_impl(
             if submission is None:
                 return {"status": "missing"}
             submission.status = SubmissionStatus.error
+            submission.error_kind = "infra_error"
             submission.score = 0
             submission.feedback = str(exc)
             _record_grading_event(
@@ -328,6 +512,7 @@ async def _grade_submission_impl(
         assignment = await db.get(Assignment, submission.assignment_id)
         if assignment is None:
             submission.status = SubmissionStatus.error
+            submission.error_kind = "internal_error"
             submission.feedback = "Assignment missing"
             _record_grading_event(
                 db,
@@ -381,6 +566,7 @@ async def _grade_submission_impl(
             submission.final_autograde_version_id = version_id
         if version_id is None:
             submission.status = SubmissionStatus.error
+            submission.error_kind = "internal_error"
             submission.score = 0
             submission.feedback = "Autograde configuration missing. Ask staff to configure autograding for this assignment."
             _record_grading_event(
@@ -398,6 +584,7 @@ async def _grade_submission_impl(
         version = await db.get(AssignmentAutogradeVersion, int(version_id))
         if version is None:
             submission.status = SubmissionStatus.error
+            submission.error_kind = "internal_error"
             submission.score = 0
             submission.feedback = "Autograde configuration missing. Ask staff to configure autograding for this assignment."
             _record_grading_event(
@@ -426,6 +613,7 @@ async def _grade_submission_impl(
         tests = list(tests_result.scalars().all())
         if not tests:
             submission.status = SubmissionStatus.error
+            submission.error_kind = "internal_error"
             submission.score = 0
             if phase == GradingPhase.practice.value:
                 submission.feedback = (
@@ -457,11 +645,12 @@ async def _grade_submission_impl(
         submission_path = Path(submission.storage_path)
         try:
             async def _prepare() -> Any:
-                return await prepare_jobe_run(
-                    jobe,
-                    submission_path=submission_path,
-                    assignment=assignment_config,
-                )
+                with start_span("prepare_jobe_run"):
+                    return await prepare_jobe_run(
+                        jobe,
+                        submission_path=submission_path,
+                        assignment=assignment_config,
+                    )
 
             prepared = await _run_with_jobe_slot(
                 context="prepare_jobe_run",
@@ -469,6 +658,7 @@ async def _grade_submission_impl(
             )
         except JobeCircuitOpenError:
             submission.status = SubmissionStatus.error
+            submission.error_kind = "infra_error"
             submission.score = 0
             submission.feedback = "Grading infrastructure unavailable (JOBE circuit breaker open)."
             _record_grading_event(
@@ -485,6 +675,7 @@ async def _grade_submission_impl(
             return {"status": "error", "reason": "jobe_circuit_open", "phase": phase}
         except ZipExtractionError as exc:
             submission.status = SubmissionStatus.error
+            submission.error_kind = "internal_error"
             submission.score = 0
             submission.feedback = str(exc)
             _record_grading_event(
@@ -527,6 +718,7 @@ async def _grade_submission_impl(
                 return {"status": "retrying", "attempt": attempt + 1, "phase": phase}
 
             submission.status = SubmissionStatus.error
+            submission.error_kind = "infra_error"
             submission.score = 0
             submission.feedback = "Grading infrastructure temporarily unavailable. Please retry."
             _record_grading_event(
@@ -543,6 +735,7 @@ async def _grade_submission_impl(
             return {"status": "error", "reason": "jobe_transient", "phase": phase}
         except JobeError:
             submission.status = SubmissionStatus.error
+            submission.error_kind = "internal_error"
             submission.score = 0
             submission.feedback = "Grading failed due to JOBE error"
             logger.exception(
@@ -564,6 +757,7 @@ async def _grade_submission_impl(
             return {"status": "error", "reason": "jobe_error", "phase": phase}
         except Exception:
             submission.status = SubmissionStatus.error
+            submission.error_kind = "internal_error"
             submission.score = 0
             submission.feedback = "Grading failed due to internal error"
             logger.exception(
@@ -593,18 +787,20 @@ async def _grade_submission_impl(
         for tc in tests:
             try:
                 async def _run() -> Any:
-                    return await run_test_case(
-                        jobe,
-                        prepared=prepared,
-                        stdin=tc.stdin,
-                        expected_stdout=tc.expected_stdout,
-                        expected_stderr=tc.expected_stderr,
-                        comparison_mode=getattr(tc, "comparison_mode", "trim") or "trim",
-                    )
+                    with start_span("run_test_case", attributes={"test_case.id": tc.test_case_id}):
+                        return await run_test_case(
+                            jobe,
+                            prepared=prepared,
+                            stdin=tc.stdin,
+                            expected_stdout=tc.expected_stdout,
+                            expected_stderr=tc.expected_stderr,
+                            comparison_mode=getattr(tc, "comparison_mode", "trim") or "trim",
+                        )
 
                 check = await _run_with_jobe_slot(context="run_test_case", op=_run)
             except JobeCircuitOpenError:
                 submission.status = SubmissionStatus.error
+                submission.error_kind = "infra_error"
                 submission.score = 0
                 submission.feedback = "Grading infrastructure unavailable (JOBE circuit breaker open)."
                 _record_grading_event(
@@ -647,6 +843,7 @@ async def _grade_submission_impl(
                     return {"status": "retrying", "attempt": attempt + 1, "phase": phase}
 
                 submission.status = SubmissionStatus.error
+                submission.error_kind = "infra_error"
                 submission.score = 0
                 submission.feedback = "Grading infrastructure temporarily unavailable. Please retry."
                 _record_grading_event(
@@ -663,6 +860,7 @@ async def _grade_submission_impl(
                 return {"status": "error", "reason": "jobe_transient", "phase": phase}
             except JobeError:
                 submission.status = SubmissionStatus.error
+                submission.error_kind = "internal_error"
                 submission.score = 0
                 submission.feedback = "Grading failed due to JOBE error"
                 logger.exception(
@@ -685,6 +883,7 @@ async def _grade_submission_impl(
                 return {"status": "error", "reason": "jobe_error", "phase": phase}
             except Exception:
                 submission.status = SubmissionStatus.error
+                submission.error_kind = "internal_error"
                 submission.score = 0
                 submission.feedback = "Grading failed due to internal error"
                 logger.exception(
@@ -720,6 +919,7 @@ async def _grade_submission_impl(
 
             if check.compile_output.strip():
                 submission.status = SubmissionStatus.error
+                submission.error_kind = "compile_error"
                 submission.score = 0
                 submission.feedback = check.compile_output
                 terminal_reason = "compile_error"
@@ -739,8 +939,14 @@ async def _grade_submission_impl(
             commit=False,
         )
 
+        # Summarised here so list views never need the (large) result rows.
+        submission.tests_passed = sum(1 for r in results if r.passed)
+        submission.tests_total = len(tests)
         if submission.status != SubmissionStatus.error:
             submission.status = SubmissionStatus.graded
+            submission.error_kind = (
+                "runtime_error" if any(r.outcome != JOBE_OUTCOME_OK for r in results) else None
+            )
             submission.score = min(passed_points, cap_points if cap_points > 0 else passed_points)
             prefix = "Final" if phase == GradingPhase.final.value else "Practice"
             submission.feedback = f"{prefix}: Passed {passed_points}/{max_points} points across {len(tests)} tests."
@@ -779,10 +985,20 @@ async def grade_submission(
     phase: str = "practice",
     attempt: int = 0,
     priority_defer_count: int = 0,
+    context: Context = TaskiqDepends(),
 ) -> dict[str, Any]:
     return await _grade_submission_impl(
         submission_id=submission_id,
         phase=phase,
         attempt=attempt,
         priority_defer_count=priority_defer_count,
+        traceparent=context.message.labels.get("traceparent"),
     )
+
+
+@broker.task
+async def build_submission_archive(job_id: int) -> dict[str, Any]:
+    with track_queries() as queries:
+        result = await build_submission_archive_job(job_id=job_id)
+    report_query_stats(queries, label="build_submission_archive")
+    return result
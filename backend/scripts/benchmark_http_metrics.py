@@ -0,0 +1,124 @@
+"""Benchmark the per-request overhead of the HTTP metrics middleware.
+
+Drives a small FastAPI app directly over ASGI (no sockets, no database) with and without
+`HttpMetricsMiddleware`, alternating rounds to even out noise, then reports the median
+per-request cost of each and the difference. The same comparison over a no-op ASGI app
+isolates the middleware's own cost from routing noise. It also counts the blocks retained
+per instrumented request once the route's series exist, which should stay flat no matter
+how many distinct paths hit the same route template.
+
+    BENCH_REQUESTS=50000 python -m scripts.benchmark_http_metrics
+"""
+
+import asyncio
+import os
+import statistics
+import time
+import tracemalloc
+
+from fastapi import FastAPI
+
+from app.observability.http_metrics import HttpMetricsMiddleware
+
+REQUESTS = int(os.environ.get("BENCH_REQUESTS", "20000"))
+ROUNDS = int(os.environ.get("BENCH_ROUNDS", "5"))
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/courses/{course_id}/assignments/{assignment_id}")
+    async def assignment(course_id: int, assignment_id: int) -> dict:
+        return {"course_id": course_id, "assignment_id": assignment_id}
+
+    return app
+
+
+class _Route:
+    path_format = "/api/v1/courses/{course_id}/assignments/{assignment_id}"
+
+
+_ROUTE = _Route()
+
+
+async def _noop_app(scope, receive, send) -> None:
+    scope["route"] = _ROUTE
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message: dict) -> None:
+    return None
+
+
+def _scope(i: int) -> dict:
+    path = f"/api/v1/courses/{i % 500}/assignments/{i}"
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+
+async def _run(app, scopes: list[dict]) -> float:
+    started = time.perf_counter()
+    for scope in scopes:
+        await app(dict(scope), _receive, _send)
+    return (time.perf_counter() - started) / len(scopes) * 1e6
+
+
+async def _allocated_blocks(app, scopes: list[dict]) -> float:
+    tracemalloc.start()
+    try:
+        await _run(app, scopes[:100])
+        before = tracemalloc.take_snapshot()
+        await _run(app, scopes)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    grown = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    return grown / len(scopes)
+
+
+async def _compare(label: str, bare, scopes: list[dict]) -> None:
+    instrumented = HttpMetricsMiddleware(bare)
+    await _run(bare, scopes[:1000])
+    await _run(instrumented, scopes[:1000])
+    bare_us, instrumented_us = [], []
+    for _ in range(ROUNDS):
+        bare_us.append(await _run(bare, scopes))
+        instrumented_us.append(await _run(instrumented, scopes))
+
+    bare_median = statistics.median(bare_us)
+    instrumented_median = statistics.median(instrumented_us)
+    print(
+        f"{label:<8} bare={bare_median:.2f}us instrumented={instrumented_median:.2f}us "
+        f"overhead={instrumented_median - bare_median:.2f}us/request "
+        f"({(instrumented_median / bare_median - 1) * 100:.1f}%)"
+    )
+
+
+async def main() -> None:
+    scopes = [_scope(i) for i in range(REQUESTS)]
+    print(f"requests={REQUESTS} rounds={ROUNDS}")
+    await _compare("noop", _noop_app, scopes)
+    await _compare("fastapi", _build_app(), scopes)
+    blocks = await _allocated_blocks(HttpMetricsMiddleware(_build_app()), scopes)
+    print(f"retained blocks per instrumented request: {blocks:.4f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,213 @@
+"""Benchmark staff "next ungraded" navigation on a synthetic dataset.
+
+Seeds a scratch schema (dropped afterwards unless BENCH_KEEP=1), then walks the queue of
+one course with the stored-priority query and with the previous CASE-ordered query,
+printing per-step latency and an EXPLAIN of each.
+
+    BENCH_SUBMISSIONS=2000000 python -m scripts.benchmark_next_ungraded
+"""
+
+import os
+import statistics
+import time
+
+from sqlalchemy import and_, case, event, or_, select, text
+
+from app.crud.staff_submissions import _base_staff_submission_query, get_next_ungraded_staff_submission_row
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.models.course import Course
+from app.models.submission import SUBMISSION_TRIAGE_PRIORITY, Submission, SubmissionStatus
+
+SCHEMA = os.environ.get("BENCH_SCHEMA", "bench_next_ungraded")
+SUBMISSIONS = int(os.environ.get("BENCH_SUBMISSIONS", "1000000"))
+COURSES = int(os.environ.get("BENCH_COURSES", "200"))
+STEPS = int(os.environ.get("BENCH_STEPS", "200"))
+STUDENTS_PER_COURSE = 50
+ASSIGNMENTS_PER_COURSE = 10
+
+SEED_SQL = [
+    "INSERT INTO organizations (name) VALUES ('bench')",
+    "INSERT INTO users (email) VALUES ('staff@bench.invalid')",
+    """
+    INSERT INTO courses (organization_id, code, title)
+    SELECT 1, 'B' || g, 'Bench ' || g FROM generate_series(1, :courses) AS g
+    """,
+    """
+    INSERT INTO assignments (course_id, title, max_points, autograde_mode)
+    SELECT c, 'A' || a, 100, 'practice_only'
+    FROM generate_series(1, :courses) AS c, generate_series(1, :assignments) AS a
+    """,
+    """
+    INSERT INTO users (email)
+    SELECT 's' || g || '@bench.invalid' FROM generate_series(1, :courses * :students) AS g
+    """,
+    """
+    INSERT INTO course_memberships (course_id, user_id, role)
+    SELECT g, 1, 'ta' FROM generate_series(1, :courses) AS g
+    """,
+    """
+    INSERT INTO course_memberships (course_id, user_id, role)
+    SELECT (g - 1) / :students + 1, g + 1, 'student' FROM generate_series(1, :courses * :students) AS g
+    """,
+    # ~85% graded, the rest spread over the triage states; course skew is uniform.
+    """
+    INSERT INTO submissions (assignment_id, user_id, file_name, size_bytes, storage_path, status, created_at)
+    SELECT
+        (c - 1) * :assignments + 1 + (random() * (:assignments - 1))::int,
+        (c - 1) * :students + 2 + (random() * (:students - 1))::int,
+        'main.c', 100, 'bench/main.c',
+        (CASE
+            WHEN r < 0.85 THEN 'graded'
+            WHEN r < 0.95 THEN 'pending'
+            WHEN r < 0.98 THEN 'grading'
+            ELSE 'error'
+        END)::submission_status,
+        now() - (random() * interval '120 days')
+    FROM (
+        SELECT 1 + (random() * (:courses - 1))::int AS c, random() AS r
+        FROM generate_series(1, :submissions)
+    ) AS s
+    """,
+]
+
+
+def _legacy_statement(*, staff_user_id: int, course_id: int, after: tuple | None):
+    priority = case(
+        (Submission.status == SubmissionStatus.pending, 0),
+        (Submission.status == SubmissionStatus.grading, 1),
+        (Submission.status == SubmissionStatus.error, 2),
+        else_=3,
+    )
+    stmt = (
+        _base_staff_submission_query(staff_user_id=staff_user_id)
+        .where(Course.id == course_id)
+        .where(Submission.status != SubmissionStatus.graded)
+    )
+    if after is not None:
+        after_priority, after_created, after_id = after
+        stmt = stmt.where(
+            or_(
+                priority > after_priority,
+                and_(priority == after_priority, Submission.created_at > after_created),
+                and_(priority == after_priority, Submission.created_at == after_created, Submission.id > after_id),
+            )
+        )
+    return stmt.order_by(priority, Submission.created_at.asc(), Submission.id.asc()).limit(1)
+
+
+async def _seed() -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.execute(text(f"SET search_path TO {SCHEMA}"))
+        await conn.run_sync(Base.metadata.create_all)
+        params = {
+            "courses": COURSES,
+            "assignments": ASSIGNMENTS_PER_COURSE,
+            "students": STUDENTS_PER_COURSE,
+            "submissions": SUBMISSIONS,
+        }
+        for sql in SEED_SQL:
+            await conn.execute(text(sql), params)
+        await conn.execute(text("ANALYZE"))
+
+
+async def _walk(db, step) -> list[float]:
+    timings = []
+    after_id = None
+    for _ in range(STEPS):
+        started = time.perf_counter()
+        after_id = await step(after_id)
+        timings.append((time.perf_counter() - started) * 1000)
+        if after_id is None:
+            break
+    return timings
+
+
+async def _explain(db, run) -> str:
+    captured: list[tuple] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    sync_engine = db.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _record)
+    try:
+        await run()
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", _record)
+    statement, parameters = captured[-1]
+    conn = await db.connection()
+    result = await conn.exec_driver_sql("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters)
+    return "\n".join(row[0] for row in result)
+
+
+def _report(label: str, timings: list[float]) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{label:<8} steps={len(timings)} mean={statistics.mean(timings):.2f}ms "
+        f"p50={statistics.median(timings):.2f}ms p95={p95:.2f}ms"
+    )
+
+
+async def main() -> None:
+    print(f"Seeding {SUBMISSIONS} submissions across {COURSES} courses into schema {SCHEMA}...")
+    started = time.perf_counter()
+    await _seed()
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+    try:
+        async with SessionLocal() as db:
+            await db.execute(text(f"SET search_path TO {SCHEMA}"))
+            staff_user_id, course_id = 1, COURSES // 2
+
+            async def stored_step(after_id):
+                row = await get_next_ungraded_staff_submission_row(
+                    db, staff_user_id=staff_user_id, course_id=course_id, after_submission_id=after_id
+                )
+                return None if row is None else row.submission.id
+
+            async def legacy_step(after_id):
+                after = None
+                if after_id is not None:
+                    status, created_at, sid = (
+                        await db.execute(
+                            select(Submission.status, Submission.created_at, Submission.id).where(
+                                Submission.id == after_id
+                            )
+                        )
+                    ).one()
+                    after = (SUBMISSION_TRIAGE_PRIORITY[status], created_at, sid)
+                row = (
+                    await db.execute(_legacy_statement(staff_user_id=staff_user_id, course_id=course_id, after=after))
+                ).first()
+                return None if row is None else row[0].id
+
+            # Warm the cache once so both variants start from the same state.
+            await _walk(db, stored_step)
+            _report("legacy", await _walk(db, legacy_step))
+            _report("stored", await _walk(db, stored_step))
+
+            midpoint = await stored_step(None)
+            for _ in range(STEPS // 2):
+                nxt = await stored_step(midpoint)
+                if nxt is None:
+                    break
+                midpoint = nxt
+            print("\n-- legacy plan (next after a mid-queue submission)")
+            print(await _explain(db, lambda: legacy_step(midpoint)))
+            print("\n-- stored plan (next after a mid-queue submission)")
+            print(await _explain(db, lambda: stored_step(midpoint)))
+    finally:
+        if os.environ.get("BENCH_KEEP") != "1":
+            async with engine.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    asyncio.run(main())
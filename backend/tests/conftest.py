@@ -3,6 +3,7 @@ import os
 from collections.abc import AsyncGenerator
 from pathlib import Path
 from collections.abc import Generator
+from contextlib import contextmanager
 from uuid import uuid4
 
 import pytest
@@ -31,6 +32,8 @@ os.environ["REDIS_URL"] = ""
 os.environ["RATE_LIMIT_LOGIN_PER_MINUTE"] = "100000"
 os.environ["RATE_LIMIT_EXECUTION_PER_MINUTE"] = "100000"
 os.environ["RATE_LIMIT_UPLOADS_PER_MINUTE"] = "100000"
+# Write staff digests on the request so tests can assert on them immediately.
+os.environ["NOTIFICATION_DIGEST_FLUSH_SECONDS"] = "0"
 
 from app.main import app  # noqa: E402
 
@@ -77,6 +80,7 @@ async def db() -> AsyncGenerator[AsyncSession, None]:
 async def client(db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     from sqlalchemy import text
     from app.crud.audit import drain_audit_tasks
+    from app.crud.gradebook import _reset_gradebook_cache_for_tests
     from app.db.deps import get_db
 
     async def _override_get_db():
@@ -90,6 +94,8 @@ async def client(db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
             yield c
     finally:
         await drain_audit_tasks()
+        # Course ids repeat across per-test schemas; don't let cached matrices leak between tests.
+        _reset_gradebook_cache_for_tests()
         app.dependency_overrides.clear()
 
 
@@ -102,3 +108,23 @@ def disable_async_audit_dispatch() -> Generator[None, None, None]:
         yield
     finally:
         set_audit_dispatch_enabled(True)
+
+
+@pytest.fixture()
+def max_queries():
+    """`with max_queries(n): ...` fails if the block (including requests made through
+    `client`) executes more than `n` database statements."""
+    from app.observability.query_stats import track_queries
+
+    @contextmanager
+    def _max_queries(limit: int):
+        with track_queries() as stats:
+            yield stats
+        if stats.count > limit:
+            listing = "\n".join(
+                f"{n}x {' '.join(statement.split())[:200]}"
+                for statement, n in stats.repeated(1)
+            )
+            pytest.fail(f"{stats.count} statements executed (limit {limit}):\n{listing}")
+
+    return _max_queries
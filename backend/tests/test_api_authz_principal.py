@@ -0,0 +1,71 @@
+import pytest
+
+from app.api.deps.principal import _reset_principal_cache_for_tests, load_principal
+from app.core.config import settings
+from app.models.course_membership import CourseRole
+from app.models.organization_membership import OrgRole
+
+
+async def _login(client, *, email: str, password: str) -> None:
+    r = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200
+
+
+async def _setup(client) -> tuple[int, int, int, int]:
+    await _login(client, email="admin@example.com", password="password123")
+    r = await client.post("/api/v1/orgs", json={"name": "Org Authz"})
+    assert r.status_code == 201
+    org_id = r.json()["id"]
+    r = await client.post(f"/api/v1/orgs/{org_id}/courses", json={"code": "AZ101", "title": "Authz"})
+    assert r.status_code == 201
+    course_id = r.json()["id"]
+    r = await client.post("/api/v1/users", json={"email": "authz.student@example.com", "password": "password123"})
+    assert r.status_code == 201
+    user_id = r.json()["id"]
+    r = await client.post(
+        f"/api/v1/staff/courses/{course_id}/memberships",
+        json={"user_id": user_id, "role": "student"},
+    )
+    assert r.status_code == 201
+    membership_id = r.json()["id"]
+    await client.post("/api/v1/auth/logout")
+    return org_id, course_id, user_id, membership_id
+
+
+@pytest.mark.asyncio
+async def test_principal_loads_course_and_org_roles_in_one_query(client, db):
+    org_id, course_id, user_id, _ = await _setup(client)
+    await _login(client, email="admin@example.com", password="password123")
+    r = await client.post(f"/api/v1/orgs/{org_id}/memberships", json={"user_id": user_id, "role": "ta"})
+    assert r.status_code == 201
+
+    principal = await load_principal(db, user_id=user_id)
+    assert principal.course_role(course_id) == CourseRole.student
+    assert principal.org_role(org_id) == OrgRole.ta
+    assert principal.course_role(course_id + 1000) is None
+
+
+@pytest.mark.asyncio
+async def test_cross_request_principal_cache_is_invalidated_on_membership_change(client, monkeypatch):
+    monkeypatch.setattr(settings, "authz_cache_ttl_seconds", 60)
+    _reset_principal_cache_for_tests()
+    try:
+        _, course_id, _, membership_id = await _setup(client)
+
+        await _login(client, email="authz.student@example.com", password="password123")
+        r = await client.get(f"/api/v1/student/courses/{course_id}")
+        assert r.status_code == 200
+        r = await client.get(f"/api/v1/student/courses/{course_id}/modules")
+        assert r.status_code == 200
+
+        await client.post("/api/v1/auth/logout")
+        await _login(client, email="admin@example.com", password="password123")
+        r = await client.delete(f"/api/v1/staff/courses/{course_id}/memberships/{membership_id}")
+        assert r.status_code == 204
+
+        await client.post("/api/v1/auth/logout")
+        await _login(client, email="authz.student@example.com", password="password123")
+        r = await client.get(f"/api/v1/student/courses/{course_id}/modules")
+        assert r.status_code == 403
+    finally:
+        _reset_principal_cache_for_tests()
@@ -121,3 +121,26 @@ async def test_csv_import_accepts_case_insensitive_headers(client):
     assert body["created_invites"] == 1
     assert body["auto_enrolled"] == 0
     assert body["issues"] == []
+
+
+@pytest.mark.asyncio
+async def test_csv_import_query_count_does_not_grow_with_the_roster(client, max_queries):
+    await _login_admin(client)
+    org_id = (await client.post("/api/v1/orgs", json={"name": "Org Budget"})).json()["id"]
+    course_id = (
+        await client.post(f"/api/v1/orgs/{org_id}/courses", json={"code": "CS150", "title": "Budget"})
+    ).json()["id"]
+
+    async def _import(first: int, count: int) -> int:
+        lines = [b"email,name,student_number,programme"]
+        lines += [f"budget{i}@example.com,Student {i},BG{i:03},BCS".encode() for i in range(first, first + count)]
+        with max_queries(10) as stats:
+            r = await client.post(
+                f"/api/v1/orgs/{org_id}/courses/{course_id}/invites/import-csv",
+                files={"file": ("roster.csv", BytesIO(b"\n".join(lines) + b"\n"), "text/csv")},
+            )
+        assert r.status_code == 200
+        assert r.json()["created_invites"] == count
+        return stats.count
+
+    assert await _import(0, 2) == await _import(2, 40)
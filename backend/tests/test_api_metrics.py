@@ -1,53 +1,161 @@
-from app.models.grading_event import GradingEvent
+import asyncio
+
 import pytest
 
+from app.observability.http_metrics import HttpMetricsMiddleware
+from app.observability.metrics import REGISTRY
+from app.observability.metrics_server import start_metrics_server
+from app.worker import tasks as worker_tasks
+
+
+def _sample(body: str, series: str) -> float:
+    for line in body.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
 
-async def _seed_metrics_events(db) -> None:
-    db.add(
-        GradingEvent(
-            submission_id=None,
-            phase="practice",
-            event_type="graded",
-            attempt=0,
-            duration_ms=1500,
-        )
+def _record_events(db) -> None:
+    worker_tasks._record_grading_event(
+        db, submission_id=None, phase="practice", event_type="graded", attempt=0, duration_ms=1500
     )
-    db.add(
-        GradingEvent(
-            submission_id=None,
-            phase="practice",
-            event_type="error",
-            attempt=1,
-            reason="jobe_transient",
-            context="run_test_case",
-            duration_ms=700,
-        )
+    worker_tasks._record_grading_event(
+        db,
+        submission_id=None,
+        phase="practice",
+        event_type="error",
+        attempt=1,
+        reason="jobe_transient",
+        context="run_test_case",
+        duration_ms=700,
     )
-    db.add(
-        GradingEvent(
-            submission_id=None,
-            phase="final",
-            event_type="retry",
-            attempt=0,
-            reason="jobe_transient",
-            context="prepare",
-        )
+    worker_tasks._record_grading_event(
+        db,
+        submission_id=None,
+        phase="final",
+        event_type="retry",
+        attempt=0,
+        reason="jobe_transient",
+        context="prepare",
     )
-    await db.commit()
+
+
+_SERIES = (
+    'marconi_grading_jobs_total{phase="practice",result="graded"}',
+    'marconi_grading_jobs_total{phase="practice",result="error"}',
+    'marconi_grading_retries_total{phase="final"}',
+    'marconi_jobe_errors_total{phase="practice",context="run_test_case"}',
+    'marconi_grading_latency_seconds_count{phase="practice",result="graded"}',
+    'marconi_grading_latency_seconds_bucket{phase="practice",result="graded",le="2.5"}',
+)
 
 
 @pytest.mark.asyncio
 async def test_metrics_endpoint_exposes_grading_counters(client, db):
-    await _seed_metrics_events(db)
+    before = REGISTRY.render()
+    _record_events(db)
+    await db.commit()
 
     response = await client.get("/api/v1/metrics")
     assert response.status_code == 200
     assert "text/plain" in response.headers["content-type"]
 
     body = response.text
-    assert 'marconi_grading_jobs_total{phase="practice",result="graded"} 1' in body
-    assert 'marconi_grading_jobs_total{phase="practice",result="error"} 1' in body
-    assert 'marconi_grading_retries_total{phase="final"} 1' in body
-    assert 'marconi_jobe_errors_total{context="run_test_case",phase="practice"} 1' in body
-    assert 'marconi_grading_latency_seconds_count{phase="practice",result="graded"} 1' in body
-    assert 'marconi_grading_queue_depth{status="pending"}' in body
+    for series in _SERIES:
+        assert _sample(body, series) == _sample(before, series) + 1, series
+    assert _sample(body, 'marconi_grading_latency_seconds_bucket{phase="practice",result="graded",le="1"}') == (
+        _sample(before, 'marconi_grading_latency_seconds_bucket{phase="practice",result="graded",le="1"}')
+    )
+    assert "# TYPE marconi_grading_latency_seconds histogram" in body
+    assert 'marconi_grading_queue_depth{status="pending"} 0' in body
+    assert 'marconi_grading_lane_depth{lane="final"} 0' in body
+    assert body.count("# TYPE marconi_grading_jobs_total ") == 1
+
+
+@pytest.mark.asyncio
+async def test_worker_metrics_server_serves_the_registry():
+    server = await start_metrics_server(host="127.0.0.1", port=0)
+    assert server is not None
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: worker\r\n\r\n")
+        await writer.drain()
+        response = (await reader.read()).decode()
+        writer.close()
+        assert response.startswith("HTTP/1.1 200 OK\r\n")
+        assert "# TYPE marconi_grading_jobs_total counter" in response
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /nope HTTP/1.1\r\n\r\n")
+        await writer.drain()
+        assert (await reader.read()).startswith(b"HTTP/1.1 404 ")
+        writer.close()
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_http_metrics_are_labelled_by_route_template(client):
+    r = await client.post("/api/v1/auth/login", json={"email": "admin@example.com", "password": "password123"})
+    assert r.status_code == 200
+    org_id = (await client.post("/api/v1/orgs", json={"name": "Org Http Metrics"})).json()["id"]
+    series = 'marconi_http_request_duration_seconds_count{method="GET",route="/api/v1/orgs/{org_id}",status_class="2xx"}'
+    before = REGISTRY.render()
+
+    for _ in range(3):
+        assert (await client.get(f"/api/v1/orgs/{org_id}")).status_code == 200
+    assert (await client.get("/api/v1/no-such-route")).status_code == 404
+
+    body = (await client.get("/api/v1/metrics")).text
+    assert _sample(body, series) == _sample(before, series) + 3
+    db_series = series.replace("duration_seconds_count", "db_seconds_sum")
+    assert _sample(body, db_series) > _sample(before, db_series)
+    unmatched = 'marconi_http_request_duration_seconds_count{method="GET",route="<unmatched>",status_class="4xx"}'
+    assert _sample(body, unmatched) == _sample(before, unmatched) + 1
+    assert f"/api/v1/orgs/{org_id}" not in body
+    # The scrape itself is still in flight while it renders.
+    assert _sample(body, 'marconi_http_requests_in_flight{method="GET"}') == 1
+
+
+@pytest.mark.asyncio
+async def test_event_streams_leave_in_flight_and_latency_metrics():
+    class _Route:
+        path_format = "/api/v1/test/stream"
+
+    opened = asyncio.Event()
+    release = asyncio.Event()
+
+    async def _stream_app(scope, receive, send) -> None:
+        scope["route"] = _Route()
+        headers = [(b"content-type", b"text/event-stream; charset=utf-8")]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b": ping\n\n", "more_body": True})
+        opened.set()
+        await release.wait()
+        await send({"type": "http.response.body", "body": b""})
+
+    async def _send(message) -> None:
+        pass
+
+    in_flight = 'marconi_http_requests_in_flight{method="GET"}'
+    open_streams = 'marconi_http_event_streams_open{route="/api/v1/test/stream"}'
+    duration = (
+        'marconi_http_request_duration_seconds_count{method="GET",route="/api/v1/test/stream",status_class="2xx"}'
+    )
+    before = REGISTRY.render()
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/test/stream", "headers": []}
+    request = asyncio.create_task(HttpMetricsMiddleware(_stream_app)(scope, None, _send))
+    await opened.wait()
+
+    during = REGISTRY.render()
+    assert _sample(during, in_flight) == _sample(before, in_flight)
+    assert _sample(during, open_streams) == _sample(before, open_streams) + 1
+
+    release.set()
+    await request
+    after = REGISTRY.render()
+    assert _sample(after, in_flight) == _sample(before, in_flight)
+    assert _sample(after, open_streams) == _sample(before, open_streams)
+    assert _sample(after, duration) == _sample(before, duration)
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from contextlib import AsyncExitStack
+from io import BytesIO
+
+import pytest
+from sqlalchemy import event
+
+from app.crud.notifications import create_notification
+from app.models.notification import NotificationKind
+from app.realtime.events import EventBus, _reset_event_bus_for_tests, get_event_bus, notification_channel
+from app.realtime.sse import iter_channel_events
+
+
+@pytest.fixture(autouse=True)
+def _local_event_bus():
+    _reset_event_bus_for_tests(EventBus())
+    yield
+    _reset_event_bus_for_tests()
+
+
+def _drain(subscription) -> list[dict]:
+    events = []
+    while not subscription._queue.empty():
+        events.append(subscription._queue.get_nowait())
+    return events
+
+
+async def _login(client, email: str) -> None:
+    r = await client.post("/api/v1/auth/login", json={"email": email, "password": "password123"})
+    assert r.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_digest_and_read_push_events_and_maintain_unread_count(client):
+    await _login(client, "admin@example.com")
+    admin_id = (await client.get("/api/v1/auth/me")).json()["id"]
+
+    org_id = (await client.post("/api/v1/orgs", json={"name": "Org Push"})).json()["id"]
+    course_id = (
+        await client.post(f"/api/v1/orgs/{org_id}/courses", json={"code": "CS120", "title": "Push"})
+    ).json()["id"]
+    r = await client.post(
+        f"/api/v1/orgs/{org_id}/courses/{course_id}/assignments",
+        json={"title": "A1", "description": None, "module_id": None, "max_points": 10},
+    )
+    assignment_id = r.json()["id"]
+    stud_id = (
+        await client.post("/api/v1/users", json={"email": "push@example.com", "password": "password123"})
+    ).json()["id"]
+    r = await client.post(
+        f"/api/v1/orgs/{org_id}/courses/{course_id}/memberships",
+        json={"user_id": stud_id, "role": "student"},
+    )
+    assert r.status_code == 201
+
+    r = await client.get("/api/v1/student/notifications/unread-count")
+    assert r.json() == {"unread_count": 0}
+
+    async with get_event_bus().subscribe(notification_channel(admin_id)) as subscription:
+        await client.post("/api/v1/auth/logout")
+        await _login(client, "push@example.com")
+        for _ in range(2):
+            r = await client.post(
+                f"/api/v1/student/courses/{course_id}/assignments/{assignment_id}/submissions",
+                files={"file": ("main.c", BytesIO(b"int main(){return 0;}\n"), "text/x-c")},
+            )
+            assert r.status_code == 201
+
+        await client.post("/api/v1/auth/logout")
+        await _login(client, "admin@example.com")
+        r = await client.get("/api/v1/student/notifications/unread-count")
+        assert r.json() == {"unread_count": 1}
+
+        events = _drain(subscription)
+        assert [e["type"] for e in events] == ["notification.created", "notification.updated"]
+        assert events[0]["unread_count"] == 1
+        assert "unread_count" not in events[1]
+        notif_id = events[0]["notification"]["id"]
+        assert events[1]["notification"]["id"] == notif_id
+        assert events[1]["notification"]["title"].startswith("New submissions (2)")
+
+        r = await client.post(f"/api/v1/student/notifications/{notif_id}/read")
+        assert r.status_code == 200
+        # Reading again is a no-op and must not push the counter below zero.
+        r = await client.post(f"/api/v1/student/notifications/{notif_id}/read")
+        assert r.status_code == 200
+
+        events = _drain(subscription)
+        assert events == [{"type": "notification.read", "notification_id": notif_id, "unread_count": 0}]
+
+    r = await client.get("/api/v1/student/notifications/unread-count")
+    assert r.json() == {"unread_count": 0}
+
+
+@pytest.mark.asyncio
+async def test_notification_stream_opens_with_snapshot_then_pushes(client, db):
+    await _login(client, "admin@example.com")
+    admin_id = (await client.get("/api/v1/auth/me")).json()["id"]
+
+    async def _snapshot():
+        snapshot = {"type": "notification.unread", "unread_count": 0}
+        # A notification created while the snapshot is being read must still be pushed.
+        await create_notification(
+            db,
+            user_id=admin_id,
+            kind=NotificationKind.submission_graded,
+            title="Graded: A1",
+            body=None,
+            link_url=None,
+        )
+        return [snapshot]
+
+    stream = iter_channel_events(notification_channel(admin_id), initial=_snapshot, heartbeat_seconds=5)
+    assert await stream.__anext__() == "retry: 5000\n\n"
+    assert await stream.__anext__() == 'event: notification.unread\ndata: {"type":"notification.unread","unread_count":0}\n\n'
+
+    frame = await stream.__anext__()
+    assert frame.startswith("event: notification.created\n")
+    assert '"unread_count":1' in frame
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_bulk_grading_inserts_notifications_in_one_statement(client, db):
+    await _login(client, "admin@example.com")
+    org_id = (await client.post("/api/v1/orgs", json={"name": "Org Bulk"})).json()["id"]
+    course_id = (
+        await client.post(f"/api/v1/orgs/{org_id}/courses", json={"code": "CS121", "title": "Bulk"})
+    ).json()["id"]
+    assignment_id = (
+        await client.post(
+            f"/api/v1/orgs/{org_id}/courses/{course_id}/assignments",
+            json={"title": "A1", "description": None, "module_id": None, "max_points": 10},
+        )
+    ).json()["id"]
+
+    student_ids: list[int] = []
+    for i in range(3):
+        email = f"bulk{i}@example.com"
+        user_id = (await client.post("/api/v1/users", json={"email": email, "password": "password123"})).json()["id"]
+        r = await client.post(
+            f"/api/v1/orgs/{org_id}/courses/{course_id}/memberships",
+            json={"user_id": user_id, "role": "student"},
+        )
+        assert r.status_code == 201
+        student_ids.append(user_id)
+
+    submission_ids: list[int] = []
+    for i in range(3):
+        await client.post("/api/v1/auth/logout")
+        await _login(client, f"bulk{i}@example.com")
+        r = await client.post(
+            f"/api/v1/student/courses/{course_id}/assignments/{assignment_id}/submissions",
+            files={"file": ("main.c", BytesIO(b"int main(){return 0;}\n"), "text/x-c")},
+        )
+        submission_ids.append(r.json()["id"])
+    await client.post("/api/v1/auth/logout")
+    await _login(client, "admin@example.com")
+
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        async with AsyncExitStack() as stack:
+            subscriptions = [
+                await stack.enter_async_context(get_event_bus().subscribe(notification_channel(uid)))
+                for uid in student_ids
+            ]
+            r = await client.post(
+                "/api/v1/staff/submissions/bulk",
+                json={"submission_ids": submission_ids, "action": "mark_graded"},
+            )
+            assert r.status_code == 200
+            for subscription in subscriptions:
+                events = _drain(subscription)
+                assert [(e["type"], e["unread_count"]) for e in events] == [("notification.created", 1)]
+                assert events[0]["notification"]["title"] == "Graded: A1"
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+    inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT INTO NOTIFICATIONS ")]
+    assert len(inserts) == 1
+
+    # Re-marking graded does not notify again.
+    r = await client.post(
+        "/api/v1/staff/submissions/bulk",
+        json={"submission_ids": submission_ids, "action": "mark_graded"},
+    )
+    assert r.status_code == 200
+    await client.post("/api/v1/auth/logout")
+    await _login(client, "bulk0@example.com")
+    assert (await client.get("/api/v1/student/notifications/unread-count")).json() == {"unread_count": 1}
@@ -0,0 +1,87 @@
+import hashlib
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import delete
+
+from app.core import session_cache
+from app.core.config import settings
+from app.models.session import Session
+
+
+def _lookups(result: str) -> float:
+    return session_cache._lookups_total.labels(result).value
+
+
+@pytest.mark.asyncio
+async def test_session_cache_serves_repeat_requests_and_is_invalidated_on_logout(client):
+    r = await client.post("/api/v1/auth/login", json={"email": "admin@example.com", "password": "password123"})
+    assert r.status_code == 200
+
+    hits_before = _lookups("hit")
+    r = await client.get("/api/v1/auth/me")
+    assert r.status_code == 200
+    r = await client.get("/api/v1/auth/me")
+    assert r.status_code == 200
+    assert r.json()["email"] == "admin@example.com"
+    assert _lookups("hit") == hits_before + 1
+
+    # The cookie is kept client-side to prove the server forgets the cached session.
+    token = client.cookies.get(settings.session_cookie_name)
+    await client.post("/api/v1/auth/logout")
+    client.cookies.set(settings.session_cookie_name, token)
+    r = await client.get("/api/v1/auth/me")
+    assert r.status_code == 401
+
+    r = await client.get("/api/v1/metrics")
+    assert 'marconi_session_cache_lookups_total{result="hit"}' in r.text
+
+
+@pytest.mark.asyncio
+async def test_session_cache_ttl_bounds_staleness_of_out_of_band_deletes(client, db, monkeypatch):
+    r = await client.post("/api/v1/auth/login", json={"email": "admin@example.com", "password": "password123"})
+    assert r.status_code == 200
+    r = await client.get("/api/v1/auth/me")
+    assert r.status_code == 200
+
+    token = client.cookies.get(settings.session_cookie_name)
+    token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    # Simulate a delete the cache never heard about (another replica, manual cleanup).
+    await db.execute(delete(Session).where(Session.token_hash == token_hash))
+    await db.commit()
+
+    r = await client.get("/api/v1/auth/me")
+    assert r.status_code == 200
+
+    monkeypatch.setattr("app.core.session_cache.time", SimpleNamespace(monotonic=lambda: 10.0**12))
+    r = await client.get("/api/v1/auth/me")
+    assert r.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_session_cache_keeps_credentials_and_github_identity_out_of_snapshots(client, db):
+    from sqlalchemy import update
+
+    from app.models.user import User
+
+    r = await client.post("/api/v1/auth/login", json={"email": "admin@example.com", "password": "password123"})
+    assert r.status_code == 200
+    admin_id = r.json()["id"]
+    await db.execute(update(User).where(User.id == admin_id).values(github_user_id=42, github_login="octo"))
+    await db.commit()
+    r = await client.get("/api/v1/auth/me")
+    assert r.status_code == 200
+
+    token = client.cookies.get(settings.session_cookie_name)
+    cached = await session_cache.get_cached_session(hashlib.sha256(token.encode("utf-8")).hexdigest())
+    assert cached is not None
+    assert not session_cache.UNCACHED_USER_COLUMNS & set(cached.user)
+    assert "password_hash" not in cached.to_json()
+
+    # Served from the cache, the route still sees the identity stored in the database.
+    hits_before = _lookups("hit")
+    r = await client.get("/api/v1/integrations/github/user/status")
+    assert r.status_code == 200
+    assert _lookups("hit") == hits_before + 1
+    assert r.json()["connected"] is True
+    assert (r.json()["github_user_id"], r.json()["github_login"]) == (42, "octo")
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+from pathlib import Path
+import zipfile
+
+import pytest
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.course_membership import CourseMembership
+from app.models.submission_archive_job import SubmissionArchiveJob
+from app.worker.submission_archive import build_submission_archive_job, cleanup_expired_submission_archives
+
+
+async def _login(client, *, email: str, password: str) -> None:
+    r = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200
+
+
+async def _session_factory_for_schema(db):
+    schema = (await db.execute(text("SELECT current_schema()"))).scalar_one()
+    session_maker = async_sessionmaker(db.bind, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def _factory():
+        async with session_maker() as session:
+            await session.execute(text(f"SET search_path TO {schema}"))
+            yield session
+
+    return _factory
+
+
+async def _setup_course_with_submissions(client, db) -> tuple[int, int, int]:
+    await _login(client, email="admin@example.com", password="password123")
+
+    r = await client.post("/api/v1/orgs", json={"name": "Org Archive"})
+    assert r.status_code == 201
+    org_id = r.json()["id"]
+
+    r = await client.post(f"/api/v1/orgs/{org_id}/courses", json={"code": "CS210", "title": "Archives"})
+    assert r.status_code == 201
+    course_id = r.json()["id"]
+
+    r = await client.post(
+        f"/api/v1/staff/courses/{course_id}/assignments",
+        json={"title": "A1", "description": None, "module_id": None},
+    )
+    assert r.status_code == 201
+    assignment_id = r.json()["id"]
+
+    student_numbers = {"arch1@example.com": "2100/701", "arch2@example.com": None}
+    for email, student_number in student_numbers.items():
+        r = await client.post("/api/v1/users", json={"email": email, "password": "password123"})
+        assert r.status_code == 201
+        user_id = r.json()["id"]
+        r = await client.post(
+            f"/api/v1/staff/courses/{course_id}/memberships",
+            json={"user_id": user_id, "role": "student"},
+        )
+        assert r.status_code == 201
+        if student_number:
+            await db.execute(
+                update(CourseMembership)
+                .where(CourseMembership.course_id == course_id, CourseMembership.user_id == user_id)
+                .values(student_number=student_number)
+            )
+            await db.commit()
+
+    await client.post("/api/v1/auth/logout")
+    await _login(client, email="arch1@example.com", password="password123")
+    for body in (b"int main(){return 1;}\n", b"int main(){return 0;}\n"):
+        r = await client.post(
+            f"/api/v1/student/courses/{course_id}/assignments/{assignment_id}/submissions",
+            files={"file": ("main.c", BytesIO(body), "text/x-c")},
+        )
+        assert r.status_code == 201
+
+    await client.post("/api/v1/auth/logout")
+    await _login(client, email="arch2@example.com", password="password123")
+    r = await client.post(
+        f"/api/v1/student/courses/{course_id}/assignments/{assignment_id}/submissions",
+        files={"file": ("solution.cpp", BytesIO(b"int main(){}\n"), "text/x-c++")},
+    )
+    assert r.status_code == 201
+    arch2_user_id = r.json()["user_id"]
+
+    await client.post("/api/v1/auth/logout")
+    await _login(client, email="admin@example.com", password="password123")
+    return course_id, assignment_id, arch2_user_id
+
+
+@pytest.mark.asyncio
+async def test_staff_can_stream_latest_and_all_submissions_zip(client, db):
+    course_id, assignment_id, arch2_user_id = await _setup_course_with_submissions(client, db)
+    base = f"/api/v1/staff/courses/{course_id}/assignments/{assignment_id}/submissions"
+
+    r = await client.get(f"{base}/download")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/zip"
+    assert "attachment" in r.headers["content-disposition"]
+    with zipfile.ZipFile(BytesIO(r.content)) as zf:
+        assert zf.testzip() is None
+        assert sorted(zf.namelist()) == ["2100_701/main.c", f"user-{arch2_user_id}/solution.cpp"]
+        assert zf.read("2100_701/main.c") == b"int main(){return 0;}\n"
+
+    r = await client.get(f"{base}/download?scope=all")
+    assert r.status_code == 200
+    with zipfile.ZipFile(BytesIO(r.content)) as zf:
+        names = zf.namelist()
+        assert len(names) == 3
+        assert sum(1 for n in names if n.startswith("2100_701/")) == 2
+
+
+@pytest.mark.asyncio
+async def test_submission_archive_job_reports_progress_and_serves_file(client, db, monkeypatch):
+    course_id, assignment_id, _ = await _setup_course_with_submissions(client, db)
+    base = f"/api/v1/staff/courses/{course_id}/assignments/{assignment_id}/submissions"
+    session_factory = await _session_factory_for_schema(db)
+
+    async def _run_inline(job_id: int):
+        return await build_submission_archive_job(job_id, session_factory=session_factory)
+
+    monkeypatch.setattr("app.api.routes.staff_course_submissions.build_submission_archive_job", _run_inline)
+
+    r = await client.post(f"{base}/archives", json={"scope": "all"})
+    assert r.status_code == 202
+    job_id = r.json()["id"]
+
+    r = await client.get(f"{base}/archives/{job_id}")
+    assert r.status_code == 200
+    job = r.json()
+    assert job["status"] == "completed"
+    assert job["total_entries"] == 3
+    assert job["processed_entries"] == 3
+    assert job["size_bytes"] > 0
+
+    r = await client.get(f"{base}/archives/{job_id}/download")
+    assert r.status_code == 200
+    with zipfile.ZipFile(BytesIO(r.content)) as zf:
+        assert len(zf.namelist()) == 3
+
+    # A job that already ran is not rebuilt.
+    result = await build_submission_archive_job(job_id, session_factory=session_factory)
+    assert result["status"] == "skipped"
+
+
+@pytest.mark.asyncio
+async def test_expired_submission_archives_are_deleted(client, db, monkeypatch):
+    course_id, assignment_id, _ = await _setup_course_with_submissions(client, db)
+    base = f"/api/v1/staff/courses/{course_id}/assignments/{assignment_id}/submissions"
+    session_factory = await _session_factory_for_schema(db)
+
+    async def _run_inline(job_id: int):
+        return await build_submission_archive_job(job_id, session_factory=session_factory)
+
+    monkeypatch.setattr("app.api.routes.staff_course_submissions.build_submission_archive_job", _run_inline)
+
+    r = await client.post(f"{base}/archives", json={"scope": "latest"})
+    assert r.status_code == 202
+    job_id = r.json()["id"]
+    r = await client.get(f"{base}/archives/{job_id}")
+    assert r.json()["expires_at"] is not None
+
+    storage_path = (
+        await db.execute(select(SubmissionArchiveJob.storage_path).where(SubmissionArchiveJob.id == job_id))
+    ).scalar_one()
+    assert Path(storage_path).exists()
+
+    # Not expired yet: nothing is removed.
+    assert await cleanup_expired_submission_archives(session_factory=session_factory) == 0
+    assert Path(storage_path).exists()
+
+    await db.execute(
+        update(SubmissionArchiveJob)
+        .where(SubmissionArchiveJob.id == job_id)
+        .values(expires_at=datetime.now(timezone.utc) - timedelta(minutes=1))
+    )
+    await db.commit()
+    r = await client.get(f"{base}/archives/{job_id}/download")
+    assert r.status_code == 410
+
+    assert await cleanup_expired_submission_archives(session_factory=session_factory) == 1
+    assert not Path(storage_path).exists()
+    assert await cleanup_expired_submission_archives(session_factory=session_factory) == 0
+    r = await client.get(f"{base}/archives/{job_id}/download")
+    assert r.status_code == 410
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.crud import audit as audit_crud
+from app.models.audit_event import AuditEvent
+
+
+async def _session_factory_for_schema(db):
+    schema = (await db.execute(text("SELECT current_schema()"))).scalar_one()
+    session_maker = async_sessionmaker(db.bind, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def _factory():
+        async with session_maker() as session:
+            await session.execute(text(f"SET search_path TO {schema}"))
+            yield session
+
+    return _factory
+
+
+def _event(action: str) -> dict:
+    return {
+        "organization_id": None,
+        "actor_user_id": None,
+        "action": action,
+        "target_type": "test",
+        "target_id": None,
+        "metadata": {"k": action},
+        "context": None,
+    }
+
+
+async def _actions(db) -> list[str]:
+    return list((await db.execute(select(AuditEvent.action).order_by(AuditEvent.id))).scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_writer_batches_events_and_spills_when_full(db, tmp_path):
+    writer = audit_crud.AuditWriter(
+        max_queue=3,
+        batch_size=2,
+        flush_interval_seconds=3600,
+        spill_dir=tmp_path,
+        session_factory=await _session_factory_for_schema(db),
+    )
+    batches = audit_crud._batch_size._default_child()
+    batches_before = batches.count
+    spilled_before = audit_crud._spilled_total._default_child().value
+
+    loop = asyncio.get_running_loop()
+    for i in range(5):
+        writer.submit(_event(f"e{i}"), loop)
+
+    # A full batch wakes the writer; the overflow went to disk.
+    assert audit_crud._spilled_total._default_child().value == spilled_before + 2
+    assert list(tmp_path.glob("audit-*.jsonl"))
+
+    for _ in range(100):
+        if writer._task is None:
+            break
+        await asyncio.sleep(0.01)
+    assert writer._task is None
+
+    assert sorted(await _actions(db)) == ["e0", "e1", "e2", "e3", "e4"]
+    assert batches.count - batches_before == 3  # 2 + 1 from the queue, then 2 replayed
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_writer_drops_and_counts_when_spilling_is_disabled(db):
+    writer = audit_crud.AuditWriter(
+        max_queue=1,
+        batch_size=10,
+        flush_interval_seconds=3600,
+        spill_dir=None,
+        session_factory=await _session_factory_for_schema(db),
+    )
+    dropped = audit_crud._dropped_total.labels("queue_full")
+    dropped_before = dropped.value
+
+    loop = asyncio.get_running_loop()
+    writer.submit(_event("kept"), loop)
+    writer.submit(_event("dropped"), loop)
+    assert dropped.value == dropped_before + 1
+    assert writer.depth == 1
+
+    await writer.flush()
+    writer._task.cancel()
+    assert await _actions(db) == ["kept"]
+
+
+def _write_spill(path, actions: list[str]) -> None:
+    path.write_text("".join(json.dumps(_event(a)) + "\n" for a in actions), encoding="utf-8")
+
+
+def _exited_pid() -> int:
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+@pytest.mark.asyncio
+async def test_replay_keeps_spilled_events_while_the_database_is_unavailable(db, tmp_path):
+    @asynccontextmanager
+    async def _unavailable():
+        raise OperationalError("INSERT", {}, OSError("connection refused"))
+        yield
+
+    own_file = tmp_path / f"audit-{os.getpid()}.jsonl"
+    _write_spill(own_file, ["s0", "s1", "s2"])
+    write_failed = audit_crud._dropped_total.labels("write_failed")
+    write_failed_before = write_failed.value
+
+    down = audit_crud.AuditWriter(
+        max_queue=10, batch_size=2, flush_interval_seconds=3600, spill_dir=tmp_path, session_factory=_unavailable
+    )
+    await down._replay_spilled()
+    assert write_failed.value == write_failed_before
+    assert [p.name for p in tmp_path.iterdir()] == [own_file.name]
+    assert [json.loads(line)["action"] for line in own_file.read_text().splitlines()] == ["s0", "s1", "s2"]
+
+    up = audit_crud.AuditWriter(
+        max_queue=10,
+        batch_size=2,
+        flush_interval_seconds=3600,
+        spill_dir=tmp_path,
+        session_factory=await _session_factory_for_schema(db),
+    )
+    await up._replay_spilled()
+    assert sorted(await _actions(db)) == ["s0", "s1", "s2"]
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_replay_claims_only_files_no_live_process_is_writing(db, tmp_path):
+    dead = _exited_pid()
+    live_file = tmp_path / f"audit-{os.getppid()}.jsonl"
+    _write_spill(live_file, ["live"])
+    _write_spill(tmp_path / f"audit-{dead}.jsonl", ["dead"])
+    # Claimed by a process that died mid-replay.
+    _write_spill(tmp_path / f"audit-{dead + 1}.{dead}.replay", ["orphaned"])
+
+    writer = audit_crud.AuditWriter(
+        max_queue=10,
+        batch_size=10,
+        flush_interval_seconds=3600,
+        spill_dir=tmp_path,
+        session_factory=await _session_factory_for_schema(db),
+    )
+    await writer._replay_spilled()
+    assert sorted(await _actions(db)) == ["dead", "orphaned"]
+    assert [p.name for p in tmp_path.iterdir()] == [live_file.name]
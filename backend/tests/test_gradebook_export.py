@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+
+import pytest
+from sqlalchemy import update
+
+from app.crud.late_policy import apply_late_penalty
+from app.models.assignment import Assignment
+from app.models.assignment_extension import AssignmentExtension
+from app.models.submission import Submission, SubmissionStatus
+
+
+async def _login(client, email: str) -> None:
+    r = await client.post("/api/v1/auth/login", json={"email": email, "password": "password123"})
+    assert r.status_code == 200
+
+
+def test_apply_late_penalty_rounds_down():
+    assert apply_late_penalty(10, None) == 10
+    assert apply_late_penalty(10, 0) == 10
+    assert apply_late_penalty(7, 15) == 5
+    assert apply_late_penalty(10, 100) == 0
+
+
+@pytest.mark.asyncio
+async def test_gradebook_streams_latest_and_best_with_penalties_and_extensions(client, db):
+    await _login(client, "admin@example.com")
+    org_id = (await client.post("/api/v1/orgs", json={"name": "Org Gradebook"})).json()["id"]
+    course_id = (
+        await client.post(f"/api/v1/orgs/{org_id}/courses", json={"code": "CS180", "title": "Gradebook"})
+    ).json()["id"]
+    assignment_ids = []
+    for title in ("A1", "A2"):
+        r = await client.post(
+            f"/api/v1/orgs/{org_id}/courses/{course_id}/assignments",
+            json={"title": title, "description": None, "module_id": None, "max_points": 10},
+        )
+        assignment_ids.append(r.json()["id"])
+    a1, a2 = assignment_ids
+    student_ids = []
+    for i in (1, 2, 3):
+        email = f"grade{i}@example.com"
+        user_id = (await client.post("/api/v1/users", json={"email": email, "password": "password123"})).json()["id"]
+        await client.post(
+            f"/api/v1/orgs/{org_id}/courses/{course_id}/memberships",
+            json={"user_id": user_id, "role": "student"},
+        )
+        student_ids.append(user_id)
+
+    async def _submit(email: str, assignment_id: int) -> int:
+        await client.post("/api/v1/auth/logout")
+        await _login(client, email)
+        r = await client.post(
+            f"/api/v1/student/courses/{course_id}/assignments/{assignment_id}/submissions",
+            files={"file": ("main.c", BytesIO(b"int main(){return 0;}\n"), "text/x-c")},
+        )
+        return r.json()["id"]
+
+    scores = {
+        await _submit("grade1@example.com", a1): 8,
+        await _submit("grade1@example.com", a1): 6,
+        await _submit("grade1@example.com", a2): 10,
+        await _submit("grade2@example.com", a1): 10,
+    }
+    for submission_id, score in scores.items():
+        await db.execute(
+            update(Submission)
+            .where(Submission.id == submission_id)
+            .values(status=SubmissionStatus.graded, score=score)
+        )
+    # A1 was due yesterday at 10%/day; grade1 has an extension, grade2 is one day late.
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        update(Assignment)
+        .where(Assignment.id == a1)
+        .values(due_date=now - timedelta(hours=1), late_policy={"percent_per_day": 10})
+    )
+    db.add(AssignmentExtension(assignment_id=a1, user_id=student_ids[0], extended_due_date=now + timedelta(days=1)))
+    await db.commit()
+
+    await client.post("/api/v1/auth/logout")
+    await _login(client, "admin@example.com")
+
+    r = await client.get(f"/api/v1/staff/courses/{course_id}/gradebook.csv")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(r.text)))
+    assert rows == [
+        ["student_number", "email", "full_name", "A1 (10)", "A2 (10)"],
+        ["", "grade1@example.com", "", "6", "10"],
+        ["", "grade2@example.com", "", "9", ""],
+        ["", "grade3@example.com", "", "", ""],
+    ]
+
+    r = await client.get(f"/api/v1/staff/courses/{course_id}/gradebook.jsonl", params={"score": "best"})
+    assert r.status_code == 200
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [(line["email"], line["scores"]) for line in lines] == [
+        ("grade1@example.com", {str(a1): 8, str(a2): 10}),
+        ("grade2@example.com", {str(a1): 9, str(a2): None}),
+        ("grade3@example.com", {str(a1): None, str(a2): None}),
+    ]
+
+    await client.post("/api/v1/auth/logout")
+    await _login(client, "grade3@example.com")
+    r = await client.get(f"/api/v1/staff/courses/{course_id}/gradebook.csv")
+    assert r.status_code == 403
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from io import BytesIO
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.crud import gradebook as gradebook_crud
+from app.models.course_gradebook_version import CourseGradebookVersion
+from app.models.submission import Submission, SubmissionStatus
+
+
+async def _login(client, email: str) -> None:
+    r = await client.post("/api/v1/auth/login", json={"email": email, "password": "password123"})
+    assert r.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_gradebook_matrix_is_columnar_and_cached_until_a_grading_write(client, db, max_queries, monkeypatch):
+    await _login(client, "admin@example.com")
+    org_id = (await client.post("/api/v1/orgs", json={"name": "Org Matrix"})).json()["id"]
+    course_id = (
+        await client.post(f"/api/v1/orgs/{org_id}/courses", json={"code": "CS190", "title": "Matrix"})
+    ).json()["id"]
+    assignment_ids = []
+    for title in ("A1", "A2"):
+        r = await client.post(
+            f"/api/v1/orgs/{org_id}/courses/{course_id}/assignments",
+            json={"title": title, "description": None, "module_id": None, "max_points": 10},
+        )
+        assignment_ids.append(r.json()["id"])
+    a1, a2 = assignment_ids
+    student_ids = []
+    for i in (1, 2):
+        email = f"matrix{i}@example.com"
+        user_id = (await client.post("/api/v1/users", json={"email": email, "password": "password123"})).json()["id"]
+        await client.post(
+            f"/api/v1/orgs/{org_id}/courses/{course_id}/memberships",
+            json={"user_id": user_id, "role": "student"},
+        )
+        student_ids.append(user_id)
+
+    await client.post("/api/v1/auth/logout")
+    await _login(client, "matrix1@example.com")
+    submission_ids = []
+    for _ in range(2):
+        r = await client.post(
+            f"/api/v1/student/courses/{course_id}/assignments/{a2}/submissions",
+            files={"file": ("main.c", BytesIO(b"int main(){return 0;}\n"), "text/x-c")},
+        )
+        submission_ids.append(r.json()["id"])
+    r = await client.get(f"/api/v1/staff/courses/{course_id}/gradebook")
+    assert r.status_code == 403
+    await client.post("/api/v1/auth/logout")
+    await _login(client, "admin@example.com")
+
+    # Those uploads are younger than the settle window, so the matrix is not cached yet.
+    hits = gradebook_crud._matrix_hit
+    hits_before = hits.value
+    for _ in range(2):
+        r = await client.get(f"/api/v1/staff/courses/{course_id}/gradebook")
+        assert r.status_code == 200
+    assert hits.value == hits_before
+    monkeypatch.setattr(settings, "submission_changes_settle_seconds", 0.0)
+
+    r = await client.get(f"/api/v1/staff/courses/{course_id}/gradebook")
+    assert r.status_code == 200
+    matrix = r.json()
+    assert matrix["assignments"]["id"] == [a1, a2]
+    assert matrix["assignments"]["title"] == ["A1", "A2"]
+    assert matrix["students"]["user_id"] == student_ids
+    assert matrix["cells"] == {
+        "submission_id": [[None, submission_ids[1]], [None, None]],
+        "status": [[None, "pending"], [None, None]],
+        "score": [[None, None], [None, None]],
+    }
+
+    # A hit is the course lookup plus the version stamp, never the matrix query.
+    with max_queries(2):
+        r = await client.get(f"/api/v1/staff/courses/{course_id}/gradebook")
+    assert r.json() == matrix
+    assert hits.value == hits_before + 1
+
+    # Grading outside the API (as the worker does) moves the stamp without writing the
+    # per-course version row, so concurrent uploads and grading never queue on it.
+    roster_version = (
+        await db.execute(
+            select(CourseGradebookVersion.version).where(CourseGradebookVersion.course_id == course_id)
+        )
+    ).scalar_one()
+    await db.execute(
+        update(Submission)
+        .where(Submission.id == submission_ids[1])
+        .values(status=SubmissionStatus.graded, score=7)
+    )
+    await db.commit()
+    r = await client.get(f"/api/v1/staff/courses/{course_id}/gradebook")
+    assert r.json()["cells"]["status"][0] == [None, "graded"]
+    assert r.json()["cells"]["score"][0] == [None, 7]
+    assert r.json()["version"] != matrix["version"]
+    assert hits.value == hits_before + 1
+    assert (
+        await db.execute(
+            select(CourseGradebookVersion.version)
+            .where(CourseGradebookVersion.course_id == course_id)
+            .execution_options(populate_existing=True)
+        )
+    ).scalar_one() == roster_version
+
+    # Roster and assignment changes invalidate too.
+    await client.delete(f"/api/v1/orgs/{org_id}/courses/{course_id}/assignments/{a1}")
+    r = await client.get(f"/api/v1/staff/courses/{course_id}/gradebook")
+    assert r.json()["assignments"]["id"] == [a2]
+    assert r.json()["cells"]["status"] == [["graded"], [None]]
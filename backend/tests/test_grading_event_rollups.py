@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.crud.grading_events import prune_grading_events, rollup_grading_events
+from app.models.grading_event import GradingEvent
+from app.models.grading_event_rollup import GradingEventRollup
+
+
+@pytest.mark.asyncio
+async def test_rollup_writes_closed_hours_once_and_prune_keeps_unrolled_events(db):
+    hour = datetime(2026, 3, 1, 10, tzinfo=timezone.utc)
+    for i, duration_ms in enumerate(range(100, 1100, 10)):
+        db.add(
+            GradingEvent(
+                phase="practice",
+                event_type="graded",
+                duration_ms=duration_ms,
+                created_at=hour + timedelta(seconds=i),
+            )
+        )
+    db.add(
+        GradingEvent(
+            phase="practice",
+            event_type="error",
+            reason="jobe_transient",
+            context="run_test_case",
+            created_at=hour + timedelta(minutes=30),
+        )
+    )
+    db.add(GradingEvent(phase="final", event_type="retry", created_at=hour + timedelta(hours=1, minutes=2)))
+    db.add(GradingEvent(phase="final", event_type="retry", created_at=hour + timedelta(hours=2, minutes=1)))
+    await db.commit()
+
+    # 12:03 is inside the settle window of the 11:00 hour, so only 10:00 is closed.
+    assert await rollup_grading_events(db, now=hour + timedelta(hours=2, minutes=3)) == 2
+    rows = {
+        (r.phase, r.event_type, r.reason): r
+        for r in (await db.execute(select(GradingEventRollup))).scalars().all()
+    }
+    graded = rows[("practice", "graded", None)]
+    assert graded.bucket_start == hour
+    assert (graded.events, graded.duration_count, graded.duration_sum_ms) == (100, 100, 59500)
+    assert (graded.duration_max_ms, graded.duration_p50_ms, graded.duration_p95_ms) == (1090, 595, 1040)
+    error = rows[("practice", "error", "jobe_transient")]
+    assert (error.context, error.events, error.duration_count, error.duration_p50_ms) == ("run_test_case", 1, 0, None)
+
+    assert await rollup_grading_events(db, now=hour + timedelta(hours=2, minutes=3)) == 0
+    assert await rollup_grading_events(db, now=hour + timedelta(hours=2, minutes=10)) == 1
+
+    # Retention never outruns the rollups: the 12:00 hour is not rolled up yet.
+    pruned = await prune_grading_events(db, older_than=hour + timedelta(days=30), batch_size=40)
+    assert pruned == 102
+    remaining = (await db.execute(select(func.count()).select_from(GradingEvent))).scalar_one()
+    assert remaining == 1
+
+
+@pytest.mark.asyncio
+async def test_rollup_buckets_in_utc_and_waits_for_open_grading_transactions(db):
+    schema = (await db.execute(text("SELECT current_schema()"))).scalar_one()
+    session_maker = async_sessionmaker(db.bind, expire_on_commit=False)
+
+    async with session_maker() as grading:
+        await grading.execute(text(f"SET search_path TO {schema}"))
+        # Stamped with this transaction's start; it stays open as if JOBE runs were pending.
+        grading.add(GradingEvent(phase="practice", event_type="started"))
+        await grading.flush()
+        started = (await grading.execute(select(func.now()))).scalar_one()
+
+        earlier = started - timedelta(hours=1)
+        db.add(GradingEvent(phase="practice", event_type="graded", created_at=earlier))
+        await db.commit()
+        # A non-UTC session TimeZone must not shift the buckets (+05:30 would give :30 buckets).
+        await db.execute(text("SET LOCAL TIME ZONE 'Asia/Kolkata'"))
+        assert await rollup_grading_events(db, now=started + timedelta(hours=3)) == 1
+        (bucket_start,) = (await db.execute(select(GradingEventRollup.bucket_start))).scalars().all()
+        assert bucket_start == earlier.replace(minute=0, second=0, microsecond=0)
+
+        await grading.commit()
+
+    assert await rollup_grading_events(db, now=started + timedelta(hours=3)) == 1
+    rows = (
+        await db.execute(select(GradingEventRollup.event_type).order_by(GradingEventRollup.bucket_start))
+    ).scalars().all()
+    assert rows == ["graded", "started"]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.crud.notifications import NotificationDraft, create_notifications
+from app.crud.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from app.models.notification import NotificationKind
+
+
+def test_cursor_round_trips_and_rejects_tampering():
+    created = datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+    token = encode_cursor(created, 42)
+    assert "=" not in token
+    assert decode_cursor(token, (datetime, int)) == (created, 42)
+
+    for bad in ("", "not-base64!", encode_cursor("42"), encode_cursor(True), encode_cursor(1, 2)):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(bad, (int,))
+
+
+async def _login_admin(client) -> None:
+    r = await client.post("/api/v1/auth/login", json={"email": "admin@example.com", "password": "password123"})
+    assert r.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_users_cursor_pages_match_offset_listing(client):
+    await _login_admin(client)
+    for i in range(5):
+        r = await client.post("/api/v1/users", json={"email": f"page{i}@example.com", "password": "password123"})
+        assert r.status_code == 201
+
+    expected = [u["id"] for u in (await client.get("/api/v1/users?limit=500")).json()]
+
+    seen: list[int] = []
+    r = await client.get("/api/v1/users?limit=2")
+    while True:
+        assert r.status_code == 200
+        seen.extend(u["id"] for u in r.json())
+        cursor = r.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+        r = await client.get("/api/v1/users", params={"limit": 2, "cursor": cursor})
+    assert seen == expected
+
+    r = await client.get("/api/v1/users?cursor=garbage")
+    assert r.status_code == 400
+    assert r.json() == {"detail": "Invalid cursor"}
+
+
+@pytest.mark.asyncio
+async def test_notifications_cursor_walks_newest_first(client, db):
+    await _login_admin(client)
+    admin_id = (await client.get("/api/v1/auth/me")).json()["id"]
+    await create_notifications(
+        db,
+        drafts=[
+            NotificationDraft(
+                user_id=admin_id,
+                kind=NotificationKind.submission_graded,
+                title=f"N{i}",
+                body=None,
+                link_url=None,
+            )
+            for i in range(5)
+        ],
+    )
+
+    r = await client.get("/api/v1/student/notifications?limit=3")
+    first = [n["title"] for n in r.json()]
+    assert first == ["N4", "N3", "N2"]
+    r = await client.get("/api/v1/student/notifications", params={"limit": 3, "cursor": r.headers["x-next-cursor"]})
+    assert [n["title"] for n in r.json()] == ["N1", "N0"]
+    assert "x-next-cursor" not in r.headers
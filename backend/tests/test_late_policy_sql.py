@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import DateTime, Integer, column, select, values
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.crud.late_policy import (
+    apply_late_penalty,
+    apply_late_penalty_sql,
+    compute_effective_due_date,
+    compute_late_penalty_percent,
+    effective_due_date_sql,
+    late_penalty_sql,
+    late_policy_sql,
+    resolve_late_policy,
+)
+
+_BASE = datetime(2026, 3, 1, 9, 0, tzinfo=timezone.utc)
+
+
+def _random_int(rng: random.Random, upper: int) -> int | None:
+    # Mostly in range, with out-of-range values and nulls to exercise clamping and `or 0`.
+    options = [None, 0, -rng.randint(1, 50), rng.randint(0, upper), upper + rng.randint(1, 500)]
+    return rng.choices(options, weights=[1, 1, 1, 6, 1])[0]
+
+
+def _random_policy(rng: random.Random) -> dict | None:
+    kind = rng.random()
+    if kind < 0.2:
+        return None
+    if kind < 0.25:
+        return {}
+    policy: dict = {}
+    if rng.random() < 0.6:
+        policy["enabled"] = rng.choice([True, True, True, False, None, 0, 1])
+    if rng.random() < 0.4:
+        policy["type"] = "percent_per_day"
+    for key, upper in (("grace_minutes", 7 * 24 * 60), ("percent_per_day", 100), ("max_percent", 100)):
+        if rng.random() < 0.75:
+            policy[key] = _random_int(rng, upper)
+    return policy
+
+
+def _random_moment(rng: random.Random, around: datetime) -> datetime:
+    return around + timedelta(
+        days=rng.randint(-3, 12),
+        seconds=rng.randint(0, 86399),
+        microseconds=rng.choice([0, rng.randint(0, 999999)]),
+    )
+
+
+def _random_case(rng: random.Random) -> dict:
+    due = None if rng.random() < 0.15 else _random_moment(rng, _BASE)
+    extension = None if rng.random() < 0.7 else _random_moment(rng, due or _BASE)
+    anchor = extension or due or _BASE
+    if rng.random() < 0.2:
+        # Land exactly on, or a microsecond either side of, a day boundary past the deadline.
+        grace = rng.choice([0, 15, 60])
+        submitted = anchor + timedelta(minutes=grace, days=rng.randint(0, 3), microseconds=rng.choice([-1, 0, 1]))
+    else:
+        submitted = _random_moment(rng, anchor)
+    return {
+        "course_policy": _random_policy(rng),
+        "assignment_policy": _random_policy(rng),
+        "due_date": due,
+        "extended_due_date": extension,
+        "submitted_at": submitted,
+        "score": rng.randint(0, 150),
+    }
+
+
+def _python_result(case: dict) -> tuple[int | None, int | None, int]:
+    policy = resolve_late_policy(course_policy=case["course_policy"], assignment_policy=case["assignment_policy"])
+    late_seconds, penalty_percent = compute_late_penalty_percent(
+        submitted_at=case["submitted_at"],
+        effective_due_date=compute_effective_due_date(
+            assignment_due_date=case["due_date"],
+            extension_due_date=case["extended_due_date"],
+        ),
+        policy=policy,
+    )
+    return late_seconds, penalty_percent, apply_late_penalty(case["score"], penalty_percent)
+
+
+@pytest.mark.asyncio
+async def test_sql_late_penalty_matches_python_implementation(db):
+    rng = random.Random(20260301)
+    cases = [_random_case(rng) for _ in range(2000)]
+
+    rows = values(
+        column("case_id", Integer),
+        column("course_policy", JSONB(none_as_null=True)),
+        column("assignment_policy", JSONB(none_as_null=True)),
+        column("due_date", DateTime(timezone=True)),
+        column("extended_due_date", DateTime(timezone=True)),
+        column("submitted_at", DateTime(timezone=True)),
+        column("score", Integer),
+        name="cases",
+    ).data(
+        [
+            (
+                i,
+                case["course_policy"],
+                case["assignment_policy"],
+                case["due_date"],
+                case["extended_due_date"],
+                case["submitted_at"],
+                case["score"],
+            )
+            for i, case in enumerate(cases)
+        ]
+    )
+    late_seconds, penalty_percent = late_penalty_sql(
+        submitted_at=rows.c.submitted_at,
+        effective_due_date=effective_due_date_sql(
+            assignment_due_date=rows.c.due_date,
+            extension_due_date=rows.c.extended_due_date,
+        ),
+        policy=late_policy_sql(course_policy=rows.c.course_policy, assignment_policy=rows.c.assignment_policy),
+    )
+    result = await db.execute(
+        select(
+            rows.c.case_id,
+            late_seconds,
+            penalty_percent,
+            apply_late_penalty_sql(rows.c.score, penalty_percent),
+        ).order_by(rows.c.case_id)
+    )
+
+    sql_results = {case_id: tuple(rest) for case_id, *rest in result.all()}
+    assert len(sql_results) == len(cases)
+    for i, case in enumerate(cases):
+        assert sql_results[i] == _python_result(case), case
+
+
+@pytest.mark.asyncio
+async def test_sql_late_policy_treats_json_null_like_missing(db):
+    # Assignment columns written through the ORM store JSON null rather than SQL NULL.
+    rows = values(
+        column("course_policy", JSONB(none_as_null=True)),
+        column("assignment_policy", JSONB),
+        name="policies",
+    ).data([({"percent_per_day": 25}, None)])
+    policy = late_policy_sql(course_policy=rows.c.course_policy, assignment_policy=rows.c.assignment_policy)
+    applies, percent_per_day, max_percent = (
+        await db.execute(select(policy.applies, policy.percent_per_day, policy.max_percent))
+    ).one()
+    assert (applies, percent_per_day, max_percent) == (True, 25, 100)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from io import BytesIO
+
+import pytest
+from sqlalchemy import delete, func, select, update
+
+from app.models.latest_submission import LatestSubmission
+from app.models.submission import Submission, SubmissionStatus
+from app.models.user import User
+
+
+async def _login(client, email: str) -> None:
+    r = await client.post("/api/v1/auth/login", json={"email": email, "password": "password123"})
+    assert r.status_code == 200
+
+
+async def _latest_by_group_by(db) -> set[tuple[int, int, int, SubmissionStatus, int | None]]:
+    latest_ids = select(func.max(Submission.id)).group_by(Submission.assignment_id, Submission.user_id)
+    rows = await db.execute(
+        select(Submission.assignment_id, Submission.user_id, Submission.id, Submission.status, Submission.score).where(
+            Submission.id.in_(latest_ids)
+        )
+    )
+    return set(rows.all())
+
+
+async def _latest_from_table(db) -> set[tuple[int, int, int, SubmissionStatus, int | None]]:
+    rows = await db.execute(
+        select(
+            LatestSubmission.assignment_id,
+            LatestSubmission.user_id,
+            LatestSubmission.submission_id,
+            LatestSubmission.status,
+            LatestSubmission.score,
+        )
+    )
+    return set(rows.all())
+
+
+@pytest.mark.asyncio
+async def test_latest_submissions_track_inserts_grading_and_deletes(client, db):
+    await _login(client, "admin@example.com")
+    org_id = (await client.post("/api/v1/orgs", json={"name": "Org Latest"})).json()["id"]
+    course_id = (
+        await client.post(f"/api/v1/orgs/{org_id}/courses", json={"code": "CS160", "title": "Latest"})
+    ).json()["id"]
+    assignment_ids = []
+    for title in ("A1", "A2"):
+        r = await client.post(
+            f"/api/v1/orgs/{org_id}/courses/{course_id}/assignments",
+            json={"title": title, "description": None, "module_id": None, "max_points": 10},
+        )
+        assignment_ids.append(r.json()["id"])
+    student_ids = []
+    for email in ("latest1@example.com", "latest2@example.com"):
+        user_id = (await client.post("/api/v1/users", json={"email": email, "password": "password123"})).json()["id"]
+        await client.post(
+            f"/api/v1/orgs/{org_id}/courses/{course_id}/memberships",
+            json={"user_id": user_id, "role": "student"},
+        )
+        student_ids.append(user_id)
+
+    await client.post("/api/v1/auth/logout")
+    await _login(client, "latest1@example.com")
+    attempts = []
+    for assignment_id in (assignment_ids[0], assignment_ids[0], assignment_ids[1]):
+        r = await client.post(
+            f"/api/v1/student/courses/{course_id}/assignments/{assignment_id}/submissions",
+            files={"file": ("main.c", BytesIO(b"int main(){return 0;}\n"), "text/x-c")},
+        )
+        attempts.append(r.json()["id"])
+    await client.post("/api/v1/auth/logout")
+    await _login(client, "admin@example.com")
+
+    assert await _latest_from_table(db) == await _latest_by_group_by(db)
+    assert {row[2] for row in await _latest_from_table(db)} == {attempts[1], attempts[2]}
+
+    # Grading the latest attempt is mirrored; grading an older one is not.
+    await db.execute(
+        update(Submission).where(Submission.id.in_(attempts[:2])).values(status=SubmissionStatus.graded, score=7)
+    )
+    await db.commit()
+    assert await _latest_from_table(db) == await _latest_by_group_by(db)
+
+    r = await client.get(f"/api/v1/staff/courses/{course_id}/missing-submissions")
+    summary = {s["assignment_id"]: s for s in r.json()}
+    assert (summary[assignment_ids[0]]["submitted_count"], summary[assignment_ids[0]]["missing_count"]) == (1, 1)
+    r = await client.get(f"/api/v1/staff/courses/{course_id}/missing-submissions/{assignment_ids[0]}")
+    assert [s["user_id"] for s in r.json()] == [student_ids[1]]
+
+    # Deleting the latest attempt falls back to the previous one.
+    await db.execute(delete(Submission).where(Submission.id == attempts[1]))
+    await db.commit()
+    assert await _latest_from_table(db) == await _latest_by_group_by(db)
+    assert attempts[0] in {row[2] for row in await _latest_from_table(db)}
+
+    # Cascading deletes of an assignment or a user leave nothing behind.
+    r = await client.delete(f"/api/v1/orgs/{org_id}/courses/{course_id}/assignments/{assignment_ids[0]}")
+    assert r.status_code == 204
+    assert await _latest_from_table(db) == await _latest_by_group_by(db)
+    await db.execute(delete(User).where(User.id == student_ids[0]))
+    await db.commit()
+    assert await _latest_from_table(db) == set()
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+from io import BytesIO
+
+import pytest
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.crud.staff_missing_submissions import _exact_student_counts, repair_assignment_student_counters
+from app.models.assignment_student_counter import AssignmentStudentCounter
+from app.models.course_membership import CourseMembership, CourseRole
+from app.worker import deadline_poller
+
+
+async def _login(client, email: str) -> None:
+    r = await client.post("/api/v1/auth/login", json={"email": email, "password": "password123"})
+    assert r.status_code == 200
+
+
+async def _counters(db) -> dict[int, tuple[int, int]]:
+    rows = await db.execute(
+        select(
+            AssignmentStudentCounter.assignment_id,
+            AssignmentStudentCounter.students_total,
+            AssignmentStudentCounter.students_submitted,
+        ).execution_options(populate_existing=True)
+    )
+    return {assignment_id: (total, submitted) for assignment_id, total, submitted in rows.all()}
+
+
+async def _exact(db) -> dict[int, tuple[int, int]]:
+    rows = await db.execute(_exact_student_counts(course_id=None))
+    return {assignment_id: (total, submitted) for assignment_id, total, submitted in rows.all()}
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_enrollment_and_first_submissions(client, db):
+    await _login(client, "admin@example.com")
+    org_id = (await client.post("/api/v1/orgs", json={"name": "Org Missing"})).json()["id"]
+    course_id = (
+        await client.post(f"/api/v1/orgs/{org_id}/courses", json={"code": "CS170", "title": "Missing"})
+    ).json()["id"]
+    a1 = (
+        await client.post(
+            f"/api/v1/orgs/{org_id}/courses/{course_id}/assignments",
+            json={"title": "A1", "description": None, "module_id": None, "max_points": 10},
+        )
+    ).json()["id"]
+
+    membership_ids = {}
+    for email in ("miss1@example.com", "miss2@example.com", "miss3@example.com"):
+        user_id = (await client.post("/api/v1/users", json={"email": email, "password": "password123"})).json()["id"]
+        r = await client.post(
+            f"/api/v1/orgs/{org_id}/courses/{course_id}/memberships",
+            json={"user_id": user_id, "role": "student"},
+        )
+        membership_ids[email] = r.json()["id"]
+    assert (await _counters(db))[a1] == (3, 0)
+
+    # Assignments created later start from the current roster.
+    a2 = (
+        await client.post(
+            f"/api/v1/orgs/{org_id}/courses/{course_id}/assignments",
+            json={"title": "A2", "description": None, "module_id": None, "max_points": 10},
+        )
+    ).json()["id"]
+    assert (await _counters(db))[a2] == (3, 0)
+
+    await client.post("/api/v1/auth/logout")
+    await _login(client, "miss1@example.com")
+    for _ in range(2):  # only the first attempt counts
+        await client.post(
+            f"/api/v1/student/courses/{course_id}/assignments/{a1}/submissions",
+            files={"file": ("main.c", BytesIO(b"int main(){return 0;}\n"), "text/x-c")},
+        )
+    await client.post("/api/v1/auth/logout")
+    await _login(client, "admin@example.com")
+    assert (await _counters(db))[a1] == (3, 1)
+
+    r = await client.get(f"/api/v1/staff/courses/{course_id}/missing-submissions")
+    summary = {s["assignment_id"]: s for s in r.json()}
+    assert (summary[a1]["total_students"], summary[a1]["submitted_count"], summary[a1]["missing_count"]) == (3, 1, 2)
+
+    # Promoting the submitter to TA removes them from both counts; removing a student
+    # drops the roster.
+    r = await client.patch(
+        f"/api/v1/orgs/{org_id}/courses/{course_id}/memberships/{membership_ids['miss1@example.com']}",
+        json={"role": "ta"},
+    )
+    assert r.status_code == 200
+    r = await client.delete(
+        f"/api/v1/orgs/{org_id}/courses/{course_id}/memberships/{membership_ids['miss2@example.com']}"
+    )
+    assert r.status_code == 204
+    counters = await _counters(db)
+    assert counters == await _exact(db)
+    assert counters[a1] == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_repair_job_fixes_drifted_counters(client, db, monkeypatch):
+    await _login(client, "admin@example.com")
+    org_id = (await client.post("/api/v1/orgs", json={"name": "Org Repair"})).json()["id"]
+    course_id = (
+        await client.post(f"/api/v1/orgs/{org_id}/courses", json={"code": "CS171", "title": "Repair"})
+    ).json()["id"]
+    assignment_id = (
+        await client.post(
+            f"/api/v1/orgs/{org_id}/courses/{course_id}/assignments",
+            json={"title": "A1", "description": None, "module_id": None, "max_points": 10},
+        )
+    ).json()["id"]
+
+    await db.execute(
+        update(AssignmentStudentCounter)
+        .where(AssignmentStudentCounter.assignment_id == assignment_id)
+        .values(students_total=7, students_submitted=5)
+    )
+    await db.commit()
+
+    assert await repair_assignment_student_counters(db, course_id=course_id) == 1
+    assert (await _counters(db))[assignment_id] == (0, 0)
+    assert await repair_assignment_student_counters(db) == 0
+
+    # The poller runs it once per interval.
+    calls = []
+
+    async def _job() -> int:
+        calls.append(1)
+        return 0
+
+    monkeypatch.setattr(
+        deadline_poller,
+        "PERIODIC_JOBS",
+        [("job", "missing_counters_repair_interval_seconds", _job)],
+    )
+    last_run: dict[str, float] = {}
+    await deadline_poller.run_periodic_jobs(last_run)
+    await deadline_poller.run_periodic_jobs(last_run)
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_repair_keeps_an_enrollment_that_commits_while_it_runs(client, db):
+    await _login(client, "admin@example.com")
+    org_id = (await client.post("/api/v1/orgs", json={"name": "Org Repair Race"})).json()["id"]
+    course_id = (
+        await client.post(f"/api/v1/orgs/{org_id}/courses", json={"code": "CS172", "title": "Race"})
+    ).json()["id"]
+    assignment_id = (
+        await client.post(
+            f"/api/v1/orgs/{org_id}/courses/{course_id}/assignments",
+            json={"title": "A1", "description": None, "module_id": None, "max_points": 10},
+        )
+    ).json()["id"]
+    user_id = (
+        await client.post("/api/v1/users", json={"email": "race@example.com", "password": "password123"})
+    ).json()["id"]
+
+    schema = (await db.execute(text("SELECT current_schema()"))).scalar_one()
+    session_maker = async_sessionmaker(db.bind, expire_on_commit=False)
+    async with session_maker() as enrolling, session_maker() as repairing:
+        for session in (enrolling, repairing):
+            await session.execute(text(f"SET search_path TO {schema}"))
+        # The enrollment trigger has bumped (and locked) the counter row; not yet committed.
+        enrolling.add(CourseMembership(course_id=course_id, user_id=user_id, role=CourseRole.student))
+        await enrolling.flush()
+
+        repair = asyncio.create_task(repair_assignment_student_counters(repairing, course_id=course_id))
+        await asyncio.sleep(0.2)
+        assert not repair.done()
+        await enrolling.commit()
+        assert await repair == 0
+
+    assert (await _counters(db))[assignment_id] == (1, 0)
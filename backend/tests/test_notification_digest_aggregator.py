@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.crud.notifications import SubmissionDigestEntry
+from app.models.notification import Notification, NotificationKind
+from app.worker.submission_digests import SubmissionDigestAggregator
+
+
+async def _session_factory_for_schema(db):
+    schema = (await db.execute(text("SELECT current_schema()"))).scalar_one()
+    session_maker = async_sessionmaker(db.bind, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def _factory():
+        async with session_maker() as session:
+            await session.execute(text(f"SET search_path TO {schema}"))
+            yield session
+
+    return _factory
+
+
+async def _course_with_staff(client) -> tuple[int, list[int]]:
+    r = await client.post("/api/v1/auth/login", json={"email": "admin@example.com", "password": "password123"})
+    assert r.status_code == 200
+    admin_id = (await client.get("/api/v1/auth/me")).json()["id"]
+    org_id = (await client.post("/api/v1/orgs", json={"name": "Org Digest"})).json()["id"]
+    course_id = (
+        await client.post(f"/api/v1/orgs/{org_id}/courses", json={"code": "CS130", "title": "Digest"})
+    ).json()["id"]
+
+    ta_ids = []
+    for email in ("ta1@example.com", "ta2@example.com"):
+        user_id = (await client.post("/api/v1/users", json={"email": email, "password": "password123"})).json()["id"]
+        r = await client.post(
+            f"/api/v1/orgs/{org_id}/courses/{course_id}/memberships",
+            json={"user_id": user_id, "role": "ta"},
+        )
+        assert r.status_code == 201
+        ta_ids.append(user_id)
+    return course_id, [admin_id, *ta_ids]
+
+
+def _entry(course_id: int, *, email: str, submitter_user_id: int) -> SubmissionDigestEntry:
+    return SubmissionDigestEntry(
+        course_id=course_id,
+        course_code="CS130",
+        assignment_title="A1",
+        student_email=email,
+        submitter_user_id=submitter_user_id,
+    )
+
+
+@pytest.mark.asyncio
+async def test_aggregator_coalesces_entries_into_one_digest_per_staff_member(client, db):
+    course_id, staff_ids = await _course_with_staff(client)
+    aggregator = SubmissionDigestAggregator(
+        flush_seconds=3600,
+        max_pending_courses=10,
+        session_factory=await _session_factory_for_schema(db),
+    )
+
+    assert aggregator.record(_entry(course_id, email="s1@example.com", submitter_user_id=10_001))
+    assert aggregator.record(_entry(course_id, email="s2@example.com", submitter_user_id=10_002))
+    # A TA submitting is counted for everyone except that TA.
+    assert aggregator.record(_entry(course_id, email="ta1@example.com", submitter_user_id=staff_ids[1]))
+    assert aggregator.pending_courses == 1
+    assert await aggregator.flush() == 1
+    assert aggregator.pending_courses == 0
+
+    rows = (
+        await db.execute(
+            select(Notification.user_id, Notification.title, Notification.body)
+            .where(Notification.kind == NotificationKind.submissions_received)
+            .order_by(Notification.user_id)
+        )
+    ).all()
+    by_user = {user_id: (title, body) for user_id, title, body in rows}
+    assert set(by_user) == set(staff_ids)
+    assert by_user[staff_ids[0]][0] == "New submissions (3) — CS130"
+    assert by_user[staff_ids[1]][0] == "New submissions (2) — CS130"
+    assert by_user[staff_ids[0]][1].endswith("Latest: ta1@example.com — A1")
+
+    # A later batch extends the open digests instead of adding rows.
+    assert aggregator.record(_entry(course_id, email="s3@example.com", submitter_user_id=10_003))
+    await aggregator.flush()
+    titles = (
+        await db.execute(
+            select(Notification.title).where(Notification.user_id == staff_ids[0]).execution_options(
+                populate_existing=True
+            )
+        )
+    ).scalars().all()
+    assert titles == ["New submissions (4) — CS130"]
+    aggregator._task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_aggregator_flushes_in_background_and_bounds_pending_courses(client, db):
+    course_id, staff_ids = await _course_with_staff(client)
+    aggregator = SubmissionDigestAggregator(
+        flush_seconds=0.05,
+        max_pending_courses=1,
+        session_factory=await _session_factory_for_schema(db),
+    )
+
+    assert aggregator.record(_entry(course_id, email="s1@example.com", submitter_user_id=10_001))
+    # Another course would exceed the bound, so the caller is told to write it inline.
+    assert not aggregator.record(_entry(course_id + 1, email="s2@example.com", submitter_user_id=10_002))
+
+    for _ in range(50):
+        await asyncio.sleep(0.02)
+        if aggregator.pending_courses == 0 and aggregator._task is None:
+            break
+    assert aggregator._task is None
+
+    count = (
+        await db.execute(select(Notification.id).where(Notification.kind == NotificationKind.submissions_received))
+    ).all()
+    assert len(count) == len(staff_ids)
+
+
+@pytest.mark.asyncio
+async def test_failing_course_does_not_abort_the_remaining_digests(client, db, monkeypatch):
+    from app.crud import notifications as notifications_crud
+
+    r = await client.post("/api/v1/auth/login", json={"email": "admin@example.com", "password": "password123"})
+    assert r.status_code == 200
+    admin_id = (await client.get("/api/v1/auth/me")).json()["id"]
+    org_id = (await client.post("/api/v1/orgs", json={"name": "Org Digest Failures"})).json()["id"]
+    course_ids = [
+        (await client.post(f"/api/v1/orgs/{org_id}/courses", json={"code": code, "title": code})).json()["id"]
+        for code in ("CS131", "CS132", "CS133")
+    ]
+
+    def _digests():
+        return [
+            notifications_crud.CourseSubmissionDigest.from_entry(
+                _entry(course_id, email="s1@example.com", submitter_user_id=10_001)
+            )
+            for course_id in course_ids
+        ]
+
+    await notifications_crud.apply_submission_digests(db, digests=_digests())
+
+    # Every course now has an open digest to update; make the second course's write fail.
+    increment = notifications_crud._increment_unread_counts
+    calls = 0
+
+    async def _failing_second_course(db, *, user_ids):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("boom")
+        return await increment(db, user_ids=user_ids)
+
+    monkeypatch.setattr(notifications_crud, "_increment_unread_counts", _failing_second_course)
+    await notifications_crud.apply_submission_digests(db, digests=_digests())
+    assert calls == 3
+
+    rows = (
+        await db.execute(
+            select(Notification.link_url, Notification.title)
+            .where(Notification.user_id == admin_id, Notification.kind == NotificationKind.submissions_received)
+            .execution_options(populate_existing=True)
+        )
+    ).all()
+    titles = {link_url: title for link_url, title in rows}
+    assert len(rows) == 3
+    assert titles[f"/staff/submissions?course_id={course_ids[0]}"] == "New submissions (2) — CS130"
+    assert titles[f"/staff/submissions?course_id={course_ids[1]}"] == "New submissions (1) — CS130"
+    assert titles[f"/staff/submissions?course_id={course_ids[2]}"] == "New submissions (2) — CS130"
@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import select
+
+from app.core import security
+from app.core.config import settings
+from app.models.user import User
+
+
+def test_scrypt_and_pbkdf2_hashes_round_trip_and_flag_rehash(monkeypatch):
+    monkeypatch.setattr(settings, "password_pbkdf2_iterations", 1000)
+    legacy = security.hash_password("s3cret")
+    assert legacy.startswith("pbkdf2_sha256$1000$")
+    assert security.verify_password("s3cret", legacy)
+    assert not security.password_needs_rehash(legacy)
+
+    monkeypatch.setattr(settings, "password_hash_scheme", "scrypt")
+    monkeypatch.setattr(settings, "password_scrypt_n", 2**10)
+    assert security.password_needs_rehash(legacy)
+
+    upgraded = security.hash_password("s3cret")
+    assert upgraded.startswith("scrypt$1024$8$1$")
+    assert security.verify_password("s3cret", upgraded)
+    assert not security.verify_password("wrong", upgraded)
+    assert not security.password_needs_rehash(upgraded)
+    # Legacy hashes keep verifying after the scheme changes.
+    assert security.verify_password("s3cret", legacy)
+    assert not security.verify_password("s3cret", "md5$abc")
+
+
+@pytest.mark.asyncio
+async def test_async_hashing_runs_in_pool_and_records_queue_time():
+    queue = security._hash_queue_seconds.labels("verify")
+    before = queue.count
+    stored = await security.hash_password_async("password123")
+    assert await security.verify_password_async("password123", stored)
+    assert not await security.verify_password_async("nope", stored)
+    assert queue.count == before + 2
+
+
+@pytest.mark.asyncio
+async def test_login_transparently_rehashes_to_configured_scheme(client, db, monkeypatch):
+    r = await client.post("/api/v1/auth/login", json={"email": "admin@example.com", "password": "password123"})
+    assert r.status_code == 200
+    r = await client.post("/api/v1/users", json={"email": "rehash@example.com", "password": "password123"})
+    assert r.status_code == 201
+    await client.post("/api/v1/auth/logout")
+
+    user = (await db.execute(select(User).where(User.email == "rehash@example.com"))).scalar_one()
+    assert user.password_hash.startswith("pbkdf2_sha256$")
+
+    monkeypatch.setattr(settings, "password_hash_scheme", "scrypt")
+    monkeypatch.setattr(settings, "password_scrypt_n", 2**10)
+    r = await client.post("/api/v1/auth/login", json={"email": "rehash@example.com", "password": "password123"})
+    assert r.status_code == 200
+
+    await db.refresh(user)
+    assert user.password_hash.startswith("scrypt$1024$")
+
+    await client.post("/api/v1/auth/logout")
+    r = await client.post("/api/v1/auth/login", json={"email": "rehash@example.com", "password": "password123"})
+    assert r.status_code == 200
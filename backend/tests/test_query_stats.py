@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import logging
+
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.observability.query_stats import report_query_stats, track_queries
+
+
+@pytest.mark.asyncio
+async def test_nested_trackers_count_queries_and_flag_repeated_statements(db, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "query_log_threshold", 5)
+    monkeypatch.setattr(settings, "query_repeat_threshold", 3)
+
+    with track_queries() as outer:
+        await db.execute(text("SELECT 1"))
+        with track_queries() as inner:
+            for i in range(4):
+                await db.execute(text("SELECT :i"), {"i": i})
+    assert (outer.count, inner.count) == (5, 4)
+    assert outer.seconds >= inner.seconds > 0
+    assert inner.repeated(3) == [("SELECT %(i)s", 4)]
+
+    with caplog.at_level(logging.WARNING, logger="app.observability.query_stats"):
+        report_query_stats(inner, label="inner")
+        report_query_stats(outer, label="outer")
+    messages = [record.getMessage() for record in caplog.records]
+    assert any("possible N+1" in m and "unit=inner" in m and "executions=4" in m for m in messages)
+    assert any("High query count. unit=outer queries=5" in m for m in messages)
+    assert not any("High query count. unit=inner" in m for m in messages)
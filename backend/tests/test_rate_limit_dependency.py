@@ -1,3 +1,4 @@
+from types import SimpleNamespace
 from uuid import uuid4
 
 import pytest
@@ -43,3 +44,40 @@ async def test_rate_limit_is_noop_when_disabled() -> None:
     request = _request_for("20.20.20.20")
     await dependency(request)
     await dependency(request)
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_rejection_sets_retry_after_and_counts_metric() -> None:
+    from app.api.deps.rate_limit import _rejections_total
+
+    bucket = f"test-retry-{uuid4().hex}"
+    dependency = make_rate_limit_dependency(bucket=bucket, limit=2, window_seconds=60)
+    request = _request_for("30.30.30.30")
+    await dependency(request)
+    await dependency(request)
+
+    with pytest.raises(HTTPException) as exc:
+        await dependency(request)
+    assert exc.value.status_code == 429
+    # GCRA refills one slot every window/limit seconds.
+    assert 1 <= int(exc.value.headers["Retry-After"]) <= 30
+    assert _rejections_total.labels(bucket).value == 1
+
+    # Other clients keep their own budget.
+    await dependency(_request_for("30.30.30.31"))
+
+
+def test_gcra_limiter_keeps_one_entry_per_key_and_trims_expired(monkeypatch) -> None:
+    from app.api.deps import rate_limit
+
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    limiter = rate_limit._InMemoryGcraLimiter(max_keys=100)
+    for i in range(50):
+        for _ in range(3):
+            limiter.allow(key=f"k{i}", limit=10, window_seconds=60)
+    assert len(limiter) == 50
+
+    clock[0] += 120
+    assert limiter.allow(key="fresh", limit=10, window_seconds=60).allowed
+    assert len(limiter) == 1
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from io import BytesIO
+import json
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.integrations.jobe import JOBE_OUTCOME_OK
+from app.realtime.events import EventBus, _reset_event_bus_for_tests, get_event_bus, submission_channel
+from app.realtime.sse import iter_channel_events
+from app.worker.grading import PreparedJobeRun, RunCheck
+from app.worker.tasks import _grade_submission_impl
+
+
+@pytest.fixture(autouse=True)
+def _local_event_bus():
+    _reset_event_bus_for_tests(EventBus())
+    yield
+    _reset_event_bus_for_tests()
+
+
+async def _login(client, *, email: str, password: str) -> None:
+    response = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200
+
+
+async def _setup_course(client) -> tuple[int, int, int]:
+    await _login(client, email="admin@example.com", password="password123")
+    org_id = (await client.post("/api/v1/orgs", json={"name": "Org Realtime"})).json()["id"]
+    course_id = (
+        await client.post(f"/api/v1/orgs/{org_id}/courses", json={"code": "CS410", "title": "Realtime"})
+    ).json()["id"]
+    response = await client.post("/api/v1/users", json={"email": "rt.student@example.com", "password": "password123"})
+    assert response.status_code == 201
+    student_id = response.json()["id"]
+    response = await client.post(
+        f"/api/v1/orgs/{org_id}/courses/{course_id}/memberships",
+        json={"user_id": student_id, "role": "student"},
+    )
+    assert response.status_code == 201
+    response = await client.post(
+        f"/api/v1/staff/courses/{course_id}/assignments",
+        json={"title": "A1", "description": "Desc", "module_id": None, "autograde_mode": "practice_only"},
+    )
+    assert response.status_code == 201
+    assignment_id = response.json()["id"]
+    response = await client.post(
+        f"/api/v1/staff/courses/{course_id}/assignments/{assignment_id}/testcases",
+        json={
+            "name": "T1",
+            "position": 1,
+            "points": 5,
+            "is_hidden": False,
+            "stdin": "",
+            "expected_stdout": "ok\n",
+            "expected_stderr": "",
+        },
+    )
+    assert response.status_code == 201
+    await client.post("/api/v1/auth/logout")
+    return course_id, assignment_id, student_id
+
+
+async def _session_factory_for_schema(db):
+    schema = (await db.execute(text("SELECT current_schema()"))).scalar_one()
+    session_maker = async_sessionmaker(db.bind, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def _factory():
+        async with session_maker() as session:
+            await session.execute(text(f"SET search_path TO {schema}"))
+            yield session
+
+    return _factory
+
+
+def _drain(subscription) -> list[dict]:
+    events = []
+    while not subscription._queue.empty():
+        events.append(subscription._queue.get_nowait())
+    return events
+
+
+@pytest.mark.asyncio
+async def test_submit_and_grading_publish_status_transitions(client, db, monkeypatch) -> None:
+    course_id, assignment_id, student_id = await _setup_course(client)
+
+    async def _fake_prepare(*args, **kwargs):
+        return PreparedJobeRun(
+            language_id="c",
+            source_code="int main(){return 0;}\n",
+            source_filename="main.c",
+            file_list=None,
+            parameters=None,
+            cputime=settings.jobe_grading_cputime_seconds,
+            memorylimit=settings.jobe_grading_memorylimit_mb,
+            streamsize=settings.jobe_grading_streamsize_mb,
+        )
+
+    async def _fake_run_test_case(*args, **kwargs):
+        return RunCheck(passed=True, outcome=JOBE_OUTCOME_OK, compile_output="", stdout="ok\n", stderr="")
+
+    async def _fake_health_gate(*, force: bool = False):
+        return None
+
+    monkeypatch.setattr("app.worker.tasks._ensure_jobe_healthy", _fake_health_gate)
+    monkeypatch.setattr("app.worker.tasks._jobe_client", lambda: object())
+    monkeypatch.setattr("app.worker.tasks.prepare_jobe_run", _fake_prepare)
+    monkeypatch.setattr("app.worker.tasks.run_test_case", _fake_run_test_case)
+
+    async with get_event_bus().subscribe(submission_channel(student_id)) as subscription:
+        await _login(client, email="rt.student@example.com", password="password123")
+        response = await client.post(
+            f"/api/v1/student/courses/{course_id}/assignments/{assignment_id}/submissions",
+            files={"file": ("main.c", BytesIO(b"int main(){return 0;}\n"), "text/x-c")},
+        )
+        assert response.status_code == 201
+        submission_id = int(response.json()["id"])
+
+        session_factory = await _session_factory_for_schema(db)
+        result = await _grade_submission_impl(
+            submission_id=submission_id,
+            phase="practice",
+            attempt=0,
+            session_factory=session_factory,
+        )
+        assert result["status"] == "graded"
+
+        events = [e for e in _drain(subscription) if e["submission_id"] == submission_id]
+
+    assert [e["status"] for e in events][-3:] == ["pending", "grading", "graded"]
+    assert events[-1]["score"] == 5
+    assert all(e["type"] == "submission.status" and e["assignment_id"] == assignment_id for e in events)
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_formats_filtered_events_and_heartbeats() -> None:
+    channel = submission_channel(42)
+    stream = iter_channel_events(channel, accept=lambda e: e["assignment_id"] == 7, heartbeat_seconds=0.05)
+
+    assert await stream.__anext__() == "retry: 5000\n\n"
+    assert await stream.__anext__() == ": keepalive\n\n"
+
+    bus = get_event_bus()
+    await bus.publish(channel, {"type": "submission.status", "submission_id": 1, "assignment_id": 8})
+    await bus.publish(channel, {"type": "submission.status", "submission_id": 2, "assignment_id": 7})
+    frame = await asyncio.wait_for(stream.__anext__(), timeout=1)
+    event_line, data_line = frame.strip().split("\n")
+    assert event_line == "event: submission.status"
+    assert json.loads(data_line.removeprefix("data: "))["submission_id"] == 2
+
+    await stream.aclose()
+    assert channel not in bus._subscribers
+
+
+@pytest.mark.asyncio
+async def test_publish_many_sends_all_events_in_one_redis_round_trip():
+    class _Pipeline:
+        def __init__(self, redis) -> None:
+            self.redis = redis
+            self.commands: list[tuple[str, str]] = []
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info) -> None:
+            return None
+
+        def publish(self, channel: str, message: str) -> None:
+            self.commands.append((channel, message))
+
+        async def execute(self) -> None:
+            self.redis.round_trips.append(self.commands)
+
+    class _Redis:
+        def __init__(self) -> None:
+            self.round_trips: list[list[tuple[str, str]]] = []
+
+        def pipeline(self, *, transaction: bool):
+            assert transaction is False
+            return _Pipeline(self)
+
+        async def publish(self, channel: str, message: str) -> None:
+            raise AssertionError("bulk publishes must be pipelined")
+
+    redis = _Redis()
+    bus = EventBus(redis_url="redis://unused", prefix="test")
+    bus._redis = redis
+    await bus.publish_many(
+        [
+            (submission_channel(1), {"type": "submission.status", "submission_id": 10}),
+            (submission_channel(2), {"type": "submission.status", "submission_id": 11}),
+        ]
+    )
+
+    (commands,) = redis.round_trips
+    assert [(channel, json.loads(message)["submission_id"]) for channel, message in commands] == [
+        ("test:submissions:user:1", 10),
+        ("test:submissions:user:2", 11),
+    ]
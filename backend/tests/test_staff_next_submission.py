@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from io import BytesIO
+
+import pytest
+from sqlalchemy import select, update
+
+from app.models.submission import SUBMISSION_TRIAGE_PRIORITY, Submission, SubmissionStatus
+
+
+async def _login(client, email: str) -> None:
+    r = await client.post("/api/v1/auth/login", json={"email": email, "password": "password123"})
+    assert r.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_next_walks_stored_triage_order(client, db):
+    await _login(client, "admin@example.com")
+    org_id = (await client.post("/api/v1/orgs", json={"name": "Org Triage"})).json()["id"]
+    course_id = (
+        await client.post(f"/api/v1/orgs/{org_id}/courses", json={"code": "CS150", "title": "Triage"})
+    ).json()["id"]
+    assignment_id = (
+        await client.post(
+            f"/api/v1/orgs/{org_id}/courses/{course_id}/assignments",
+            json={"title": "A1", "description": None, "module_id": None, "max_points": 10},
+        )
+    ).json()["id"]
+    stud_id = (
+        await client.post("/api/v1/users", json={"email": "triage@example.com", "password": "password123"})
+    ).json()["id"]
+    await client.post(
+        f"/api/v1/orgs/{org_id}/courses/{course_id}/memberships",
+        json={"user_id": stud_id, "role": "student"},
+    )
+
+    await client.post("/api/v1/auth/logout")
+    await _login(client, "triage@example.com")
+    ids = []
+    for _ in range(5):
+        r = await client.post(
+            f"/api/v1/student/courses/{course_id}/assignments/{assignment_id}/submissions",
+            files={"file": ("main.c", BytesIO(b"int main(){return 0;}\n"), "text/x-c")},
+        )
+        ids.append(r.json()["id"])
+    await client.post("/api/v1/auth/logout")
+    await _login(client, "admin@example.com")
+
+    statuses = {
+        ids[0]: SubmissionStatus.error,
+        ids[1]: SubmissionStatus.graded,
+        ids[3]: SubmissionStatus.grading,
+    }
+    for submission_id, status in statuses.items():
+        await db.execute(update(Submission).where(Submission.id == submission_id).values(status=status))
+    await db.commit()
+
+    rows = (
+        await db.execute(
+            select(Submission.id, Submission.status, Submission.course_id, Submission.triage_priority).where(
+                Submission.id.in_(ids)
+            )
+        )
+    ).all()
+    for _, status, stored_course_id, priority in rows:
+        assert stored_course_id == course_id
+        assert priority == SUBMISSION_TRIAGE_PRIORITY[status]
+
+    # pending (oldest first), then grading, then error; graded is skipped.
+    expected = [ids[2], ids[4], ids[3], ids[0]]
+    seen: list[int] = []
+    r = await client.get(f"/api/v1/staff/submissions/next?course_id={course_id}")
+    while r.status_code == 200 and r.json()["submission_id"] is not None:
+        seen.append(r.json()["submission_id"])
+        r = await client.get(
+            "/api/v1/staff/submissions/next",
+            params={"course_id": course_id, "after_submission_id": seen[-1]},
+        )
+    assert seen == expected
+
+    r = await client.get(
+        "/api/v1/staff/submissions/next",
+        params={"course_id": course_id, "status_filter": "error"},
+    )
+    assert r.json()["submission_id"] == ids[0]
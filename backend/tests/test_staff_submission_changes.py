@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from io import BytesIO
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.models.submission import Submission, SubmissionStatus
+
+
+async def _login(client, email: str) -> None:
+    r = await client.post("/api/v1/auth/login", json={"email": email, "password": "password123"})
+    assert r.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_changes_feed_returns_writes_after_the_cursor(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "submission_changes_settle_seconds", 0.0)
+    await _login(client, "admin@example.com")
+    org_id = (await client.post("/api/v1/orgs", json={"name": "Org Changes"})).json()["id"]
+    course_id = (
+        await client.post(f"/api/v1/orgs/{org_id}/courses", json={"code": "CS195", "title": "Changes"})
+    ).json()["id"]
+    assignment_id = (
+        await client.post(
+            f"/api/v1/orgs/{org_id}/courses/{course_id}/assignments",
+            json={"title": "A1", "description": None, "module_id": None, "max_points": 10},
+        )
+    ).json()["id"]
+    stud_id = (
+        await client.post("/api/v1/users", json={"email": "changes@example.com", "password": "password123"})
+    ).json()["id"]
+    await client.post(
+        f"/api/v1/orgs/{org_id}/courses/{course_id}/memberships",
+        json={"user_id": stud_id, "role": "student"},
+    )
+
+    async def _submit() -> int:
+        await client.post("/api/v1/auth/logout")
+        await _login(client, "changes@example.com")
+        r = await client.post(
+            f"/api/v1/student/courses/{course_id}/assignments/{assignment_id}/submissions",
+            files={"file": ("main.c", BytesIO(b"int main(){return 0;}\n"), "text/x-c")},
+        )
+        await client.post("/api/v1/auth/logout")
+        await _login(client, "admin@example.com")
+        return r.json()["id"]
+
+    old_id = await _submit()
+    r = await client.get("/api/v1/staff/submissions/changes", params={"course_id": course_id})
+    assert r.status_code == 200
+    baseline = r.json()
+    assert baseline["items"] == [] and baseline["has_more"] is False
+
+    new_ids = [await _submit(), await _submit()]
+    r = await client.get(
+        "/api/v1/staff/submissions/changes",
+        params={"course_id": course_id, "cursor": baseline["next_cursor"], "limit": 1},
+    )
+    page = r.json()
+    assert [item["id"] for item in page["items"]] == new_ids[:1]
+    assert page["has_more"] is True
+    r = await client.get(
+        "/api/v1/staff/submissions/changes",
+        params={"course_id": course_id, "cursor": page["next_cursor"]},
+    )
+    page = r.json()
+    assert [item["id"] for item in page["items"]] == new_ids[1:]
+    assert page["has_more"] is False
+    cursor = page["next_cursor"]
+
+    # Writes that bypass the ORM are stamped too, and grading records graded_at.
+    await db.execute(
+        update(Submission).where(Submission.id == old_id).values(status=SubmissionStatus.graded, score=9)
+    )
+    await db.commit()
+    r = await client.get("/api/v1/staff/submissions/changes", params={"course_id": course_id, "cursor": cursor})
+    (item,) = r.json()["items"]
+    assert (item["id"], item["status"], item["score"]) == (old_id, "graded", 9)
+    assert item["graded_at"] == item["updated_at"]
+    cursor = r.json()["next_cursor"]
+
+    # No-op updates leave the stamp alone; leaving graded clears graded_at.
+    await db.execute(update(Submission).where(Submission.id == old_id).values(score=9))
+    await db.commit()
+    r = await client.get("/api/v1/staff/submissions/changes", params={"course_id": course_id, "cursor": cursor})
+    assert r.json() == {"items": [], "next_cursor": cursor, "has_more": False}
+    r = await client.post(
+        "/api/v1/staff/submissions/bulk",
+        json={"submission_ids": [old_id], "action": "mark_pending"},
+    )
+    assert r.status_code == 200
+    r = await client.get("/api/v1/staff/submissions/changes", params={"cursor": cursor})
+    assert [(i["id"], i["graded_at"]) for i in r.json()["items"]] == [(old_id, None)]
+    graded_at = (await db.execute(select(Submission.graded_at).where(Submission.id == old_id))).scalar_one()
+    assert graded_at is None
+
+    # Writes younger than the settle window wait for the next poll.
+    monkeypatch.setattr(settings, "submission_changes_settle_seconds", 3600.0)
+    cursor = r.json()["next_cursor"]
+    await _submit()
+    r = await client.get("/api/v1/staff/submissions/changes", params={"course_id": course_id, "cursor": cursor})
+    assert r.json()["items"] == []
+
+    r = await client.get("/api/v1/staff/submissions/changes", params={"cursor": "garbage"})
+    assert r.status_code == 400
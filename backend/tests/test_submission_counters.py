@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from io import BytesIO
+
+import pytest
+from sqlalchemy import select, update
+
+from app.crud.staff_submissions import count_staff_submission_rows, count_staff_submission_rows_from_counters
+from app.models.submission import Submission, SubmissionStatus
+
+
+async def _login(client, email: str) -> None:
+    r = await client.post("/api/v1/auth/login", json={"email": email, "password": "password123"})
+    assert r.status_code == 200
+
+
+async def _assert_counters_match(db, *, staff_user_id: int, course_id: int) -> None:
+    for status in (None, *SubmissionStatus):
+        for scoped_course in (None, course_id):
+            kwargs = {"staff_user_id": staff_user_id, "course_id": scoped_course, "status": status}
+            assert await count_staff_submission_rows_from_counters(db, **kwargs) == await count_staff_submission_rows(
+                db, **kwargs
+            ), kwargs
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_inserts_status_changes_and_deletes(client, db):
+    await _login(client, "admin@example.com")
+    admin_id = (await client.get("/api/v1/auth/me")).json()["id"]
+    org_id = (await client.post("/api/v1/orgs", json={"name": "Org Counters"})).json()["id"]
+    course_id = (
+        await client.post(f"/api/v1/orgs/{org_id}/courses", json={"code": "CS140", "title": "Counters"})
+    ).json()["id"]
+    assignment_ids = []
+    for title in ("A1", "A2"):
+        r = await client.post(
+            f"/api/v1/orgs/{org_id}/courses/{course_id}/assignments",
+            json={"title": title, "description": None, "module_id": None, "max_points": 10},
+        )
+        assignment_ids.append(r.json()["id"])
+    stud_id = (
+        await client.post("/api/v1/users", json={"email": "count@example.com", "password": "password123"})
+    ).json()["id"]
+    await client.post(
+        f"/api/v1/orgs/{org_id}/courses/{course_id}/memberships",
+        json={"user_id": stud_id, "role": "student"},
+    )
+
+    await client.post("/api/v1/auth/logout")
+    await _login(client, "count@example.com")
+    submission_ids = []
+    for assignment_id in (assignment_ids[0], assignment_ids[0], assignment_ids[1]):
+        r = await client.post(
+            f"/api/v1/student/courses/{course_id}/assignments/{assignment_id}/submissions",
+            files={"file": ("main.c", BytesIO(b"int main(){return 0;}\n"), "text/x-c")},
+        )
+        submission_ids.append(r.json()["id"])
+    await client.post("/api/v1/auth/logout")
+    await _login(client, "admin@example.com")
+
+    await _assert_counters_match(db, staff_user_id=admin_id, course_id=course_id)
+
+    r = await client.post(
+        "/api/v1/staff/submissions/bulk",
+        json={"submission_ids": submission_ids[:2], "action": "mark_graded"},
+    )
+    assert r.status_code == 200
+    # Writes that bypass the ORM are counted too.
+    await db.execute(update(Submission).where(Submission.id == submission_ids[2]).values(status=SubmissionStatus.error))
+    await db.commit()
+    await _assert_counters_match(db, staff_user_id=admin_id, course_id=course_id)
+
+    r = await client.get(f"/api/v1/staff/submissions/page?course_id={course_id}&status_filter=graded")
+    assert (r.json()["total"], r.json()["total_source"]) == (2, "counter")
+    r = await client.get(f"/api/v1/staff/submissions/page?course_id={course_id}&exact_total=true")
+    assert (r.json()["total"], r.json()["total_source"]) == (3, "exact")
+
+    r = await client.delete(f"/api/v1/orgs/{org_id}/courses/{course_id}/assignments/{assignment_ids[0]}")
+    assert r.status_code == 204
+    remaining = (await db.execute(select(Submission.id).where(Submission.assignment_id == assignment_ids[0]))).all()
+    assert remaining == []
+    await _assert_counters_match(db, staff_user_id=admin_id, course_id=course_id)
+    r = await client.get(f"/api/v1/staff/submissions/page?course_id={course_id}")
+    assert r.json()["total"] == 1
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+import contextvars
+from io import BytesIO
+import json
+import threading
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from taskiq import TaskiqMessage
+
+from app.core.config import settings
+from app.integrations.jobe import JOBE_OUTCOME_OK
+from app.observability import tracing
+from app.worker.broker import TraceContextMiddleware
+from app.worker.grading import PreparedJobeRun, RunCheck
+from app.worker.tasks import _grade_submission_impl
+
+INCOMING_TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+INCOMING_PARENT_ID = "00f067aa0ba902b7"
+
+
+class _MemoryExporter:
+    def __init__(self) -> None:
+        self.spans: list[tracing.Span] = []
+
+        self.threads: set[str] = set()
+
+    def export(self, spans: list[tracing.Span]) -> None:
+        self.spans.extend(spans)
+        self.threads.add(threading.current_thread().name)
+
+    def shutdown(self) -> None:
+        pass
+
+
+@pytest.fixture()
+def exporter():
+    memory = _MemoryExporter()
+    previous = tracing.set_span_exporter(memory)
+    try:
+        yield memory
+    finally:
+        tracing.set_span_exporter(previous)
+
+
+async def _login(client, email: str) -> None:
+    r = await client.post("/api/v1/auth/login", json={"email": email, "password": "password123"})
+    assert r.status_code == 200
+
+
+def test_traceparent_parsing_rejects_malformed_values():
+    assert tracing.parse_traceparent(f"00-{INCOMING_TRACE_ID}-{INCOMING_PARENT_ID}-01") == (
+        INCOMING_TRACE_ID,
+        INCOMING_PARENT_ID,
+    )
+    assert tracing.parse_traceparent(f"00-{'0' * 32}-{INCOMING_PARENT_ID}-01") is None
+    assert tracing.parse_traceparent("00-abc-def-01") is None
+    assert tracing.parse_traceparent(None) is None
+
+
+def test_file_exporter_writes_otlp_json_lines(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    previous = tracing.set_span_exporter(tracing.FileSpanExporter(path, service_name="marconi-test"))
+    try:
+        with tracing.start_span("outer", attributes={"submission.id": 7}):
+            with tracing.start_span("inner"):
+                pass
+    finally:
+        tracing.set_span_exporter(previous)
+
+    (line,) = path.read_text().splitlines()
+    resource_spans = json.loads(line)["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": "marconi-test"}}
+    ]
+    inner, outer = resource_spans["scopeSpans"][0]["spans"]
+    assert (inner["name"], outer["name"]) == ("inner", "outer")
+    assert inner["parentSpanId"] == outer["spanId"] and "parentSpanId" not in outer
+    assert outer["attributes"] == [{"key": "submission.id", "value": {"intValue": "7"}}]
+
+
+def test_local_root_exports_only_its_own_trace_off_the_caller_thread(exporter):
+    def _short_request() -> None:
+        with tracing.start_span("short"):
+            with tracing.start_span("short.child"):
+                pass
+
+    with tracing.start_span("long"):
+        with tracing.start_span("long.child"):
+            pass
+        # A concurrent request (its own context) finishes while "long" is still running.
+        contextvars.Context().run(_short_request)
+        tracing._export_queue.join()
+        assert sorted(s.name for s in exporter.spans) == ["short", "short.child"]
+
+    tracing.flush_spans()
+    assert sorted(s.name for s in exporter.spans) == ["long", "long.child", "short", "short.child"]
+    assert exporter.threads == {"span-export"}
+
+
+@pytest.mark.asyncio
+async def test_trace_follows_a_submission_from_upload_to_grading(client, db, exporter, monkeypatch):
+    await _login(client, "admin@example.com")
+    org_id = (await client.post("/api/v1/orgs", json={"name": "Org Trace"})).json()["id"]
+    course_id = (
+        await client.post(f"/api/v1/orgs/{org_id}/courses", json={"code": "CS410", "title": "Trace"})
+    ).json()["id"]
+    student_id = (
+        await client.post("/api/v1/users", json={"email": "trace@example.com", "password": "password123"})
+    ).json()["id"]
+    await client.post(
+        f"/api/v1/orgs/{org_id}/courses/{course_id}/memberships",
+        json={"user_id": student_id, "role": "student"},
+    )
+    assignment_id = (
+        await client.post(
+            f"/api/v1/staff/courses/{course_id}/assignments",
+            json={"title": "A1", "description": "Desc", "module_id": None, "autograde_mode": "practice_only"},
+        )
+    ).json()["id"]
+    await client.post(
+        f"/api/v1/staff/courses/{course_id}/assignments/{assignment_id}/testcases",
+        json={
+            "name": "T1",
+            "position": 1,
+            "points": 7,
+            "is_hidden": False,
+            "stdin": "",
+            "expected_stdout": "ok\n",
+            "expected_stderr": "",
+        },
+    )
+    await client.post("/api/v1/auth/logout")
+    await _login(client, "trace@example.com")
+
+    # Stand in for Redis: capture what the taskiq middleware would put on the message.
+    sent: list[TaskiqMessage] = []
+
+    class _Task:
+        async def kiq(self, **kwargs):
+            message = TaskiqMessage(task_id="t", task_name="grade_submission", labels={}, args=[], kwargs=kwargs)
+            sent.append(TraceContextMiddleware().pre_send(message))
+
+    monkeypatch.setattr(settings, "redis_url", "redis://unused")
+    monkeypatch.setattr("app.worker.enqueue.grade_submission", _Task())
+    exporter.spans.clear()
+    r = await client.post(
+        f"/api/v1/student/courses/{course_id}/assignments/{assignment_id}/submissions",
+        files={"file": ("main.c", BytesIO(b"int main(){return 0;}\n"), "text/x-c")},
+        headers={"traceparent": f"00-{INCOMING_TRACE_ID}-{INCOMING_PARENT_ID}-01"},
+    )
+    assert r.status_code == 201
+    submission_id = r.json()["id"]
+    (message,) = sent
+
+    schema = (await db.execute(text("SELECT current_schema()"))).scalar_one()
+    session_maker = async_sessionmaker(db.bind, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def _session_factory():
+        async with session_maker() as session:
+            await session.execute(text(f"SET search_path TO {schema}"))
+            yield session
+
+    async def _fake_prepare(*args, **kwargs):
+        return PreparedJobeRun(
+            language_id="c",
+            source_code="int main(){return 0;}\n",
+            source_filename="main.c",
+            file_list=None,
+            parameters=None,
+            cputime=1,
+            memorylimit=64,
+            streamsize=0.064,
+        )
+
+    async def _fake_run_test_case(*args, **kwargs):
+        return RunCheck(passed=True, outcome=JOBE_OUTCOME_OK, compile_output="", stdout="ok\n", stderr="")
+
+    async def _healthy(*, force: bool = False):
+        return None
+
+    monkeypatch.setattr("app.worker.tasks._ensure_jobe_healthy", _healthy)
+    monkeypatch.setattr("app.worker.tasks._jobe_client", lambda: object())
+    monkeypatch.setattr("app.worker.tasks.prepare_jobe_run", _fake_prepare)
+    monkeypatch.setattr("app.worker.tasks.run_test_case", _fake_run_test_case)
+    result = await _grade_submission_impl(
+        submission_id=submission_id,
+        session_factory=_session_factory,
+        traceparent=message.labels["traceparent"],
+    )
+    assert result["status"] == "graded"
+
+    tracing.flush_spans()
+    spans = [s for s in exporter.spans if s.trace_id == INCOMING_TRACE_ID]
+    by_name = {s.name: s for s in spans}
+    server = by_name["POST /api/v1/student/courses/{course_id}/assignments/{assignment_id}/submissions"]
+    assert server.parent_span_id == INCOMING_PARENT_ID
+    assert server.attributes["http.response.status_code"] == 201
+    assert by_name["submission.store"].parent_span_id == server.span_id
+    enqueue = by_name["enqueue grade_submission"]
+    assert enqueue.parent_span_id == server.span_id
+    assert message.labels["traceparent"] == f"00-{INCOMING_TRACE_ID}-{enqueue.span_id}-01"
+
+    grade = by_name["grade_submission"]
+    assert grade.parent_span_id == enqueue.span_id
+    assert grade.attributes["grading.status"] == "graded"
+    for name in ("prepare_jobe_run", "run_test_case"):
+        assert by_name[name].parent_span_id == grade.span_id
+    assert by_name["jobe.slot_wait"].parent_span_id == grade.span_id
+    db_parents = {s.parent_span_id for s in spans if s.name == "db.query"}
+    assert {server.span_id, grade.span_id} <= db_parents
@@ -143,6 +143,7 @@ async def test_grade_submission_transitions_pending_to_graded(client, db, monkey
     assert submission.score == 7
     assert submission.feedback is not None
     assert submission.feedback.startswith("Practice: Passed 7/7 points across 1 tests.")
+    assert (submission.error_kind, submission.tests_passed, submission.tests_total) == (None, 1, 1)
     events = (
         await db.execute(
             select(GradingEvent).where(GradingEvent.submission_id == submission_id).order_by(GradingEvent.id.asc())
@@ -191,6 +192,12 @@ async def test_grade_submission_transitions_pending_to_error(client, db, monkeyp
     assert submission.status == SubmissionStatus.error
     assert submission.score == 0
     assert submission.feedback == "gcc: error: broken source"
+    assert (submission.error_kind, submission.tests_passed, submission.tests_total) == ("compile_error", 0, 1)
+
+    # The student list reads the stored classification.
+    response = await client.get("/api/v1/student/submissions")
+    item = next(i for i in response.json() if i["id"] == submission_id)
+    assert (item["error_kind"], item["tests_passed"], item["tests_total"]) == ("compile_error", 0, 1)
 
 
 @pytest.mark.asyncio
@@ -241,6 +248,7 @@ async def test_grade_submission_fail_fast_when_health_gate_is_unhealthy(client,
     assert submission.status == SubmissionStatus.error
     assert submission.score == 0
     assert submission.feedback == "Grading infrastructure unavailable (JOBE health check failed)."
+    assert submission.error_kind == "infra_error"
     events = (
         await db.execute(
             select(GradingEvent).where(GradingEvent.submission_id == submission_id).order_by(GradingEvent.id.asc())
@@ -5,7 +5,12 @@ import { createPortal } from "react-dom";
 import { useRouter } from "next/navigation";
 import { AnimatePresence, motion } from "framer-motion";
 import { Bell, Check } from "lucide-react";
-import { ApiError, notifications, type Notification } from "@/lib/api";
+import {
+  ApiError,
+  notifications,
+  type Notification,
+  type NotificationStreamEvent,
+} from "@/lib/api";
 import { reportError } from "@/lib/reportError";
 
 export function NotificationBell({
@@ -37,10 +42,10 @@ export function NotificationBell({
     try {
       const [all, unread] = await Promise.all([
         notifications.list({ limit: 10 }),
-        notifications.list({ unread_only: true, limit: 50 }),
+        notifications.unreadCount(),
       ]);
       setNotificationList(all);
-      setUnreadCount(unread.length);
+      setUnreadCount(unread.unread_count);
     } catch (err) {
       if (err instanceof ApiError && err.status === 401) {
         setIsDisabled(true);
@@ -53,11 +58,69 @@ export function NotificationBell({
     }
   }, [enabled, isDisabled]);
 
+  // Push instead of polling: the stream opens with the unread count and then delivers
+  // created/updated/read events. EventSource reconnects on its own; each reopen resyncs
+  // the list in case events were missed while disconnected.
   useEffect(() => {
     if (!enabled || isDisabled) return;
     void fetchNotifications();
-    const interval = setInterval(() => void fetchNotifications(), 60000);       
-    return () => clearInterval(interval);
+    if (typeof EventSource === "undefined") return;
+
+    const source = notifications.stream();
+    let opened = false;
+
+    const parse = (event: MessageEvent): NotificationStreamEvent | null => {
+      try {
+        return JSON.parse(event.data) as NotificationStreamEvent;
+      } catch {
+        return null;
+      }
+    };
+    const applyCount = (payload: NotificationStreamEvent) => {
+      if (typeof payload.unread_count === "number") setUnreadCount(payload.unread_count);
+    };
+    const upsert = (event: MessageEvent) => {
+      const payload = parse(event);
+      if (!payload) return;
+      const incoming = payload.notification;
+      if (incoming) {
+        setNotificationList((prev) =>
+          [incoming, ...prev.filter((n) => n.id !== incoming.id)].slice(0, 10)
+        );
+      }
+      applyCount(payload);
+    };
+    const onUnread = (event: MessageEvent) => {
+      const payload = parse(event);
+      if (payload) applyCount(payload);
+    };
+    const onRead = (event: MessageEvent) => {
+      const payload = parse(event);
+      if (!payload) return;
+      const readId = payload.notification_id;
+      if (readId !== undefined) {
+        const readAt = new Date().toISOString();
+        setNotificationList((prev) =>
+          prev.map((n) => (n.id === readId && n.read_at === null ? { ...n, read_at: readAt } : n))
+        );
+      }
+      applyCount(payload);
+    };
+
+    source.onopen = () => {
+      if (opened) void fetchNotifications();
+      opened = true;
+    };
+    source.onerror = () => {
+      // CLOSED means the browser gave up (e.g. the session expired); check once via fetch.
+      if (source.readyState === EventSource.CLOSED) void fetchNotifications();
+    };
+    source.addEventListener("notification.unread", onUnread);
+    source.addEventListener("notification.created", upsert);
+    source.addEventListener("notification.updated", upsert);
+    source.addEventListener("notification.read", onRead);
+
+    return () => source.close();
   }, [enabled, fetchNotifications, isDisabled]);
 
   const computePanelPosition = useCallback(() => {
@@ -1,5 +1,5 @@
 import { API_BASE, ApiError, handleResponse } from "./core";
-import type { Assignment, AssignmentCreate, AssignmentExtension, AssignmentExtensionUpsert, AssignmentUpdate, Course, CourseMembership, CourseMembershipCreate, CourseMembershipUpdate, CourseNotificationPreferences, CourseStudentInviteByEmail, CourseUpdate, ImportCsvResult, MissingStudentOut, MissingSubmissionsSummaryItem, Module, ModuleCreate, ModuleResource, ModuleResourceLinkCreate, ModuleResourceUpdate, ModuleUpdate, OrgMembership, StaffCalendarEvent, TestCase, TestCaseCreate, TestCaseUpdate } from "./types";
+import type { Assignment, AssignmentCreate, AssignmentExtension, AssignmentExtensionUpsert, AssignmentUpdate, Course, CourseMembership, CourseMembershipCreate, CourseMembershipUpdate, CourseNotificationPreferences, CourseStudentInviteByEmail, CourseUpdate, GradebookMatrix, ImportCsvResult, MissingStudentOut, MissingSubmissionsSummaryItem, Module, ModuleCreate, ModuleResource, ModuleResourceLinkCreate, ModuleResourceUpdate, ModuleUpdate, OrgMembership, StaffCalendarEvent, TestCase, TestCaseCreate, TestCaseUpdate } from "./types";
 
 export const courseStaff = {
   async listCourses(offset = 0, limit = 100): Promise<Course[]> {
@@ -440,4 +440,16 @@ export const courseStaff = {
     }
     return res.blob();
   },
+
+  async gradebook(courseId: number): Promise<GradebookMatrix> {
+    const res = await fetch(`${API_BASE}/api/v1/staff/courses/${courseId}/gradebook`, {
+      credentials: "include",
+    });
+    return handleResponse<GradebookMatrix>(res);
+  },
+
+  // Streamed export; link to it directly so the browser writes it to disk as it arrives.
+  gradebookUrl(courseId: number, format: "csv" | "jsonl" = "csv", score: "latest" | "best" = "latest"): string {
+    return `${API_BASE}/api/v1/staff/courses/${courseId}/gradebook.${format}?score=${score}`;
+  },
 };
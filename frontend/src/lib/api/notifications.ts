@@ -1,5 +1,5 @@
 import { API_BASE, handleResponse } from "./core";
-import type { Notification } from "./types";
+import type { Notification, NotificationUnreadCount } from "./types";
 
 export const notifications = {
   async list(params?: {
@@ -19,6 +19,20 @@ export const notifications = {
     return handleResponse<Notification[]>(res);
   },
 
+  async unreadCount(): Promise<NotificationUnreadCount> {
+    const res = await fetch(`${API_BASE}/api/v1/student/notifications/unread-count`, {
+      credentials: "include",
+    });
+    return handleResponse<NotificationUnreadCount>(res);
+  },
+
+  /** Server-sent events: notification.unread, notification.created/updated/read. */
+  stream(): EventSource {
+    return new EventSource(`${API_BASE}/api/v1/student/notifications/stream`, {
+      withCredentials: true,
+    });
+  },
+
   async markRead(notificationId: number): Promise<Notification> {
     const res = await fetch(
       `${API_BASE}/api/v1/student/notifications/${notificationId}/read`,
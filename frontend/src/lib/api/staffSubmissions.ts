@@ -1,5 +1,5 @@
 import { API_BASE, ApiError, handleResponse } from "./core";
-import type { Paginated, StaffNextSubmissionOut, StaffSubmissionDetail, StaffSubmissionQueueItem, StaffSubmissionsBulkRequest, StaffSubmissionsBulkResult, StaffSubmissionUpdate, Submission, SubmissionTestResult, ZipContents } from "./types";
+import type { Paginated, StaffNextSubmissionOut, StaffSubmissionChanges, StaffSubmissionDetail, StaffSubmissionQueueItem, StaffSubmissionsBulkRequest, StaffSubmissionsBulkResult, StaffSubmissionUpdate, Submission, SubmissionTestResult, ZipContents } from "./types";
 
 export const staffSubmissions = {
   async listQueue(params?: {
@@ -26,12 +26,14 @@ export const staffSubmissions = {
     status?: "pending" | "grading" | "graded" | "error";
     offset?: number;
     limit?: number;
+    cursor?: string;
   }): Promise<Paginated<StaffSubmissionQueueItem>> {
     const query = new URLSearchParams();
     if (params?.course_id !== undefined) query.set("course_id", String(params.course_id));
     if (params?.status) query.set("status_filter", params.status);
     if (params?.offset !== undefined) query.set("offset", String(params.offset));
     if (params?.limit !== undefined) query.set("limit", String(params.limit));
+    if (params?.cursor) query.set("cursor", params.cursor);
 
     const qs = query.toString();
     const res = await fetch(`${API_BASE}/api/v1/staff/submissions/page${qs ? `?${qs}` : ""}`, {
@@ -40,6 +42,20 @@ export const staffSubmissions = {
     return handleResponse<Paginated<StaffSubmissionQueueItem>>(res);
   },
 
+  // Omit `cursor` to get a starting cursor (no items) before loading the first page.
+  async changes(params?: { course_id?: number; cursor?: string; limit?: number }): Promise<StaffSubmissionChanges> {
+    const query = new URLSearchParams();
+    if (params?.course_id !== undefined) query.set("course_id", String(params.course_id));
+    if (params?.cursor) query.set("cursor", params.cursor);
+    if (params?.limit !== undefined) query.set("limit", String(params.limit));
+
+    const qs = query.toString();
+    const res = await fetch(`${API_BASE}/api/v1/staff/submissions/changes${qs ? `?${qs}` : ""}`, {
+      credentials: "include",
+    });
+    return handleResponse<StaffSubmissionChanges>(res);
+  },
+
   async bulkUpdate(data: StaffSubmissionsBulkRequest): Promise<StaffSubmissionsBulkResult> {
     const res = await fetch(`${API_BASE}/api/v1/staff/submissions/bulk`, {
       method: "POST",
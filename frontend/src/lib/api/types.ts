@@ -95,6 +95,8 @@ export interface Submission {
   feedback: string | null;
   status: "pending" | "grading" | "graded" | "error";
   error_kind?: "compile_error" | "runtime_error" | "infra_error" | "internal_error" | null;
+  tests_passed?: number | null;
+  tests_total?: number | null;
   effective_due_date?: string | null;
   late_seconds?: number | null;
   late_penalty_percent?: number | null;
@@ -457,6 +459,15 @@ export interface StaffSubmissionQueueItem {
   status: "pending" | "grading" | "graded" | "error";
   score: number | null;
   feedback: string | null;
+  updated_at?: string | null;
+  graded_at?: string | null;
+}
+
+// Incremental sync: upsert `items` by id, then poll again with `next_cursor`.
+export interface StaffSubmissionChanges {
+  items: StaffSubmissionQueueItem[];
+  next_cursor: string;
+  has_more: boolean;
 }
 
 export interface ZipEntry {
@@ -486,6 +497,10 @@ export interface Paginated<T> {
   total: number;
   offset: number;
   limit: number;
+  /** Keyset cursor for the next page (pass back as `cursor`); null on the last page. */
+  next_cursor?: string | null;
+  /** Where `total` came from: maintained counters (default) or an exact recount. */
+  total_source?: "counter" | "exact";
 }
 
 export type StaffSubmissionBulkAction = "mark_pending" | "mark_grading" | "mark_graded";
@@ -512,6 +527,29 @@ export interface MissingSubmissionsSummaryItem {
   missing_count: number;
 }
 
+// Column-oriented: cells.<field>[i][j] is students[i] x assignments[j]; null when unsubmitted.
+export interface GradebookMatrix {
+  course_id: number;
+  version: string | null;
+  assignments: {
+    id: number[];
+    title: string[];
+    max_points: number[];
+    due_date: (string | null)[];
+  };
+  students: {
+    user_id: number[];
+    email: string[];
+    full_name: (string | null)[];
+    student_number: (string | null)[];
+  };
+  cells: {
+    submission_id: (number | null)[][];
+    status: ("pending" | "grading" | "graded" | "error" | null)[][];
+    score: (number | null)[][];
+  };
+}
+
 export interface MissingStudentOut {
   user_id: number;
   email: string;
@@ -572,6 +610,8 @@ export interface StudentSubmission {
   max_points: number;
   feedback: string | null;
   error_kind?: "compile_error" | "runtime_error" | "infra_error" | "internal_error" | null;
+  tests_passed?: number | null;
+  tests_total?: number | null;
   due_date?: string | null;
   effective_due_date?: string | null;
   late_seconds?: number | null;
@@ -582,7 +622,7 @@ export interface StudentSubmission {
    NOTIFICATION TYPES
    ============================================ */
 
-export type NotificationKind = "submission_graded";
+export type NotificationKind = "submission_graded" | "submissions_received";
 
 export interface Notification {
   id: number;
@@ -593,3 +633,14 @@ export interface Notification {
   read_at: string | null;
   created_at: string;
 }
+
+export interface NotificationUnreadCount {
+  unread_count: number;
+}
+
+export interface NotificationStreamEvent {
+  type: "notification.unread" | "notification.created" | "notification.updated" | "notification.read";
+  notification?: Notification;
+  notification_id?: number;
+  unread_count?: number;
+}
@@ -0,0 +1 @@
+int main(){return 0;}
\ No newline at end of file